@@ -1,27 +1,88 @@
 import logging
 
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.helpers.event import async_track_time_change, async_track_time_interval
+from homeassistant.helpers.storage import STORAGE_DIR
+
+from contextlib import AsyncExitStack
+from datetime import timedelta
+from functools import partial
 from homeassistant.helpers.config_entry_oauth2_flow import (
     async_register_implementation,
     OAuth2Session,
 )
 
 from .oauth2_impl import GoogleDriveOAuth2Implementation
-from .helpers.authentication_services import async_get_google_drive_credentials
+from .helpers.authentication_services import DriveCredentialsCache, async_get_google_drive_credentials
+from .helpers.drive_client_pool import DriveClientPool
+from .helpers.async_drive_client import AsyncDriveClient
+from .helpers.job_scheduler import DriveJobScheduler
+from .helpers.create_sensor import async_create_or_update_sensor
+from .helpers.upload_strategy import UploadStrategy
+from .helpers.upload_progress import UploadProgressTracker
+from .helpers.folder_cache import FolderCache, get_folder_cache_store
+from .helpers.file_hash import FileHashCache
+from .helpers.sync_manifest import SyncManifest, get_sync_manifest_store
+from .helpers.metadata_mirror import DriveMetadataMirror
+from .helpers.change_watcher import DriveChangeWatcher, get_change_watcher_store
+from .helpers.upload_queue import OfflineUploadQueue, UploadQueueDatabase
 from .helpers.google_drive_actions import (
     async_get_list_files_by_pattern,
     async_upload_media_file,
+    async_queue_upload_media_file,
+    async_upload_media_files,
+    async_upload_archive,
     async_cleanup_older_files_by_pattern,
+    async_apply_retention_policy,
+    async_cleanup_older_date_folders,
+    async_merge_duplicate_folders,
+    async_sync_folder,
+    async_download_file,
+    async_prewarm_folder_cache,
+    async_precreate_daily_folders,
+    async_sync_metadata_mirror,
+    async_add_change_watch,
+    async_remove_change_watch,
     )
 from .helpers.service_schemas import SCHEMAS
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CONF_PREWARM_FOLDER_CACHE,
+    CONF_PRECREATE_DAILY_FOLDERS,
+    DEFAULT_PREWARM_FOLDER_CACHE,
+    DEFAULT_PRECREATE_DAILY_FOLDERS,
+    DAILY_FOLDERS_PRECREATE_HOUR,
+    CONF_METADATA_MIRROR,
+    DEFAULT_METADATA_MIRROR,
+    MIRROR_SYNC_INTERVAL,
+    CONF_CHANGE_PUSH_NOTIFICATIONS,
+    DEFAULT_CHANGE_PUSH_NOTIFICATIONS,
+    API_STATS_SENSOR_NAME,
+    API_STATS_INTERVAL,
+    CONF_ASYNC_DRIVE_CLIENT,
+    DEFAULT_ASYNC_DRIVE_CLIENT,
+    JOB_QUEUE_STATS_INTERVAL,
+    UPLOAD_QUEUE_STATS_INTERVAL,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry) -> bool:
-    """Set up Google Drive integration from a config entry."""
+    """Set up Google Drive integration from a config entry.
+
+    Home Assistant does not unload an entry of which the setup raised, so whatever was opened
+    before the failing step is closed here. Once the setup completed, async_unload_entry closes it.
+    """
+    async with AsyncExitStack() as cleanup:
+        result = await _async_setup_entry(hass, entry, cleanup)
+        cleanup.pop_all()
+        return result
+
+
+async def _async_setup_entry(hass: HomeAssistant, entry, cleanup: AsyncExitStack) -> bool:
+    """Set up the config entry, pushing the closing of everything it opens on `cleanup`."""
     # Re‑instantiate and register our OAuth2 implementation so HA can find it on restart
     implementation = GoogleDriveOAuth2Implementation(
         hass,
@@ -32,18 +93,212 @@ async def async_setup_entry(hass: HomeAssistant, entry) -> bool:
 
     # Create the OAuth2Session (handles token refresh & storage)
     session = OAuth2Session(hass, entry, implementation)
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = session
 
+    # Cache the credentials built from the session token, refreshing the token once when it is about to expire
+    credentials_cache = DriveCredentialsCache(hass, entry, session)
+
+    # Create the Drive client pool, loading the bundled discovery document once
+    client_pool = DriveClientPool()
+    cleanup.push_async_callback(hass.async_add_executor_job, client_pool.close)
+    await hass.async_add_executor_job(client_pool.load_discovery_document)
+
+    # Create the Drive client running on the event loop, sharing the rate limit of the client pool
+    async_drive_client = None
+    if entry.options.get(CONF_ASYNC_DRIVE_CLIENT, DEFAULT_ASYNC_DRIVE_CLIENT):
+
+        async def async_get_access_token() -> str:
+            return (await credentials_cache.async_get_credentials()).token
+
+        async_drive_client = AsyncDriveClient(hass, async_get_access_token, client_pool.rate_limiter)
+
+    # Run the blocking Drive work on workers of this entry by priority, instead of Home Assistant's shared executor
+    job_scheduler = DriveJobScheduler(hass)
+    cleanup.callback(job_scheduler.close)
+
+    # Create the upload strategy from the integration options
+    upload_strategy = UploadStrategy.from_options(entry.options)
+
+    # Create the tracker publishing the progress of running uploads to a sensor
+    progress_tracker = UploadProgressTracker(hass)
+
+    # Load the folder IDs resolved before the last restart
+    folder_cache = FolderCache(hass, get_folder_cache_store(hass, entry.entry_id))
+    await folder_cache.async_load()
+
+    # Cache the checksums of local files, so unchanged files are hashed only once for skip_if_identical
+    file_hash_cache = FileHashCache()
+
+    # The manifests of sync_folder, loaded by the first sync
+    sync_manifest = SyncManifest(hass, get_sync_manifest_store(hass, entry.entry_id))
+
+    # Open the local mirror of the Drive metadata, or remove it when the option was turned off
+    metadata_mirror = None
+    mirror_path = get_metadata_mirror_path(hass, entry.entry_id)
+    if entry.options.get(CONF_METADATA_MIRROR, DEFAULT_METADATA_MIRROR):
+        metadata_mirror = DriveMetadataMirror(mirror_path)
+        cleanup.push_async_callback(hass.async_add_executor_job, metadata_mirror.close)
+        await hass.async_add_executor_job(metadata_mirror.open)
+    else:
+        await hass.async_add_executor_job(DriveMetadataMirror.remove_database, mirror_path)
+
+    # Load the watches of the Drive changes feed
+    change_watcher = DriveChangeWatcher(
+        hass,
+        get_change_watcher_store(hass, entry.entry_id),
+        client_pool,
+        partial(async_get_google_drive_credentials, hass, entry),
+        entry.options.get(CONF_CHANGE_PUSH_NOTIFICATIONS, DEFAULT_CHANGE_PUSH_NOTIFICATIONS),
+        job_scheduler,
+    )
+    await change_watcher.async_load()
+    cleanup.push_async_callback(change_watcher.async_stop)
+
+    # Open the journal of the queued uploads, kept on disk so they survive a restart
+    upload_queue_database = UploadQueueDatabase(get_upload_queue_path(hass, entry.entry_id))
+    cleanup.push_async_callback(hass.async_add_executor_job, upload_queue_database.close)
+    await hass.async_add_executor_job(upload_queue_database.open)
+
+    async def upload_queued_file(request: dict) -> dict:
+        credentials = await async_get_google_drive_credentials(hass, entry)
+        return await async_upload_media_file(
+            hass,
+            credentials,
+            request["local_file_path"],
+            request["mime_type"],
+            request["remote_file_name"],
+            request["remote_folder_path"],
+            False,
+            request["save_to_sensor"],
+            request["sensor_name"],
+            request["fields"],
+            client_pool=client_pool,
+            upload_strategy=upload_strategy,
+            progress_tracker=progress_tracker,
+            folder_cache=folder_cache,
+            skip_if_identical=request["skip_if_identical"],
+            file_hash_cache=file_hash_cache,
+            async_drive_client=async_drive_client,
+            job_scheduler=job_scheduler,
+        )
+
+    upload_queue = OfflineUploadQueue(hass, upload_queue_database, upload_queued_file)
+
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
+        "session": session,
+        "credentials_cache": credentials_cache,
+        "client_pool": client_pool,
+        "async_drive_client": async_drive_client,
+        "job_scheduler": job_scheduler,
+        "upload_strategy": upload_strategy,
+        "progress_tracker": progress_tracker,
+        "folder_cache": folder_cache,
+        "file_hash_cache": file_hash_cache,
+        "sync_manifest": sync_manifest,
+        "metadata_mirror": metadata_mirror,
+        "change_watcher": change_watcher,
+        "upload_queue_database": upload_queue_database,
+        "upload_queue": upload_queue,
+    }
+    cleanup.callback(hass.data[DOMAIN].pop, entry.entry_id, None)
+
+    # Reload the entry when the options are changed
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
+    # Resolve all Drive folders once in the background, so uploads find their folder in the cache
+    if entry.options.get(CONF_PREWARM_FOLDER_CACHE, DEFAULT_PREWARM_FOLDER_CACHE):
+        async def prewarm_folder_cache() -> None:
+            credentials = await async_get_google_drive_credentials(hass, entry)
+            await async_prewarm_folder_cache(hass, credentials, client_pool, folder_cache, job_scheduler)
+
+        entry.async_create_background_task(
+            hass, prewarm_folder_cache(), "google_drive_file_manager_prewarm_folder_cache"
+        )
+
+    # Fill the metadata mirror in the background and follow the Drive changes afterwards
+    if metadata_mirror is not None:
+        async def sync_metadata_mirror(now=None) -> None:
+            credentials = await async_get_google_drive_credentials(hass, entry)
+            await async_sync_metadata_mirror(hass, credentials, metadata_mirror, client_pool, job_scheduler)
+
+        entry.async_create_background_task(
+            hass, sync_metadata_mirror(), "google_drive_file_manager_sync_metadata_mirror"
+        )
+        entry.async_on_unload(
+            async_track_time_interval(hass, sync_metadata_mirror, timedelta(seconds=MIRROR_SYNC_INTERVAL))
+        )
+
+    # Report the changes made while Home Assistant was stopped and follow the changes feed
+    entry.async_create_background_task(
+        hass, change_watcher.async_start(), "google_drive_file_manager_start_change_watcher"
+    )
+
+    # Upload the queued files in the background, starting with the ones queued before the last restart
+    upload_queue.async_start(entry)
+    cleanup.push_async_callback(upload_queue.async_stop)
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass, upload_queue.async_publish_stats, timedelta(seconds=UPLOAD_QUEUE_STATS_INTERVAL)
+        )
+    )
+
+    # Publish the request, throttle and retry counters of the rate limiter shared by all Drive requests
+    async def publish_api_stats(now) -> None:
+        stats = client_pool.rate_limiter.stats()
+        await async_create_or_update_sensor(
+            hass, API_STATS_SENSOR_NAME, stats["requests"], {**stats, "icon": "mdi:google-drive"}
+        )
+
+    entry.async_on_unload(
+        async_track_time_interval(hass, publish_api_stats, timedelta(seconds=API_STATS_INTERVAL))
+    )
+
+    # Publish the queue depth and wait times of every job class of the scheduler
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass, job_scheduler.async_publish_stats, timedelta(seconds=JOB_QUEUE_STATS_INTERVAL)
+        )
+    )
+
+    # Create tomorrow's year/month/day folders in the evening, so the first uploads after midnight don't wait for them
+    if entry.options.get(CONF_PRECREATE_DAILY_FOLDERS, DEFAULT_PRECREATE_DAILY_FOLDERS):
+        async def precreate_daily_folders(now) -> None:
+            credentials = await async_get_google_drive_credentials(hass, entry)
+            await async_precreate_daily_folders(hass, credentials, client_pool, folder_cache, job_scheduler)
+
+        entry.async_on_unload(
+            async_track_time_change(
+                hass, precreate_daily_folders, hour=DAILY_FOLDERS_PRECREATE_HOUR, minute=0, second=0
+            )
+        )
+
+
+    async def upload_media_file(call: ServiceCall) -> ServiceResponse:
+        """Service to upload a large media file, a camera snapshot, a URL or a media source item to Google Drive."""
+        # Queue the upload and return right away, it is uploaded in the background
+        if call.data["queued"]:
+            return await async_queue_upload_media_file(
+                hass,
+                upload_queue,
+                call.data.get("local_file_path"),
+                call.data["mime_type"],
+                call.data["remote_file_name"],
+                call.data["remote_folder_path"],
+                call.data["append_ymd_path"],
+                call.data["save_to_sensor"],
+                call.data["sensor_name"],
+                call.data["fields"],
+                call.data["skip_if_identical"],
+                call.data["queue_priority"],
+                folder_cache=folder_cache,
+            )
 
-    async def upload_media_file(call: ServiceCall) -> None:
-        """Service to upload a large media file to Google Drive."""
         # Get valid credentials (auto‑refresh if needed)
         credentials = await async_get_google_drive_credentials(hass, entry)
         # Upload the file
-        await async_upload_media_file(
+        return await async_upload_media_file(
             hass,
             credentials,
-            call.data["local_file_path"],
+            call.data.get("local_file_path"),
             call.data["mime_type"],
             call.data["remote_file_name"],
             call.data["remote_folder_path"],
@@ -51,14 +306,74 @@ async def async_setup_entry(hass: HomeAssistant, entry) -> bool:
             call.data["save_to_sensor"],
             call.data["sensor_name"],
             call.data["fields"],
+            client_pool=client_pool,
+            upload_strategy=upload_strategy,
+            progress_tracker=progress_tracker,
+            folder_cache=folder_cache,
+            skip_if_identical=call.data["skip_if_identical"],
+            file_hash_cache=file_hash_cache,
+            camera_entity_id=call.data.get("camera_entity_id"),
+            url=call.data.get("url"),
+            media_content_id=call.data.get("media_content_id"),
+            async_drive_client=async_drive_client,
+            job_scheduler=job_scheduler,
+        )
+
+    async def upload_media_files(call: ServiceCall) -> ServiceResponse:
+        """Service to upload multiple media files to Google Drive in parallel."""
+        # Get valid credentials (auto‑refresh if needed)
+        credentials = await async_get_google_drive_credentials(hass, entry)
+        # Upload the files
+        return await async_upload_media_files(
+            hass,
+            credentials,
+            call.data["local_file_paths"],
+            call.data["local_file_pattern"],
+            call.data["remote_folder_path"],
+            call.data["append_ymd_path"],
+            call.data["max_parallel_uploads"],
+            call.data["save_to_sensor"],
+            call.data["sensor_name"],
+            call.data["fields"],
+            client_pool=client_pool,
+            upload_strategy=upload_strategy,
+            progress_tracker=progress_tracker,
+            folder_cache=folder_cache,
+            skip_if_identical=call.data["skip_if_identical"],
+            file_hash_cache=file_hash_cache,
+            job_scheduler=job_scheduler,
+        )
+
+    async def upload_archive(call: ServiceCall) -> ServiceResponse:
+        """Service to upload local files to Google Drive as a single tar archive."""
+        # Get valid credentials (auto‑refresh if needed)
+        credentials = await async_get_google_drive_credentials(hass, entry)
+        # Upload the archive
+        return await async_upload_archive(
+            hass,
+            credentials,
+            call.data["local_file_paths"],
+            call.data["local_file_pattern"],
+            call.data["remote_file_name"],
+            call.data["remote_folder_path"],
+            call.data["append_ymd_path"],
+            call.data["compression"],
+            call.data["save_to_sensor"],
+            call.data["sensor_name"],
+            call.data["fields"],
+            client_pool=client_pool,
+            upload_strategy=upload_strategy,
+            progress_tracker=progress_tracker,
+            folder_cache=folder_cache,
+            job_scheduler=job_scheduler,
         )
 
-    async def cleanup_older_files_by_pattern(call: ServiceCall) -> None:
+    async def cleanup_older_files_by_pattern(call: ServiceCall) -> ServiceResponse:
         """Service to clean up files in Google Drive."""
         # Get valid credentials (auto‑refresh if needed)
         credentials = await async_get_google_drive_credentials(hass, entry)
-        # Clean up the files
-        await async_cleanup_older_files_by_pattern(
+        # Clean up the files, only keeping all processed files when the caller wants them in the response
+        return await async_cleanup_older_files_by_pattern(
             hass,
             credentials,
             call.data["pattern"],
@@ -67,28 +382,182 @@ async def async_setup_entry(hass: HomeAssistant, entry) -> bool:
             call.data["save_to_sensor"],
             call.data["sensor_name"],
             call.data["fields"],
+            client_pool=client_pool,
+            return_files=call.return_response,
+            async_drive_client=async_drive_client,
+            job_scheduler=job_scheduler,
+        )
+
+    async def cleanup_older_date_folders(call: ServiceCall) -> ServiceResponse:
+        """Service to remove expired year/month/day folders in Google Drive."""
+        # Get valid credentials (auto‑refresh if needed)
+        credentials = await async_get_google_drive_credentials(hass, entry)
+        # Remove the whole expired folders
+        return await async_cleanup_older_date_folders(
+            hass,
+            credentials,
+            call.data["remote_folder_path"],
+            call.data["days_ago"],
+            call.data["trash"],
+            call.data["preview"],
+            call.data["save_to_sensor"],
+            call.data["sensor_name"],
+            client_pool=client_pool,
+            folder_cache=folder_cache,
+            job_scheduler=job_scheduler,
+        )
+
+    async def apply_retention_policy(call: ServiceCall) -> ServiceResponse:
+        """Service to apply retention rules to files in Google Drive."""
+        # Get valid credentials (auto‑refresh if needed)
+        credentials = await async_get_google_drive_credentials(hass, entry)
+        # Delete the files expired by any rule
+        return await async_apply_retention_policy(
+            hass,
+            credentials,
+            call.data["rules"],
+            call.data["query"],
+            call.data["trash"],
+            call.data["preview"],
+            call.data["save_to_sensor"],
+            call.data["sensor_name"],
+            call.data["fields"],
+            client_pool=client_pool,
+            folder_cache=folder_cache,
+            job_scheduler=job_scheduler,
         )
 
-    async def list_files_by_pattern(call: ServiceCall) -> None:
+    async def list_files_by_pattern(call: ServiceCall) -> ServiceResponse:
         """Service to list files by pattern in Google Drive."""
         # Get valid credentials (auto‑refresh if needed)
         credentials = await async_get_google_drive_credentials(hass, entry)
         # List files by pattern
-        await async_get_list_files_by_pattern(
+        return await async_get_list_files_by_pattern(
             hass,
             credentials,
             call.data["query"],
             call.data["fields"],
+            call.data["save_to_sensor"],
             call.data["sensor_name"],
             call.data["sort_by_recent"],
             call.data["maximum_files"],
+            client_pool=client_pool,
+            metadata_mirror=metadata_mirror,
+            async_drive_client=async_drive_client,
+            job_scheduler=job_scheduler,
+        )
+
+    async def merge_duplicate_folders(call: ServiceCall) -> ServiceResponse:
+        """Service to merge duplicate folders in Google Drive."""
+        # Get valid credentials (auto‑refresh if needed)
+        credentials = await async_get_google_drive_credentials(hass, entry)
+        # Merge the duplicate folders
+        return await async_merge_duplicate_folders(
+            hass,
+            credentials,
+            call.data["remote_folder_path"],
+            call.data["preview"],
+            call.data["save_to_sensor"],
+            call.data["sensor_name"],
+            client_pool=client_pool,
+            folder_cache=folder_cache,
+            job_scheduler=job_scheduler,
+        )
+
+    async def sync_folder(call: ServiceCall) -> ServiceResponse:
+        """Service to sync a local folder to a folder in Google Drive."""
+        # Get valid credentials (auto‑refresh if needed)
+        credentials = await async_get_google_drive_credentials(hass, entry)
+        # Upload the new and changed files
+        return await async_sync_folder(
+            hass,
+            credentials,
+            call.data["local_folder_path"],
+            call.data["remote_folder_path"],
+            call.data["delete_orphans"],
+            call.data["full_scan"],
+            call.data["max_parallel_uploads"],
+            call.data["save_to_sensor"],
+            call.data["sensor_name"],
+            client_pool=client_pool,
+            upload_strategy=upload_strategy,
+            progress_tracker=progress_tracker,
+            folder_cache=folder_cache,
+            sync_manifest=sync_manifest,
+            file_hash_cache=file_hash_cache,
+            job_scheduler=job_scheduler,
+        )
+
+    async def download_file(call: ServiceCall) -> ServiceResponse:
+        """Service to download a file from Google Drive."""
+        # Get valid credentials (auto‑refresh if needed)
+        credentials = await async_get_google_drive_credentials(hass, entry)
+        # Download the file
+        return await async_download_file(
+            hass,
+            credentials,
+            call.data.get("file_id"),
+            call.data.get("remote_file_path"),
+            call.data["local_file_path"],
+            call.data["overwrite"],
+            call.data["resume"],
+            call.data["max_parallel_ranges"],
+            call.data["save_to_sensor"],
+            call.data["sensor_name"],
+            client_pool=client_pool,
+            folder_cache=folder_cache,
+            job_scheduler=job_scheduler,
+        )
+
+    async def add_change_watch(call: ServiceCall) -> None:
+        """Service to fire events for new, changed and removed files in a folder or matching a query."""
+        # Get valid credentials (auto‑refresh if needed)
+        credentials = await async_get_google_drive_credentials(hass, entry)
+        # Add the watch
+        await async_add_change_watch(
+            hass,
+            credentials,
+            change_watcher,
+            call.data["watch_id"],
+            call.data.get("remote_folder_path"),
+            call.data.get("query"),
+            client_pool=client_pool,
+            folder_cache=folder_cache,
+            job_scheduler=job_scheduler,
         )
 
+    async def remove_change_watch(call: ServiceCall) -> None:
+        """Service to stop watching for file changes."""
+        await async_remove_change_watch(hass, change_watcher, call.data["watch_id"])
+
     # Create a list of all the services we want to register
     services = {
         "upload_media_file": upload_media_file,
+        "upload_media_files": upload_media_files,
+        "upload_archive": upload_archive,
         "cleanup_older_files_by_pattern": cleanup_older_files_by_pattern,
+        "cleanup_older_date_folders": cleanup_older_date_folders,
+        "apply_retention_policy": apply_retention_policy,
         "list_files_by_pattern": list_files_by_pattern,
+        "merge_duplicate_folders": merge_duplicate_folders,
+        "sync_folder": sync_folder,
+        "download_file": download_file,
+        "add_change_watch": add_change_watch,
+        "remove_change_watch": remove_change_watch,
+    }
+
+    # Services that can return their results to the caller (response_variable)
+    services_with_response = {
+        "upload_media_file",
+        "upload_media_files",
+        "upload_archive",
+        "cleanup_older_files_by_pattern",
+        "cleanup_older_date_folders",
+        "apply_retention_policy",
+        "list_files_by_pattern",
+        "merge_duplicate_folders",
+        "sync_folder",
+        "download_file",
     }
 
     # Register each service with the corresponding function
@@ -99,11 +568,20 @@ async def async_setup_entry(hass: HomeAssistant, entry) -> bool:
             service_name,
             service_func,
             schema=SCHEMAS.get(service_name),
+            supports_response=(
+                SupportsResponse.OPTIONAL if service_name in services_with_response else SupportsResponse.NONE
+            ),
         )
+        cleanup.callback(hass.services.async_remove, DOMAIN, service_name)
     
     return True
 
 
+async def async_update_options(hass: HomeAssistant, entry) -> None:
+    """Reload the integration when its options are updated."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry) -> bool:
     """Unload Google Drive integration."""
 
@@ -111,5 +589,44 @@ async def async_unload_entry(hass: HomeAssistant, entry) -> bool:
     for service_name in SCHEMAS:
         hass.services.async_remove(DOMAIN, service_name)
         
-    hass.data[DOMAIN].pop(entry.entry_id)
+    # Stop the change watcher while its credentials can still be retrieved
+    await hass.data[DOMAIN][entry.entry_id]["change_watcher"].async_stop()
+
+    entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+
+    # Stop the queued uploads before their journal is closed, they are uploaded again after the next start
+    await entry_data["upload_queue"].async_stop()
+    await hass.async_add_executor_job(entry_data["upload_queue_database"].close)
+
+    # Cancel the queued Drive jobs, running jobs finish on their own
+    entry_data["job_scheduler"].close()
+
+    # Close the connections held by the Drive clients of this entry
+    await hass.async_add_executor_job(entry_data["client_pool"].close)
+
+    if entry_data["metadata_mirror"] is not None:
+        await hass.async_add_executor_job(entry_data["metadata_mirror"].close)
     return True
+
+
+async def async_remove_entry(hass: HomeAssistant, entry) -> None:
+    """Remove the stored data of a deleted config entry."""
+    await get_folder_cache_store(hass, entry.entry_id).async_remove()
+    await get_change_watcher_store(hass, entry.entry_id).async_remove()
+    await get_sync_manifest_store(hass, entry.entry_id).async_remove()
+    await hass.async_add_executor_job(
+        DriveMetadataMirror.remove_database, get_metadata_mirror_path(hass, entry.entry_id)
+    )
+    await hass.async_add_executor_job(
+        UploadQueueDatabase.remove_database, get_upload_queue_path(hass, entry.entry_id)
+    )
+
+
+def get_metadata_mirror_path(hass: HomeAssistant, entry_id: str) -> str:
+    """Return the path of the metadata mirror database of a config entry."""
+    return hass.config.path(STORAGE_DIR, f"{DOMAIN}.metadata.{entry_id}.db")
+
+
+def get_upload_queue_path(hass: HomeAssistant, entry_id: str) -> str:
+    """Return the path of the upload queue database of a config entry."""
+    return hass.config.path(STORAGE_DIR, f"{DOMAIN}.upload_queue.{entry_id}.db")
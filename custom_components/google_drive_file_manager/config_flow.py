@@ -1,11 +1,34 @@
 import logging
 import voluptuous as vol
 
+from homeassistant.config_entries import ConfigEntry, OptionsFlow
+from homeassistant.core import callback
 from homeassistant.helpers.config_entry_oauth2_flow import (
     AbstractOAuth2FlowHandler,
     async_register_implementation,
 )
-from .const import DOMAIN, OAUTH2_AUTHORIZE, OAUTH2_TOKEN, SCOPES
+from .const import (
+    DOMAIN,
+    OAUTH2_AUTHORIZE,
+    OAUTH2_TOKEN,
+    SCOPES,
+    CONF_MULTIPART_THRESHOLD_MB,
+    CONF_MIN_CHUNK_SIZE_MB,
+    CONF_MAX_CHUNK_SIZE_MB,
+    DEFAULT_MULTIPART_THRESHOLD_MB,
+    DEFAULT_MIN_CHUNK_SIZE_MB,
+    DEFAULT_MAX_CHUNK_SIZE_MB,
+    CONF_PREWARM_FOLDER_CACHE,
+    CONF_PRECREATE_DAILY_FOLDERS,
+    DEFAULT_PREWARM_FOLDER_CACHE,
+    DEFAULT_PRECREATE_DAILY_FOLDERS,
+    CONF_METADATA_MIRROR,
+    DEFAULT_METADATA_MIRROR,
+    CONF_CHANGE_PUSH_NOTIFICATIONS,
+    DEFAULT_CHANGE_PUSH_NOTIFICATIONS,
+    CONF_ASYNC_DRIVE_CLIENT,
+    DEFAULT_ASYNC_DRIVE_CLIENT,
+)
 from .oauth2_impl import GoogleDriveOAuth2Implementation
 
 _LOGGER = logging.getLogger(__name__)
@@ -27,6 +50,12 @@ class GoogleDriveConfigFlowHandler(
         self.client_id: str | None = None
         self.client_secret: str | None = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Return the options flow for this handler."""
+        return GoogleDriveOptionsFlowHandler(config_entry)
+
     @property
     def logger(self) -> logging.Logger:
         return _LOGGER
@@ -79,3 +108,53 @@ class GoogleDriveConfigFlowHandler(
                 "auth_implementation": self.flow_impl.domain,
             }
         )
+
+
+class GoogleDriveOptionsFlowHandler(OptionsFlow):
+    """Handle the options of the Google Drive integration."""
+
+    def __init__(self, config_entry: ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input: dict | None = None):
+        """Ask for the upload strategy thresholds and the folder preparation."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        data_schema = vol.Schema({
+            vol.Optional(
+                CONF_MULTIPART_THRESHOLD_MB,
+                default=options.get(CONF_MULTIPART_THRESHOLD_MB, DEFAULT_MULTIPART_THRESHOLD_MB),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=5)),
+            vol.Optional(
+                CONF_MIN_CHUNK_SIZE_MB,
+                default=options.get(CONF_MIN_CHUNK_SIZE_MB, DEFAULT_MIN_CHUNK_SIZE_MB),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=256)),
+            vol.Optional(
+                CONF_MAX_CHUNK_SIZE_MB,
+                default=options.get(CONF_MAX_CHUNK_SIZE_MB, DEFAULT_MAX_CHUNK_SIZE_MB),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=256)),
+            vol.Optional(
+                CONF_PREWARM_FOLDER_CACHE,
+                default=options.get(CONF_PREWARM_FOLDER_CACHE, DEFAULT_PREWARM_FOLDER_CACHE),
+            ): bool,
+            vol.Optional(
+                CONF_PRECREATE_DAILY_FOLDERS,
+                default=options.get(CONF_PRECREATE_DAILY_FOLDERS, DEFAULT_PRECREATE_DAILY_FOLDERS),
+            ): bool,
+            vol.Optional(
+                CONF_METADATA_MIRROR,
+                default=options.get(CONF_METADATA_MIRROR, DEFAULT_METADATA_MIRROR),
+            ): bool,
+            vol.Optional(
+                CONF_CHANGE_PUSH_NOTIFICATIONS,
+                default=options.get(CONF_CHANGE_PUSH_NOTIFICATIONS, DEFAULT_CHANGE_PUSH_NOTIFICATIONS),
+            ): bool,
+            vol.Optional(
+                CONF_ASYNC_DRIVE_CLIENT,
+                default=options.get(CONF_ASYNC_DRIVE_CLIENT, DEFAULT_ASYNC_DRIVE_CLIENT),
+            ): bool,
+        })
+        return self.async_show_form(step_id="init", data_schema=data_schema)
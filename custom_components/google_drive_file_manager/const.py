@@ -5,4 +5,230 @@ OAUTH2_AUTHORIZE = "https://accounts.google.com/o/oauth2/v2/auth"
 OAUTH2_TOKEN = "https://oauth2.googleapis.com/token"
 
 # Scope to read drive metadata
-SCOPES = ["https://www.googleapis.com/auth/drive"]
\ No newline at end of file
+SCOPES = ["https://www.googleapis.com/auth/drive"]
+
+# MIME type of the folders in Google Drive
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+
+# Drive accepts at most 100 calls in a single batch HTTP request
+DELETE_BATCH_SIZE = 100
+
+# Number of delete batch requests that may be in flight at the same time
+DELETE_MAX_CONCURRENT_BATCHES = 4
+
+# Minimum number of seconds between two cleanup progress events
+CLEANUP_PROGRESS_INTERVAL = 5
+
+# Size budget (bytes of JSON) of the files attribute of a sensor, the recorder doesn't store larger attributes
+SENSOR_MAX_FILES_BYTES = 16384
+
+# Number of files kept in the files attribute of a sensor whose results exceed the budget
+SENSOR_PREVIEW_FILES = 10
+
+# Folder in the configuration directory for the full results of sensors exceeding the budget
+SENSOR_RESULTS_FOLDER = DOMAIN
+
+# Event fired with the progress of a running cleanup
+EVENT_CLEANUP_PROGRESS = f"{DOMAIN}_cleanup_progress"
+
+# Default number of files uploaded at the same time by upload_media_files
+UPLOAD_DEFAULT_PARALLEL_UPLOADS = 4
+
+# Integration options for the upload strategy (sizes in MB)
+CONF_MULTIPART_THRESHOLD_MB = "multipart_threshold_mb"
+CONF_MIN_CHUNK_SIZE_MB = "min_chunk_size_mb"
+CONF_MAX_CHUNK_SIZE_MB = "max_chunk_size_mb"
+
+# Files up to this size are uploaded in one multipart request, Drive allows up to 5 MB
+DEFAULT_MULTIPART_THRESHOLD_MB = 5
+DEFAULT_MIN_CHUNK_SIZE_MB = 1
+DEFAULT_MAX_CHUNK_SIZE_MB = 32
+
+# Chunk size of a resumable upload before any throughput has been measured (bytes)
+UPLOAD_INITIAL_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Resumable upload chunks are sized to take about this many seconds at the measured throughput
+UPLOAD_TARGET_CHUNK_SECONDS = 5
+
+# Sensor showing the progress of running resumable uploads
+UPLOAD_PROGRESS_SENSOR_NAME = "Google Drive upload progress"
+
+# Minimum number of seconds between two updates of the upload progress sensor
+UPLOAD_PROGRESS_INTERVAL = 2
+
+# Maximum number of folder paths in the folder ID cache of a config entry
+FOLDER_CACHE_MAX_ENTRIES = 500
+
+# Seconds to wait before writing changes of the folder ID cache to storage
+FOLDER_CACHE_SAVE_DELAY = 10
+
+# Version of the stored folder ID cache
+FOLDER_CACHE_STORAGE_VERSION = 1
+
+# Maximum number of files moved in a single Drive batch request when merging duplicate folders
+MOVE_BATCH_SIZE = 100
+
+# Options to warm up the folder cache at startup and to create the next day's upload folders ahead of time
+CONF_PREWARM_FOLDER_CACHE = "prewarm_folder_cache"
+CONF_PRECREATE_DAILY_FOLDERS = "precreate_daily_folders"
+DEFAULT_PREWARM_FOLDER_CACHE = False
+DEFAULT_PRECREATE_DAILY_FOLDERS = True
+
+# Hour of the day (local time) at which the year/month/day folders of the next day are created
+DAILY_FOLDERS_PRECREATE_HOUR = 23
+
+# Folders of the next day are only created for paths that received uploads in this many days
+DAILY_FOLDERS_ACTIVE_DAYS = 7
+
+# Option to keep a local SQLite mirror of the Drive metadata, answering list_files_by_pattern without the API
+CONF_METADATA_MIRROR = "metadata_mirror"
+DEFAULT_METADATA_MIRROR = False
+
+# Seconds between two syncs of the metadata mirror with the Drive changes feed
+MIRROR_SYNC_INTERVAL = 300
+
+# Before answering a query the mirror is synced when its last sync is older than this many seconds
+MIRROR_QUERY_SYNC_INTERVAL = 15
+
+# Events fired for files matching a change watch
+EVENT_FILE_ADDED = f"{DOMAIN}_file_added"
+EVENT_FILE_CHANGED = f"{DOMAIN}_file_changed"
+EVENT_FILE_REMOVED = f"{DOMAIN}_file_removed"
+
+# Version of the stored change watches and page token
+CHANGE_WATCHER_STORAGE_VERSION = 1
+
+# Seconds between polls of the changes feed, doubled after every poll without changes up to the maximum
+WATCH_MIN_POLL_INTERVAL = 15
+WATCH_MAX_POLL_INTERVAL = 300
+
+# Maximum number of files remembered per watch to tell added from changed files
+WATCH_MAX_TRACKED_FILES = 5000
+
+# Seconds to wait before writing changes of the watches and page token to storage
+WATCH_SAVE_DELAY = 10
+
+# Option to receive Drive push notifications on a webhook, this needs an external HTTPS URL
+CONF_CHANGE_PUSH_NOTIFICATIONS = "change_push_notifications"
+DEFAULT_CHANGE_PUSH_NOTIFICATIONS = False
+
+# Seconds a push notification channel is requested for, it is renewed shortly before it expires
+WATCH_CHANNEL_LIFETIME = 24 * 60 * 60
+WATCH_CHANNEL_RENEW_MARGIN = 10 * 60
+
+# Token bucket shared by all Drive requests of an account: sustained requests per second and burst size
+API_REQUESTS_PER_SECOND = 10
+API_REQUESTS_BURST = 20
+
+# Rate limit and server errors are retried this many times, with exponential backoff between the attempts
+API_MAX_RETRIES = 6
+API_RETRY_BASE_DELAY = 1
+API_RETRY_MAX_DELAY = 64
+
+# Sensor showing the number of Drive requests, throttled requests and retries
+API_STATS_SENSOR_NAME = "Google Drive API requests"
+
+# Seconds between two updates of the API requests sensor
+API_STATS_INTERVAL = 60
+
+# Maximum number of local files of which the MD5 checksum is cached for skip_if_identical
+FILE_HASH_CACHE_MAX_ENTRIES = 1000
+
+# Block size used to read local files when computing their MD5 checksum (bytes)
+FILE_HASH_BLOCK_SIZE = 1024 * 1024
+
+# Version of the stored sync_folder manifests
+SYNC_MANIFEST_STORAGE_VERSION = 1
+
+# Seconds to wait before writing changes of the sync_folder manifests to storage
+SYNC_MANIFEST_SAVE_DELAY = 10
+
+# Maximum number of parent folders combined in a single listing query when listing a remote tree
+SYNC_LIST_PARENTS_PER_QUERY = 50
+
+# Size of the byte ranges in which files are downloaded, each download thread holds one range in memory
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Files smaller than this are always downloaded with a single connection
+DOWNLOAD_PARALLEL_THRESHOLD = 32 * 1024 * 1024
+
+# Suffix of the local file a download is written to until it is complete
+DOWNLOAD_PARTIAL_SUFFIX = ".part"
+
+# Maximum number of bytes produced ahead of a streamed upload, e.g. of an archive being written
+STREAM_PIPE_BUFFER_SIZE = 1024 * 1024
+
+# Compression options of upload_archive and the MIME type and file extension of the resulting archive
+ARCHIVE_FORMATS = {
+    "none": ("application/x-tar", ".tar"),
+    "gzip": ("application/gzip", ".tar.gz"),
+    "zstd": ("application/zstd", ".tar.zst"),
+}
+
+# Size of the blocks in which the response of an uploaded URL is read, and seconds to wait for the next block
+STREAM_READ_CHUNK_SIZE = 64 * 1024
+STREAM_READ_TIMEOUT = 60
+
+# Maximum number of keep-alive connections to the Drive API shared by all requests of an account
+DRIVE_CONNECTION_POOL_SIZE = 16
+
+# Seconds to wait for a connection to the Drive API and for data on it
+DRIVE_CONNECT_TIMEOUT = 30
+DRIVE_READ_TIMEOUT = 60
+
+# Option to send uploads, listings and deletes through the native async Drive client instead of googleapiclient
+CONF_ASYNC_DRIVE_CLIENT = "async_drive_client"
+DEFAULT_ASYNC_DRIVE_CLIENT = False
+
+# Root URL of the Google APIs, of which the async Drive client builds its request URLs
+DRIVE_API_ROOT_URL = "https://www.googleapis.com/"
+
+# Maximum number of requests in a single Drive batch request
+DRIVE_BATCH_MAX_REQUESTS = 100
+
+# Priority classes of the Drive job scheduler, highest priority first: quick listings someone waits for,
+# single file transfers and long running bulk work (cleanups, syncs, multi-file uploads)
+JOB_CLASS_INTERACTIVE = "interactive"
+JOB_CLASS_TRANSFER = "transfer"
+JOB_CLASS_BULK = "bulk"
+JOB_CLASSES = (JOB_CLASS_INTERACTIVE, JOB_CLASS_TRANSFER, JOB_CLASS_BULK)
+
+# Number of worker threads of the Drive job scheduler, kept apart from Home Assistant's shared executor
+JOB_SCHEDULER_WORKERS = 8
+
+# Maximum number of jobs of each class running at the same time, transfers and bulk jobs together
+# leave workers free for interactive jobs
+JOB_CLASS_LIMITS = {
+    JOB_CLASS_INTERACTIVE: 8,
+    JOB_CLASS_TRANSFER: 4,
+    JOB_CLASS_BULK: 2,
+}
+
+# Maximum number of sub-tasks (parallel uploads, byte ranges, delete batches, listing producers) a running job
+# of each class runs at the same time, on sub-task threads of the scheduler that are kept apart from its workers
+JOB_CLASS_SUBTASK_LIMITS = {
+    JOB_CLASS_INTERACTIVE: 1,
+    JOB_CLASS_TRANSFER: 4,
+    JOB_CLASS_BULK: 8,
+}
+
+# Number of recently started jobs of a class of which the wait time is reported
+JOB_WAIT_SAMPLES = 100
+
+# Sensors showing the queue of each job class, and seconds between two updates
+JOB_QUEUE_SENSOR_NAME = "Google Drive {} jobs"
+JOB_QUEUE_STATS_INTERVAL = 10
+
+# Maximum number of queued uploads running at the same time while the offline upload queue drains
+UPLOAD_QUEUE_PARALLEL_UPLOADS = 2
+
+# Seconds to wait before trying the queued uploads again after Drive was unreachable, doubling up to the maximum
+UPLOAD_QUEUE_MIN_RETRY_DELAY = 30
+UPLOAD_QUEUE_MAX_RETRY_DELAY = 900
+
+# Sensor showing the number of queued uploads, and seconds between two updates of the age of the oldest one
+UPLOAD_QUEUE_SENSOR_NAME = "Google Drive upload queue"
+UPLOAD_QUEUE_STATS_INTERVAL = 60
+
+# Event fired when a queued upload was uploaded, or dropped because it can't succeed
+EVENT_QUEUED_UPLOAD = f"{DOMAIN}_queued_upload"
@@ -0,0 +1,455 @@
+from __future__ import annotations
+
+from googleapiclient.errors import HttpError
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from collections.abc import AsyncIterator, Awaitable, Callable
+from email.parser import BytesParser
+from email.policy import HTTP
+import aiohttp
+import asyncio
+import httplib2
+import json
+import os
+import time
+import uuid
+import logging
+
+from .rate_limiter import (
+    IDEMPOTENT_METHODS,
+    DriveRateLimiter,
+    get_batch_size,
+    is_retryable_response,
+    parse_retry_after,
+)
+from .upload_progress import UploadProgressTracker
+from .upload_strategy import UploadStrategy
+from ..const import (
+    DRIVE_API_ROOT_URL,
+    DRIVE_BATCH_MAX_REQUESTS,
+    DRIVE_CONNECT_TIMEOUT,
+    DRIVE_READ_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AsyncDriveClient:
+    """Drive v3 client on the shared aiohttp session of Home Assistant.
+
+    The googleapiclient path runs every service call in an executor thread, which it holds for
+    the whole listing or upload. This client sends the same requests as coroutines, so many
+    concurrent calls don't compete for the executor: only reading a file chunk is handed to it.
+    It implements what the upload, listing and cleanup services need: listing, getting and
+    creating files and folders, deleting, batch requests and multipart and resumable uploads.
+
+    Requests take a token from the rate limiter of the account and are retried like the
+    googleapiclient requests. Errors are raised as googleapiclient HttpError, so the callers
+    handle both paths the same way.
+    """
+
+    def __init__(self,
+                 hass: HomeAssistant,
+                 get_access_token: Callable[[], Awaitable[str]],
+                 rate_limiter: DriveRateLimiter,
+                 root_url: str = DRIVE_API_ROOT_URL) -> None:
+        """Initialize the client.
+
+        Args:
+            hass (HomeAssistant): The Home Assistant instance, of which the shared aiohttp session is used.
+            get_access_token (Callable): Returns a valid access token, called before every request.
+            rate_limiter (DriveRateLimiter): The rate limiter of the account, shared with the googleapiclient path.
+            root_url (str): (optional) Override of the Google APIs root URL, e.g. a local test endpoint.
+        """
+        self._hass = hass
+        self._session = async_get_clientsession(hass)
+        self._get_access_token = get_access_token
+        self.rate_limiter = rate_limiter
+        self._root_url = root_url
+        self._timeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=DRIVE_CONNECT_TIMEOUT, sock_read=DRIVE_READ_TIMEOUT
+        )
+
+    #region Requests
+    async def _async_send(self,
+                          method: str,
+                          url: str,
+                          params: dict | None = None,
+                          data: bytes | None = None,
+                          headers: dict | None = None,
+                          retry: bool = True) -> tuple[int, dict, bytes]:
+        """Send a request, retrying rate limit, server and network errors when `retry` is set.
+
+        A POST is only retried when it never reached Drive or was rejected by a rate limit, since
+        it may have been carried out before the connection broke or the server failed.
+
+        Returns:
+            tuple[int, dict, bytes]: The status, the headers (lower case names) and the body of the response.
+        """
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        requests = get_batch_size(data) if "/batch/" in url else 1
+        attempt = 0
+
+        while True:
+            await self.rate_limiter.async_acquire(requests)
+            attempt += 1
+            access_token = await self._get_access_token()
+
+            try:
+                async with self._session.request(
+                    method,
+                    url,
+                    params=params,
+                    data=data,
+                    headers={**(headers or {}), "Authorization": f"Bearer {access_token}"},
+                    timeout=self._timeout,
+                ) as response:
+                    content = await response.read()
+                    status = response.status
+                    response_headers = {name.lower(): value for name, value in response.headers.items()}
+
+            except (aiohttp.ClientError, TimeoutError) as e:
+                # Raised as the built-in types the retry policy knows, like the googleapiclient path
+                error = e if isinstance(e, TimeoutError) else ConnectionError(f"{type(e).__name__}: {e}")
+                not_sent = isinstance(e, aiohttp.ClientConnectorError)
+                delay = self.rate_limiter.get_retry_delay(attempt) if retry and (idempotent or not_sent) else None
+                if delay is None:
+                    raise error from e
+                _LOGGER.debug("Drive request %s %s failed (%s), retrying in %.1f s", method, url, e, delay)
+
+            else:
+                if not retry or not is_retryable_response(status, content):
+                    return status, response_headers, content
+
+                # A server error may come after a non-idempotent request was carried out
+                if not idempotent and status not in (403, 429):
+                    return status, response_headers, content
+
+                delay = self.rate_limiter.get_retry_delay(
+                    attempt, status, parse_retry_after(response_headers.get("retry-after"))
+                )
+                if delay is None:
+                    return status, response_headers, content
+                _LOGGER.debug("Drive request %s %s returned %s, retrying in %.1f s", method, url, status, delay)
+
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _raise_for_status(url: str, status: int, headers: dict, content: bytes) -> None:
+        """Raise the HttpError googleapiclient would raise for an unsuccessful response."""
+        if status < 300:
+            return
+        raise HttpError(httplib2.Response({**headers, "status": str(status)}), content, uri=url)
+
+    async def _async_request_json(self,
+                                  method: str,
+                                  path: str,
+                                  params: dict | None = None,
+                                  body: dict | None = None) -> dict:
+        """Send a Drive API request with an optional JSON body and return the decoded response."""
+        url = f"{self._root_url}{path}"
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json; charset=UTF-8"} if body is not None else None
+
+        status, response_headers, content = await self._async_send(method, url, params, data, headers)
+        self._raise_for_status(url, status, response_headers, content)
+        return json.loads(content) if content else {}
+    #endregion
+
+    #region Files
+    async def async_iter_file_pages(self,
+                                    query: str,
+                                    fields: str,
+                                    order_by: str | None = None,
+                                    page_size: int = 1000) -> AsyncIterator[list[dict]]:
+        """Yield the pages of files matching a Drive query, following the page tokens.
+
+        Args:
+            query (str): The Drive query.
+            fields (str): The fields to return per file.
+            order_by (str | None): (optional) The sort order of the files.
+            page_size (int): (optional) The number of files per page, at most 1000.
+        """
+        page_token = None
+
+        while True:
+            response = await self._async_request_json("GET", "drive/v3/files", {
+                "q": query,
+                "fields": f"nextPageToken, files({fields})",
+                "orderBy": order_by,
+                "pageSize": page_size,
+                "pageToken": page_token,
+            })
+            yield response.get("files", [])
+
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return
+
+    async def async_list_files(self,
+                               query: str,
+                               fields: str,
+                               order_by: str | None = None,
+                               maximum_files: int = 0) -> list[dict]:
+        """Return the files matching a Drive query, at most `maximum_files` if set."""
+        files = []
+        page_size = min(maximum_files, 1000) if maximum_files else 1000
+
+        async for page in self.async_iter_file_pages(query, fields, order_by, page_size):
+            files.extend(page)
+            if maximum_files and len(files) >= maximum_files:
+                return files[:maximum_files]
+
+        return files
+
+    async def async_get_file(self, file_id: str, fields: str) -> dict:
+        """Return the requested fields of a file."""
+        return await self._async_request_json("GET", f"drive/v3/files/{file_id}", {"fields": fields})
+
+    async def async_create_file(self, metadata: dict, fields: str = "id") -> dict:
+        """Create a file without content (e.g. a folder) and return its requested fields."""
+        return await self._async_request_json("POST", "drive/v3/files", {"fields": fields}, metadata)
+
+    async def async_delete_file(self, file_id: str) -> None:
+        """Delete a file permanently."""
+        await self._async_request_json("DELETE", f"drive/v3/files/{file_id}")
+
+    async def async_batch(self,
+                          requests: list[tuple[str, str, dict | None]]) -> list[tuple[dict | None, HttpError | None]]:
+        """Send up to DRIVE_BATCH_MAX_REQUESTS Drive requests in a single batch HTTP request.
+
+        Args:
+            requests (list[tuple]): The method, path (e.g. 'drive/v3/files/<id>') and JSON body (or None) per request.
+
+        Returns:
+            list[tuple]: Per request in order, the decoded response and None, or None and the HttpError it failed
+            with, like the callback of a googleapiclient batch receives them.
+        """
+        if len(requests) > DRIVE_BATCH_MAX_REQUESTS:
+            raise ValueError(f"A batch holds at most {DRIVE_BATCH_MAX_REQUESTS} requests")
+
+        boundary = uuid.uuid4().hex
+        parts = []
+        for index, (method, path, body) in enumerate(requests):
+            request = f"{method} /{path} HTTP/1.1\r\n"
+            if body is not None:
+                payload = json.dumps(body)
+                request += f"Content-Type: application/json; charset=UTF-8\r\nContent-Length: {len(payload)}\r\n\r\n{payload}"
+            else:
+                request += "\r\n"
+            parts.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                "Content-Transfer-Encoding: binary\r\n"
+                f"Content-ID: <{index}>\r\n\r\n"
+                f"{request}\r\n"
+            )
+
+        url = f"{self._root_url}batch/drive/v3"
+        status, headers, content = await self._async_send(
+            "POST",
+            url,
+            data=("".join(parts) + f"--{boundary}--").encode(),
+            headers={"Content-Type": f"multipart/mixed; boundary={boundary}"},
+        )
+        self._raise_for_status(url, status, headers, content)
+
+        # A missing response counts as failed, the other requests keep their own response
+        responses: list[tuple[dict | None, HttpError | None]] = [
+            (None, HttpError(httplib2.Response({"status": "500"}), b"No response received for the request", uri=url))
+        ] * len(requests)
+
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {headers.get('content-type')}\r\n\r\n".encode() + content
+        )
+        for part in message.iter_parts():
+            content_id = (part["Content-ID"] or "").strip("<>").removeprefix("response-")
+            if not content_id.isdigit() or int(content_id) >= len(requests):
+                continue
+
+            index = int(content_id)
+            response = part.get_payload(decode=True)
+            status_line, _, rest = response.partition(b"\r\n")
+            status = int(status_line.split(b" ")[1])
+            body = rest.split(b"\r\n\r\n", 1)[1].strip() if b"\r\n\r\n" in rest else b""
+
+            if status < 300:
+                responses[index] = (json.loads(body) if body else {}, None)
+            else:
+                request_url = f"{self._root_url}{requests[index][1]}"
+                responses[index] = (None, HttpError(httplib2.Response({"status": str(status)}), body, uri=request_url))
+
+        return responses
+    #endregion
+
+    #region Uploads
+    async def async_upload_file(self,
+                                local_file_path: str,
+                                metadata: dict,
+                                mime_type: str,
+                                fields: str,
+                                upload_strategy: UploadStrategy,
+                                progress_tracker: UploadProgressTracker | None = None) -> dict:
+        """Upload a local file as a new Drive file, like upload_file_to_folder does with googleapiclient.
+
+        Small files are sent in a single multipart request, larger files in a resumable upload of
+        which the chunk size follows the upload strategy. A failed chunk is resumed from the last
+        byte Drive acknowledged. Only reading the chunks from disk runs in the executor.
+
+        Args:
+            local_file_path (str): The local path of the file.
+            metadata (dict): The metadata of the new file (name, parents).
+            mime_type (str): The MIME type of the file.
+            fields (str): The fields to include in the response from the Google Drive API.
+            upload_strategy (UploadStrategy): Chooses multipart or resumable and tunes the chunk size.
+            progress_tracker (UploadProgressTracker | None): (optional) Receives the progress of resumable uploads.
+
+        Returns:
+            dict: The response from the Google Drive API, with the 'upload_strategy' that was used.
+        """
+        size = await self._hass.async_add_executor_job(os.path.getsize, local_file_path)
+
+        if upload_strategy.use_multipart(size):
+            content = await self._hass.async_add_executor_job(read_file_range, local_file_path, 0, size)
+            response = await self._async_upload_multipart(metadata, mime_type, content, fields)
+            return {**response, "upload_strategy": "multipart"}
+
+        response = await self._async_upload_resumable(
+            local_file_path, size, metadata, mime_type, fields, upload_strategy, progress_tracker
+        )
+        return {**response, "upload_strategy": "resumable"}
+
+    async def _async_upload_multipart(self, metadata: dict, mime_type: str, content: bytes, fields: str) -> dict:
+        """Send the metadata and content of a file in one multipart request."""
+        boundary = uuid.uuid4().hex
+        body = (
+            f"--{boundary}\r\n"
+            "Content-Type: application/json; charset=UTF-8\r\n\r\n"
+            f"{json.dumps(metadata)}\r\n"
+            f"--{boundary}\r\n"
+            f"Content-Type: {mime_type}\r\n\r\n"
+        ).encode() + content + f"\r\n--{boundary}--".encode()
+
+        url = f"{self._root_url}upload/drive/v3/files"
+        status, headers, response = await self._async_send(
+            "POST",
+            url,
+            {"uploadType": "multipart", "fields": fields},
+            body,
+            {"Content-Type": f"multipart/related; boundary={boundary}"},
+        )
+        self._raise_for_status(url, status, headers, response)
+        return json.loads(response)
+
+    async def _async_upload_resumable(self,
+                                      local_file_path: str,
+                                      size: int,
+                                      metadata: dict,
+                                      mime_type: str,
+                                      fields: str,
+                                      upload_strategy: UploadStrategy,
+                                      progress_tracker: UploadProgressTracker | None) -> dict:
+        """Start a resumable upload session and send the file chunk by chunk."""
+        url = f"{self._root_url}upload/drive/v3/files"
+        status, headers, content = await self._async_send(
+            "POST",
+            url,
+            {"uploadType": "resumable", "fields": fields},
+            json.dumps(metadata).encode(),
+            {
+                "Content-Type": "application/json; charset=UTF-8",
+                "X-Upload-Content-Type": mime_type,
+                "X-Upload-Content-Length": str(size),
+            },
+        )
+        self._raise_for_status(url, status, headers, content)
+        session_url = headers["location"]
+
+        name = metadata.get("name") or os.path.basename(local_file_path)
+        upload_id = progress_tracker.start(name, size) if progress_tracker else None
+        chunk_size = upload_strategy.initial_chunk_size()
+        offset = 0
+        attempt = 0
+
+        try:
+            while True:
+                chunk_started = time.monotonic()
+
+                try:
+                    if offset < size:
+                        chunk = await self._hass.async_add_executor_job(
+                            read_file_range, local_file_path, offset, chunk_size
+                        )
+                        content_range = f"bytes {offset}-{offset + len(chunk) - 1}/{size}"
+                    else:
+                        # Only an empty file gets here, it is finished with an empty chunk
+                        chunk, content_range = b"", f"bytes */{size}"
+
+                    # Failed chunks are resumed here, after asking Drive which bytes arrived
+                    status, headers, content = await self._async_send(
+                        "PUT", session_url, data=chunk, headers={"Content-Range": content_range}, retry=False
+                    )
+                    if status not in (200, 201, 308):
+                        self._raise_for_status(session_url, status, headers, content)
+
+                except Exception as e:
+                    attempt += 1
+                    delay = self.rate_limiter.get_retry_delay_for_error(e, attempt)
+                    if delay is None:
+                        raise
+                    _LOGGER.warning("Uploading a chunk of '%s' failed (%s), resuming in %.1f s", name, e, delay)
+                    await asyncio.sleep(delay)
+
+                    status, headers, content = await self._async_query_upload_status(session_url, size)
+                    if status in (200, 201):
+                        return json.loads(content)
+                    offset = get_upload_offset(headers)
+                    continue
+
+                attempt = 0
+                if status in (200, 201):
+                    chunk_bytes = size - offset
+                    offset = size
+                else:
+                    acknowledged = get_upload_offset(headers)
+                    chunk_bytes, offset = acknowledged - offset, acknowledged
+
+                chunk_seconds = time.monotonic() - chunk_started
+                chunk_size = upload_strategy.record_chunk(chunk_bytes, chunk_seconds)
+                if progress_tracker:
+                    progress_tracker.update(upload_id, offset, chunk_bytes, chunk_seconds)
+
+                if status in (200, 201):
+                    return json.loads(content)
+
+        finally:
+            if progress_tracker:
+                progress_tracker.finish(upload_id)
+
+    async def _async_query_upload_status(self, session_url: str, size: int) -> tuple[int, dict, bytes]:
+        """Ask Drive which bytes of a resumable upload it received."""
+        status, headers, content = await self._async_send(
+            "PUT", session_url, data=b"", headers={"Content-Range": f"bytes */{size}"}
+        )
+        if status not in (200, 201, 308):
+            self._raise_for_status(session_url, status, headers, content)
+        return status, headers, content
+    #endregion
+
+
+def read_file_range(local_file_path: str, offset: int, length: int) -> bytes:
+    """Read `length` bytes of a file from `offset` (blocking, run in the executor)."""
+    with open(local_file_path, "rb") as file:
+        file.seek(offset)
+        return file.read(length)
+
+
+def get_upload_offset(headers: dict) -> int:
+    """Return the number of bytes of a resumable upload Drive acknowledged, from the Range of a 308 response."""
+    byte_range = headers.get("range")
+    if not byte_range:
+        return 0
+    return int(byte_range.rsplit("-", 1)[1]) + 1
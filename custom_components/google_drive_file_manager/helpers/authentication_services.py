@@ -5,25 +5,74 @@ from homeassistant.helpers.config_entry_oauth2_flow import (
 )
 from google.oauth2.credentials import Credentials
 
+import asyncio
+from datetime import datetime, timezone
+
 from ..const import DOMAIN, SCOPES, OAUTH2_TOKEN
 
-async def async_get_google_drive_credentials(hass, entry):
 
-    """Service to list mp4 files in Google Drive."""
-    session: OAuth2Session = hass.data[DOMAIN][entry.entry_id]
+class DriveCredentialsCache:
+    """Per config entry cache of the Google credentials built from the OAuth2 session token.
+
+    The same credentials object is returned while the access token of the session is valid.
+    The session refreshes the token, once, also when several service calls ask for credentials
+    at the same time: the first call refreshes it, the others wait for that refresh and get its
+    result.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry, session: OAuth2Session) -> None:
+        """Initialize the cache.
+
+        Args:
+            hass (HomeAssistant): The Home Assistant instance.
+            entry: The config entry, holding the client ID and secret.
+            session (OAuth2Session): The OAuth2 session of the config entry, holding the token.
+        """
+        self._hass = hass
+        self._entry = entry
+        self._session = session
+        self._credentials: Credentials | None = None
+        self._lock = asyncio.Lock()
+
+    def _is_current(self) -> bool:
+        """Return whether the cached credentials hold the valid access token of the session."""
+        return (
+            self._credentials is not None
+            and self._credentials.token == self._session.token["access_token"]
+            and self._session.valid_token
+        )
 
-    # Ensure the OAuth2 token is valid (refresh if needed)
-    await session.async_ensure_token_valid() # non-blocking
-    token_data = session.token
+    async def async_get_credentials(self) -> Credentials:
+        """Return the cached credentials, refreshing the access token first when it is about to expire."""
+        if self._is_current():
+            return self._credentials
 
-    # Prepare Google Credentials
-    credentials = Credentials(
-        token=token_data["access_token"],
-        refresh_token=token_data.get("refresh_token"),
-        token_uri=OAUTH2_TOKEN,
-        client_id=entry.data.get("client_id"),
-        client_secret=entry.data.get("client_secret"),
-        scopes=SCOPES,
-    )
+        async with self._lock:
+            # Another call may have refreshed the token while this one was waiting
+            if not self._is_current():
+                await self._session.async_ensure_token_valid()
+                self._credentials = self._build_credentials()
+
+            return self._credentials
+
+    def _build_credentials(self) -> Credentials:
+        """Build the Google credentials of the current token of the session."""
+        token_data = self._session.token
+
+        return Credentials(
+            token=token_data["access_token"],
+            refresh_token=token_data.get("refresh_token"),
+            token_uri=OAUTH2_TOKEN,
+            client_id=self._entry.data.get("client_id"),
+            client_secret=self._entry.data.get("client_secret"),
+            scopes=SCOPES,
+            # Naive UTC, like google-auth expects, so a long running request refreshes the token itself
+            expiry=datetime.fromtimestamp(token_data["expires_at"], timezone.utc).replace(tzinfo=None),
+        )
+
+
+async def async_get_google_drive_credentials(hass, entry):
+    """Return valid Google credentials of the config entry (refreshing the token if needed)."""
+    credentials_cache: DriveCredentialsCache = hass.data[DOMAIN][entry.entry_id]["credentials_cache"]
 
-    return credentials
\ No newline at end of file
+    return await credentials_cache.async_get_credentials()
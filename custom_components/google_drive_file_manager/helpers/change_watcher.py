@@ -0,0 +1,474 @@
+from __future__ import annotations
+
+from aiohttp.web import Request
+
+from homeassistant.components import webhook
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.network import NoURLAvailableError, get_url
+from homeassistant.helpers.storage import Store
+
+from .drive_client_pool import DriveClientPool, get_drive_service
+from .drive_query import UnsupportedQueryError, translate_query
+from .job_scheduler import DriveJobScheduler, async_run_drive_job
+from .metadata_mirror import MIRROR_FIELDS, match_files
+
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+import secrets
+import threading
+import time
+import uuid
+import logging
+
+from ..const import (
+    DOMAIN,
+    CHANGE_WATCHER_STORAGE_VERSION,
+    JOB_CLASS_BULK,
+    EVENT_FILE_ADDED,
+    EVENT_FILE_CHANGED,
+    EVENT_FILE_REMOVED,
+    WATCH_MIN_POLL_INTERVAL,
+    WATCH_MAX_POLL_INTERVAL,
+    WATCH_MAX_TRACKED_FILES,
+    WATCH_CHANNEL_LIFETIME,
+    WATCH_CHANNEL_RENEW_MARGIN,
+    WATCH_SAVE_DELAY,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# The file fields included in the events
+WATCH_FIELDS = ",".join(MIRROR_FIELDS)
+
+
+def get_change_watcher_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """Return the storage of the change watches of a config entry."""
+    return Store(hass, CHANGE_WATCHER_STORAGE_VERSION, f"{DOMAIN}.change_watcher.{entry_id}")
+
+
+class DriveChangeWatcher:
+    """Follows the Drive changes feed and fires events for the files matching the registered watches.
+
+    A watch is either a folder (its direct children) or a Drive query (the subset of the query
+    syntax the metadata mirror supports). Files a watch has seen before are reported as changed,
+    other files as added. Files that are deleted, trashed, moved out of the folder or no longer
+    match the query are reported as removed. The page token of the changes feed, the watches and
+    the files seen per watch are stored, so changes made while Home Assistant was stopped are
+    reported after a restart.
+
+    The feed is polled with an interval that starts at WATCH_MIN_POLL_INTERVAL and doubles after
+    every poll without events, up to WATCH_MAX_POLL_INTERVAL. With push notifications Drive calls
+    a webhook on every change, which triggers a poll right away; polling then only continues at
+    the maximum interval in case a notification is lost.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        store: Store,
+        client_pool: DriveClientPool | None,
+        async_get_credentials: Callable[[], Awaitable],
+        push_notifications: bool = False,
+        job_scheduler: DriveJobScheduler | None = None,
+    ) -> None:
+        self._hass = hass
+        self._store = store
+        self._client_pool = client_pool
+        self._async_get_credentials = async_get_credentials
+        self._push_notifications = push_notifications
+        self._job_scheduler = job_scheduler
+        self._lock = threading.Lock()
+        self._page_token: str | None = None
+        self._root_id: str | None = None
+        self._watches: dict[str, dict] = {}
+        self._seen: dict[str, OrderedDict[str, None]] = {}
+        self._channel: dict | None = None
+        self._webhook_id: str | None = None
+        self._channel_token: str | None = None
+        self._interval = WATCH_MIN_POLL_INTERVAL
+        self._cancel_poll: Callable[[], None] | None = None
+        self._cancel_renew: Callable[[], None] | None = None
+        self._polling = False
+        self._poll_again = False
+        self._stopped = False
+
+    async def async_load(self) -> None:
+        """Load the page token and watches from storage."""
+        data = await self._store.async_load() or {}
+        with self._lock:
+            self._page_token = data.get("page_token")
+            self._root_id = data.get("root_id")
+            self._watches = data.get("watches", {})
+            self._seen = {watch_id: OrderedDict.fromkeys(seen) for watch_id, seen in data.get("seen", {}).items()}
+            self._channel = data.get("channel")
+
+    async def async_start(self) -> None:
+        """Start following the changes feed when there are watches."""
+        # The channel of the previous run notifies a webhook that no longer exists
+        if self._channel is not None:
+            await self._async_stop_channel()
+        await self.async_watches_changed()
+
+    async def async_stop(self) -> None:
+        """Stop polling and push notifications and write the state to storage."""
+        self._stopped = True
+        self._cancel_timers()
+        await self._async_stop_channel()
+        if self._webhook_id is not None:
+            webhook.async_unregister(self._hass, self._webhook_id)
+            self._webhook_id = None
+        await self._store.async_save(self._data_to_save())
+
+    async def async_watches_changed(self) -> None:
+        """(Re)start or stop following the changes feed after watches were added or removed."""
+        if self._stopped:
+            return
+
+        if not self._watches:
+            self._cancel_timers()
+            await self._async_stop_channel()
+            return
+
+        self._interval = WATCH_MIN_POLL_INTERVAL
+        self._schedule_poll(WATCH_MIN_POLL_INTERVAL)
+
+        if self._push_notifications and self._channel is None:
+            await self._async_open_channel()
+
+    def add_watch(self, credentials, watch_id: str, watch: dict) -> None:
+        """Register (or replace) a watch, blocking.
+
+        Args:
+            credentials: The credentials object to access Google Drive.
+            watch_id (str): The ID of the watch, included in its events.
+            watch (dict): The 'folder_path' and 'folder_id' of a folder watch, or the 'query' of a query watch.
+        """
+        if watch.get("query"):
+            try:
+                translate_query(watch["query"])
+            except UnsupportedQueryError as e:
+                raise HomeAssistantError(f"The query of change watch '{watch_id}' is not supported: {e}") from e
+
+        drive = get_drive_service(credentials, self._client_pool)
+
+        with self._lock:
+            page_token, root_id = self._page_token, self._root_id
+        if page_token is None:
+            page_token = drive.changes().getStartPageToken().execute()["startPageToken"]
+        if root_id is None:
+            root_id = drive.files().get(fileId="root", fields="id").execute()["id"]
+
+        # Remember the files that match already, so their changes and removal are reported correctly
+        if watch.get("folder_id"):
+            query = f"'{watch['folder_id']}' in parents and trashed = false"
+        else:
+            query = f"({watch['query']}) and trashed = false"
+        seen = self._list_file_ids(drive, query)
+
+        with self._lock:
+            self._page_token = self._page_token or page_token
+            self._root_id = root_id
+            self._watches[watch_id] = watch
+            self._seen[watch_id] = OrderedDict.fromkeys(seen)
+        self._schedule_save()
+
+        _LOGGER.info("Watching Drive changes for '%s' (%d existing file(s))", watch_id, len(seen))
+
+    def remove_watch(self, watch_id: str) -> bool:
+        """Remove a watch, returning False if it does not exist."""
+        with self._lock:
+            removed = self._watches.pop(watch_id, None) is not None
+            self._seen.pop(watch_id, None)
+        if removed:
+            self._schedule_save()
+        return removed
+
+    @staticmethod
+    def _list_file_ids(drive, query: str) -> list[str]:
+        """Return the IDs of at most WATCH_MAX_TRACKED_FILES matching files, oldest modified first."""
+        files_resource = drive.files()
+        file_ids = []
+        page_token = None
+
+        while len(file_ids) < WATCH_MAX_TRACKED_FILES:
+            response = files_resource.list(
+                q=query,
+                fields="nextPageToken, files(id)",
+                orderBy="modifiedTime desc",
+                pageSize=1000,
+                pageToken=page_token,
+            ).execute()
+            file_ids.extend(file["id"] for file in response.get("files", []))
+
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+
+        return list(reversed(file_ids[:WATCH_MAX_TRACKED_FILES]))
+
+    #region Polling
+    def poll(self, credentials) -> int:
+        """Fetch the changes since the stored page token and fire the events of the watches, blocking.
+
+        Returns:
+            int: The number of fired events.
+        """
+        drive = get_drive_service(credentials, self._client_pool)
+        changes_resource = drive.changes()
+
+        with self._lock:
+            page_token = self._page_token
+
+        events = 0
+        while page_token:
+            response = changes_resource.list(
+                pageToken=page_token,
+                fields=f"nextPageToken, newStartPageToken, changes(fileId, removed, file({WATCH_FIELDS}))",
+                pageSize=1000,
+                includeRemoved=True,
+                spaces="drive",
+            ).execute()
+            events += self._process_changes(response.get("changes", []))
+
+            next_page_token = response.get("nextPageToken")
+            page_token = next_page_token or response.get("newStartPageToken")
+            with self._lock:
+                self._page_token = page_token
+            self._schedule_save()
+
+            if not next_page_token:
+                break
+
+        return events
+
+    def _match(self, watch: dict, files: list[dict]) -> set[str]:
+        """Return the IDs of the files matching a watch, trashed files never match."""
+        files = [file for file in files if not file.get("trashed")]
+        if watch.get("folder_id"):
+            return {file["id"] for file in files if watch["folder_id"] in file.get("parents", [])}
+        return match_files(files, watch["query"], self._root_id)
+
+    def _process_changes(self, changes: list[dict]) -> int:
+        files = [change["file"] for change in changes if not change.get("removed") and "file" in change]
+        removed_ids = [change["fileId"] for change in changes if change.get("removed") or "file" not in change]
+
+        events = []
+        with self._lock:
+            for watch_id, watch in self._watches.items():
+                seen = self._seen.setdefault(watch_id, OrderedDict())
+                matching = self._match(watch, files)
+
+                for file in files:
+                    if file["id"] in matching:
+                        event_type = EVENT_FILE_CHANGED if file["id"] in seen else EVENT_FILE_ADDED
+                        seen[file["id"]] = None
+                        seen.move_to_end(file["id"])
+                        events.append((event_type, watch_id, watch, file))
+                    elif file["id"] in seen:
+                        # Trashed, moved out of the folder or no longer matching the query
+                        del seen[file["id"]]
+                        events.append((EVENT_FILE_REMOVED, watch_id, watch, file))
+
+                for file_id in removed_ids:
+                    if file_id in seen:
+                        del seen[file_id]
+                        events.append((EVENT_FILE_REMOVED, watch_id, watch, {"id": file_id}))
+
+                while len(seen) > WATCH_MAX_TRACKED_FILES:
+                    seen.popitem(last=False)
+
+        for event_type, watch_id, watch, file in events:
+            # Called from the executor thread, EventBus.fire is thread-safe
+            self._hass.bus.fire(event_type, {
+                "watch_id": watch_id,
+                "remote_folder_path": watch.get("folder_path"),
+                "query": watch.get("query"),
+                "file": file,
+            })
+
+        return len(events)
+
+    @callback
+    def _schedule_poll(self, delay: float) -> None:
+        if self._cancel_poll is not None:
+            self._cancel_poll()
+        self._cancel_poll = async_call_later(self._hass, delay, self._async_poll)
+
+    async def _async_poll(self, _now=None) -> None:
+        self._cancel_poll = None
+
+        # A notification arrived during a poll, poll once more when it is done
+        if self._polling:
+            self._poll_again = True
+            return
+
+        self._polling = True
+        events = 0
+        try:
+            credentials = await self._async_get_credentials()
+            events = await async_run_drive_job(self._hass, self._job_scheduler, JOB_CLASS_BULK, self.poll, credentials)
+        except Exception as e:
+            _LOGGER.warning("Polling the Drive changes feed failed: %s", e)
+        finally:
+            self._polling = False
+
+        if self._stopped or not self._watches:
+            return
+
+        if self._poll_again:
+            self._poll_again = False
+            self._schedule_poll(0)
+            return
+
+        # Poll quickly while files are changing and slow down when Drive is quiet
+        if self._channel is not None:
+            self._interval = WATCH_MAX_POLL_INTERVAL
+        elif events:
+            self._interval = WATCH_MIN_POLL_INTERVAL
+        else:
+            self._interval = min(self._interval * 2, WATCH_MAX_POLL_INTERVAL)
+        self._schedule_poll(self._interval)
+    #endregion
+
+    #region Push notifications
+    def open_channel(self, credentials, address: str) -> dict:
+        """Ask Drive to post a notification to the address on every change, blocking."""
+        drive = get_drive_service(credentials, self._client_pool)
+        with self._lock:
+            page_token = self._page_token
+
+        response = drive.changes().watch(
+            pageToken=page_token,
+            includeRemoved=True,
+            spaces="drive",
+            body={
+                "id": str(uuid.uuid4()),
+                "type": "web_hook",
+                "address": address,
+                "token": self._channel_token,
+                "expiration": int((time.time() + WATCH_CHANNEL_LIFETIME) * 1000),
+            },
+        ).execute()
+
+        return {
+            "id": response["id"],
+            "resource_id": response["resourceId"],
+            "expiration": int(response.get("expiration", (time.time() + WATCH_CHANNEL_LIFETIME) * 1000)) / 1000,
+        }
+
+    def stop_channel(self, credentials, channel: dict) -> None:
+        """Stop the notifications of a channel, blocking."""
+        drive = get_drive_service(credentials, self._client_pool)
+        drive.channels().stop(body={"id": channel["id"], "resourceId": channel["resource_id"]}).execute()
+
+    async def _async_open_channel(self) -> None:
+        try:
+            # Drive only posts notifications to HTTPS addresses reachable from the internet
+            base_url = get_url(self._hass, allow_internal=False, allow_ip=False, require_ssl=True)
+        except NoURLAvailableError:
+            _LOGGER.warning(
+                "Drive push notifications need an external HTTPS URL of Home Assistant, "
+                "polling for changes instead"
+            )
+            return
+
+        if self._webhook_id is None:
+            self._webhook_id = secrets.token_hex(16)
+            self._channel_token = secrets.token_hex(16)
+            webhook.async_register(
+                self._hass,
+                DOMAIN,
+                "Google Drive changes",
+                self._webhook_id,
+                self._async_handle_webhook,
+                allowed_methods=["POST"],
+            )
+
+        try:
+            credentials = await self._async_get_credentials()
+            self._channel = await async_run_drive_job(
+                self._hass,
+                self._job_scheduler,
+                JOB_CLASS_BULK,
+                self.open_channel,
+                credentials,
+                base_url + webhook.async_generate_path(self._webhook_id),
+            )
+        except Exception as e:
+            _LOGGER.warning("Opening a Drive push notification channel failed, polling for changes instead: %s", e)
+            return
+
+        self._schedule_save()
+        _LOGGER.info("Receiving Drive change notifications on channel %s", self._channel["id"])
+
+        # Renew the channel shortly before Drive closes it
+        renew_in = max(self._channel["expiration"] - time.time() - WATCH_CHANNEL_RENEW_MARGIN, WATCH_MIN_POLL_INTERVAL)
+        self._cancel_renew = async_call_later(self._hass, renew_in, self._async_renew_channel)
+
+    async def _async_stop_channel(self) -> None:
+        if self._cancel_renew is not None:
+            self._cancel_renew()
+            self._cancel_renew = None
+
+        channel, self._channel = self._channel, None
+        if channel is None:
+            return
+        self._schedule_save()
+
+        try:
+            credentials = await self._async_get_credentials()
+            await async_run_drive_job(
+                self._hass, self._job_scheduler, JOB_CLASS_BULK, self.stop_channel, credentials, channel
+            )
+        except Exception as e:
+            # The channel expires by itself
+            _LOGGER.debug("Stopping Drive notification channel %s failed: %s", channel["id"], e)
+
+    async def _async_renew_channel(self, _now=None) -> None:
+        self._cancel_renew = None
+        await self._async_stop_channel()
+        if not self._stopped and self._watches:
+            await self._async_open_channel()
+
+    async def _async_handle_webhook(self, hass: HomeAssistant, webhook_id: str, request: Request) -> None:
+        """Poll the changes feed when Drive notifies a change on the current channel."""
+        channel = self._channel
+        if (
+            channel is None
+            or request.headers.get("X-Goog-Channel-ID") != channel["id"]
+            or not secrets.compare_digest(request.headers.get("X-Goog-Channel-Token", ""), self._channel_token or "")
+        ):
+            _LOGGER.debug("Ignoring a notification of an unknown Drive channel")
+            return
+
+        # The first notification of a channel only confirms it was opened
+        if request.headers.get("X-Goog-Resource-State") == "sync":
+            return
+
+        self._schedule_poll(0)
+    #endregion
+
+    @callback
+    def _cancel_timers(self) -> None:
+        if self._cancel_poll is not None:
+            self._cancel_poll()
+            self._cancel_poll = None
+        if self._cancel_renew is not None:
+            self._cancel_renew()
+            self._cancel_renew = None
+
+    def _data_to_save(self) -> dict:
+        with self._lock:
+            return {
+                "page_token": self._page_token,
+                "root_id": self._root_id,
+                "watches": dict(self._watches),
+                "seen": {watch_id: list(seen) for watch_id, seen in self._seen.items()},
+                "channel": self._channel,
+            }
+
+    def _schedule_save(self) -> None:
+        """Schedule a delayed write of the state, callable from any thread."""
+        self._hass.loop.call_soon_threadsafe(self._store.async_delay_save, self._data_to_save, WATCH_SAVE_DELAY)
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import os
+from collections.abc import Iterable
 from typing import Any, List
 
 from homeassistant.core import HomeAssistant
 from homeassistant.util import slugify
 
+from ..const import SENSOR_MAX_FILES_BYTES, SENSOR_PREVIEW_FILES, SENSOR_RESULTS_FOLDER
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -46,5 +52,144 @@ async def async_create_or_update_sensor(
     if "friendly_name" not in attributes:
         attributes["friendly_name"] = sensor_name
 
+    # Skip the update when the results are unchanged, comparing the digest instead of all files
+    current = hass.states.get(entity_id)
+    if (
+        current is not None
+        and "results_digest" in attributes
+        and current.state == str(state)
+        and current.attributes.get("results_digest") == attributes["results_digest"]
+        and {key: value for key, value in current.attributes.items() if key != "files"}
+        == {key: value for key, value in attributes.items() if key != "files"}
+    ):
+        _LOGGER.debug("Results of sensor %s are unchanged, not updating it", entity_id)
+        return
+
     # Set the state and attributes of the sensor.
     hass.states.async_set(entity_id, state, attributes)
+
+
+def get_sensor_results_path(hass: HomeAssistant, sensor_name: str) -> str:
+    """Return the path of the JSON Lines file holding the full results of a sensor."""
+    return hass.config.path(SENSOR_RESULTS_FOLDER, f"{slugify(sensor_name)}.jsonl")
+
+
+def get_sensor_results_digest(hass: HomeAssistant, sensor_name: str) -> str | None:
+    """Return the digest of the results currently shown by a sensor, if any."""
+    current = hass.states.get(_create_entity_id(sensor_name))
+    return current.attributes.get("results_digest") if current is not None else None
+
+
+class SensorResultCollector:
+    """Collects the files of a result for the files attribute of a sensor within a size budget.
+
+    Files are kept in memory until their JSON exceeds `max_bytes`. From then on only a preview of
+    the first files, the count and the newest and oldest file are kept, and all files are streamed
+    as JSON Lines to a temporary file that replaces the results file of the sensor when closed.
+    A digest of all files lets unchanged results skip rewriting the file and the sensor.
+
+    The methods are blocking, run them in the executor.
+    """
+
+    def __init__(self,
+                 results_path: str,
+                 max_bytes: int = SENSOR_MAX_FILES_BYTES,
+                 preview_files: int = SENSOR_PREVIEW_FILES) -> None:
+        self._results_path = results_path
+        self._temporary_path = f"{results_path}.tmp"
+        self._max_bytes = max_bytes
+        self._preview_files = preview_files
+        self._files: list[dict] = []
+        self._lines: list[str] = []
+        self._size = 0
+        self._stream = None
+        self._digest = hashlib.sha256()
+        self._newest: dict | None = None
+        self._oldest: dict | None = None
+        self._newest_time = ""
+        self._oldest_time = ""
+        self.count = 0
+
+    def add(self, file: dict) -> None:
+        """Add a file (or result) to the collected results."""
+        line = json.dumps(file, default=str, separators=(",", ":")) + "\n"
+        self._digest.update(line.encode("utf-8"))
+        self.count += 1
+
+        # Track the newest and oldest file when the time fields are part of the results
+        file_time = file.get("modifiedTime") or file.get("createdTime")
+        if file_time:
+            if self._newest is None or file_time > self._newest_time:
+                self._newest, self._newest_time = file, file_time
+            if self._oldest is None or file_time < self._oldest_time:
+                self._oldest, self._oldest_time = file, file_time
+
+        if self._stream is None:
+            self._size += len(line)
+            if self._size <= self._max_bytes:
+                self._files.append(file)
+                self._lines.append(line)
+                return
+
+            # Over budget, stream the files collected so far and all further files to disk
+            os.makedirs(os.path.dirname(self._results_path), exist_ok=True)
+            self._stream = open(self._temporary_path, "w", encoding="utf-8")
+            self._stream.writelines(self._lines)
+            self._files = self._files[:self._preview_files]
+            self._lines = []
+
+        self._stream.write(line)
+
+    def close(self, previous_digest: str | None = None) -> dict[str, Any]:
+        """Finish collecting and return the sensor attributes describing the results.
+
+        Args:
+            previous_digest (str | None): (optional) The digest of the results the sensor shows now.
+
+        Returns:
+            dict[str, Any]: The 'files' (all, or a preview when 'truncated'), the 'results_digest' and for
+            truncated results the 'file_count', 'newest_file', 'oldest_file' and 'results_file'.
+        """
+        digest = self._digest.hexdigest()
+
+        if self._stream is None:
+            # The results fit in the sensor, remove the file of earlier results that didn't
+            if os.path.exists(self._results_path):
+                os.remove(self._results_path)
+            return {"files": self._files, "truncated": False, "results_digest": digest}
+
+        self._stream.close()
+        self._stream = None
+
+        # Keep the results file when the results are unchanged
+        if digest == previous_digest and os.path.exists(self._results_path):
+            os.remove(self._temporary_path)
+        else:
+            os.replace(self._temporary_path, self._results_path)
+
+        return {
+            "files": self._files,
+            "truncated": True,
+            "file_count": self.count,
+            "newest_file": self._newest,
+            "oldest_file": self._oldest,
+            "results_file": self._results_path,
+            "results_digest": digest,
+        }
+
+    def discard(self) -> None:
+        """Stop collecting after a failure, removing the temporary file."""
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+            os.remove(self._temporary_path)
+
+    def collect(self, files: Iterable[dict], previous_digest: str | None = None) -> dict[str, Any]:
+        """Add all files and close the collector, see close for the returned attributes."""
+        try:
+            for file in files:
+                self.add(file)
+        except Exception:
+            self.discard()
+            raise
+        return self.close(previous_digest)
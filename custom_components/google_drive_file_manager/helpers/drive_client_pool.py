@@ -0,0 +1,117 @@
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from google_auth_httplib2 import AuthorizedHttp
+
+from .pooled_http import PooledHttp
+from .rate_limiter import DriveRateLimiter, RateLimitedHttp
+
+import json
+import threading
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DriveClientPool:
+    """Per config entry pool of Google Drive service objects.
+
+    Building a Drive service parses the (large) discovery document and opens a new
+    httplib2 connection, which is a noticeable part of every service call on slower hosts.
+    The pool loads the bundled static discovery document once and keeps one service object
+    per executor thread, because the service objects are not thread-safe. The credentials of a
+    cached service are swapped for the most recent ones on every checkout so refreshed tokens are used.
+    All services send their requests over one keep-alive connection pool, so a call running on
+    another executor thread than the previous one doesn't pay new TCP and TLS handshakes, and
+    share the rate limiter of the pool, which throttles and retries their requests.
+    """
+
+    def __init__(self,
+                 root_url: str | None = None,
+                 rate_limiter: DriveRateLimiter | None = None,
+                 http: PooledHttp | None = None) -> None:
+        """Initialize the pool.
+
+        Args:
+            root_url (str | None): (optional) Override of the Drive API root URL, e.g. a local test endpoint.
+            rate_limiter (DriveRateLimiter | None): (optional) The rate limiter of the account, a default one if not set.
+            http (PooledHttp | None): (optional) The transport shared by all services, a default one if not set.
+        """
+        self.rate_limiter = rate_limiter or DriveRateLimiter()
+        self.http = http or PooledHttp()
+        self._local = threading.local()
+        self._discovery_document: str | None = None
+        self._root_url = root_url
+        self._closed = False
+
+    def load_discovery_document(self) -> None:
+        """Load the bundled Drive v3 discovery document (blocking, run in the executor)."""
+        if self._discovery_document is not None:
+            return
+
+        discovery_document = get_static_doc("drive", "v3")
+
+        # Point every endpoint (including batch and media upload paths) to the overridden root URL
+        if self._root_url:
+            document = json.loads(discovery_document)
+            document["rootUrl"] = self._root_url
+            document["baseUrl"] = self._root_url + document["servicePath"]
+            discovery_document = json.dumps(document)
+
+        self._discovery_document = discovery_document
+
+    def get_service(self, credentials):
+        """Return the Drive service object of the calling thread, creating it if needed.
+
+        Args:
+            credentials: The credentials object to access Google Drive.
+
+        Returns:
+            The Drive v3 service object bound to the calling thread.
+        """
+        service = getattr(self._local, "service", None)
+
+        # Reuse the service of this thread, only swapping the credentials
+        if service is not None:
+            self._local.authorized_http.credentials = credentials
+            return service
+
+        if self._closed:
+            raise RuntimeError("Drive client pool has been closed")
+
+        # Fall back to loading the document in this thread if setup did not do it
+        self.load_discovery_document()
+
+        authorized_http = AuthorizedHttp(credentials, http=self.http)
+        service = build_from_document(
+            self._discovery_document, http=RateLimitedHttp(authorized_http, self.rate_limiter)
+        )
+
+        self._local.service = service
+        self._local.authorized_http = authorized_http
+        _LOGGER.debug("Created Drive client for thread %s", threading.current_thread().name)
+
+        return service
+
+    def close(self) -> None:
+        """Close the connections of every client created by the pool."""
+        self._closed = True
+        self.http.close()
+
+        # Drop the service of the closing thread, other threads drop theirs with the pool
+        self._local = threading.local()
+
+
+def get_drive_service(credentials, client_pool: DriveClientPool | None = None):
+    """Return a Drive service object, from the client pool when one is available.
+
+    Args:
+        credentials: The credentials object to access Google Drive.
+        client_pool (DriveClientPool | None): The pool of the config entry, if any.
+
+    Returns:
+        The Drive v3 service object.
+    """
+    if client_pool is None:
+        return build("drive", "v3", credentials=credentials)
+
+    return client_pool.get_service(credentials)
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import re
+import sqlite3
+
+# Query fields and the mirror columns they are stored in
+STRING_COLUMNS = {"name": "files.name", "mimeType": "files.mime_type"}
+TIME_COLUMNS = {"createdTime": "files.created_time", "modifiedTime": "files.modified_time"}
+
+TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<string>'(?:\\.|[^'\\])*')
+      | (?P<operator><=|>=|!=|=|<|>)
+      | (?P<paren>[()])
+      | (?P<word>[A-Za-z_][A-Za-z0-9_.]*)
+    )
+""", re.VERBOSE)
+
+
+class UnsupportedQueryError(ValueError):
+    """Raised when a query uses syntax that can't be translated to SQL."""
+
+
+def tokenize(query: str) -> list[tuple[str, str]]:
+    """Split a query into (kind, value) tokens, string values are unescaped."""
+    tokens = []
+    position = 0
+    query = query.strip()
+
+    while position < len(query):
+        match = TOKEN_PATTERN.match(query, position)
+        if not match or match.end() == position:
+            raise UnsupportedQueryError(f"Unexpected input at position {position}: {query[position:position + 20]!r}")
+        position = match.end()
+
+        kind = match.lastgroup
+        value = match[kind]
+        if kind == "string":
+            value = re.sub(r"\\(.)", r"\1", value[1:-1])
+        tokens.append((kind, value))
+
+    return tokens
+
+
+def normalize_time(value: str) -> str:
+    """Convert an RFC 3339 date-time to the UTC format Drive returns (2025-05-15T12:34:56.000Z)."""
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError as e:
+        raise UnsupportedQueryError(f"Unsupported date-time '{value}'") from e
+
+    # Drive interprets date-times without an offset as UTC
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def drive_contains(text: str | None, value: str) -> bool:
+    """Evaluate `contains` like Drive does for names: `value` must start the text or one of its words.
+
+    Drive only matches prefixes, 'name contains 'World'' matches 'Hello World' and 'Hello_World',
+    but not 'HelloWorld'. Like Drive, the comparison ignores case.
+    """
+    if text is None:
+        return False
+    text, value = text.casefold(), value.casefold()
+    if not value:
+        return True
+
+    start = text.find(value)
+    while start != -1:
+        if start == 0 or not text[start - 1].isalnum():
+            return True
+        start = text.find(value, start + 1)
+    return False
+
+
+def register_query_functions(connection: sqlite3.Connection) -> None:
+    """Register the SQL functions used by the conditions of translate_query on a connection."""
+    connection.create_function("drive_contains", 2, drive_contains, deterministic=True)
+
+
+class QueryTranslator:
+    """Recursive descent parser translating a Drive query into a SQL condition with its parameters.
+
+    Only the subset of the query syntax that can be answered from the metadata mirror is supported:
+
+        name = 'x', name != 'x', name contains 'x'
+        mimeType = 'x', mimeType != 'x', mimeType contains 'x'
+        (contains matches the start of the value or of one of its words, like Drive)
+        createdTime / modifiedTime with =, !=, <, <=, >, >= and an RFC 3339 date-time
+        trashed = true / false
+        'folder ID' in parents
+        and, or, not and parentheses
+
+    Anything else raises UnsupportedQueryError, the query should then be sent to the Drive API.
+    """
+
+    def __init__(self, query: str, root_id: str | None = None) -> None:
+        self._tokens = tokenize(query)
+        self._position = 0
+        self._root_id = root_id
+        self.params: list = []
+
+    def _peek(self) -> tuple[str, str] | None:
+        return self._tokens[self._position] if self._position < len(self._tokens) else None
+
+    def _next(self) -> tuple[str, str]:
+        token = self._peek()
+        if token is None:
+            raise UnsupportedQueryError("Unexpected end of query")
+        self._position += 1
+        return token
+
+    def _accept_word(self, word: str) -> bool:
+        token = self._peek()
+        if token and token[0] == "word" and token[1].lower() == word:
+            self._position += 1
+            return True
+        return False
+
+    def translate(self) -> str:
+        if not self._tokens:
+            return "1"
+        condition = self._or()
+        if self._peek() is not None:
+            raise UnsupportedQueryError(f"Unexpected '{self._peek()[1]}'")
+        return condition
+
+    def _or(self) -> str:
+        conditions = [self._and()]
+        while self._accept_word("or"):
+            conditions.append(self._and())
+        return conditions[0] if len(conditions) == 1 else "(" + " OR ".join(conditions) + ")"
+
+    def _and(self) -> str:
+        conditions = [self._unary()]
+        while self._accept_word("and"):
+            conditions.append(self._unary())
+        return conditions[0] if len(conditions) == 1 else "(" + " AND ".join(conditions) + ")"
+
+    def _unary(self) -> str:
+        if self._accept_word("not"):
+            return f"NOT {self._unary()}"
+
+        if self._peek() == ("paren", "("):
+            self._position += 1
+            condition = self._or()
+            if self._next() != ("paren", ")"):
+                raise UnsupportedQueryError("Missing ')'")
+            return f"({condition})"
+
+        return self._term()
+
+    def _term(self) -> str:
+        kind, value = self._next()
+
+        # 'folder ID' in parents
+        if kind == "string":
+            if not (self._accept_word("in") and self._accept_word("parents")):
+                raise UnsupportedQueryError("Only the 'in parents' collection is supported")
+            folder_id = self._root_id if value == "root" and self._root_id else value
+            self.params.append(folder_id)
+            return "files.id IN (SELECT file_id FROM parents WHERE parent_id = ?)"
+
+        if kind != "word":
+            raise UnsupportedQueryError(f"Unexpected '{value}'")
+
+        field = value
+        if self._accept_word("contains"):
+            if field not in STRING_COLUMNS:
+                raise UnsupportedQueryError(f"'contains' is not supported for '{field}'")
+            self.params.append(self._string())
+            return f"drive_contains({STRING_COLUMNS[field]}, ?)"
+
+        operator_kind, operator = self._next()
+        if operator_kind != "operator":
+            raise UnsupportedQueryError(f"Unsupported operator '{operator}' for '{field}'")
+
+        if field in STRING_COLUMNS:
+            if operator not in {"=", "!="}:
+                raise UnsupportedQueryError(f"Unsupported operator '{operator}' for '{field}'")
+            self.params.append(self._string())
+            return f"{STRING_COLUMNS[field]} {operator} ?"
+
+        if field in TIME_COLUMNS:
+            self.params.append(normalize_time(self._string()))
+            return f"{TIME_COLUMNS[field]} {operator} ?"
+
+        if field == "trashed" and operator in {"=", "!="}:
+            word_kind, word = self._next()
+            if word_kind != "word" or word.lower() not in {"true", "false"}:
+                raise UnsupportedQueryError("'trashed' must be compared to true or false")
+            self.params.append(1 if word.lower() == "true" else 0)
+            return f"files.trashed {operator} ?"
+
+        raise UnsupportedQueryError(f"Unsupported query term '{field}'")
+
+    def _string(self) -> str:
+        kind, value = self._next()
+        if kind != "string":
+            raise UnsupportedQueryError(f"Expected a quoted value, got '{value}'")
+        return value
+
+
+def translate_query(query: str, root_id: str | None = None) -> tuple[str, list]:
+    """Translate a Drive query into a SQL condition on the mirror tables.
+
+    Args:
+        query (str): The Drive query, an empty query matches all files.
+        root_id (str | None): (optional) The ID of the root folder, substituted for the 'root' alias.
+
+    Returns:
+        tuple[str, list]: The SQL condition and its parameters, the connection needs register_query_functions.
+
+    Raises:
+        UnsupportedQueryError: The query uses syntax outside the supported subset.
+    """
+    translator = QueryTranslator(query or "", root_id)
+    condition = translator.translate()
+    return condition, translator.params
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import os
+import threading
+import logging
+
+from ..const import FILE_HASH_BLOCK_SIZE, FILE_HASH_CACHE_MAX_ENTRIES
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def compute_md5(local_file_path: str) -> str:
+    """Return the MD5 checksum (hex) of a local file, reading it in blocks so large files are never held in memory."""
+    digest = hashlib.md5(usedforsecurity=False)
+    with open(local_file_path, "rb") as file:
+        while block := file.read(FILE_HASH_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FileHashCache:
+    """Thread-safe cache of the MD5 checksums of local files, used to skip uploads of identical files.
+
+    Checksums are keyed by the device and inode of the file and only reused while its size and
+    modification time are unchanged, so a file is hashed again when it is rewritten and never
+    when it is uploaded repeatedly. The least recently used entries are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = FILE_HASH_CACHE_MAX_ENTRIES) -> None:
+        self._max_entries = max_entries
+        self._hashes: OrderedDict[tuple[int, int], tuple[int, int, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_md5(self, local_file_path: str) -> str:
+        """Return the MD5 checksum of a local file, from the cache when the file is unchanged (blocking)."""
+        stat = os.stat(local_file_path)
+        key = (stat.st_dev, stat.st_ino)
+
+        with self._lock:
+            cached = self._hashes.get(key)
+            if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+                self._hashes.move_to_end(key)
+                return cached[2]
+
+        md5 = compute_md5(local_file_path)
+        _LOGGER.debug("Computed the MD5 checksum of %s", local_file_path)
+
+        with self._lock:
+            self._hashes[key] = (stat.st_size, stat.st_mtime_ns, md5)
+            self._hashes.move_to_end(key)
+            while len(self._hashes) > self._max_entries:
+                self._hashes.popitem(last=False)
+
+        return md5
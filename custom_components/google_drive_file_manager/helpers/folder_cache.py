@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator, Mapping
+from contextlib import asynccontextmanager, contextmanager
+from datetime import date, timedelta
+import asyncio
+import threading
+import logging
+
+from ..const import (
+    DOMAIN,
+    DAILY_FOLDERS_ACTIVE_DAYS,
+    FOLDER_CACHE_MAX_ENTRIES,
+    FOLDER_CACHE_SAVE_DELAY,
+    FOLDER_CACHE_STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_folder_cache_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """Return the storage of the folder ID cache of a config entry."""
+    return Store(hass, FOLDER_CACHE_STORAGE_VERSION, f"{DOMAIN}.folder_ids.{entry_id}")
+
+
+class PathLock:
+    """Reentrant lock of a folder path, held by a thread or by an asyncio task.
+
+    Threads wait on a condition, coroutines on an asyncio.Event that is set from whichever thread
+    releases the lock, so threads and coroutines resolving the same path wait for each other without
+    blocking the event loop. All methods are called with the lock of the folder cache held.
+    """
+
+    def __init__(self, lock: threading.Lock) -> None:
+        self._condition = threading.Condition(lock)
+        self._owner = None
+        self._depth = 0
+        self._async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+        # Number of threads and tasks holding or waiting for the lock
+        self.users = 0
+
+    def try_acquire(self, owner) -> bool:
+        """Take the lock for a thread ID or task if it is free or already theirs."""
+        if self._owner is not None and self._owner != owner:
+            return False
+        self._owner = owner
+        self._depth += 1
+        return True
+
+    def acquire(self, owner) -> None:
+        """Take the lock for a thread ID, waiting until it is free."""
+        while not self.try_acquire(owner):
+            self._condition.wait()
+
+    def add_async_waiter(self, loop: asyncio.AbstractEventLoop, event: asyncio.Event) -> None:
+        """Set `event` in `loop` when the lock is released."""
+        self._async_waiters.append((loop, event))
+
+    def release(self) -> None:
+        """Release the lock once, waking up the waiting threads and coroutines when it is free."""
+        self._depth -= 1
+        if self._depth:
+            return
+        self._owner = None
+        self._condition.notify_all()
+        for loop, event in self._async_waiters:
+            loop.call_soon_threadsafe(event.set)
+        self._async_waiters.clear()
+
+
+class FolderCache:
+    """Thread-safe, size bounded cache of Drive folder path → folder ID.
+
+    The least recently used paths are evicted once the cache holds FOLDER_CACHE_MAX_ENTRIES paths.
+    When a store is given, the cache survives restarts: it is loaded with async_load and changes are
+    written with a delay. Folder IDs loaded from storage may have been deleted or trashed in the
+    meantime, so they are reported as needing validation until mark_validated is called for them.
+
+    The cache also remembers the folder paths that recently received uploads in year/month/day
+    subfolders, so the folders of the next day can be created ahead of time.
+
+    Resolving a path that is not cached yet should happen inside `resolving(path)`, so concurrent
+    callers of the same path wait for a single lookup (or create) instead of racing each other.
+    Coroutines use `async_resolving(path)` instead, which holds the same lock of the path but waits
+    without blocking the event loop.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant | None = None,
+        store: Store | None = None,
+        max_entries: int = FOLDER_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self._hass = hass
+        self._store = store
+        self._max_entries = max_entries
+        self._folders: OrderedDict[str, str] = OrderedDict()
+        self._unvalidated: set[str] = set()
+        self._resolving: dict[str, PathLock] = {}
+        self._daily_roots: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    async def async_load(self) -> None:
+        """Load the cached folders from storage."""
+        if self._store is None:
+            return
+
+        data = await self._store.async_load() or {}
+        with self._lock:
+            # Stored in least to most recently used order
+            self._folders = OrderedDict(data.get("folders", {}))
+            self._unvalidated = set(self._folders)
+            self._daily_roots = data.get("daily_roots", {})
+            self._evict()
+
+        _LOGGER.debug("Loaded %d cached Drive folder(s)", len(self._folders))
+
+    def get(self, path: str) -> str | None:
+        """Return the folder ID of a path, or None if it is not cached."""
+        with self._lock:
+            folder_id = self._folders.get(path)
+            if folder_id is not None:
+                self._folders.move_to_end(path)
+            return folder_id
+
+    def needs_validation(self, path: str) -> bool:
+        """Return True if the folder ID of the path was loaded from storage and not checked since."""
+        with self._lock:
+            return path in self._unvalidated
+
+    def mark_validated(self, path: str) -> None:
+        """Mark the folder ID of the path as checked against Drive."""
+        with self._lock:
+            self._unvalidated.discard(path)
+
+    def set(self, path: str, folder_id: str) -> None:
+        """Cache the folder ID of a path."""
+        with self._lock:
+            self._folders[path] = folder_id
+            self._folders.move_to_end(path)
+            self._unvalidated.discard(path)
+            self._evict()
+        self._schedule_save()
+
+    def set_many(self, folders: Mapping[str, str]) -> None:
+        """Cache the folder IDs of many paths at once, given from least to most recently used."""
+        with self._lock:
+            for path, folder_id in folders.items():
+                self._folders[path] = folder_id
+                self._folders.move_to_end(path)
+                self._unvalidated.discard(path)
+            self._evict()
+        self._schedule_save()
+
+    def remember_daily_root(self, path: str) -> None:
+        """Record that a path received an upload in year/month/day subfolders today."""
+        today = date.today().isoformat()
+        with self._lock:
+            if self._daily_roots.get(path) == today:
+                return
+            self._daily_roots[path] = today
+        self._schedule_save()
+
+    def get_daily_roots(self) -> list[str]:
+        """Return the paths that received uploads in year/month/day subfolders in the last DAILY_FOLDERS_ACTIVE_DAYS days."""
+        oldest = (date.today() - timedelta(days=DAILY_FOLDERS_ACTIVE_DAYS)).isoformat()
+        with self._lock:
+            # Forget paths that are no longer used, their folders should not be created forever
+            self._daily_roots = {path: day for path, day in self._daily_roots.items() if day >= oldest}
+            return list(self._daily_roots)
+
+    def invalidate(self, path: str) -> None:
+        """Remove a path and all paths below it from the cache."""
+        prefix = f"{path}/"
+        with self._lock:
+            for cached_path in [p for p in self._folders if p == path or p.startswith(prefix)]:
+                del self._folders[cached_path]
+                self._unvalidated.discard(cached_path)
+        self._schedule_save()
+
+    def clear(self) -> None:
+        """Remove all paths from the cache."""
+        with self._lock:
+            self._folders.clear()
+            self._unvalidated.clear()
+        self._schedule_save()
+
+    def _get_path_lock(self, path: str) -> PathLock:
+        """Return the lock of a path and count the caller as one of its users, called with the cache lock held."""
+        path_lock = self._resolving.get(path)
+        if path_lock is None:
+            path_lock = self._resolving[path] = PathLock(self._lock)
+        path_lock.users += 1
+        return path_lock
+
+    def _release_path_lock(self, path: str, path_lock: PathLock, acquired: bool) -> None:
+        """Release the lock of a path if it was acquired, and forget it when it has no users left."""
+        with self._lock:
+            if acquired:
+                path_lock.release()
+            path_lock.users -= 1
+            if path_lock.users == 0:
+                del self._resolving[path]
+
+    @contextmanager
+    def resolving(self, path: str) -> Iterator[None]:
+        """Hold the resolution of a path, other threads and coroutines resolving the same path wait until it is released (reentrant)."""
+        with self._lock:
+            path_lock = self._get_path_lock(path)
+            path_lock.acquire(threading.get_ident())
+
+        try:
+            yield
+        finally:
+            self._release_path_lock(path, path_lock, True)
+
+    @asynccontextmanager
+    async def async_resolving(self, path: str) -> AsyncIterator[None]:
+        """Hold the resolution of a path in the event loop, like `resolving` for the current task (reentrant)."""
+        loop = asyncio.get_running_loop()
+        owner = asyncio.current_task()
+        acquired = False
+
+        with self._lock:
+            path_lock = self._get_path_lock(path)
+
+        try:
+            while True:
+                with self._lock:
+                    if path_lock.try_acquire(owner):
+                        acquired = True
+                        break
+                    released = asyncio.Event()
+                    path_lock.add_async_waiter(loop, released)
+                await released.wait()
+
+            yield
+        finally:
+            self._release_path_lock(path, path_lock, acquired)
+
+    def _evict(self) -> None:
+        while len(self._folders) > self._max_entries:
+            path, _ = self._folders.popitem(last=False)
+            self._unvalidated.discard(path)
+
+    def _data_to_save(self) -> dict:
+        with self._lock:
+            return {"folders": dict(self._folders), "daily_roots": dict(self._daily_roots)}
+
+    def _schedule_save(self) -> None:
+        """Schedule a delayed write of the cache, callable from any thread."""
+        if self._store is None:
+            return
+        self._hass.loop.call_soon_threadsafe(
+            self._store.async_delay_save, self._data_to_save, FOLDER_CACHE_SAVE_DELAY
+        )
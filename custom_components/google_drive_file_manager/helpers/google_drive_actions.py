@@ -1,20 +1,74 @@
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaFileUpload, MediaInMemoryUpload
 
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .create_sensor import async_create_or_update_sensor
+from .create_sensor import (
+    SensorResultCollector,
+    async_create_or_update_sensor,
+    get_sensor_results_digest,
+    get_sensor_results_path,
+)
+from .drive_client_pool import DriveClientPool, get_drive_service
+from .upload_strategy import AdaptiveMediaFileUpload, UploadStrategy
+from .upload_progress import UploadProgressTracker
+from .folder_cache import FolderCache
+from .metadata_mirror import DriveMetadataMirror
+from .drive_query import UnsupportedQueryError
+from .change_watcher import DriveChangeWatcher
+from .file_hash import FileHashCache, compute_md5
+from .sync_manifest import SyncedFile, SyncManifest
+from .stream_upload import BoundedPipe, StreamClosedError, StreamMediaUpload
+from .async_drive_client import AsyncDriveClient
+from .job_scheduler import DriveJobScheduler, async_run_drive_job, get_job_executor
+from .upload_queue import OfflineUploadQueue
+from .retention import RetentionPolicy, RetentionRule
 
+import aiohttp
+import asyncio
+import glob
+import io
 import os
-from datetime import datetime, timezone, timedelta
+import queue
+import tarfile
+import threading
+import time
+import zstandard
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, as_completed, wait
+from datetime import date, datetime, timezone, timedelta
+from itertools import islice
 import mimetypes
 import logging
 
-from ..const import DOMAIN
+from ..const import (
+    DOMAIN,
+    DELETE_BATCH_SIZE,
+    DELETE_MAX_CONCURRENT_BATCHES,
+    CLEANUP_PROGRESS_INTERVAL,
+    EVENT_CLEANUP_PROGRESS,
+    MOVE_BATCH_SIZE,
+    UPLOAD_DEFAULT_PARALLEL_UPLOADS,
+    SYNC_LIST_PARENTS_PER_QUERY,
+    DOWNLOAD_CHUNK_SIZE,
+    DOWNLOAD_PARALLEL_THRESHOLD,
+    DOWNLOAD_PARTIAL_SUFFIX,
+    ARCHIVE_FORMATS,
+    STREAM_READ_CHUNK_SIZE,
+    STREAM_READ_TIMEOUT,
+    JOB_CLASS_INTERACTIVE,
+    JOB_CLASS_TRANSFER,
+    JOB_CLASS_BULK,
+    FOLDER_MIME_TYPE,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# Marks the end of the listing in the page queue of the cleanup pipeline
+LIST_PAGES_DONE = object()
+
 def generate_full_fields_filter(fields: str, mandatory_fields: list = []) -> str:
     """Generate a full fields filter for Google Drive API requests including mandatory parameters.
     Args:
@@ -40,22 +94,76 @@ def generate_full_fields_filter(fields: str, mandatory_fields: list = []) -> str
 
     return fields
 
+def list_all_files(files_resource, query: str, fields: str, order_by: str = None) -> list[dict]:
+    """Return all files matching a Drive query, following the page tokens.
+
+    Args:
+        files_resource: The files resource of a Drive service.
+        query (str): The Drive query.
+        fields (str): The fields to return per file.
+        order_by (str): (optional) The sort order of the files.
+
+    Returns:
+        list[dict]: The matching files.
+    """
+    files = []
+    page_token = None
+
+    while True:
+        response = files_resource.list(
+            q=query,
+            fields=f"nextPageToken, files({fields})",
+            orderBy=order_by,
+            pageSize=1000,
+            pageToken=page_token,
+        ).execute()
+        files.extend(response.get("files", []))
+
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return files
+
 #region List files by pattern
-def get_list_files_by_pattern(credentials, query: str, fields: str, sort_by_recent: bool, maximum_files: int) -> dict:
+def get_list_files_by_pattern(
+    credentials,
+    query: str,
+    fields: str,
+    sort_by_recent: bool,
+    maximum_files: int,
+    client_pool: DriveClientPool | None = None,
+    metadata_mirror: DriveMetadataMirror | None = None) -> dict:
     """Standard blocking function to get files from Google Drive matching a pattern.
 
+    When a metadata mirror is given and ready, the query is answered from the mirror after
+    applying the latest Drive changes. Queries (or fields) the mirror can't answer go to the Drive API.
+
     Args:
         credentials: The credentials object to access Google Drive.
         pattern (str): The pattern to filter filenames.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        metadata_mirror (DriveMetadataMirror | None): (optional) The metadata mirror of the config entry.
 
     Returns:
         dict: The response from the Google Drive API containing the list of files matching the pattern.
     """
-    drive_service = build("drive", "v3", credentials=credentials)
+    drive_service = get_drive_service(credentials, client_pool)
 
     # Parse the fields to include in the response
     fields = generate_full_fields_filter(fields)
 
+    if metadata_mirror is not None and metadata_mirror.ready:
+        try:
+            metadata_mirror.sync_if_stale(drive_service)
+            files = metadata_mirror.list_files(
+                query,
+                [field.strip() for field in fields.split(",") if field.strip()],
+                "modifiedTime desc" if sort_by_recent else "name",
+                maximum_files,
+            )
+            return {'files': files}
+        except UnsupportedQueryError as e:
+            _LOGGER.debug("Listing '%s' with the Drive API, the metadata mirror can't answer it: %s", query, e)
+
     # Set the response fields, including nextPageToken to handle pagination
     response_fields = f"nextPageToken, files({fields})"
 
@@ -111,16 +219,43 @@ async def async_get_list_files_by_pattern(
     credentials, 
     query: str, 
     fields: str, 
+    save_to_sensor: bool,
     sensor_name: str,
     sort_by_recent: bool,
-    maximum_files: int) -> None:
-    """Async function to get mp4 files from Google Drive and log results."""
+    maximum_files: int,
+    client_pool: DriveClientPool | None = None,
+    metadata_mirror: DriveMetadataMirror | None = None,
+    async_drive_client: AsyncDriveClient | None = None,
+    job_scheduler: DriveJobScheduler | None = None) -> dict:
+    """Async function to get mp4 files from Google Drive and log results.
+
+    With `async_drive_client` Drive is listed on the event loop, unless the metadata mirror can answer the query.
+
+    Returns:
+        dict: The service response, the matching 'files' with the requested fields.
+    """
 
     try:
-        # Offload the blocking call to the executor
-        results = await hass.async_add_executor_job(
-            get_list_files_by_pattern, credentials, query, fields, sort_by_recent, maximum_files
-        )
+        if async_drive_client is not None and (metadata_mirror is None or not metadata_mirror.ready):
+            results = await async_native_get_list_files_by_pattern(
+                async_drive_client, query, fields, sort_by_recent, maximum_files
+            )
+
+        else:
+            # Offload the blocking call to the executor
+            results = await async_run_drive_job(
+                hass,
+                job_scheduler,
+                JOB_CLASS_INTERACTIVE,
+                get_list_files_by_pattern,
+                credentials,
+                query,
+                fields,
+                sort_by_recent,
+                maximum_files,
+                client_pool=client_pool,
+                metadata_mirror=metadata_mirror,
+            )
 
         files = results.get("files", [])
         if files:
@@ -128,19 +263,28 @@ async def async_get_list_files_by_pattern(
         else:
             _LOGGER.warning("No matching files found in Google Drive.")
 
-        # Create or update the sensor with the list of files
+        # Check if the results should be written to a sensor
+        if save_to_sensor:
+
+            # Create or update the sensor with the list of files, large lists are written to a file
+            collector = SensorResultCollector(get_sensor_results_path(hass, sensor_name))
+            results_attributes = await hass.async_add_executor_job(
+                collector.collect, files, get_sensor_results_digest(hass, sensor_name)
+            )
 
-        # Set the state to the number of files.
-        state = len(files)
+            # Set the state to the number of files.
+            state = len(files)
 
-        # Set the attributes for the sensor.
-        attributes = {
-            "files": files,
-            "friendly_name": sensor_name,
-            "icon": "mdi:google-drive",
-        }
+            # Set the attributes for the sensor.
+            attributes = {
+                **results_attributes,
+                "friendly_name": sensor_name,
+                "icon": "mdi:google-drive",
+            }
 
-        await async_create_or_update_sensor(hass, sensor_name, state, attributes)
+            await async_create_or_update_sensor(hass, sensor_name, state, attributes)
+
+        return {"files": files}
     
     except HomeAssistantError:
         raise  
@@ -148,6 +292,33 @@ async def async_get_list_files_by_pattern(
     except Exception as e:
         _LOGGER.error("Error retrieving list of files from Google Drive: %s", e, exc_info=True)
         raise HomeAssistantError(f"List files failed: {e}") from e
+
+def sync_metadata_mirror(credentials,
+                         metadata_mirror: DriveMetadataMirror,
+                         client_pool: DriveClientPool | None = None) -> int:
+    """Bring the metadata mirror up to date with Drive (a full listing the first time)."""
+    drive_service = get_drive_service(credentials, client_pool)
+    return metadata_mirror.sync(drive_service)
+
+async def async_sync_metadata_mirror(hass,
+                                     credentials,
+                                     metadata_mirror: DriveMetadataMirror,
+                                     client_pool: DriveClientPool | None = None,
+                                     job_scheduler: DriveJobScheduler | None = None) -> None:
+    """Async wrapper to sync the metadata mirror, failures are logged and retried at the next sync."""
+    try:
+        await async_run_drive_job(
+            hass,
+            job_scheduler,
+            JOB_CLASS_BULK,
+            sync_metadata_mirror,
+            credentials,
+            metadata_mirror,
+            client_pool=client_pool,
+        )
+
+    except Exception as e:
+        _LOGGER.warning("Syncing the Drive metadata mirror failed: %s", e)
 #endregion
 
 #region Upload media file
@@ -163,6 +334,16 @@ def verify_file_path_exists(file_path: str) -> None:
             "Please check the path and try again."
         )
     
+def get_default_remote_file_name(local_file_path: str) -> str:
+    """Return the Drive file name used when no remote file name is provided.
+
+    This is the local file name without its extension.
+    """
+    # Extract the file name from the local file path including the file extension
+    remote_file_name_with_extension = local_file_path.split("/")[-1]
+    # Remove the file extension from the remote file name
+    return remote_file_name_with_extension.split(".")[0]
+
 def get_mime_type_from_path(file_path: str) -> str:
     """Return a MIME type suitable for Drive uploads.
 
@@ -171,344 +352,4019 @@ def get_mime_type_from_path(file_path: str) -> str:
     mime, _ = mimetypes.guess_type(file_path, strict=False)
     return mime or "application/octet-stream"
 
-def extract_folder_id_from_path(hass, credentials, folder_remote_path: str):
+def get_fallback_folder_cache(hass) -> FolderCache:
+    """Return the in-memory folder cache in the integration data, used when no cache of a config entry is given."""
+    return hass.data.setdefault(DOMAIN, {}).setdefault("folder_ids", FolderCache())
+
+def is_folder_available(drive, folder_id: str) -> bool:
+    """Return True if the folder still exists in Drive and is not trashed."""
+    try:
+        folder = drive.files().get(fileId=folder_id, fields="id,trashed").execute()
+    except HttpError as e:
+        if e.resp.status == 404:
+            return False
+        raise
+    return not folder.get("trashed", False)
+
+def get_cached_folder_id(drive, folder_cache: FolderCache, path: str) -> str | None:
+    """Return the cached folder ID of a path, checking IDs loaded from storage against Drive once."""
+    folder_id = folder_cache.get(path)
+    if folder_id is None or not folder_cache.needs_validation(path):
+        return folder_id
+
+    if is_folder_available(drive, folder_id):
+        folder_cache.mark_validated(path)
+        return folder_id
+
+    _LOGGER.info("Cached folder %s → %s no longer exists, resolving it again", path, folder_id)
+    folder_cache.invalidate(path)
+    return None
+
+def escape_query_value(value: str) -> str:
+    """Escape a value for use in a quoted string of a Drive query."""
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+def get_root_folder_id(drive, folder_cache: FolderCache) -> str:
+    """Return the ID of the root folder of My Drive, cached as the empty path.
+
+    Drive lists the real ID of the root folder in the parents of a file, not the 'root' alias.
+    """
+    root_id = folder_cache.get("")
+    if root_id is None:
+        root_id = drive.files().get(fileId="root", fields="id").execute()["id"]
+        folder_cache.set("", root_id)
+    return root_id
+
+def find_folder_chain(drive, parent_id: str, names: list[str], path: str) -> list[str]:
+    """Find the existing folders of a chain of nested folder names with a single query.
+
+    All folders with any of the names are listed at once, after which the chain is followed
+    locally from the parent folder. When duplicate folders exist, the oldest one is used so
+    every caller ends up in the same folder.
+
+    Args:
+        drive: The Drive service.
+        parent_id (str): The ID of the folder containing the first folder of the chain.
+        names (list[str]): The folder names, each folder being in the previous one.
+        path (str): The path of the parent folder, used for logging.
+
+    Returns:
+        list[str]: The IDs of the longest leading part of the chain that exists.
+    """
+    candidates = list_all_files(drive.files(), build_folder_chain_query(names), "id,name,parents", order_by="createdTime")
+    return follow_folder_chain(candidates, parent_id, names, path)
+
+def build_folder_chain_query(names: list[str]) -> str:
+    """Return the Drive query listing all folders with any of the names."""
+    names_query = " or ".join(f"name = '{escape_query_value(name)}'" for name in dict.fromkeys(names))
+    return f"mimeType = '{FOLDER_MIME_TYPE}' and trashed = false and ({names_query})"
+
+def follow_folder_chain(candidates: list[dict], parent_id: str, names: list[str], path: str) -> list[str]:
+    """Follow a chain of nested folder names through the listed candidate folders, oldest first.
+
+    Returns:
+        list[str]: The IDs of the longest leading part of the chain that exists.
+    """
+    # Index the candidates by parent and name, the oldest folder first
+    children: dict[tuple[str, str], list[str]] = {}
+    for folder in candidates:
+        for parent in folder.get("parents", []):
+            children.setdefault((parent, folder["name"]), []).append(folder["id"])
+
+    chain = []
+    folder_path = path
+    for name in names:
+        folder_path = f"{folder_path}/{name}" if folder_path else name
+        folder_ids = children.get((parent_id, name))
+        if not folder_ids:
+            break
+
+        if len(folder_ids) > 1:
+            _LOGGER.warning(
+                "Found duplicate Drive folders for %s, using the oldest. "
+                "Run the merge_duplicate_folders service to merge them.", folder_path
+            )
+
+        parent_id = folder_ids[0]
+        _LOGGER.debug("Found folder %s → %s", folder_path, parent_id)
+        chain.append(parent_id)
+
+    return chain
+
+def create_folder(drive, name: str, parent_id: str, path: str) -> str:
+    """Create a folder in the parent folder and return its ID."""
+    meta = {
+        "name": name,
+        "mimeType": FOLDER_MIME_TYPE,
+        "parents": [parent_id],
+    }
+    created = drive.files().create(body=meta, fields="id").execute()
+    _LOGGER.info("Created folder %s → %s", path, created["id"])
+    return created["id"]
+
+def extract_folder_id_from_path(
+    hass,
+    credentials,
+    folder_remote_path: str,
+    client_pool: DriveClientPool | None = None,
+    folder_cache: FolderCache | None = None):
     """Based on a folder path, extract the folder ID from Google Drive.
-    It will check the availability of a folder ID in the Home Assistant integration data and return that.
-    If not available, it will search for the folder in Google Drive and return the ID.
-    If the folder is not found, it will create the folder with the given name and do that until the full path is created.
-    Any new folder IDs will be stored in the Home Assistant integration data for future use.
+    It will check the availability of a folder ID in the folder cache and return that.
+    If not available, it will look up the uncached folders of the path in Google Drive with a single query.
+    The folders that are not found are created, until the full path is created.
+    Any new folder IDs will be stored in the folder cache for future use.
 
     Args:
         credentials (_type_): Credentials object to access Google Drive.
         folder_remote_path (_type_): A string representing the folder path in Google Drive. Formatted with '/' as a separator.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry,
+            an in-memory cache in the integration data is used if not provided.
     """
 
-    drive = build("drive", "v3", credentials=credentials)
+    drive = get_drive_service(credentials, client_pool)
 
     # initialize cache
-    cache = hass.data.setdefault(DOMAIN, {})
-    folder_cache = cache.setdefault("folder_ids", {})
+    if folder_cache is None:
+        folder_cache = get_fallback_folder_cache(hass)
+
+    folder_remote_path = folder_remote_path.strip("/")
 
     # if we've already resolved this full path, return it
-    if folder_remote_path in folder_cache:
-        return folder_cache[folder_remote_path]
+    folder_id = get_cached_folder_id(drive, folder_cache, folder_remote_path)
+    if folder_id:
+        return folder_id
 
-    parent_id = "root"
-    segments = folder_remote_path.strip("/").split("/")
+    # Only one thread resolves a path at a time, concurrent uploads to the same path
+    # wait here and then find the folder in the cache instead of looking it up again
+    with folder_cache.resolving(folder_remote_path):
+        folder_id = folder_cache.get(folder_remote_path)
+        if folder_id:
+            return folder_id
 
-    for i, segment in enumerate(segments, start=1):
-        subpath = "/".join(segments[:i])
-        if subpath in folder_cache:
-            parent_id = folder_cache[subpath]
-            continue
-
-        # look for an existing folder with this name under parent_id
-        q = (
-            "mimeType = 'application/vnd.google-apps.folder' and "
-            f"name = '{segment}' and " #.replace('\"', '\\\"')
-            f"'{parent_id}' in parents and trashed = false"
-        )
-        resp = drive.files().list(q=q, fields="files(id,name)", pageSize=1).execute()
-        files = resp.get("files", [])
+        segments = folder_remote_path.split("/")
 
-        if files:
-            folder_id = files[0]["id"]
-            _LOGGER.debug("Found folder %s → %s", subpath, folder_id)
-        else:
-            # create the folder
-            meta = {
-                "name": segment,
-                "mimeType": "application/vnd.google-apps.folder",
-                "parents": [parent_id],
-            }
-            created = drive.files().create(body=meta, fields="id").execute()
-            folder_id = created["id"]
-            _LOGGER.info("Created folder %s → %s", subpath, folder_id)
+        # Start from the deepest folder of the path that is cached
+        start, parent_id = 0, None
+        for i in range(len(segments) - 1, 0, -1):
+            parent_id = get_cached_folder_id(drive, folder_cache, "/".join(segments[:i]))
+            if parent_id:
+                start = i
+                break
+        if not parent_id:
+            parent_id = get_root_folder_id(drive, folder_cache)
+
+        # Look up all remaining folders of the path in one query
+        chain = find_folder_chain(drive, parent_id, segments[start:], "/".join(segments[:start]))
+        if chain:
+            folder_cache.set_many({
+                "/".join(segments[:start + i]): chain_id for i, chain_id in enumerate(chain, start=1)
+            })
+            parent_id = chain[-1]
+
+        # Create the folders that do not exist yet
+        for i in range(start + len(chain), len(segments)):
+            subpath = "/".join(segments[:i + 1])
 
-        # cache and step into it
-        folder_cache[subpath] = folder_id
-        parent_id = folder_id
+            # Paths sharing this folder may be resolved at the same time, only one of them creates it
+            with folder_cache.resolving(subpath):
+                folder_id = folder_cache.get(subpath)
+                if folder_id is None:
+                    folder_id = create_folder(drive, segments[i], parent_id, subpath)
+                    folder_cache.set(subpath, folder_id)
+
+            parent_id = folder_id
 
     # return the ID for the full path
-    return folder_cache[folder_remote_path]
+    return parent_id
 
-def upload_media_file(hass, 
-                    credentials, 
-                    local_file_path: str,
-                    fields: str,
-                    mime_type: str = None, 
-                    remote_file_name: str = None, 
-                    remote_folder_path: str = None,
-                    append_ymd_path: bool = False) -> dict:
-    """Uploads a large media file to Google Drive.
+def find_folder_id_from_path(hass,
+                             credentials,
+                             folder_remote_path: str,
+                             client_pool: DriveClientPool | None = None,
+                             folder_cache: FolderCache | None = None) -> str | None:
+    """Return the ID of an existing Drive folder path, without creating missing folders.
 
     Args:
-        hass: The Home Assistant instance used to run the asynchronous task and store the folder ID cache.
+        hass: The Home Assistant instance used to store the fallback folder ID cache.
         credentials: The credentials object to access Google Drive.
-        local_file_path (str): The local path to the media file.
-        mime_type (str): The MIME type of the file.
-        remote_filename (str): (optional) The desired name for the file in Google Drive.
-        remote_folder_path (str): (optional) A filepath in Google Drive to upload the file to.
-        append_ymd_path (bool): If True, the file will be uploaded in a subfolder structure for year/month/day.
-        fields: (str): The fields to include in the response from the Google Drive API.
+        folder_remote_path (str): The folder path in Google Drive, formatted with '/' as a separator.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
 
     Returns:
-        dict: The response from the Google Drive API after the upload.
+        str | None: The folder ID, or None if (part of) the path does not exist.
     """
-        
-    # Verify the local file path exists - Exit if not
-    verify_file_path_exists(local_file_path)
+    drive = get_drive_service(credentials, client_pool)
 
-    drive_service = build("drive", "v3", credentials=credentials)
+    if folder_cache is None:
+        folder_cache = get_fallback_folder_cache(hass)
 
-    # If no MIME type is provided, try to guess it based on the file extension
-    if not mime_type:
-        mime_type = get_mime_type_from_path(local_file_path)
-        
-    # Set up the media file upload
-    media = MediaFileUpload(local_file_path, mimetype=mime_type, resumable=True)
+    folder_remote_path = folder_remote_path.strip("/")
+    if not folder_remote_path:
+        return get_root_folder_id(drive, folder_cache)
 
-    file_metadata = {}
-    
-    # Set the remote (Drive) filename is provided (should always be the case)
-    if remote_file_name:
-        file_metadata["name"] = remote_file_name
+    folder_id = get_cached_folder_id(drive, folder_cache, folder_remote_path)
+    if folder_id:
+        return folder_id
+
+    segments = folder_remote_path.split("/")
+    chain = find_folder_chain(drive, get_root_folder_id(drive, folder_cache), segments, "")
+    if len(chain) < len(segments):
+        return None
+
+    folder_cache.set_many({"/".join(segments[:i]): chain_id for i, chain_id in enumerate(chain, start=1)})
+    return chain[-1]
+
+def build_upload_folder_path(remote_folder_path: str = None,
+                             append_ymd_path: bool = False,
+                             day: datetime | None = None) -> str | None:
+    """Return the Drive folder path to upload to.
+
+    Args:
+        remote_folder_path (str): (optional) A filepath in Google Drive to upload the file to.
+        append_ymd_path (bool): If True, the year/month/day subfolder structure is appended to the path.
+        day (datetime | None): (optional) The day of the year/month/day subfolders, today if not provided.
+
+    Returns:
+        str | None: The folder path, or None to upload to the root folder.
+    """
 
     # Extract the remote folder based on the folder path
     # This is needed when a remote folder path is provided or when the append_ymd_path is True
-    if remote_folder_path or append_ymd_path:
-        
-        # If no remote folder path is provided, use the root folder
-        remote_folder_path = remote_folder_path or ""
+    if not (remote_folder_path or append_ymd_path):
+        return None
 
-        # If append_ymd_path is True, append the year/month/day subfolder structure to the remote folder path
-        if append_ymd_path:
-            # Append year/month/day subfolder structure to the remote folder path
-            now = datetime.now()
-            remote_folder_path = os.path.join(
-                remote_folder_path, 
-                str(now.year), 
-                str(now.month).zfill(2), 
-                str(now.day).zfill(2)
-            )
+    # If no remote folder path is provided, use the root folder
+    remote_folder_path = remote_folder_path or ""
 
-        folder_id = extract_folder_id_from_path(hass, credentials, remote_folder_path)
+    # If append_ymd_path is True, append the year/month/day subfolder structure to the remote folder path
+    if append_ymd_path:
+        # Append year/month/day subfolder structure to the remote folder path
+        now = day or datetime.now()
+        remote_folder_path = os.path.join(
+            remote_folder_path, 
+            str(now.year), 
+            str(now.month).zfill(2), 
+            str(now.day).zfill(2)
+        )
 
-        # Set the folder ID in the metadata so the file is uploaded to the correct folder
-        file_metadata["parents"] = [folder_id]
+    return remote_folder_path
 
-    # fields to include in the response
-    fields = generate_full_fields_filter(fields)
+def find_identical_file(drive_service,
+                        local_file_path: str,
+                        remote_file_name: str,
+                        folder_id: str,
+                        fields: str,
+                        file_hash_cache: FileHashCache | None = None) -> dict | None:
+    """Return a file in a Drive folder with the same name and content as a local file, if any.
+
+    The local file is only hashed when a file with the same name and size exists in the folder.
+
+    Args:
+        drive_service: The Drive service.
+        local_file_path (str): The local path of the file.
+        remote_file_name (str): The name of the file in Google Drive.
+        folder_id (str): The ID of the Drive folder, the root folder if empty.
+        fields (str): The fields to include in the returned file.
+        file_hash_cache (FileHashCache | None): (optional) Caches the checksums of local files.
 
-    # Initiate the file upload request
-    request = drive_service.files().create(
-        body=file_metadata,
-        media_body=media,
-        fields=fields
+    Returns:
+        dict | None: The existing file with the requested fields, or None.
+    """
+    query = (
+        f"name = '{escape_query_value(remote_file_name)}' "
+        f"and '{escape_query_value(folder_id or 'root')}' in parents and trashed = false"
+    )
+    candidates = list_all_files(
+        drive_service.files(),
+        query,
+        generate_full_fields_filter(fields, mandatory_fields=["id", "size", "md5Checksum"]),
     )
 
-    # Execute the upload iteratively until complete
-    response = None
+    # Files with another size can't be identical, only hash the local file when needed
+    size = str(os.path.getsize(local_file_path))
+    candidates = [file for file in candidates if file.get("size") == size and file.get("md5Checksum")]
+    if not candidates:
+        return None
 
-    while response is None:
-        _, response = request.next_chunk()
-    
-    return response
+    md5 = (file_hash_cache or FileHashCache()).get_md5(local_file_path)
+    return next((file for file in candidates if file["md5Checksum"] == md5), None)
 
-async def async_upload_media_file(hass, 
-                                  credentials, 
-                                  local_file_path: str, 
-                                  mime_type: str, 
-                                  remote_file_name: str, 
-                                  remote_folder_path: str,
-                                  append_ymd_path: bool,
-                                  save_to_sensor: bool,
-                                  sensor_name: str,
-                                  fields: str
-                                  ) -> None:
+def query_resumable_upload_status(request, media) -> dict | None:
+    """Ask Drive which bytes of a started resumable upload it received, and resume the request from there.
+
+    Args:
+        request: The Drive create or update request of which the resumable session was started.
+        media: The media upload of the request.
+
+    Returns:
+        dict | None: The response of the upload if Drive already received all bytes, otherwise None.
     """
-    Async function to upload a large media file to Google Drive and log results.
-    This function offloads the blocking upload operation to an executor and 
-    handles the response from the Google Drive API. It logs the success or 
-    failure of the upload operation.
+    size = media.size()
+    response, content = request.http.request(
+        request.resumable_uri,
+        "PUT",
+        headers={"Content-Range": f"bytes */{size if size is not None else '*'}", "Content-Length": "0"},
+    )
+
+    if response.status in (200, 201):
+        return request.postproc(response, content)
+    if response.status != 308:
+        raise HttpError(response, content, uri=request.resumable_uri)
+
+    # Without a Range header no byte arrived yet
+    byte_range = response.get("range")
+    request.resumable_progress = int(byte_range.rsplit("-", 1)[1]) + 1 if byte_range else 0
+    return None
+
+def execute_resumable_upload(request,
+                             media,
+                             name: str,
+                             upload_strategy: UploadStrategy,
+                             progress_tracker: UploadProgressTracker | None = None,
+                             client_pool: DriveClientPool | None = None) -> dict:
+    """Send a resumable upload chunk by chunk, adapting the chunk size and resuming after failed chunks.
+
     Args:
-        hass: The Home Assistant instance used to run the asynchronous task.
-        credentials: The credentials object to access Google Drive.
-        local_file_path (str): The local path to the media file.
-        mime_type (str): The MIME type of the file.
-        remote_file_name (str): The desired name for the file in Google Drive.
-        remote_folder_path (str): (optional) A filepath in Google Drive to upload the file to.
-        save_to_sensor (bool): Whether to save the uploaded file information to a sensor.
-        sensor_name (str): The name of the sensor to save the uploaded file information.
-        fields (str): The fields to include in the response from the Google Drive API.
+        request: The Drive create or update request of which `media` is the resumable media body.
+        media: The media upload, with a `chunk_size` attribute that is updated after every chunk.
+        name (str): The name of the file, for the progress sensor and the log.
+        upload_strategy (UploadStrategy): Measures the throughput and returns the next chunk size.
+        progress_tracker (UploadProgressTracker | None): (optional) Receives the progress of the upload.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool, of which the rate limiter
+            decides whether and when a failed chunk is resumed.
 
     Returns:
-        None: This function does not return a value. It logs the result of the 
-        upload operation.
+        dict: The response from the Google Drive API after the last chunk.
     """
-    
+    upload_id = None
+    if progress_tracker:
+        upload_id = progress_tracker.start(name, media.size())
+
+    rate_limiter = client_pool.rate_limiter if client_pool is not None else None
+
     try:
+        # Execute the upload iteratively until complete
+        response = None
+        attempt = 0
+        query_status = False
 
-        # If no remote file name is provided, use the local file name as the remote file name
-        if not remote_file_name:
-            # Extract the file name from the local file path including the file extension
-            remote_file_name_with_extension = local_file_path.split("/")[-1]
-            # Remove the file extension from the remote file name
-            remote_file_name = remote_file_name_with_extension.split(".")[0]
+        while response is None:
+            progress_before = request.resumable_progress
+            chunk_started = time.monotonic()
 
-        # Offload the blocking call to the executor
-        response = await hass.async_add_executor_job(
-            upload_media_file, 
-            hass, 
-            credentials, 
-            local_file_path,
-            fields, 
-            mime_type, 
-            remote_file_name, 
-            remote_folder_path,
-            append_ymd_path
-            )
+            try:
+                if query_status:
+                    response = query_resumable_upload_status(request, media)
+                    query_status = False
+                    continue
+                _, response = request.next_chunk()
+            except Exception as e:
+                # Starting the session is already retried by the rate limiter, only resume started sessions
+                if rate_limiter is None or request.resumable_uri is None:
+                    raise
 
-        _LOGGER.info("File uploaded successfully")
+                attempt += 1
+                delay = rate_limiter.get_retry_delay_for_error(e, attempt)
+                if delay is None:
+                    raise
 
-        # Check if the results should be written to a sensor
-        if save_to_sensor:
-            
-            # Set the state to the name of the remote file
-            state = remote_file_name
+                # Resume from the last byte Drive acknowledged: after a failed response next_chunk asks Drive
+                # for it itself, after a network error (or a failed query) the status is queried first
+                query_status = query_status or not isinstance(e, HttpError)
+                _LOGGER.warning("Uploading a chunk of '%s' failed (%s), resuming in %.1f s", name, e, delay)
+                time.sleep(delay)
+                continue
 
-            # Create or update the sensor with the uploaded file information
-            await async_create_or_update_sensor(
-                hass, 
-                sensor_name, 
-                state,
-                response
-            )
+            attempt = 0
 
+            # The progress is not updated for the last chunk, it ends at the file size
+            progress_after = media.size() if response is not None else request.resumable_progress
+            chunk_seconds = time.monotonic() - chunk_started
+            media.chunk_size = upload_strategy.record_chunk(progress_after - progress_before, chunk_seconds)
 
-    except HomeAssistantError:
-        # already user-friendly (verify_file_path_exists or get_mime_type_from_path)
-        raise  
+            if progress_tracker:
+                progress_tracker.update(upload_id, progress_after, progress_after - progress_before, chunk_seconds)
 
-    except Exception as e:
-        _LOGGER.error("Error uploading file to Google Drive: %s", e, exc_info=True)
-        raise HomeAssistantError(f"Drive upload failed: {e}") from e
+    finally:
+        if progress_tracker:
+            progress_tracker.finish(upload_id)
 
-#endregion
+    return response
 
-#region Cleanup Drive files
-def cleanup_older_files_by_pattern(credentials, pattern: str, days_ago: int, preview: bool, fields: str) -> list[str]:
-    """Delete files in Drive whose name matches `pattern` and are older than `days_ago`.
+def upload_file_to_folder(credentials,
+                          local_file_path: str,
+                          fields: str,
+                          mime_type: str = None,
+                          remote_file_name: str = None,
+                          folder_id: str = None,
+                          client_pool: DriveClientPool | None = None,
+                          upload_strategy: UploadStrategy | None = None,
+                          progress_tracker: UploadProgressTracker | None = None,
+                          skip_if_identical: bool = False,
+                          file_hash_cache: FileHashCache | None = None,
+                          file_id: str = None) -> dict:
+    """Uploads a local file to an already resolved Drive folder.
+
+    Small files are sent in a single multipart request, larger files in a resumable upload
+    of which the chunk size is adapted to the measured throughput (see UploadStrategy).
+    With `skip_if_identical` a file with the same name and MD5 checksum in the folder is
+    returned instead of uploading the file again. With `file_id` the content of that existing
+    file is replaced instead of creating a new file, keeping its ID, links and revisions.
 
     Args:
-        credentials: Authorized Google credentials.
-        pattern (str): Substring to match in file names (uses Drive `name contains` query).
-        days_ago (int): Maximum file age in days; any file created before now-days_ago will be deleted.
-        preview (bool): If True, only log the files that would be deleted without actually deleting them.
-        fields (str): The fields to include in the response from the Google Drive API.
+        credentials: The credentials object to access Google Drive.
+        local_file_path (str): The local path to the media file.
+        fields: (str): The fields to include in the response from the Google Drive API.
+        mime_type (str): (optional) The MIME type of the file, guessed from the extension if empty.
+        remote_file_name (str): (optional) The desired name for the file in Google Drive.
+        folder_id (str): (optional) The ID of the Drive folder to upload to, the root folder if empty.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        upload_strategy (UploadStrategy | None): (optional) The upload strategy of the config entry.
+        progress_tracker (UploadProgressTracker | None): (optional) Receives the progress of resumable uploads.
+        skip_if_identical (bool): (optional) If True, an identical file in the folder is returned instead of uploading.
+        file_hash_cache (FileHashCache | None): (optional) Caches the checksums of local files.
+        file_id (str): (optional) The ID of an existing Drive file of which the content is replaced.
 
     Returns:
-        List of filenames that were deleted.
+        dict: The response from the Google Drive API after the upload, with the 'upload_strategy'
+        ('multipart', 'resumable' or 'skipped' for an identical existing file) that was used.
     """
-    drive = build("drive", "v3", credentials=credentials)
-    # Compute RFC3339 timestamp threshold
-    cutoff = (datetime.now(timezone.utc) - timedelta(days=days_ago)).isoformat()
 
-    # Build query: name contains pattern from user, createdTime older than cutoff, not trashed
-    query = [
-            f"({pattern})",
-            f"createdTime < '{cutoff}'",
-            "trashed = false"
-    ]
+    # Verify the local file path exists - Exit if not
+    verify_file_path_exists(local_file_path)
 
-    # Remove empty parts from query and join with " and " to create a valid query string
-    query = " and ".join([part for part in query if part])
+    drive_service = get_drive_service(credentials, client_pool)
+    upload_strategy = upload_strategy or UploadStrategy()
 
-    deleted = []
-    page_token = None
+    # If no MIME type is provided, try to guess it based on the file extension
+    if not mime_type:
+        mime_type = get_mime_type_from_path(local_file_path)
 
-    # Generate the full fields filter, ensuring 'id' is always included
-    fields = generate_full_fields_filter(fields, mandatory_fields=["id", "name"])
+    file_metadata = {}
+    
+    # Set the remote (Drive) filename is provided (should always be the case)
+    if remote_file_name:
+        file_metadata["name"] = remote_file_name
 
-    while True:
-        response = drive.files().list(
-            q=query,
-            fields=f"nextPageToken, files({fields})",
-            pageToken=page_token,
-        ).execute()
+    # Set the folder ID in the metadata so the file is uploaded to the correct folder
+    if folder_id:
+        file_metadata["parents"] = [folder_id]
 
-        # Get the files from the Google Drive response
-        files = response.get("files", [])
+    # fields to include in the response
+    fields = generate_full_fields_filter(fields)
 
-        # Iterate over the files and process them
-        for file in files:
-            # Check if the preview parameter is set to False, in that case execute deletion
-            if not preview:
-                drive.files().delete(fileId=file["id"]).execute()
+    # Return the existing file instead of transferring the same content again
+    if skip_if_identical:
+        existing_file = find_identical_file(
+            drive_service,
+            local_file_path,
+            remote_file_name or os.path.basename(local_file_path),
+            folder_id,
+            fields,
+            file_hash_cache,
+        )
+        if existing_file is not None:
+            _LOGGER.info("Skipped uploading %s, an identical file exists in Drive", local_file_path)
+            return {**existing_file, "upload_strategy": "skipped"}
 
-            deleted.append(file["name"])
+    def build_request(media):
+        # Replace the content of an existing file, its parents are not part of an update body
+        if file_id:
+            return drive_service.files().update(
+                fileId=file_id,
+                body={"name": file_metadata["name"]} if "name" in file_metadata else {},
+                media_body=media,
+                fields=fields
+            )
+        return drive_service.files().create(
+            body=file_metadata,
+            media_body=media,
+            fields=fields
+        )
 
-        # check if there is a next page token, if not, break the loop
-        page_token = response.get("nextPageToken")
-        if not page_token:
-            break
+    # Small files: metadata and content in one multipart request
+    if upload_strategy.use_multipart(os.path.getsize(local_file_path)):
+        media = MediaFileUpload(local_file_path, mimetype=mime_type, resumable=False)
+        response = build_request(media).execute()
 
-    return deleted
+        return {**response, "upload_strategy": "multipart"}
 
-async def async_cleanup_older_files_by_pattern(
-        hass, 
-        credentials, 
-        pattern: str, 
-        days_ago: int, 
-        preview: bool, 
-        save_to_sensor: bool, 
-        sensor_name: str, 
-        fields: str) -> None:
-    """Async wrapper to delete old Drive files and log the outcome.
+    # Large files: resumable upload, tuning the chunk size after every chunk
+    media = AdaptiveMediaFileUpload(local_file_path, mime_type, upload_strategy.initial_chunk_size())
+    response = execute_resumable_upload(
+        build_request(media),
+        media,
+        remote_file_name or os.path.basename(local_file_path),
+        upload_strategy,
+        progress_tracker,
+        client_pool,
+    )
 
-    Usage: await async_cleanup_older_files_by_pattern(hass, creds, "camera", 30)
-    """
-    try:
-        deleted = await hass.async_add_executor_job(
-            cleanup_older_files_by_pattern, credentials, pattern, days_ago, preview, fields
-        )
-        if deleted:
-            names = ", ".join(deleted)
-            _LOGGER.warning(
-                "Deleted %d Drive file(s) older than %d days matching '%s': %s",
-                len(deleted), days_ago, pattern, names
+    return {**response, "upload_strategy": "resumable"}
+
+def read_stream_head(stream, upload_strategy: UploadStrategy) -> bytes:
+    """Read the start of a stream, until it ended or is too large for a multipart upload.
+
+    Args:
+        stream: Object with a read(size) method returning b'' at the end of the data.
+        upload_strategy (UploadStrategy): The upload strategy, of which the multipart threshold is used.
+
+    Returns:
+        bytes: All data of the stream if it fits in a multipart upload, otherwise just more than that.
+    """
+    head = bytearray()
+    while len(head) <= upload_strategy.multipart_threshold:
+        data = stream.read(upload_strategy.multipart_threshold + 1 - len(head))
+        if not data:
+            break
+        head += data
+    return bytes(head)
+
+def upload_stream_to_folder(credentials,
+                            stream,
+                            head: bytes,
+                            fields: str,
+                            mime_type: str,
+                            remote_file_name: str,
+                            folder_id: str = None,
+                            client_pool: DriveClientPool | None = None,
+                            upload_strategy: UploadStrategy | None = None,
+                            progress_tracker: UploadProgressTracker | None = None) -> dict:
+    """Uploads the data read from a stream of unknown size to an already resolved Drive folder.
+
+    Data that ended within the multipart threshold is sent in a single multipart request, longer
+    data in a resumable upload that reads the stream one chunk at a time. Nothing is written to
+    local storage. Drive refuses an upload to a missing folder when the upload starts, before the
+    stream is read, so the upload can be started again with the same head and stream. A resumable
+    session that is lost after chunks were sent raises a HomeAssistantError instead of an HttpError,
+    since the stream cannot be read again.
+
+    Args:
+        credentials: The credentials object to access Google Drive.
+        stream: Object with a read(size) method returning b'' at the end of the data.
+        head (bytes): The start of the data, already read from the stream with read_stream_head.
+        fields: (str): The fields to include in the response from the Google Drive API.
+        mime_type (str): The MIME type of the file.
+        remote_file_name (str): The name of the file in Google Drive.
+        folder_id (str): (optional) The ID of the Drive folder to upload to, the root folder if empty.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        upload_strategy (UploadStrategy | None): (optional) The upload strategy of the config entry.
+        progress_tracker (UploadProgressTracker | None): (optional) Receives the progress of resumable uploads.
+
+    Returns:
+        dict: The response from the Google Drive API after the upload, with the 'upload_strategy' that was used.
+    """
+    drive_service = get_drive_service(credentials, client_pool)
+    upload_strategy = upload_strategy or UploadStrategy()
+
+    file_metadata = {"name": remote_file_name}
+    if folder_id:
+        file_metadata["parents"] = [folder_id]
+
+    fields = generate_full_fields_filter(fields)
+
+    # The whole stream was read: metadata and content in one multipart request
+    if len(head) <= upload_strategy.multipart_threshold:
+        media = MediaInMemoryUpload(head, mimetype=mime_type, resumable=False)
+        response = drive_service.files().create(body=file_metadata, media_body=media, fields=fields).execute()
+        return {**response, "upload_strategy": "multipart"}
+
+    media = StreamMediaUpload(stream, mime_type, upload_strategy.initial_chunk_size(), head)
+    request = drive_service.files().create(body=file_metadata, media_body=media, fields=fields)
+    try:
+        response = execute_resumable_upload(request, media, remote_file_name, upload_strategy, progress_tracker, client_pool)
+    except HttpError as e:
+        # A session that expired mid-upload also answers 404, but the data it got is gone from the stream
+        if e.resp.status == 404 and request.resumable_uri is not None:
+            raise HomeAssistantError(
+                f"The upload session of '{remote_file_name}' expired after data was sent, the stream cannot be read again"
+            ) from e
+        raise
+
+    return {**response, "upload_strategy": "resumable"}
+
+def upload_file_to_path(hass,
+                        credentials,
+                        local_file_path: str,
+                        fields: str,
+                        mime_type: str = None,
+                        remote_file_name: str = None,
+                        folder_path: str = None,
+                        client_pool: DriveClientPool | None = None,
+                        upload_strategy: UploadStrategy | None = None,
+                        progress_tracker: UploadProgressTracker | None = None,
+                        folder_cache: FolderCache | None = None,
+                        skip_if_identical: bool = False,
+                        file_hash_cache: FileHashCache | None = None) -> dict:
+    """Uploads a local file to a Drive folder path, resolving (and creating) the folder.
+
+    When the upload fails because the cached folder no longer exists (e.g. it was deleted in the
+    Drive UI), the cached path is invalidated and the upload is retried once in a newly resolved folder.
+
+    Args:
+        hass: The Home Assistant instance used to store the fallback folder ID cache.
+        credentials: The credentials object to access Google Drive.
+        local_file_path (str): The local path to the media file.
+        fields: (str): The fields to include in the response from the Google Drive API.
+        mime_type (str): (optional) The MIME type of the file, guessed from the extension if empty.
+        remote_file_name (str): (optional) The desired name for the file in Google Drive.
+        folder_path (str): (optional) The Drive folder path to upload to, the root folder if empty.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        upload_strategy (UploadStrategy | None): (optional) The upload strategy of the config entry.
+        progress_tracker (UploadProgressTracker | None): (optional) Receives the progress of resumable uploads.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+        skip_if_identical (bool): (optional) If True, an identical file in the folder is returned instead of uploading.
+        file_hash_cache (FileHashCache | None): (optional) Caches the checksums of local files.
+
+    Returns:
+        dict: The response from the Google Drive API after the upload, with the 'upload_strategy' that was used.
+    """
+
+    def upload(folder_id: str | None) -> dict:
+        return upload_file_to_folder(
+            credentials,
+            local_file_path,
+            fields,
+            mime_type,
+            remote_file_name,
+            folder_id,
+            client_pool,
+            upload_strategy,
+            progress_tracker,
+            skip_if_identical,
+            file_hash_cache,
+        )
+
+    return upload_to_folder_path(hass, credentials, folder_path, upload, client_pool, folder_cache)
+
+def upload_to_folder_path(hass,
+                          credentials,
+                          folder_path: str | None,
+                          upload: Callable[[str | None], dict],
+                          client_pool: DriveClientPool | None = None,
+                          folder_cache: FolderCache | None = None) -> dict:
+    """Resolve (and create) a Drive folder path and run an upload into it.
+
+    When the upload fails with an HttpError 404 because the cached folder no longer exists, the cached
+    path is invalidated and the upload is called again with a newly resolved folder. `upload` must only
+    raise an HttpError 404 when it can be called again: Drive refuses an upload to a missing folder
+    when it starts, but an upload reading a stream has to turn a 404 of a session that expired after
+    chunks were sent (the data they read is gone) into another error.
+
+    Args:
+        hass: The Home Assistant instance used to store the fallback folder ID cache.
+        credentials: The credentials object to access Google Drive.
+        folder_path (str | None): The Drive folder path to upload to, the root folder if empty.
+        upload (Callable[[str | None], dict]): Uploads to the folder ID it is called with (None for the root).
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+
+    Returns:
+        dict: The result of `upload`.
+    """
+    if not folder_path:
+        return upload(None)
+
+    folder_id = extract_folder_id_from_path(hass, credentials, folder_path, client_pool, folder_cache)
+
+    try:
+        return upload(folder_id)
+
+    except HttpError as e:
+        # Drive answers 404 when the parent folder of the new file does not exist (anymore)
+        if e.resp.status != 404:
+            raise
+
+        _LOGGER.warning("Drive folder %s (%s) no longer exists, resolving it again", folder_path, folder_id)
+
+        # Parent folders may have been removed too, so drop the whole cached tree of the path
+        if folder_cache is None:
+            folder_cache = get_fallback_folder_cache(hass)
+        folder_cache.invalidate(folder_path.strip("/").split("/")[0])
+
+        folder_id = extract_folder_id_from_path(hass, credentials, folder_path, client_pool, folder_cache)
+        return upload(folder_id)
+
+def upload_media_file(hass, 
+                    credentials, 
+                    local_file_path: str,
+                    fields: str,
+                    mime_type: str = None, 
+                    remote_file_name: str = None, 
+                    remote_folder_path: str = None,
+                    append_ymd_path: bool = False,
+                    client_pool: DriveClientPool | None = None,
+                    upload_strategy: UploadStrategy | None = None,
+                    progress_tracker: UploadProgressTracker | None = None,
+                    folder_cache: FolderCache | None = None,
+                    skip_if_identical: bool = False,
+                    file_hash_cache: FileHashCache | None = None) -> dict:
+    """Uploads a large media file to Google Drive.
+
+    Args:
+        hass: The Home Assistant instance used to run the asynchronous task and store the fallback folder ID cache.
+        credentials: The credentials object to access Google Drive.
+        local_file_path (str): The local path to the media file.
+        mime_type (str): The MIME type of the file.
+        remote_filename (str): (optional) The desired name for the file in Google Drive.
+        remote_folder_path (str): (optional) A filepath in Google Drive to upload the file to.
+        append_ymd_path (bool): If True, the file will be uploaded in a subfolder structure for year/month/day.
+        fields: (str): The fields to include in the response from the Google Drive API.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        upload_strategy (UploadStrategy | None): (optional) The upload strategy of the config entry.
+        progress_tracker (UploadProgressTracker | None): (optional) Receives the progress of resumable uploads.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+        skip_if_identical (bool): (optional) If True, an identical file in the folder is returned instead of uploading.
+        file_hash_cache (FileHashCache | None): (optional) Caches the checksums of local files.
+
+    Returns:
+        dict: The response from the Google Drive API after the upload, with the 'upload_strategy' that was used.
+    """
+        
+    # Verify the local file path exists - Exit if not
+    verify_file_path_exists(local_file_path)
+
+    # Remember the path, so the folders of the next day can be created ahead of time
+    if append_ymd_path and folder_cache is not None:
+        folder_cache.remember_daily_root((remote_folder_path or "").strip("/"))
+
+    return upload_file_to_path(
+        hass,
+        credentials,
+        local_file_path,
+        fields,
+        mime_type,
+        remote_file_name,
+        build_upload_folder_path(remote_folder_path, append_ymd_path),
+        client_pool,
+        upload_strategy,
+        progress_tracker,
+        folder_cache,
+        skip_if_identical,
+        file_hash_cache,
+    )
+
+def upload_media_stream(hass,
+                        credentials,
+                        stream,
+                        fields: str,
+                        mime_type: str,
+                        remote_file_name: str,
+                        remote_folder_path: str = None,
+                        append_ymd_path: bool = False,
+                        client_pool: DriveClientPool | None = None,
+                        upload_strategy: UploadStrategy | None = None,
+                        progress_tracker: UploadProgressTracker | None = None,
+                        folder_cache: FolderCache | None = None) -> dict:
+    """Uploads the data of a stream (a camera snapshot, a download, ...) like upload_media_file uploads a file.
+
+    Args:
+        hass: The Home Assistant instance used to store the fallback folder ID cache.
+        credentials: The credentials object to access Google Drive.
+        stream: Object with a read(size) method returning b'' at the end of the data.
+        fields: (str): The fields to include in the response from the Google Drive API.
+        mime_type (str): The MIME type of the data.
+        remote_file_name (str): The name of the file in Google Drive.
+        remote_folder_path (str): (optional) A filepath in Google Drive to upload the file to.
+        append_ymd_path (bool): If True, the file will be uploaded in a subfolder structure for year/month/day.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        upload_strategy (UploadStrategy | None): (optional) The upload strategy of the config entry.
+        progress_tracker (UploadProgressTracker | None): (optional) Receives the progress of resumable uploads.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+
+    Returns:
+        dict: The response from the Google Drive API after the upload, with the 'upload_strategy' that was used.
+    """
+    upload_strategy = upload_strategy or UploadStrategy()
+
+    # Remember the path, so the folders of the next day can be created ahead of time
+    if append_ymd_path and folder_cache is not None:
+        folder_cache.remember_daily_root((remote_folder_path or "").strip("/"))
+
+    head = read_stream_head(stream, upload_strategy)
+
+    return upload_to_folder_path(
+        hass,
+        credentials,
+        build_upload_folder_path(remote_folder_path, append_ymd_path),
+        lambda folder_id: upload_stream_to_folder(
+            credentials,
+            stream,
+            head,
+            fields,
+            mime_type,
+            remote_file_name,
+            folder_id,
+            client_pool,
+            upload_strategy,
+            progress_tracker,
+        ),
+        client_pool,
+        folder_cache,
+    )
+
+async def async_upload_media_stream(hass,
+                                    credentials,
+                                    camera_entity_id: str | None,
+                                    url: str | None,
+                                    media_content_id: str | None,
+                                    mime_type: str,
+                                    remote_file_name: str,
+                                    remote_folder_path: str,
+                                    append_ymd_path: bool,
+                                    fields: str,
+                                    client_pool: DriveClientPool | None = None,
+                                    upload_strategy: UploadStrategy | None = None,
+                                    progress_tracker: UploadProgressTracker | None = None,
+                                    folder_cache: FolderCache | None = None,
+                                    job_scheduler: DriveJobScheduler | None = None) -> dict:
+    """Upload a camera snapshot, the response of a URL or a media source item without writing it to disk.
+
+    A snapshot is uploaded from memory. A URL is streamed into the upload through a bounded pipe:
+    the response is read in the event loop and written to the pipe the upload reads from in the
+    executor, so only a small buffer is held whatever the size. Media source items of the local
+    media folders are uploaded as files, cameras as snapshots and other items through their URL.
+
+    Args:
+        hass: The Home Assistant instance.
+        credentials: The credentials object to access Google Drive.
+        camera_entity_id (str | None): The camera of which a snapshot is uploaded.
+        url (str | None): The HTTP(S) URL of which the response is uploaded.
+        media_content_id (str | None): The media source URI (media-source://...) of the uploaded item.
+        mime_type (str): The MIME type of the file, the one of the source if empty.
+        remote_file_name (str): The name in Google Drive, generated from the source if empty.
+        remote_folder_path (str): (optional) A filepath in Google Drive to upload the file to.
+        append_ymd_path (bool): If True, the file will be uploaded in a subfolder structure for year/month/day.
+        fields (str): The fields to include in the response from the Google Drive API.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        upload_strategy (UploadStrategy | None): (optional) The upload strategy of the config entry.
+        progress_tracker (UploadProgressTracker | None): (optional) Receives the progress of resumable uploads.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+        job_scheduler (DriveJobScheduler | None): (optional) Runs the blocking Drive work instead of the shared executor.
+
+    Returns:
+        dict: The response from the Google Drive API after the upload, with the 'name' and the 'upload_strategy'.
+    """
+    # Camera pulls in the stream integration, only import these when they are used
+    from homeassistant.components import camera, media_source
+    from homeassistant.components.media_player import async_process_play_media_url
+
+    fields = generate_full_fields_filter(fields, mandatory_fields=["name"])
+
+    if media_content_id:
+        if not media_source.is_media_source_id(media_content_id):
+            raise HomeAssistantError(f"'{media_content_id}' is not a media source URI")
+        item = media_source.MediaSourceItem.from_uri(hass, media_content_id, None)
+
+        if item.domain == camera.DOMAIN:
+            camera_entity_id = item.identifier
+
+        elif item.domain == media_source.DOMAIN:
+            # A file in a local media folder, upload it directly
+            local_source = hass.data[media_source.DOMAIN][media_source.DOMAIN]
+            local_file_path = str(local_source.async_full_path(*local_source.async_parse_identifier(item)))
+            return await async_run_drive_job(
+                hass,
+                job_scheduler,
+                JOB_CLASS_TRANSFER,
+                upload_media_file,
+                hass,
+                credentials,
+                local_file_path,
+                fields,
+                mime_type,
+                remote_file_name or get_default_remote_file_name(local_file_path),
+                remote_folder_path,
+                append_ymd_path,
+                client_pool=client_pool,
+                upload_strategy=upload_strategy,
+                progress_tracker=progress_tracker,
+                folder_cache=folder_cache,
+            )
+
+        else:
+            play_media = await media_source.async_resolve_media(hass, media_content_id, None)
+            url = async_process_play_media_url(hass, play_media.url)
+            mime_type = mime_type or play_media.mime_type
+
+    if camera_entity_id:
+        image = await camera.async_get_image(hass, camera_entity_id)
+        return await async_run_drive_job(
+            hass,
+            job_scheduler,
+            JOB_CLASS_TRANSFER,
+            upload_media_stream,
+            hass,
+            credentials,
+            io.BytesIO(image.content),
+            fields,
+            mime_type or image.content_type,
+            remote_file_name or f"{camera_entity_id.split('.', 1)[1]}_{datetime.now():%Y%m%d_%H%M%S}",
+            remote_folder_path,
+            append_ymd_path,
+            client_pool=client_pool,
+            upload_strategy=upload_strategy,
+            progress_tracker=progress_tracker,
+            folder_cache=folder_cache,
+        )
+
+    session = async_get_clientsession(hass)
+    timeout = aiohttp.ClientTimeout(total=None, sock_read=STREAM_READ_TIMEOUT)
+
+    async with session.get(url, timeout=timeout) as response:
+        response.raise_for_status()
+
+        pipe = BoundedPipe()
+
+        def upload() -> dict:
+            try:
+                return upload_media_stream(
+                    hass,
+                    credentials,
+                    pipe,
+                    fields,
+                    mime_type or response.content_type,
+                    remote_file_name or get_default_remote_file_name(response.url.path) or "download",
+                    remote_folder_path,
+                    append_ymd_path,
+                    client_pool,
+                    upload_strategy,
+                    progress_tracker,
+                    folder_cache,
+                )
+            except BaseException:
+                # Stop the download below, it would wait for the upload to read on
+                pipe.cancel()
+                raise
+
+        uploaded = asyncio.ensure_future(async_run_drive_job(hass, job_scheduler, JOB_CLASS_TRANSFER, upload))
+        # Also stop the download when the job ends without running the upload (e.g. it was cancelled)
+        uploaded.add_done_callback(lambda _: pipe.cancel())
+
+        # Writing waits in the event loop while the pipe is full, also while the job waits for its turn
+        try:
+            async for chunk in response.content.iter_chunked(STREAM_READ_CHUNK_SIZE):
+                await pipe.async_write(chunk)
+        except StreamClosedError:
+            # The upload failed, awaiting it raises its error
+            pass
+        except BaseException as e:
+            pipe.fail(e)
+            if not isinstance(e, Exception):
+                raise
+        else:
+            pipe.close()
+
+        return await uploaded
+
+async def async_upload_media_file(hass, 
+                                  credentials, 
+                                  local_file_path: str, 
+                                  mime_type: str, 
+                                  remote_file_name: str, 
+                                  remote_folder_path: str,
+                                  append_ymd_path: bool,
+                                  save_to_sensor: bool,
+                                  sensor_name: str,
+                                  fields: str,
+                                  client_pool: DriveClientPool | None = None,
+                                  upload_strategy: UploadStrategy | None = None,
+                                  progress_tracker: UploadProgressTracker | None = None,
+                                  folder_cache: FolderCache | None = None,
+                                  skip_if_identical: bool = False,
+                                  file_hash_cache: FileHashCache | None = None,
+                                  camera_entity_id: str | None = None,
+                                  url: str | None = None,
+                                  media_content_id: str | None = None,
+                                  async_drive_client: AsyncDriveClient | None = None,
+                                  job_scheduler: DriveJobScheduler | None = None) -> dict:
+    """
+    Async function to upload a large media file to Google Drive and log results.
+    This function offloads the blocking upload operation to an executor and 
+    handles the response from the Google Drive API. It logs the success or 
+    failure of the upload operation.
+    Args:
+        hass: The Home Assistant instance used to run the asynchronous task.
+        credentials: The credentials object to access Google Drive.
+        local_file_path (str): The local path to the media file.
+        mime_type (str): The MIME type of the file.
+        remote_file_name (str): The desired name for the file in Google Drive.
+        remote_folder_path (str): (optional) A filepath in Google Drive to upload the file to.
+        save_to_sensor (bool): Whether to save the uploaded file information to a sensor.
+        sensor_name (str): The name of the sensor to save the uploaded file information.
+        fields (str): The fields to include in the response from the Google Drive API.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        upload_strategy (UploadStrategy | None): (optional) The upload strategy of the config entry.
+        progress_tracker (UploadProgressTracker | None): (optional) Receives the progress of resumable uploads.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+        skip_if_identical (bool): (optional) If True, an identical file in the folder is returned instead of uploading.
+        file_hash_cache (FileHashCache | None): (optional) Caches the checksums of local files.
+        camera_entity_id (str | None): (optional) Upload a snapshot of this camera instead of a local file.
+        url (str | None): (optional) Upload the response of this URL instead of a local file.
+        media_content_id (str | None): (optional) Upload this media source item instead of a local file.
+        async_drive_client (AsyncDriveClient | None): (optional) Uploads local files on the event loop
+            instead of in an executor thread.
+        job_scheduler (DriveJobScheduler | None): (optional) Runs the blocking Drive work instead of the shared executor.
+
+    Returns:
+        dict: The service response, the Drive response with the requested fields and the 'upload_strategy'.
+    """
+    
+    try:
+
+        if not local_file_path:
+            # Upload from the source directly, without a temporary file
+            response = await async_upload_media_stream(
+                hass,
+                credentials,
+                camera_entity_id,
+                url,
+                media_content_id,
+                mime_type,
+                remote_file_name,
+                remote_folder_path,
+                append_ymd_path,
+                fields,
+                client_pool=client_pool,
+                upload_strategy=upload_strategy,
+                progress_tracker=progress_tracker,
+                folder_cache=folder_cache,
+                job_scheduler=job_scheduler,
             )
+            remote_file_name = response["name"]
+
         else:
-            _LOGGER.info("No Drive files older than %d days matching '%s' found.", days_ago, pattern)
+            # If no remote file name is provided, use the local file name as the remote file name
+            if not remote_file_name:
+                remote_file_name = get_default_remote_file_name(local_file_path)
+
+        if local_file_path and async_drive_client is not None:
+            response = await async_native_upload_media_file(
+                hass,
+                async_drive_client,
+                local_file_path,
+                fields,
+                mime_type,
+                remote_file_name,
+                remote_folder_path,
+                append_ymd_path,
+                upload_strategy=upload_strategy,
+                progress_tracker=progress_tracker,
+                folder_cache=folder_cache,
+                skip_if_identical=skip_if_identical,
+                file_hash_cache=file_hash_cache,
+                job_scheduler=job_scheduler,
+            )
+
+        elif local_file_path:
+            # Offload the blocking call to the executor
+            response = await async_run_drive_job(
+                hass,
+                job_scheduler,
+                JOB_CLASS_TRANSFER,
+                upload_media_file, 
+                hass, 
+                credentials, 
+                local_file_path,
+                fields, 
+                mime_type, 
+                remote_file_name, 
+                remote_folder_path,
+                append_ymd_path,
+                client_pool=client_pool,
+                upload_strategy=upload_strategy,
+                progress_tracker=progress_tracker,
+                folder_cache=folder_cache,
+                skip_if_identical=skip_if_identical,
+                file_hash_cache=file_hash_cache,
+                )
+
+        _LOGGER.info("File uploaded successfully (%s upload)", response["upload_strategy"])
 
         # Check if the results should be written to a sensor
         if save_to_sensor:
             
-            # Set the state to the number of deleted files
-            state = len(deleted)
-
-            # Set the attributes for the sensor.
-            attributes = {
-                "files": deleted,
-                "friendly_name": sensor_name,
-                "icon": "mdi:google-drive",
-            }
+            # Set the state to the name of the remote file
+            state = remote_file_name
 
             # Create or update the sensor with the uploaded file information
             await async_create_or_update_sensor(
                 hass, 
                 sensor_name, 
                 state,
-                attributes
+                response
             )
-    
+
+        return response
+
     except HomeAssistantError:
+        # already user-friendly (verify_file_path_exists or get_mime_type_from_path)
         raise  
 
     except Exception as e:
-        _LOGGER.error(
-                    "Error cleaning up Drive files older than %d days matching '%s': %s",
-                    days_ago, pattern, e, exc_info=True
-                )        
-        raise HomeAssistantError(f"Cleaning older files failed: {e}") from e
-#endregion
\ No newline at end of file
+        _LOGGER.error("Error uploading file to Google Drive: %s", e, exc_info=True)
+        raise HomeAssistantError(f"Drive upload failed: {e}") from e
+
+async def async_queue_upload_media_file(hass,
+                                        upload_queue: OfflineUploadQueue,
+                                        local_file_path: str,
+                                        mime_type: str,
+                                        remote_file_name: str,
+                                        remote_folder_path: str,
+                                        append_ymd_path: bool,
+                                        save_to_sensor: bool,
+                                        sensor_name: str,
+                                        fields: str,
+                                        skip_if_identical: bool = False,
+                                        priority: int = 0,
+                                        folder_cache: FolderCache | None = None) -> dict:
+    """
+    Async function to queue the upload of a local file, returning as soon as the request is journaled.
+    The queue uploads it in the background, also after a restart, once Google Drive is reachable.
+
+    Args:
+        hass: The Home Assistant instance used to run the asynchronous task.
+        upload_queue (OfflineUploadQueue): The offline upload queue of the config entry.
+        local_file_path (str): The local path to the media file.
+        mime_type (str): The MIME type of the file.
+        remote_file_name (str): The desired name for the file in Google Drive.
+        remote_folder_path (str): (optional) A filepath in Google Drive to upload the file to.
+        append_ymd_path (bool): If True, the file is uploaded in the year/month/day subfolders of the day it was queued.
+        save_to_sensor (bool): Whether to save the uploaded file information to a sensor once uploaded.
+        sensor_name (str): The name of the sensor to save the uploaded file information.
+        fields (str): The fields to include in the response from the Google Drive API.
+        skip_if_identical (bool): (optional) If True, an identical file in the folder is not uploaded again.
+        priority (int): (optional) Queued uploads with a higher priority are uploaded first.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+
+    Returns:
+        dict: The service response, 'queued', the 'queue_id' of the upload and the 'backlog' of queued uploads.
+    """
+
+    if not local_file_path:
+        raise HomeAssistantError(
+            "Only local files can be queued, upload camera snapshots, URLs and media items without 'queued'"
+        )
+
+    await hass.async_add_executor_job(verify_file_path_exists, local_file_path)
+
+    # If no remote file name is provided, use the local file name as the remote file name
+    if not remote_file_name:
+        remote_file_name = get_default_remote_file_name(local_file_path)
+
+    # Remember the path, so the folders of the next day can be created ahead of time
+    if append_ymd_path and folder_cache is not None:
+        folder_cache.remember_daily_root((remote_folder_path or "").strip("/"))
+
+    # The year/month/day subfolders are the ones of the day the file was queued, not uploaded
+    request = {
+        "local_file_path": local_file_path,
+        "mime_type": mime_type,
+        "remote_file_name": remote_file_name,
+        "remote_folder_path": build_upload_folder_path(remote_folder_path, append_ymd_path) or "",
+        "save_to_sensor": save_to_sensor,
+        "sensor_name": sensor_name,
+        "fields": fields,
+        "skip_if_identical": skip_if_identical,
+    }
+
+    return await upload_queue.async_enqueue(request, priority)
+
+#endregion
+
+#region Upload multiple media files
+def collect_local_file_paths(local_file_paths: list[str], local_file_pattern: str = None) -> list[str]:
+    """Combine the explicit local file paths with the files matching a glob pattern.
+
+    Args:
+        local_file_paths (list[str]): Paths of the local files.
+        local_file_pattern (str): (optional) A glob pattern (e.g. /media/snapshots/*.jpg), '**' matches subfolders.
+
+    Returns:
+        list[str]: The unique paths, in the given order followed by the sorted pattern matches.
+    """
+    paths = list(local_file_paths or [])
+
+    # Only add regular files matching the pattern, directories are skipped
+    if local_file_pattern:
+        paths.extend(
+            path for path in sorted(glob.glob(local_file_pattern, recursive=True))
+            if os.path.isfile(path)
+        )
+
+    # Remove duplicates while keeping the order
+    return list(dict.fromkeys(paths))
+
+def upload_media_files(hass,
+                       credentials,
+                       local_file_paths: list[str],
+                       fields: str,
+                       local_file_pattern: str = None,
+                       remote_folder_path: str = None,
+                       append_ymd_path: bool = False,
+                       max_parallel_uploads: int = UPLOAD_DEFAULT_PARALLEL_UPLOADS,
+                       client_pool: DriveClientPool | None = None,
+                       upload_strategy: UploadStrategy | None = None,
+                       progress_tracker: UploadProgressTracker | None = None,
+                       folder_cache: FolderCache | None = None,
+                       skip_if_identical: bool = False,
+                       file_hash_cache: FileHashCache | None = None) -> list[dict]:
+    """Uploads multiple local files to the same Drive folder in parallel.
+
+    The remote folder is resolved once for all files. A failing upload does not stop the others.
+
+    Args:
+        hass: The Home Assistant instance used to store the folder ID cache.
+        credentials: The credentials object to access Google Drive.
+        local_file_paths (list[str]): Paths of the local files to upload.
+        fields (str): The fields to include in the response from the Google Drive API for each file.
+        local_file_pattern (str): (optional) A glob pattern selecting additional local files to upload.
+        remote_folder_path (str): (optional) A filepath in Google Drive to upload the files to.
+        append_ymd_path (bool): If True, the files will be uploaded in a subfolder structure for year/month/day.
+        max_parallel_uploads (int): The maximum number of uploads running at the same time.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        upload_strategy (UploadStrategy | None): (optional) The upload strategy of the config entry.
+        progress_tracker (UploadProgressTracker | None): (optional) Receives the progress of resumable uploads.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+        skip_if_identical (bool): (optional) If True, identical files in the folder are returned instead of uploading.
+        file_hash_cache (FileHashCache | None): (optional) Caches the checksums of local files.
+
+    Returns:
+        list[dict]: Per local file (in order) the 'local_file_path', a 'status' of 'uploaded' or 'failed'
+        and the Drive 'file' response or the 'error'.
+    """
+    paths = collect_local_file_paths(local_file_paths, local_file_pattern)
+
+    if not paths:
+        raise HomeAssistantError(
+            "No local files to upload. Please check the file paths or the pattern and try again."
+        )
+
+    # Determine the folder path once, so all files end up in the same (year/month/day) folder
+    folder_path = build_upload_folder_path(remote_folder_path, append_ymd_path)
+
+    # Remember the path, so the folders of the next day can be created ahead of time
+    if append_ymd_path and folder_cache is not None:
+        folder_cache.remember_daily_root((remote_folder_path or "").strip("/"))
+
+    # Resolve the folder before starting the uploads, the uploads then find it in the cache
+    if folder_path:
+        extract_folder_id_from_path(hass, credentials, folder_path, client_pool, folder_cache)
+
+    with get_job_executor(max_parallel_uploads, "google_drive_upload") as executor:
+        futures = [
+            executor.submit(
+                upload_file_to_path,
+                hass,
+                credentials,
+                path,
+                fields,
+                None,
+                get_default_remote_file_name(path),
+                folder_path,
+                client_pool,
+                upload_strategy,
+                progress_tracker,
+                folder_cache,
+                skip_if_identical,
+                file_hash_cache,
+            )
+            for path in paths
+        ]
+
+    results = []
+    for path, future in zip(paths, futures):
+        try:
+            results.append({"local_file_path": path, "status": "uploaded", "file": future.result()})
+        except Exception as e:
+            results.append({"local_file_path": path, "status": "failed", "error": str(e)})
+
+    return results
+
+async def async_upload_media_files(hass,
+                                   credentials,
+                                   local_file_paths: list[str],
+                                   local_file_pattern: str,
+                                   remote_folder_path: str,
+                                   append_ymd_path: bool,
+                                   max_parallel_uploads: int,
+                                   save_to_sensor: bool,
+                                   sensor_name: str,
+                                   fields: str,
+                                   client_pool: DriveClientPool | None = None,
+                                   upload_strategy: UploadStrategy | None = None,
+                                   progress_tracker: UploadProgressTracker | None = None,
+                                   folder_cache: FolderCache | None = None,
+                                   skip_if_identical: bool = False,
+                                   file_hash_cache: FileHashCache | None = None,
+                                   job_scheduler: DriveJobScheduler | None = None) -> dict:
+    """
+    Async function to upload multiple local files to Google Drive in parallel and log results.
+
+    Args:
+        hass: The Home Assistant instance used to run the asynchronous task.
+        credentials: The credentials object to access Google Drive.
+        local_file_paths (list[str]): Paths of the local files to upload.
+        local_file_pattern (str): (optional) A glob pattern selecting additional local files to upload.
+        remote_folder_path (str): (optional) A filepath in Google Drive to upload the files to.
+        append_ymd_path (bool): If True, the files will be uploaded in a subfolder structure for year/month/day.
+        max_parallel_uploads (int): The maximum number of uploads running at the same time.
+        save_to_sensor (bool): Whether to save the per-file results to a sensor.
+        sensor_name (str): The name of the sensor to save the results to.
+        fields (str): The fields to include in the response from the Google Drive API for each file.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        upload_strategy (UploadStrategy | None): (optional) The upload strategy of the config entry.
+        progress_tracker (UploadProgressTracker | None): (optional) Receives the progress of resumable uploads.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+        skip_if_identical (bool): (optional) If True, identical files in the folder are returned instead of uploading.
+        file_hash_cache (FileHashCache | None): (optional) Caches the checksums of local files.
+        job_scheduler (DriveJobScheduler | None): (optional) Runs the blocking Drive work instead of the shared executor.
+
+    Returns:
+        dict: The service response, the per-file results in 'files' and the number of 'failed' uploads.
+    """
+
+    try:
+        # Offload the blocking uploads to the executor
+        results = await async_run_drive_job(
+            hass,
+            job_scheduler,
+            JOB_CLASS_BULK,
+            upload_media_files,
+            hass,
+            credentials,
+            local_file_paths,
+            fields,
+            local_file_pattern,
+            remote_folder_path,
+            append_ymd_path,
+            max_parallel_uploads,
+            client_pool=client_pool,
+            upload_strategy=upload_strategy,
+            progress_tracker=progress_tracker,
+            folder_cache=folder_cache,
+            skip_if_identical=skip_if_identical,
+            file_hash_cache=file_hash_cache,
+            )
+
+        failed = [result for result in results if result["status"] == "failed"]
+        _LOGGER.info("Uploaded %d of %d file(s)", len(results) - len(failed), len(results))
+
+        if failed:
+            _LOGGER.error(
+                "Failed to upload %d file(s), first error for '%s': %s",
+                len(failed), failed[0]["local_file_path"], failed[0]["error"]
+            )
+
+        # Check if the results should be written to a sensor
+        if save_to_sensor:
+
+            # Set the state to the number of uploaded files
+            state = len(results) - len(failed)
+
+            # Set the attributes for the sensor.
+            attributes = {
+                "files": results,
+                "failed": len(failed),
+                "friendly_name": sensor_name,
+                "icon": "mdi:google-drive",
+            }
+
+            await async_create_or_update_sensor(
+                hass,
+                sensor_name,
+                state,
+                attributes
+            )
+
+        return {"files": results, "failed": len(failed)}
+
+    except HomeAssistantError:
+        raise
+
+    except Exception as e:
+        _LOGGER.error("Error uploading files to Google Drive: %s", e, exc_info=True)
+        raise HomeAssistantError(f"Drive upload failed: {e}") from e
+#endregion
+
+#region Upload archive
+def get_archive_member_names(local_file_paths: list[str]) -> list[str]:
+    """Return the names of local files in an archive, their paths relative to the deepest common folder."""
+    absolute_paths = [os.path.abspath(path) for path in local_file_paths]
+    common_folder = os.path.commonpath([os.path.dirname(path) for path in absolute_paths])
+    return [os.path.relpath(path, common_folder) for path in absolute_paths]
+
+def write_archive(pipe: BoundedPipe,
+                  local_file_paths: list[str],
+                  member_names: list[str],
+                  compression: str) -> tuple[list[dict], list[str]]:
+    """Write a tar archive of local files to a pipe, run in its own thread while the pipe is uploaded.
+
+    Args:
+        pipe (BoundedPipe): The pipe the archive is written to, it is closed (or failed) at the end.
+        local_file_paths (list[str]): The local files to archive.
+        member_names (list[str]): The name of every file in the archive.
+        compression (str): 'none', 'gzip' or 'zstd'.
+
+    Returns:
+        tuple[list[dict], list[str]]: The index of the archived files, and the paths of files that no longer existed.
+    """
+    index = []
+    skipped = []
+
+    try:
+        writer = pipe
+        if compression == "zstd":
+            writer = zstandard.ZstdCompressor().stream_writer(pipe, closefd=False)
+
+        # Stream mode writes the archive sequentially, without seeking back in the output
+        with tarfile.open(fileobj=writer, mode="w|gz" if compression == "gzip" else "w|", dereference=True) as tar:
+            for local_file_path, member_name in zip(local_file_paths, member_names):
+                # Snapshots may be removed between listing and archiving them
+                try:
+                    tarinfo = tar.gettarinfo(local_file_path, arcname=member_name)
+                    file = open(local_file_path, "rb")
+                except FileNotFoundError:
+                    _LOGGER.warning("Skipped archiving '%s', the file no longer exists", local_file_path)
+                    skipped.append(local_file_path)
+                    continue
+
+                with file:
+                    tar.addfile(tarinfo, file)
+
+                # The content ends the archive so far, padded to whole blocks
+                index.append({
+                    "name": member_name,
+                    "size": tarinfo.size,
+                    "modified": datetime.fromtimestamp(tarinfo.mtime, timezone.utc).isoformat(),
+                    "offset": tar.offset - -(-tarinfo.size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE,
+                })
+
+        if writer is not pipe:
+            writer.close()
+
+    except StreamClosedError:
+        # The upload failed and stopped reading, it reports the error
+        return index, skipped
+
+    except BaseException as e:
+        pipe.fail(e)
+        raise
+
+    pipe.close()
+    return index, skipped
+
+def upload_archive(hass,
+                   credentials,
+                   local_file_paths: list[str],
+                   local_file_pattern: str,
+                   remote_file_name: str,
+                   remote_folder_path: str,
+                   append_ymd_path: bool,
+                   compression: str,
+                   fields: str,
+                   client_pool: DriveClientPool | None = None,
+                   upload_strategy: UploadStrategy | None = None,
+                   progress_tracker: UploadProgressTracker | None = None,
+                   folder_cache: FolderCache | None = None) -> dict:
+    """Upload local files as a single tar archive, streamed into the upload while it is written.
+
+    Uploading many small files one by one is dominated by the requests per file. The archive is
+    written by a separate thread into a bounded pipe that the upload reads from, so it is never
+    stored locally and only a small buffer is held in memory.
+
+    Args:
+        hass: The Home Assistant instance used to store the fallback folder ID cache.
+        credentials: The credentials object to access Google Drive.
+        local_file_paths (list[str]): Paths of the local files to archive.
+        local_file_pattern (str): A glob pattern of (more) local files to archive.
+        remote_file_name (str): The name of the archive in Google Drive, generated from the time if empty.
+        remote_folder_path (str): (optional) A filepath in Google Drive to upload the archive to.
+        append_ymd_path (bool): If True, the archive is uploaded in a subfolder structure for year/month/day.
+        compression (str): 'none', 'gzip' or 'zstd'.
+        fields (str): The fields to include in the response from the Google Drive API.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        upload_strategy (UploadStrategy | None): (optional) The upload strategy of the config entry.
+        progress_tracker (UploadProgressTracker | None): (optional) Receives the progress of resumable uploads.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+
+    Returns:
+        dict: The response from the Google Drive API with the 'upload_strategy', the index of the
+        archived 'files' and the local files that were 'skipped' because they no longer existed.
+    """
+    upload_strategy = upload_strategy or UploadStrategy()
+
+    local_file_paths = [path for path in collect_local_file_paths(local_file_paths, local_file_pattern) if os.path.isfile(path)]
+    if not local_file_paths:
+        raise HomeAssistantError("No local files found to archive")
+
+    mime_type, extension = ARCHIVE_FORMATS[compression]
+    if not remote_file_name:
+        remote_file_name = f"archive_{datetime.now():%Y%m%d_%H%M%S}{extension}"
+
+    # Remember the path, so the folders of the next day can be created ahead of time
+    if append_ymd_path and folder_cache is not None:
+        folder_cache.remember_daily_root((remote_folder_path or "").strip("/"))
+
+    pipe = BoundedPipe()
+
+    with get_job_executor(1, "google_drive_archive") as executor:
+        archived = executor.submit(
+            write_archive, pipe, local_file_paths, get_archive_member_names(local_file_paths), compression
+        )
+
+        try:
+            head = read_stream_head(pipe, upload_strategy)
+
+            response = upload_to_folder_path(
+                hass,
+                credentials,
+                build_upload_folder_path(remote_folder_path, append_ymd_path),
+                lambda folder_id: upload_stream_to_folder(
+                    credentials,
+                    pipe,
+                    head,
+                    fields,
+                    mime_type,
+                    remote_file_name,
+                    folder_id,
+                    client_pool,
+                    upload_strategy,
+                    progress_tracker,
+                ),
+                client_pool,
+                folder_cache,
+            )
+        except BaseException:
+            # Stop the archive thread, it would wait for the upload to read on
+            pipe.cancel()
+            raise
+
+        index, skipped = archived.result()
+
+    return {**response, "files": index, "skipped": skipped}
+
+async def async_upload_archive(hass,
+                               credentials,
+                               local_file_paths: list[str],
+                               local_file_pattern: str,
+                               remote_file_name: str,
+                               remote_folder_path: str,
+                               append_ymd_path: bool,
+                               compression: str,
+                               save_to_sensor: bool,
+                               sensor_name: str,
+                               fields: str,
+                               client_pool: DriveClientPool | None = None,
+                               upload_strategy: UploadStrategy | None = None,
+                               progress_tracker: UploadProgressTracker | None = None,
+                               folder_cache: FolderCache | None = None,
+                               job_scheduler: DriveJobScheduler | None = None) -> dict:
+    """Async wrapper to upload local files as one archive and optionally save the result to a sensor.
+
+    See upload_archive for the arguments, `save_to_sensor` and `sensor_name` select the sensor.
+
+    Returns:
+        dict: The service response, the Drive response with the index of the archived 'files'.
+    """
+    try:
+        response = await async_run_drive_job(
+            hass,
+            job_scheduler,
+            JOB_CLASS_BULK,
+            upload_archive,
+            hass,
+            credentials,
+            local_file_paths,
+            local_file_pattern,
+            remote_file_name,
+            remote_folder_path,
+            append_ymd_path,
+            compression,
+            fields,
+            client_pool=client_pool,
+            upload_strategy=upload_strategy,
+            progress_tracker=progress_tracker,
+            folder_cache=folder_cache,
+        )
+
+        _LOGGER.info(
+            "Uploaded archive of %d file(s) (%s upload)", len(response["files"]), response["upload_strategy"]
+        )
+
+        if save_to_sensor:
+            # The index of a large archive is written to a file
+            collector = SensorResultCollector(get_sensor_results_path(hass, sensor_name))
+            results_attributes = await hass.async_add_executor_job(
+                collector.collect, response["files"], get_sensor_results_digest(hass, sensor_name)
+            )
+
+            attributes = {
+                **{key: value for key, value in response.items() if key != "files"},
+                **results_attributes,
+                "friendly_name": sensor_name,
+                "icon": "mdi:archive-arrow-up",
+            }
+
+            # Set the state to the name of the archive
+            await async_create_or_update_sensor(hass, sensor_name, response["name"], attributes)
+
+        return response
+
+    except HomeAssistantError:
+        raise
+
+    except Exception as e:
+        _LOGGER.error("Error uploading archive to Google Drive: %s", e, exc_info=True)
+        raise HomeAssistantError(f"Drive archive upload failed: {e}") from e
+#endregion
+
+#region Prepare upload folders
+def prewarm_folder_cache(credentials,
+                         client_pool: DriveClientPool | None = None,
+                         folder_cache: FolderCache | None = None) -> int:
+    """Resolve the paths of all folders in My Drive with a single listing and cache them.
+
+    The most recently created folders are cached last, so they are kept when the Drive holds
+    more folders than fit in the cache. Of duplicate folders the oldest one is cached.
+
+    Args:
+        credentials: The credentials object to access Google Drive.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+
+    Returns:
+        int: The number of cached folder paths.
+    """
+    drive = get_drive_service(credentials, client_pool)
+    root_id = get_root_folder_id(drive, folder_cache)
+
+    folders = list_all_files(
+        drive.files(),
+        f"mimeType = '{FOLDER_MIME_TYPE}' and trashed = false",
+        "id,name,parents",
+        order_by="createdTime",
+    )
+
+    # Index the folders by parent, remembering the creation order
+    children: dict[str, list[tuple[int, dict]]] = {}
+    for index, folder in enumerate(folders):
+        for parent in folder.get("parents", []):
+            children.setdefault(parent, []).append((index, folder))
+
+    # Build the paths from the root folder down, folders outside My Drive are skipped
+    paths: dict[str, tuple[int, str]] = {}
+    pending = deque([(root_id, "")])
+    while pending:
+        parent_id, parent_path = pending.popleft()
+        for index, folder in children.get(parent_id, []):
+            path = f"{parent_path}/{folder['name']}" if parent_path else folder["name"]
+            if path in paths:
+                continue
+            paths[path] = (index, folder["id"])
+            pending.append((folder["id"], path))
+
+    folder_cache.set_many({
+        path: folder_id for path, (_, folder_id) in sorted(paths.items(), key=lambda item: item[1][0])
+    })
+    return len(paths)
+
+async def async_prewarm_folder_cache(hass,
+                                     credentials,
+                                     client_pool: DriveClientPool | None = None,
+                                     folder_cache: FolderCache | None = None,
+                                     job_scheduler: DriveJobScheduler | None = None) -> None:
+    """Async wrapper to warm up the folder cache, failures are logged since it only speeds up uploads."""
+    try:
+        count = await async_run_drive_job(
+            hass,
+            job_scheduler,
+            JOB_CLASS_BULK,
+            prewarm_folder_cache,
+            credentials,
+            client_pool=client_pool,
+            folder_cache=folder_cache,
+        )
+        _LOGGER.info("Cached the IDs of %d Drive folder(s)", count)
+
+    except Exception as e:
+        _LOGGER.warning("Warming up the Drive folder cache failed: %s", e)
+
+def precreate_daily_folders(hass,
+                            credentials,
+                            client_pool: DriveClientPool | None = None,
+                            folder_cache: FolderCache | None = None) -> None:
+    """Create the year/month/day folders of tomorrow for the paths that recently received uploads in them.
+
+    Args:
+        hass: The Home Assistant instance used to store the fallback folder ID cache.
+        credentials: The credentials object to access Google Drive.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+    """
+    tomorrow = datetime.now() + timedelta(days=1)
+
+    for root in folder_cache.get_daily_roots():
+        folder_path = build_upload_folder_path(root, True, tomorrow)
+        try:
+            extract_folder_id_from_path(hass, credentials, folder_path, client_pool, folder_cache)
+        except Exception as e:
+            # The folder will be created by the first upload instead
+            _LOGGER.warning("Creating Drive folder %s ahead of time failed: %s", folder_path, e)
+
+async def async_precreate_daily_folders(hass,
+                                        credentials,
+                                        client_pool: DriveClientPool | None = None,
+                                        folder_cache: FolderCache | None = None,
+                                        job_scheduler: DriveJobScheduler | None = None) -> None:
+    """Async wrapper to create tomorrow's year/month/day folders in the executor."""
+    await async_run_drive_job(
+        hass,
+        job_scheduler,
+        JOB_CLASS_BULK,
+        precreate_daily_folders,
+        hass,
+        credentials,
+        client_pool=client_pool,
+        folder_cache=folder_cache,
+    )
+#endregion
+
+#region Cleanup Drive files
+def get_http_status(error) -> int | None:
+    """Return the HTTP status of a failed Drive request, None if it failed without a response."""
+    return error.resp.status if isinstance(error, HttpError) else None
+
+def delete_files_batch(credentials,
+                       files: list[dict],
+                       client_pool: DriveClientPool | None = None,
+                       trash: bool = False) -> list[dict]:
+    """Delete a group of files with a single Drive batch HTTP request.
+
+    Failures are collected per file instead of aborting, so one missing or locked file
+    does not stop the rest of the batch from being deleted.
+
+    Args:
+        credentials: Authorized Google credentials.
+        files (list[dict]): The files to delete (at most DELETE_BATCH_SIZE), each containing at least an 'id'.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        trash (bool): (optional) If True, move the files to the trash instead of deleting them permanently.
+
+    Returns:
+        List of the given files, each extended with a 'status' ('deleted', 'trashed' or 'failed'), and on failure
+        an 'error' and the 'http_status' of the failed request (None if it failed without a response).
+    """
+    drive = get_drive_service(credentials, client_pool)
+
+    # Collect the exception of each delete call by file ID, None for success
+    errors = {}
+
+    def on_delete_response(request_id, response, exception):
+        errors[request_id] = exception
+
+    # Build the files resource once, creating it is expensive compared to adding a request
+    files_resource = drive.files()
+    batch = drive.new_batch_http_request(callback=on_delete_response)
+    for file in files:
+        if trash:
+            request = files_resource.update(fileId=file["id"], body={"trashed": True}, fields="id")
+        else:
+            request = files_resource.delete(fileId=file["id"])
+        batch.add(request, request_id=file["id"])
+
+    try:
+        batch.execute()
+    except Exception as e:
+        # The batch request itself failed, so none of the files were deleted
+        _LOGGER.warning("Batch deleting %d Drive file(s) failed: %s", len(files), e)
+        errors = {file["id"]: e for file in files}
+
+    results = []
+    for file in files:
+        error = errors.get(file["id"], "No response received for delete request")
+        if error:
+            results.append({**file, "status": "failed", "error": str(error), "http_status": get_http_status(error)})
+        else:
+            results.append({**file, "status": "trashed" if trash else "deleted"})
+
+    return results
+
+def build_cleanup_query(pattern: str, days_ago: int) -> str:
+    """Build the Drive query for files matching `pattern` that were created more than `days_ago` days ago."""
+    # Compute RFC3339 timestamp threshold
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days_ago)).isoformat()
+
+    # Build query: name contains pattern from user, createdTime older than cutoff, not trashed
+    query = [
+            f"({pattern})",
+            f"createdTime < '{cutoff}'",
+            "trashed = false"
+    ]
+
+    # Remove empty parts from query and join with " and " to create a valid query string
+    return " and ".join([part for part in query if part])
+
+def list_file_pages(
+    credentials,
+    query: str,
+    fields: str,
+    pages: queue.Queue,
+    stop: threading.Event,
+    client_pool: DriveClientPool | None = None) -> None:
+    """Producer that lists all files matching `query` and puts each page of files in `pages`.
+
+    The queue is bounded, so at most one page is prefetched while the consumer works on the current one.
+    The end of the listing is signalled with LIST_PAGES_DONE, a failure by putting the exception itself.
+
+    Args:
+        credentials: Authorized Google credentials.
+        query (str): The Drive query to list the files for.
+        fields (str): The file fields to include in the response from the Google Drive API.
+        pages (queue.Queue): Bounded queue receiving the lists of files.
+        stop (threading.Event): Set by the consumer to stop listing early.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+    """
+
+    def put(item) -> bool:
+        # Wait for room in the queue, giving up when the consumer has stopped
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        files_resource = get_drive_service(credentials, client_pool).files()
+        page_token = None
+
+        while True:
+            response = files_resource.list(
+                q=query,
+                fields=f"nextPageToken, files({fields})",
+                pageToken=page_token,
+                pageSize=1000,
+            ).execute()
+
+            if not put(response.get("files", [])):
+                return
+
+            # check if there is a next page token, if not, stop listing
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+
+        put(LIST_PAGES_DONE)
+
+    except Exception as e:
+        put(e)
+
+def iter_cleanup_older_files_by_pattern(
+    credentials,
+    pattern: str,
+    days_ago: int,
+    preview: bool,
+    fields: str,
+    client_pool: DriveClientPool | None = None,
+    progress_callback: Callable[[dict], None] | None = None) -> Iterator[dict]:
+    """Delete files in Drive whose name matches `pattern` and are older than `days_ago`, yielding each result.
+
+    Listing and deleting are pipelined: a producer thread prefetches the next page of matches while
+    the current page is deleted in batches of up to DELETE_BATCH_SIZE files, with at most
+    DELETE_MAX_CONCURRENT_BATCHES batches in flight. Only a few pages and batches are held at any time,
+    so memory stays bounded regardless of the number of matches.
+
+    Args:
+        credentials: Authorized Google credentials.
+        pattern (str): Substring to match in file names (uses Drive `name contains` query).
+        days_ago (int): Maximum file age in days; any file created before now-days_ago will be deleted.
+        preview (bool): If True, only report the files that would be deleted without actually deleting them.
+        fields (str): The fields to include in the response from the Google Drive API.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        progress_callback (Callable | None): (optional) Called with the progress (pages scanned, files deleted,
+            failed, elapsed seconds) at most every CLEANUP_PROGRESS_INTERVAL seconds and once when finished.
+
+    Yields:
+        The matched files with the requested fields and a 'status' of 'deleted', 'failed' or 'preview'.
+        Failed files also contain the 'error' that was returned for them.
+    """
+    query = build_cleanup_query(pattern, days_ago)
+
+    # Generate the full fields filter, ensuring 'id' is always included
+    fields = generate_full_fields_filter(fields, mandatory_fields=["id", "name"])
+
+    started = time.monotonic()
+    last_report = started
+    progress = {"pages_scanned": 0, "files_deleted": 0, "files_failed": 0, "files_preview": 0}
+
+    def report(finished: bool) -> None:
+        if progress_callback:
+            progress_callback({
+                **progress,
+                "elapsed_seconds": round(time.monotonic() - started, 1),
+                "finished": finished,
+            })
+
+    pages = queue.Queue(maxsize=1)
+    stop = threading.Event()
+    producer = get_job_executor(1, "google_drive_list")
+    producer.submit(list_file_pages, credentials, query, fields, pages, stop, client_pool)
+
+    def listed_files() -> Iterator[dict]:
+        nonlocal last_report
+        while True:
+            files = pages.get()
+            if files is LIST_PAGES_DONE:
+                return
+            if isinstance(files, Exception):
+                raise files
+
+            progress["pages_scanned"] += 1
+
+            # Report the progress during long runs
+            if time.monotonic() - last_report >= CLEANUP_PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                report(finished=False)
+
+            yield from files
+
+    try:
+        # Check if the preview parameter is set, in that case only report the files
+        if preview:
+            results = ({**file, "status": "preview"} for file in listed_files())
+
+        # Otherwise delete the files in batches while the next pages are listed
+        else:
+            results = iter_delete_files(credentials, listed_files(), client_pool)
+
+        for result in results:
+            progress[f"files_{result['status']}"] += 1
+            yield result
+
+        report(finished=True)
+
+    finally:
+        # Stop the producer when finished, failed or when the consumer stopped iterating,
+        # without waiting for a listing request that is still running
+        stop.set()
+        producer.shutdown(wait=False)
+
+def cleanup_older_files_by_pattern(
+    credentials,
+    pattern: str,
+    days_ago: int,
+    preview: bool,
+    fields: str,
+    client_pool: DriveClientPool | None = None) -> list[dict]:
+    """Delete files in Drive whose name matches `pattern` and are older than `days_ago`.
+
+    Collects all results of iter_cleanup_older_files_by_pattern in a list, see that function for details.
+
+    Returns:
+        List of the matched files with the requested fields and a 'status' of 'deleted', 'failed' or 'preview'.
+    """
+    return list(iter_cleanup_older_files_by_pattern(credentials, pattern, days_ago, preview, fields, client_pool))
+
+def summarize_cleanup_results(results: Iterable[dict],
+                              collector: SensorResultCollector | None = None,
+                              previous_digest: str | None = None,
+                              keep_files: bool = False) -> dict:
+    """Consume cleanup results, keeping only counts (and what fits in the sensor) to bound memory.
+
+    Args:
+        results (Iterable[dict]): The results of iter_cleanup_older_files_by_pattern.
+        collector (SensorResultCollector | None): (optional) Collects the results for the sensor.
+        previous_digest (str | None): (optional) The digest of the results the sensor shows now.
+        keep_files (bool): (optional) Whether to return all results in 'files'.
+
+    Returns:
+        dict: The number of 'processed' (deleted or previewed) and 'failed' files, the 'first_error'
+        that occurred, if any, with a collector the sensor attributes of the results in 'sensor'
+        and with keep_files all results in 'files'.
+    """
+    summary = CleanupSummary(collector, keep_files)
+
+    try:
+        summary.add_all(results)
+    except Exception:
+        summary.discard()
+        raise
+
+    return summary.close(previous_digest)
+
+class CleanupSummary:
+    """Counts cleanup results as they come in, see summarize_cleanup_results.
+
+    With a collector the methods are blocking, run them in the executor.
+    """
+
+    def __init__(self, collector: SensorResultCollector | None = None, keep_files: bool = False) -> None:
+        self.processed = 0
+        self.failed = 0
+        self.first_error = None
+        self._collector = collector
+        self._files = [] if keep_files else None
+
+    def add_all(self, results: Iterable[dict]) -> None:
+        """Count (and collect) results."""
+        for result in results:
+            if result["status"] == "failed":
+                self.failed += 1
+                self.first_error = self.first_error or result["error"]
+            else:
+                self.processed += 1
+            if self._collector is not None:
+                self._collector.add(result)
+            if self._files is not None:
+                self._files.append(result)
+
+    def discard(self) -> None:
+        """Drop the collected results after a failure."""
+        if self._collector is not None:
+            self._collector.discard()
+
+    def close(self, previous_digest: str | None = None) -> dict:
+        """Return the summary, see summarize_cleanup_results."""
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "first_error": self.first_error,
+            "sensor": self._collector.close(previous_digest) if self._collector is not None else None,
+            "files": self._files,
+        }
+
+async def async_cleanup_older_files_by_pattern(
+        hass, 
+        credentials, 
+        pattern: str, 
+        days_ago: int, 
+        preview: bool, 
+        save_to_sensor: bool, 
+        sensor_name: str, 
+        fields: str,
+        client_pool: DriveClientPool | None = None,
+        return_files: bool = False,
+        async_drive_client: AsyncDriveClient | None = None,
+        job_scheduler: DriveJobScheduler | None = None) -> dict:
+    """Async wrapper to delete old Drive files and log the outcome.
+
+    Progress is fired as EVENT_CLEANUP_PROGRESS events on the Home Assistant event bus while the cleanup runs.
+    Returns the service response with the number of 'processed' and 'failed' files, the 'first_error'
+    and, when `return_files` is set, all processed files in 'files'. With `async_drive_client` the
+    cleanup runs on the event loop instead of in an executor thread.
+
+    Usage: await async_cleanup_older_files_by_pattern(hass, creds, "camera", 30)
+    """
+
+    def report_progress(progress: dict) -> None:
+        # Called from the executor thread, EventBus.fire is thread-safe
+        hass.bus.fire(EVENT_CLEANUP_PROGRESS, {"pattern": pattern, "preview": preview, **progress})
+
+    def async_report_progress(progress: dict) -> None:
+        hass.bus.async_fire(EVENT_CLEANUP_PROGRESS, {"pattern": pattern, "preview": preview, **progress})
+
+    try:
+        if async_drive_client is not None:
+            summary = await async_native_summarize_cleanup(
+                hass,
+                async_drive_client,
+                pattern,
+                days_ago,
+                preview,
+                fields,
+                SensorResultCollector(get_sensor_results_path(hass, sensor_name)) if save_to_sensor else None,
+                get_sensor_results_digest(hass, sensor_name) if save_to_sensor else None,
+                return_files,
+                async_report_progress,
+            )
+
+        else:
+            # Offload consuming the (blocking) cleanup to the executor
+            summary = await async_run_drive_job(
+                hass,
+                job_scheduler,
+                JOB_CLASS_BULK,
+                summarize_cleanup_results,
+                iter_cleanup_older_files_by_pattern(
+                    credentials, pattern, days_ago, preview, fields, client_pool, report_progress
+                ),
+                SensorResultCollector(get_sensor_results_path(hass, sensor_name)) if save_to_sensor else None,
+                get_sensor_results_digest(hass, sensor_name) if save_to_sensor else None,
+                return_files,
+            )
+
+        if summary["processed"]:
+            _LOGGER.warning(
+                "%s %d Drive file(s) older than %d days matching '%s'",
+                "Found (preview)" if preview else "Deleted",
+                summary["processed"], days_ago, pattern
+            )
+        else:
+            _LOGGER.info("No Drive files older than %d days matching '%s' deleted.", days_ago, pattern)
+
+        if summary["failed"]:
+            _LOGGER.error(
+                "Failed to delete %d Drive file(s) matching '%s', first error: %s",
+                summary["failed"], pattern, summary["first_error"]
+            )
+
+        # Check if the results should be written to a sensor
+        if save_to_sensor:
+            
+            # Set the state to the number of deleted (or previewed) files
+            state = summary["processed"]
+
+            # Set the attributes for the sensor, large results are written to a file
+            attributes = {
+                **summary["sensor"],
+                "failed": summary["failed"],
+                "friendly_name": sensor_name,
+                "icon": "mdi:google-drive",
+            }
+
+            # Create or update the sensor with the uploaded file information
+            await async_create_or_update_sensor(
+                hass, 
+                sensor_name, 
+                state,
+                attributes
+            )
+
+        response = {
+            "processed": summary["processed"],
+            "failed": summary["failed"],
+            "first_error": summary["first_error"],
+        }
+        if return_files:
+            response["files"] = summary["files"]
+        return response
+    
+    except HomeAssistantError:
+        raise  
+
+    except Exception as e:
+        _LOGGER.error(
+                    "Error cleaning up Drive files older than %d days matching '%s': %s",
+                    days_ago, pattern, e, exc_info=True
+                )        
+        raise HomeAssistantError(f"Cleaning older files failed: {e}") from e
+#endregion
+
+#region Retention policies
+def iter_delete_files(credentials,
+                      files: Iterable[dict],
+                      client_pool: DriveClientPool | None = None,
+                      trash: bool = False) -> Iterator[dict]:
+    """Delete (or trash) files in batches of up to DELETE_BATCH_SIZE, with at most DELETE_MAX_CONCURRENT_BATCHES in flight.
+
+    The files are taken from `files` one batch at a time, so the pages of a listing can be deleted
+    while the next pages are still being listed.
+
+    Yields:
+        The given files with a 'status' of 'deleted', 'trashed' or 'failed', failed files also contain the 'error'.
+    """
+    files = iter(files)
+
+    with get_job_executor(DELETE_MAX_CONCURRENT_BATCHES, "google_drive_delete") as executor:
+        in_flight = set()
+
+        # Wait for a free slot when too many batches are in flight
+        for batch in iter(lambda: list(islice(files, DELETE_BATCH_SIZE)), []):
+            if len(in_flight) >= DELETE_MAX_CONCURRENT_BATCHES:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+
+            in_flight.add(executor.submit(delete_files_batch, credentials, batch, client_pool, trash))
+
+        # Wait for the remaining batches to finish
+        for future in as_completed(in_flight):
+            yield from future.result()
+
+def build_retention_query(query: str, include_folders: bool) -> str:
+    """Build the Drive query listing the candidate files of a retention policy in one pass.
+
+    The folders are listed along with the files when a rule selects the files of a folder, so
+    the subfolders of that folder are known without listing them separately.
+    """
+    files_query = f"mimeType != '{FOLDER_MIME_TYPE}'"
+    if query:
+        files_query = f"{files_query} and ({query})"
+
+    if include_folders:
+        return f"trashed = false and (mimeType = '{FOLDER_MIME_TYPE}' or ({files_query}))"
+    return f"trashed = false and {files_query}"
+
+def apply_retention_policy(hass,
+                           credentials,
+                           rules: list[dict],
+                           query: str,
+                           trash: bool,
+                           preview: bool,
+                           fields: str,
+                           client_pool: DriveClientPool | None = None,
+                           folder_cache: FolderCache | None = None,
+                           collector: SensorResultCollector | None = None,
+                           previous_digest: str | None = None) -> dict:
+    """Apply named retention rules to the Drive files from a single listing, deleting the expired files.
+
+    The files matching `query` (all files if empty) are listed once, a producer thread prefetching
+    the next page while the current one is added to the policy. Each rule then selects its files by
+    `name_pattern` (a glob) and/or `remote_folder_path` (including subfolders) and keeps them as
+    described in RetentionPolicy. The union of the files expired by any rule is deleted (or trashed) in batches.
+
+    Args:
+        hass: The Home Assistant instance.
+        credentials: Authorized Google credentials.
+        rules (list[dict]): The rules of the service call.
+        query (str): (optional) A Drive query narrowing the listed files, e.g. "name contains 'backup'".
+        trash (bool): If True, move the expired files to the trash instead of deleting them permanently.
+        preview (bool): If True, only report the files that would be deleted without actually deleting them.
+        fields (str): The fields of the expired files to include in the response.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+        collector (SensorResultCollector | None): (optional) Collects the deleted files for the sensor.
+        previous_digest (str | None): (optional) The digest of the results the sensor shows now.
+
+    Returns:
+        dict: Per rule in 'rules' the number of 'matched', 'kept' and 'expired' files and the 'expired_size'
+        (with the expired 'files' in preview), the number of 'listed' files, the number of 'processed'
+        (deleted, trashed or previewed) and 'failed' files, the 'first_error' and the 'sensor' attributes.
+    """
+    # Resolve the folders of the rules, a rule of which the folder does not exist has no files
+    retention_rules = []
+    missing_rules = []
+    for rule in rules:
+        folder_id = None
+        if rule.get("remote_folder_path"):
+            folder_id = find_folder_id_from_path(
+                hass, credentials, rule["remote_folder_path"], client_pool, folder_cache
+            )
+            if folder_id is None:
+                _LOGGER.warning(
+                    "Retention rule '%s': folder '%s' does not exist", rule["name"], rule["remote_folder_path"]
+                )
+                missing_rules.append(rule["name"])
+                continue
+        retention_rules.append(RetentionRule.from_config(rule, folder_id))
+
+    policy = RetentionPolicy(retention_rules)
+    list_query = build_retention_query(query, any(rule.folder_id for rule in retention_rules))
+    list_fields = generate_full_fields_filter(
+        fields, mandatory_fields=["id", "name", "mimeType", "parents", "createdTime", "size"]
+    )
+
+    pages = queue.Queue(maxsize=1)
+    stop = threading.Event()
+    producer = get_job_executor(1, "google_drive_list")
+    producer.submit(list_file_pages, credentials, list_query, list_fields, pages, stop, client_pool)
+
+    listed = 0
+    try:
+        while True:
+            files = pages.get()
+            if files is LIST_PAGES_DONE:
+                break
+            if isinstance(files, Exception):
+                raise files
+            listed += len(files)
+            policy.add(files)
+    finally:
+        stop.set()
+        producer.shutdown(wait=False)
+
+    rule_results, expired = policy.evaluate()
+    for name in missing_rules:
+        rule_results[name] = {"matched": 0, "kept": 0, "expired": [], "expired_size": 0}
+
+    # Check if the preview parameter is set, in that case only report the files
+    if preview:
+        results = ({**file, "status": "preview"} for file in expired)
+    else:
+        results = iter_delete_files(credentials, expired, client_pool, trash)
+
+    summary = CleanupSummary(collector)
+    try:
+        summary.add_all(results)
+    except Exception:
+        summary.discard()
+        raise
+
+    return {
+        **summary.close(previous_digest),
+        "listed": listed,
+        "rules": {
+            name: {
+                "matched": result["matched"],
+                "kept": result["kept"],
+                "expired": len(result["expired"]),
+                "expired_size": result["expired_size"],
+                **({"files": result["expired"]} if preview else {}),
+            }
+            for name, result in rule_results.items()
+        },
+    }
+
+async def async_apply_retention_policy(hass,
+                                       credentials,
+                                       rules: list[dict],
+                                       query: str,
+                                       trash: bool,
+                                       preview: bool,
+                                       save_to_sensor: bool,
+                                       sensor_name: str,
+                                       fields: str,
+                                       client_pool: DriveClientPool | None = None,
+                                       folder_cache: FolderCache | None = None,
+                                       job_scheduler: DriveJobScheduler | None = None) -> dict:
+    """Async wrapper to apply retention rules to the Drive files and log the outcome.
+
+    Args:
+        hass: The Home Assistant instance used to run the asynchronous task.
+        credentials: The credentials object to access Google Drive.
+        rules (list[dict]): The named retention rules.
+        query (str): (optional) A Drive query narrowing the listed files.
+        trash (bool): If True, move the expired files to the trash instead of deleting them permanently.
+        preview (bool): If True, only report the files that would be deleted.
+        save_to_sensor (bool): Whether to save the deleted files to a sensor.
+        sensor_name (str): The name of the sensor to save the deleted files to.
+        fields (str): The fields of the expired files to include in the response.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+        job_scheduler (DriveJobScheduler | None): (optional) Runs the blocking Drive work instead of the shared executor.
+
+    Returns:
+        dict: The service response, the per-rule results in 'rules', the number of 'listed', 'processed'
+        (deleted or previewed) and 'failed' files and the 'first_error'.
+    """
+
+    try:
+        # Offload the blocking listing and deletes to the executor
+        summary = await async_run_drive_job(
+            hass,
+            job_scheduler,
+            JOB_CLASS_BULK,
+            apply_retention_policy,
+            hass,
+            credentials,
+            rules,
+            query,
+            trash,
+            preview,
+            fields,
+            client_pool=client_pool,
+            folder_cache=folder_cache,
+            collector=SensorResultCollector(get_sensor_results_path(hass, sensor_name)) if save_to_sensor else None,
+            previous_digest=get_sensor_results_digest(hass, sensor_name) if save_to_sensor else None,
+        )
+
+        for name, result in summary["rules"].items():
+            _LOGGER.info(
+                "Retention rule '%s': %d file(s) matched, %d kept, %d expired",
+                name, result["matched"], result["kept"], result["expired"]
+            )
+
+        if summary["processed"]:
+            _LOGGER.warning(
+                "%s %d expired Drive file(s) of %d retention rule(s)",
+                "Found (preview)" if preview else "Trashed" if trash else "Deleted", summary["processed"], len(rules)
+            )
+
+        if summary["failed"]:
+            _LOGGER.error(
+                "Failed to delete %d expired Drive file(s), first error: %s",
+                summary["failed"], summary["first_error"]
+            )
+
+        # Check if the results should be written to a sensor
+        if save_to_sensor:
+
+            # Set the state to the number of deleted (or previewed) files
+            state = summary["processed"]
+
+            # Set the attributes for the sensor, large results are written to a file
+            attributes = {
+                **summary["sensor"],
+                "failed": summary["failed"],
+                "rules": {
+                    name: {key: value for key, value in result.items() if key != "files"}
+                    for name, result in summary["rules"].items()
+                },
+                "friendly_name": sensor_name,
+                "icon": "mdi:google-drive",
+            }
+
+            await async_create_or_update_sensor(
+                hass,
+                sensor_name,
+                state,
+                attributes
+            )
+
+        return {
+            "preview": preview,
+            "listed": summary["listed"],
+            "processed": summary["processed"],
+            "failed": summary["failed"],
+            "first_error": summary["first_error"],
+            "rules": summary["rules"],
+        }
+
+    except HomeAssistantError:
+        raise
+
+    except Exception as e:
+        _LOGGER.error("Error applying the retention policy: %s", e, exc_info=True)
+        raise HomeAssistantError(f"Applying the retention policy failed: {e}") from e
+#endregion
+
+#region Expire date folders
+def get_date_folder_range(name: str, parent_parts: tuple[int, ...]) -> tuple[tuple[int, ...], date, date] | None:
+    """Return the date parts and the first and last day of a year, month or day folder, by its name.
+
+    Args:
+        name (str): The folder name, like the ones append_ymd_path creates ('2024', '03', '07').
+        parent_parts (tuple[int, ...]): The date parts of the parent folders, () for a year folder.
+
+    Returns:
+        The (year[, month[, day]]) parts and the first and last day the folder holds,
+        or None when the name is not a valid date part.
+    """
+    if not (name.isascii() and name.isdigit()) or len(name) != (4 if not parent_parts else 2):
+        return None
+
+    parts = (*parent_parts, int(name))
+    try:
+        if len(parts) == 1:
+            return parts, date(parts[0], 1, 1), date(parts[0], 12, 31)
+        if len(parts) == 2:
+            first = date(parts[0], parts[1], 1)
+            return parts, first, (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        day = date(*parts)
+        return parts, day, day
+    except ValueError:
+        return None
+
+def find_expired_date_folders(drive, root_id: str, root_path: str, cutoff: date) -> list[dict]:
+    """Find the year, month and day folders below a folder of which every day is before `cutoff`.
+
+    Only the names of the folders are used: a year or month that is entirely expired is returned
+    as a whole, without listing its subfolders. Subfolders are only listed for the years and months
+    that contain the cutoff, so a tree costs a listing per level instead of one per folder.
+
+    Args:
+        drive: The Drive service.
+        root_id (str): The ID of the folder holding the year folders.
+        root_path (str): The path of that folder, used for the paths of the expired folders.
+        cutoff (date): The first day that is kept.
+
+    Returns:
+        list[dict]: The expired folders with their 'id', 'name', 'path' and the 'last_day' they hold.
+    """
+    files_resource = drive.files()
+    expired = []
+    # Parent folder ID → (path, date parts) of the folders of which the subfolders are listed
+    level = {root_id: (root_path, ())}
+
+    while level:
+        next_level = {}
+        parent_ids = list(level)
+
+        for start in range(0, len(parent_ids), SYNC_LIST_PARENTS_PER_QUERY):
+            parents_query = " or ".join(
+                f"'{escape_query_value(parent_id)}' in parents"
+                for parent_id in parent_ids[start:start + SYNC_LIST_PARENTS_PER_QUERY]
+            )
+            folders = list_all_files(
+                files_resource,
+                f"mimeType = '{FOLDER_MIME_TYPE}' and trashed = false and ({parents_query})",
+                "id,name,parents",
+            )
+
+            for folder in folders:
+                parent_id = next((parent for parent in folder.get("parents", []) if parent in level), None)
+                if parent_id is None:
+                    continue
+                parent_path, parent_parts = level[parent_id]
+
+                folder_range = get_date_folder_range(folder["name"], parent_parts)
+                if folder_range is None:
+                    continue
+                parts, first_day, last_day = folder_range
+                path = "/".join(part for part in (parent_path, folder["name"]) if part)
+
+                if last_day < cutoff:
+                    expired.append({
+                        "id": folder["id"],
+                        "name": folder["name"],
+                        "path": path,
+                        "last_day": last_day.isoformat(),
+                    })
+                elif first_day < cutoff and len(parts) < 3:
+                    next_level[folder["id"]] = (path, parts)
+
+        level = next_level
+
+    return sorted(expired, key=lambda folder: folder["path"])
+
+def cleanup_older_date_folders(hass,
+                               credentials,
+                               remote_folder_path: str,
+                               days_ago: int,
+                               trash: bool,
+                               preview: bool,
+                               client_pool: DriveClientPool | None = None,
+                               folder_cache: FolderCache | None = None,
+                               collector: SensorResultCollector | None = None,
+                               previous_digest: str | None = None) -> dict:
+    """Remove the year/month/day folders (see append_ymd_path) below a folder that are older than `days_ago`.
+
+    Whole folders are trashed or deleted with one call each, instead of one call per file in them,
+    in batches like the cleanup of files. The paths of the removed folders (and their subfolders)
+    are removed from the folder cache.
+
+    Args:
+        hass: The Home Assistant instance.
+        credentials: Authorized Google credentials.
+        remote_folder_path (str): The folder holding the year folders, which cannot be the root.
+        days_ago (int): Folders of which every day is more than this many days ago are removed.
+        trash (bool): If True, move the folders to the trash instead of deleting them permanently.
+        preview (bool): If True, only report the folders that would be removed.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+        collector (SensorResultCollector | None): (optional) Collects the removed folders for the sensor.
+        previous_digest (str | None): (optional) The digest of the results the sensor shows now.
+
+    Returns:
+        dict: The number of 'processed' (removed or previewed) and 'failed' folders, the 'first_error',
+        the 'sensor' attributes and all processed folders in 'files'.
+    """
+    if folder_cache is None:
+        folder_cache = get_fallback_folder_cache(hass)
+
+    remote_folder_path = remote_folder_path.strip("/")
+    # Any 4-digit folder in the root would be taken for a year
+    if not remote_folder_path:
+        raise HomeAssistantError("Date folders cannot be removed from the root of Google Drive, set a remote_folder_path")
+
+    root_id = find_folder_id_from_path(hass, credentials, remote_folder_path, client_pool, folder_cache)
+    if root_id is None:
+        raise HomeAssistantError(f"Folder '{remote_folder_path}' does not exist in Google Drive")
+
+    # Like append_ymd_path, the days are those of the local time
+    cutoff = date.today() - timedelta(days=days_ago)
+    drive = get_drive_service(credentials, client_pool)
+    expired = find_expired_date_folders(drive, root_id, remote_folder_path, cutoff)
+
+    # Check if the preview parameter is set, in that case only report the folders
+    if preview:
+        results = ({**folder, "status": "preview"} for folder in expired)
+    else:
+        results = iter_delete_files(credentials, expired, client_pool, trash)
+
+    summary = CleanupSummary(collector, keep_files=True)
+    try:
+        summary.add_all(results)
+    except Exception:
+        summary.discard()
+        raise
+    summary = summary.close(previous_digest)
+
+    # Forget the removed folders, an upload to one of them creates it again
+    for folder in summary["files"]:
+        if folder["status"] in ("deleted", "trashed"):
+            folder_cache.invalidate(folder["path"])
+
+    return summary
+
+async def async_cleanup_older_date_folders(hass,
+                                           credentials,
+                                           remote_folder_path: str,
+                                           days_ago: int,
+                                           trash: bool,
+                                           preview: bool,
+                                           save_to_sensor: bool,
+                                           sensor_name: str,
+                                           client_pool: DriveClientPool | None = None,
+                                           folder_cache: FolderCache | None = None,
+                                           job_scheduler: DriveJobScheduler | None = None) -> dict:
+    """Async wrapper to remove expired year/month/day folders and log the outcome.
+
+    Args:
+        hass: The Home Assistant instance used to run the asynchronous task.
+        credentials: The credentials object to access Google Drive.
+        remote_folder_path (str): The folder holding the year folders, which cannot be the root.
+        days_ago (int): Folders of which every day is more than this many days ago are removed.
+        trash (bool): If True, move the folders to the trash instead of deleting them permanently.
+        preview (bool): If True, only report the folders that would be removed.
+        save_to_sensor (bool): Whether to save the removed folders to a sensor.
+        sensor_name (str): The name of the sensor to save the removed folders to.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+        job_scheduler (DriveJobScheduler | None): (optional) Runs the blocking Drive work instead of the shared executor.
+
+    Returns:
+        dict: The service response, the number of 'processed' and 'failed' folders, the 'first_error'
+        and the processed 'folders'.
+    """
+
+    try:
+        # Offload the blocking listing and deletes to the executor
+        summary = await async_run_drive_job(
+            hass,
+            job_scheduler,
+            JOB_CLASS_BULK,
+            cleanup_older_date_folders,
+            hass,
+            credentials,
+            remote_folder_path,
+            days_ago,
+            trash,
+            preview,
+            client_pool=client_pool,
+            folder_cache=folder_cache,
+            collector=SensorResultCollector(get_sensor_results_path(hass, sensor_name)) if save_to_sensor else None,
+            previous_digest=get_sensor_results_digest(hass, sensor_name) if save_to_sensor else None,
+        )
+
+        if summary["processed"]:
+            _LOGGER.warning(
+                "%s %d date folder(s) older than %d days in '%s'",
+                "Found (preview)" if preview else "Trashed" if trash else "Deleted",
+                summary["processed"], days_ago, remote_folder_path
+            )
+        else:
+            _LOGGER.info("No date folders older than %d days in '%s'", days_ago, remote_folder_path)
+
+        if summary["failed"]:
+            _LOGGER.error(
+                "Failed to remove %d date folder(s) in '%s', first error: %s",
+                summary["failed"], remote_folder_path, summary["first_error"]
+            )
+
+        # Check if the results should be written to a sensor
+        if save_to_sensor:
+
+            # Set the state to the number of removed (or previewed) folders
+            state = summary["processed"]
+
+            # Set the attributes for the sensor, large results are written to a file
+            attributes = {
+                **summary["sensor"],
+                "failed": summary["failed"],
+                "friendly_name": sensor_name,
+                "icon": "mdi:folder-remove",
+            }
+
+            await async_create_or_update_sensor(
+                hass,
+                sensor_name,
+                state,
+                attributes
+            )
+
+        return {
+            "processed": summary["processed"],
+            "failed": summary["failed"],
+            "first_error": summary["first_error"],
+            "folders": summary["files"],
+        }
+
+    except HomeAssistantError:
+        raise
+
+    except Exception as e:
+        _LOGGER.error(
+            "Error removing date folders older than %d days in '%s': %s",
+            days_ago, remote_folder_path, e, exc_info=True
+        )
+        raise HomeAssistantError(f"Cleaning older date folders failed: {e}") from e
+#endregion
+
+#region Merge duplicate folders
+def move_files_batch(drive, files_resource, file_ids: list[str], from_folder_id: str, to_folder_id: str) -> dict:
+    """Move files to another folder in Drive batch HTTP requests of MOVE_BATCH_SIZE files.
+
+    Args:
+        drive: The Drive service.
+        files_resource: The files resource of the Drive service.
+        file_ids (list[str]): The IDs of the files to move.
+        from_folder_id (str): The ID of the folder the files are in.
+        to_folder_id (str): The ID of the folder to move the files to.
+
+    Returns:
+        dict: The error per file ID of the files that could not be moved.
+    """
+    errors = {}
+
+    def on_move_response(request_id, response, exception):
+        if exception:
+            errors[request_id] = str(exception)
+
+    for start in range(0, len(file_ids), MOVE_BATCH_SIZE):
+        batch_ids = file_ids[start:start + MOVE_BATCH_SIZE]
+        batch = drive.new_batch_http_request(callback=on_move_response)
+        for file_id in batch_ids:
+            batch.add(
+                files_resource.update(
+                    fileId=file_id, addParents=to_folder_id, removeParents=from_folder_id, fields="id"
+                ),
+                request_id=file_id,
+            )
+
+        try:
+            batch.execute()
+        except Exception as e:
+            # The batch request itself failed, so none of its files were moved
+            errors.update({file_id: str(e) for file_id in batch_ids})
+
+    return errors
+
+def merge_folder_group(drive, files_resource, path: str, folders: list[dict], preview: bool, results: list[dict]) -> str:
+    """Merge folders with the same name in the same parent into the oldest one.
+
+    The contents of every newer folder are moved into the oldest folder, after which the emptied folder is trashed.
+
+    Args:
+        drive: The Drive service.
+        files_resource: The files resource of the Drive service.
+        path (str): The path of the folders, used in the results.
+        folders (list[dict]): The folders with 'id', sorted from oldest to newest.
+        preview (bool): If True, only report the folders that would be merged.
+        results (list[dict]): Receives a result per merged (or previewed) folder.
+
+    Returns:
+        str: The ID of the folder that is kept.
+    """
+    keeper, duplicates = folders[0], folders[1:]
+
+    for duplicate in duplicates:
+        children = list_all_files(files_resource, f"'{duplicate['id']}' in parents and trashed = false", "id")
+        result = {
+            "path": path,
+            "kept_folder_id": keeper["id"],
+            "merged_folder_id": duplicate["id"],
+            "files": len(children),
+            "status": "preview",
+        }
+
+        if not preview:
+            errors = move_files_batch(drive, files_resource, [child["id"] for child in children], duplicate["id"], keeper["id"])
+
+            if errors:
+                # Keep the folder, it still holds the files that could not be moved
+                result.update(status="failed", error=next(iter(errors.values())))
+                _LOGGER.error("Failed to move %d file(s) out of duplicate folder %s (%s)", len(errors), path, duplicate["id"])
+            else:
+                files_resource.update(fileId=duplicate["id"], body={"trashed": True}, fields="id").execute()
+                result["status"] = "merged"
+                _LOGGER.info("Merged duplicate folder %s (%s) into %s", path, duplicate["id"], keeper["id"])
+
+        results.append(result)
+
+    return keeper["id"]
+
+def merge_duplicate_subfolders(drive, files_resource, folder_id: str, path: str, preview: bool, results: list[dict]) -> None:
+    """Merge duplicate folders in a folder and, recursively, in all of its subfolders."""
+    subfolders = list_all_files(
+        files_resource,
+        f"mimeType = '{FOLDER_MIME_TYPE}' and '{folder_id}' in parents and trashed = false",
+        "id,name,createdTime",
+        order_by="createdTime",
+    )
+
+    groups: dict[str, list[dict]] = {}
+    for folder in subfolders:
+        groups.setdefault(folder["name"], []).append(folder)
+
+    for name, folders in groups.items():
+        subpath = f"{path}/{name}" if path else name
+        kept_id = merge_folder_group(drive, files_resource, subpath, folders, preview, results)
+
+        # Moved subfolders may clash with subfolders of the kept folder, so merge inside it afterwards
+        merge_duplicate_subfolders(drive, files_resource, kept_id, subpath, preview, results)
+
+def merge_duplicate_folders(hass,
+                            credentials,
+                            remote_folder_path: str = None,
+                            preview: bool = False,
+                            client_pool: DriveClientPool | None = None,
+                            folder_cache: FolderCache | None = None) -> list[dict]:
+    """Merge duplicate folders (folders with the same name in the same parent) in a Drive folder tree.
+
+    Duplicates along the remote folder path itself are merged as well. Of every group of
+    duplicates the oldest folder is kept, the contents of the others are moved into it and
+    the emptied folders are trashed. Afterwards the folder cache is cleared for the tree.
+
+    Args:
+        hass: The Home Assistant instance used to store the fallback folder ID cache.
+        credentials: The credentials object to access Google Drive.
+        remote_folder_path (str): (optional) The Drive folder path to repair, the whole Drive if empty.
+        preview (bool): If True, only report the folders that would be merged.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+
+    Returns:
+        list[dict]: Per duplicate folder the 'path', 'kept_folder_id', 'merged_folder_id', number of
+        'files' in it and a 'status' of 'merged', 'failed' (with an 'error') or 'preview'.
+    """
+    drive = get_drive_service(credentials, client_pool)
+    files_resource = drive.files()
+
+    if folder_cache is None:
+        folder_cache = get_fallback_folder_cache(hass)
+
+    segments = [segment for segment in (remote_folder_path or "").strip("/").split("/") if segment]
+    results = []
+    folder_id = "root"
+
+    # Walk down the remote folder path, merging duplicates of every folder along it
+    for i, segment in enumerate(segments, start=1):
+        folders = list_all_files(
+            files_resource,
+            f"mimeType = '{FOLDER_MIME_TYPE}' and name = '{escape_query_value(segment)}' "
+            f"and '{folder_id}' in parents and trashed = false",
+            "id,name,createdTime",
+            order_by="createdTime",
+        )
+        if not folders:
+            raise HomeAssistantError(f"Drive folder '{'/'.join(segments[:i])}' does not exist")
+
+        folder_id = merge_folder_group(drive, files_resource, "/".join(segments[:i]), folders, preview, results)
+
+    merge_duplicate_subfolders(drive, files_resource, folder_id, "/".join(segments), preview, results)
+
+    # Cached IDs may point to merged (trashed) folders
+    if not preview and results:
+        if segments:
+            folder_cache.invalidate(segments[0])
+        else:
+            folder_cache.clear()
+
+    return results
+
+async def async_merge_duplicate_folders(hass,
+                                        credentials,
+                                        remote_folder_path: str,
+                                        preview: bool,
+                                        save_to_sensor: bool,
+                                        sensor_name: str,
+                                        client_pool: DriveClientPool | None = None,
+                                        folder_cache: FolderCache | None = None,
+                                        job_scheduler: DriveJobScheduler | None = None) -> dict:
+    """Async wrapper to merge duplicate Drive folders and optionally save the results to a sensor.
+
+    Args:
+        hass: The Home Assistant instance used to run the asynchronous task.
+        credentials: The credentials object to access Google Drive.
+        remote_folder_path (str): The Drive folder path to repair, the whole Drive if empty.
+        preview (bool): If True, only report the folders that would be merged.
+        save_to_sensor (bool): If True, the results are saved to a sensor.
+        sensor_name (str): The name of the sensor to save the results to.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+        job_scheduler (DriveJobScheduler | None): (optional) Runs the blocking Drive work instead of the shared executor.
+
+    Returns:
+        dict: The service response, the duplicate 'folders' and the number of 'processed' and 'failed' folders.
+    """
+    try:
+        results = await async_run_drive_job(
+            hass,
+            job_scheduler,
+            JOB_CLASS_BULK,
+            merge_duplicate_folders,
+            hass,
+            credentials,
+            remote_folder_path,
+            preview,
+            client_pool=client_pool,
+            folder_cache=folder_cache,
+        )
+
+        processed = sum(1 for result in results if result["status"] != "failed")
+        failed = len(results) - processed
+
+        if results:
+            _LOGGER.warning(
+                "%s %d duplicate Drive folder(s) in '%s'",
+                "Found (preview)" if preview else "Merged",
+                processed, remote_folder_path or "/"
+            )
+        else:
+            _LOGGER.info("No duplicate Drive folders found in '%s'", remote_folder_path or "/")
+
+        if save_to_sensor:
+            attributes = {
+                "folders": results,
+                "failed": failed,
+                "friendly_name": sensor_name,
+                "icon": "mdi:folder-sync",
+            }
+
+            # Set the state to the number of merged (or previewed) folders
+            await async_create_or_update_sensor(hass, sensor_name, processed, attributes)
+
+        return {"folders": results, "processed": processed, "failed": failed}
+
+    except HomeAssistantError:
+        raise
+
+    except Exception as e:
+        _LOGGER.error("Error merging duplicate Drive folders in '%s': %s", remote_folder_path, e, exc_info=True)
+        raise HomeAssistantError(f"Merging duplicate folders failed: {e}") from e
+#endregion
+
+#region Change watches
+def add_change_watch(hass,
+                     credentials,
+                     change_watcher: DriveChangeWatcher,
+                     watch_id: str,
+                     remote_folder_path: str = None,
+                     query: str = None,
+                     client_pool: DriveClientPool | None = None,
+                     folder_cache: FolderCache | None = None) -> None:
+    """Register a watch for the files in a Drive folder or matching a query.
+
+    Args:
+        hass: The Home Assistant instance used to store the fallback folder ID cache.
+        credentials: The credentials object to access Google Drive.
+        change_watcher (DriveChangeWatcher): The change watcher of the config entry.
+        watch_id (str): The ID of the watch, included in its events.
+        remote_folder_path (str): (optional) The Drive folder path of which the files are watched.
+        query (str): (optional) The Drive query of the watched files, used when no folder path is given.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+    """
+    folder_id = None
+    if remote_folder_path:
+        folder_id = find_folder_id_from_path(hass, credentials, remote_folder_path, client_pool, folder_cache)
+        if folder_id is None:
+            raise HomeAssistantError(f"Drive folder '{remote_folder_path}' does not exist")
+
+    change_watcher.add_watch(credentials, watch_id, {
+        "folder_path": remote_folder_path or None,
+        "folder_id": folder_id,
+        "query": None if remote_folder_path else query,
+    })
+
+async def async_add_change_watch(hass,
+                                 credentials,
+                                 change_watcher: DriveChangeWatcher,
+                                 watch_id: str,
+                                 remote_folder_path: str = None,
+                                 query: str = None,
+                                 client_pool: DriveClientPool | None = None,
+                                 folder_cache: FolderCache | None = None,
+                                 job_scheduler: DriveJobScheduler | None = None) -> None:
+    """Async wrapper to register a change watch and start following the changes feed."""
+    try:
+        await async_run_drive_job(
+            hass,
+            job_scheduler,
+            JOB_CLASS_INTERACTIVE,
+            add_change_watch,
+            hass,
+            credentials,
+            change_watcher,
+            watch_id,
+            remote_folder_path,
+            query,
+            client_pool=client_pool,
+            folder_cache=folder_cache,
+        )
+        await change_watcher.async_watches_changed()
+
+    except HomeAssistantError:
+        raise
+
+    except Exception as e:
+        _LOGGER.error("Error adding Drive change watch '%s': %s", watch_id, e, exc_info=True)
+        raise HomeAssistantError(f"Adding change watch failed: {e}") from e
+
+async def async_remove_change_watch(hass, change_watcher: DriveChangeWatcher, watch_id: str) -> None:
+    """Remove a change watch, the changes feed is no longer followed when it was the last one."""
+    if not change_watcher.remove_watch(watch_id):
+        raise HomeAssistantError(f"There is no change watch '{watch_id}'")
+    await change_watcher.async_watches_changed()
+#endregion
+
+#region Sync folder
+def scan_local_folder(local_folder_path: str) -> dict[str, tuple[int, int]]:
+    """Walk a local folder tree and return the size and modification time (ns) of every file by relative path.
+
+    Symbolic links to folders are not followed, so links can't make the walk loop.
+    """
+    files = {}
+    pending = [""]
+
+    while pending:
+        relative_folder = pending.pop()
+        with os.scandir(os.path.join(local_folder_path, relative_folder)) as entries:
+            for entry in entries:
+                relative_path = f"{relative_folder}/{entry.name}" if relative_folder else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(relative_path)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    files[relative_path] = (stat.st_size, stat.st_mtime_ns)
+
+    return files
+
+def list_remote_tree(drive, folder_id: str) -> tuple[dict[str, dict], dict[str, str], list[dict]]:
+    """List all files below a Drive folder, one level of the tree at a time.
+
+    The folders of a level are combined in queries of SYNC_LIST_PARENTS_PER_QUERY parents, so a tree
+    costs a few requests per level instead of one per folder.
+
+    Args:
+        drive: The Drive service.
+        folder_id (str): The ID of the folder to list.
+
+    Returns:
+        tuple: The files by relative path, the folder IDs by relative path (the listed folder is '')
+        and the files that have the same relative path as an older file.
+    """
+    files_resource = drive.files()
+    files = {}
+    folders = {"": folder_id}
+    duplicates = []
+    level = {folder_id: ""}
+
+    while level:
+        next_level = {}
+        parent_ids = list(level)
+
+        for start in range(0, len(parent_ids), SYNC_LIST_PARENTS_PER_QUERY):
+            parents_query = " or ".join(
+                f"'{escape_query_value(parent_id)}' in parents"
+                for parent_id in parent_ids[start:start + SYNC_LIST_PARENTS_PER_QUERY]
+            )
+            listed_files = list_all_files(
+                files_resource,
+                f"({parents_query}) and trashed = false",
+                "id,name,mimeType,parents,size,md5Checksum",
+                "createdTime",
+            )
+
+            for file in listed_files:
+                parent_id = next(parent for parent in file.get("parents", []) if parent in level)
+                relative_path = f"{level[parent_id]}/{file['name']}" if level[parent_id] else file["name"]
+
+                # Listed oldest first, so the oldest folder or file of a path is used
+                if file["mimeType"] == FOLDER_MIME_TYPE:
+                    if relative_path not in folders:
+                        folders[relative_path] = file["id"]
+                        next_level[file["id"]] = relative_path
+                elif relative_path in files:
+                    duplicates.append({**file, "path": relative_path})
+                else:
+                    files[relative_path] = file
+
+        level = next_level
+
+    return files, folders, duplicates
+
+def sync_folder(hass,
+                credentials,
+                local_folder_path: str,
+                remote_folder_path: str = None,
+                delete_orphans: bool = False,
+                full_scan: bool = False,
+                max_parallel_uploads: int = UPLOAD_DEFAULT_PARALLEL_UPLOADS,
+                client_pool: DriveClientPool | None = None,
+                upload_strategy: UploadStrategy | None = None,
+                progress_tracker: UploadProgressTracker | None = None,
+                folder_cache: FolderCache | None = None,
+                sync_manifest: SyncManifest | None = None,
+                file_hash_cache: FileHashCache | None = None) -> dict:
+    """One-way sync of a local folder tree to a Drive folder, uploading only new and changed files.
+
+    The files uploaded by earlier syncs are recorded in the manifest with the size and modification
+    time they had. A sync walks the local tree and only uploads files that are not in the manifest
+    or of which the size or modification time changed, so repeated syncs of an unchanged tree need
+    no Drive requests at all. The Drive tree is listed on the first sync (or with `full_scan`): files
+    that are already in Drive with the same MD5 checksum are adopted instead of uploaded, and files
+    that were removed from Drive are uploaded again. Changed files replace the content of their Drive
+    file, so its ID and links stay the same.
+
+    Args:
+        hass: The Home Assistant instance used to store the fallback folder ID cache.
+        credentials: The credentials object to access Google Drive.
+        local_folder_path (str): The local folder to sync.
+        remote_folder_path (str): (optional) The Drive folder path to sync to, created when missing, the root if empty.
+        delete_orphans (bool): (optional) If True, Drive files of which the local file is gone are deleted.
+        full_scan (bool): (optional) If True, the Drive tree is listed and compared even when a manifest exists.
+        max_parallel_uploads (int): (optional) The maximum number of uploads running at the same time.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        upload_strategy (UploadStrategy | None): (optional) The upload strategy of the config entry.
+        progress_tracker (UploadProgressTracker | None): (optional) Receives the progress of resumable uploads.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+        sync_manifest (SyncManifest | None): (optional) The (loaded) sync manifests of the config entry.
+        file_hash_cache (FileHashCache | None): (optional) Caches the checksums of local files.
+
+    Returns:
+        dict: The number of 'uploaded', 'updated', 'unchanged', 'adopted', 'deleted' and 'failed' files and
+        per uploaded, deleted or failed file its 'path', 'status', Drive 'id' and 'error' in 'files'.
+    """
+    if not os.path.isdir(local_folder_path):
+        raise HomeAssistantError(f"Local folder '{local_folder_path}' does not exist or is not a folder.")
+
+    remote_folder_path = (remote_folder_path or "").strip("/")
+    folder_cache = folder_cache or get_fallback_folder_cache(hass)
+    sync_manifest = sync_manifest or SyncManifest()
+    file_hash_cache = file_hash_cache or FileHashCache()
+    sync_key = SyncManifest.get_sync_key(local_folder_path, remote_folder_path)
+    drive = get_drive_service(credentials, client_pool)
+
+    with sync_manifest.running(sync_key):
+        local_files = scan_local_folder(local_folder_path)
+        manifest = sync_manifest.get_files(sync_key)
+
+        if remote_folder_path:
+            root_folder_id = extract_folder_id_from_path(hass, credentials, remote_folder_path, client_pool, folder_cache)
+        else:
+            root_folder_id = get_root_folder_id(drive, folder_cache)
+
+        # List the Drive tree on the first sync, later syncs trust the manifest
+        remote_files = None
+        duplicates = []
+        if full_scan or not manifest:
+            remote_files, remote_folders, duplicates = list_remote_tree(drive, root_folder_id)
+
+            # Cache the listed folders, so uploads into them need no lookups
+            folder_cache.set_many({
+                "/".join(filter(None, [remote_folder_path, relative_path])): folder_id
+                for relative_path, folder_id in remote_folders.items()
+                if relative_path
+            })
+
+        synced_files = {}
+        uploads = []
+        counts = {"uploaded": 0, "updated": 0, "unchanged": 0, "adopted": 0, "deleted": 0, "failed": 0}
+
+        for relative_path, (size, mtime_ns) in local_files.items():
+            synced = manifest.get(relative_path)
+
+            if remote_files is None:
+                if synced is not None and (synced.size, synced.mtime_ns) == (size, mtime_ns):
+                    synced_files[relative_path] = synced
+                    counts["unchanged"] += 1
+                else:
+                    uploads.append((relative_path, size, mtime_ns, synced.file_id if synced else None))
+                continue
+
+            remote = remote_files.get(relative_path)
+            if remote is None:
+                uploads.append((relative_path, size, mtime_ns, None))
+                continue
+
+            if (
+                synced is not None
+                and synced.file_id == remote["id"]
+                and (synced.size, synced.mtime_ns) == (size, mtime_ns)
+                and synced.md5 == remote.get("md5Checksum")
+            ):
+                synced_files[relative_path] = synced
+                counts["unchanged"] += 1
+                continue
+
+            # A Drive file with the same size may hold the same content, e.g. uploaded by hand or before the manifest
+            if (
+                remote.get("md5Checksum")
+                and remote.get("size") == str(size)
+                and file_hash_cache.get_md5(os.path.join(local_folder_path, relative_path)) == remote["md5Checksum"]
+            ):
+                synced_files[relative_path] = SyncedFile(size, mtime_ns, remote["id"], remote["md5Checksum"])
+                counts["adopted"] += 1
+                continue
+
+            uploads.append((relative_path, size, mtime_ns, remote["id"]))
+
+        # Resolve (and create) the folders of the uploads before uploading, parents first
+        folder_ids = {"": root_folder_id}
+        for relative_folder in sorted({os.path.dirname(relative_path) for relative_path, *_ in uploads} - {""}):
+            folder_ids[relative_folder] = extract_folder_id_from_path(
+                hass, credentials, f"{remote_folder_path}/{relative_folder}".strip("/"), client_pool, folder_cache
+            )
+
+        def upload(relative_path: str, file_id: str | None) -> dict:
+            def upload_to(target_file_id: str | None) -> dict:
+                return upload_file_to_folder(
+                    credentials,
+                    os.path.join(local_folder_path, relative_path),
+                    "id,name,size,md5Checksum",
+                    None,
+                    os.path.basename(relative_path),
+                    folder_ids[os.path.dirname(relative_path)],
+                    client_pool,
+                    upload_strategy,
+                    progress_tracker,
+                    False,
+                    None,
+                    target_file_id,
+                )
+
+            try:
+                return upload_to(file_id)
+            except HttpError as e:
+                # The Drive file was removed since the last sync, upload the file again
+                if file_id is None or e.resp.status != 404:
+                    raise
+                return upload_to(None)
+
+        results = []
+        with get_job_executor(max_parallel_uploads, "google_drive_sync") as executor:
+            futures = [executor.submit(upload, relative_path, file_id) for relative_path, _, _, file_id in uploads]
+
+        for (relative_path, size, mtime_ns, file_id), future in zip(uploads, futures):
+            try:
+                response = future.result()
+            except Exception as e:
+                counts["failed"] += 1
+                results.append({"path": relative_path, "status": "failed", "error": str(e)})
+                continue
+
+            status = "updated" if file_id and response["id"] == file_id else "uploaded"
+            counts[status] += 1
+            synced_files[relative_path] = SyncedFile(size, mtime_ns, response["id"], response.get("md5Checksum"))
+            results.append({"path": relative_path, "status": status, "id": response["id"]})
+
+        # Drive files of local files that are gone, and with a listing the Drive files that were never synced
+        if delete_orphans:
+            orphans = {
+                synced.file_id: relative_path
+                for relative_path, synced in manifest.items()
+                if relative_path not in local_files
+            }
+            if remote_files is not None:
+                orphans.update({
+                    file["id"]: relative_path
+                    for relative_path, file in remote_files.items()
+                    if relative_path not in local_files
+                })
+                orphans.update({file["id"]: file["path"] for file in duplicates})
+
+            orphan_files = [{"id": file_id, "path": relative_path} for file_id, relative_path in orphans.items()]
+            for start in range(0, len(orphan_files), DELETE_BATCH_SIZE):
+                for result in delete_files_batch(credentials, orphan_files[start:start + DELETE_BATCH_SIZE], client_pool):
+                    # A file that is already gone from Drive counts as deleted
+                    if result["status"] == "deleted" or result["http_status"] == 404:
+                        counts["deleted"] += 1
+                        results.append({"path": result["path"], "status": "deleted", "id": result["id"]})
+                    else:
+                        counts["failed"] += 1
+                        results.append(result)
+
+                        # Keep the file in the manifest, so the next sync tries to delete it again
+                        if result["path"] in manifest and manifest[result["path"]].file_id == result["id"]:
+                            synced_files[result["path"]] = manifest[result["path"]]
+
+        sync_manifest.set_files(sync_key, synced_files)
+
+    return {**counts, "files": results}
+
+async def async_sync_folder(hass,
+                            credentials,
+                            local_folder_path: str,
+                            remote_folder_path: str,
+                            delete_orphans: bool,
+                            full_scan: bool,
+                            max_parallel_uploads: int,
+                            save_to_sensor: bool,
+                            sensor_name: str,
+                            client_pool: DriveClientPool | None = None,
+                            upload_strategy: UploadStrategy | None = None,
+                            progress_tracker: UploadProgressTracker | None = None,
+                            folder_cache: FolderCache | None = None,
+                            sync_manifest: SyncManifest | None = None,
+                            file_hash_cache: FileHashCache | None = None,
+                            job_scheduler: DriveJobScheduler | None = None) -> dict:
+    """Async wrapper to sync a local folder to Drive and optionally save the results to a sensor.
+
+    See sync_folder for the arguments, `save_to_sensor` and `sensor_name` select the sensor.
+
+    Returns:
+        dict: The service response, the counts and per file results of sync_folder.
+    """
+    try:
+        if sync_manifest is not None:
+            await sync_manifest.async_load()
+
+        summary = await async_run_drive_job(
+            hass,
+            job_scheduler,
+            JOB_CLASS_BULK,
+            sync_folder,
+            hass,
+            credentials,
+            local_folder_path,
+            remote_folder_path,
+            delete_orphans,
+            full_scan,
+            max_parallel_uploads,
+            client_pool=client_pool,
+            upload_strategy=upload_strategy,
+            progress_tracker=progress_tracker,
+            folder_cache=folder_cache,
+            sync_manifest=sync_manifest,
+            file_hash_cache=file_hash_cache,
+        )
+
+        _LOGGER.info(
+            "Synced '%s' to Drive folder '%s': %d uploaded, %d updated, %d unchanged, %d adopted, %d deleted",
+            local_folder_path, remote_folder_path or "/", summary["uploaded"], summary["updated"],
+            summary["unchanged"], summary["adopted"], summary["deleted"]
+        )
+
+        if summary["failed"]:
+            first_failed = next(result for result in summary["files"] if result["status"] == "failed")
+            _LOGGER.error(
+                "Failed to sync %d file(s) of '%s', first error for '%s': %s",
+                summary["failed"], local_folder_path, first_failed["path"], first_failed["error"]
+            )
+
+        if save_to_sensor:
+            # Large results are written to a file
+            collector = SensorResultCollector(get_sensor_results_path(hass, sensor_name))
+            results_attributes = await hass.async_add_executor_job(
+                collector.collect, summary["files"], get_sensor_results_digest(hass, sensor_name)
+            )
+
+            attributes = {
+                **results_attributes,
+                **{key: value for key, value in summary.items() if key != "files"},
+                "friendly_name": sensor_name,
+                "icon": "mdi:folder-sync",
+            }
+
+            # Set the state to the number of uploaded and updated files
+            await async_create_or_update_sensor(
+                hass, sensor_name, summary["uploaded"] + summary["updated"], attributes
+            )
+
+        return summary
+
+    except HomeAssistantError:
+        raise
+
+    except Exception as e:
+        _LOGGER.error("Error syncing '%s' to Google Drive: %s", local_folder_path, e, exc_info=True)
+        raise HomeAssistantError(f"Folder sync failed: {e}") from e
+#endregion
+
+#region Download file
+def get_remote_file(hass,
+                    credentials,
+                    file_id: str | None,
+                    remote_file_path: str | None,
+                    client_pool: DriveClientPool | None = None,
+                    folder_cache: FolderCache | None = None) -> dict:
+    """Return the metadata of the Drive file to download, by file ID or by path.
+
+    Args:
+        hass: The Home Assistant instance used to store the fallback folder ID cache.
+        credentials: The credentials object to access Google Drive.
+        file_id (str | None): The ID of the file, takes precedence over the path.
+        remote_file_path (str | None): The path of the file in Google Drive, formatted with '/' as a separator.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+
+    Returns:
+        dict: The id, name, mimeType, size, md5Checksum and modifiedTime of the file.
+    """
+    drive = get_drive_service(credentials, client_pool)
+    fields = "id,name,mimeType,size,md5Checksum,modifiedTime"
+
+    if file_id:
+        try:
+            return drive.files().get(fileId=file_id, fields=fields).execute()
+        except HttpError as e:
+            if e.resp.status == 404:
+                raise HomeAssistantError(f"Drive file '{file_id}' does not exist") from e
+            raise
+
+    folder_path, _, name = remote_file_path.strip("/").rpartition("/")
+    folder_id = find_folder_id_from_path(hass, credentials, folder_path, client_pool, folder_cache)
+    if folder_id is None:
+        raise HomeAssistantError(f"Drive folder '{folder_path}' does not exist")
+
+    query = (
+        f"name = '{escape_query_value(name)}' and '{folder_id}' in parents "
+        f"and mimeType != '{FOLDER_MIME_TYPE}' and trashed = false"
+    )
+    files = list_all_files(drive.files(), query, fields, "modifiedTime desc")
+    if not files:
+        raise HomeAssistantError(f"Drive file '{remote_file_path}' does not exist")
+
+    # Drive allows several files with the same name in a folder, the most recently modified one is used
+    if len(files) > 1:
+        _LOGGER.warning(
+            "Found %d files named '%s', downloading the most recently modified one (%s)",
+            len(files), remote_file_path, files[0]["id"]
+        )
+    return files[0]
+
+def download_byte_range(drive, file_id: str, start: int, end: int) -> bytes:
+    """Download the bytes `start` to `end` (inclusive) of a Drive file with a ranged media request."""
+    request = drive.files().get_media(fileId=file_id)
+    request.headers["range"] = f"bytes={start}-{end}"
+    content = request.execute()
+
+    # A server ignoring the range would send the whole file
+    if len(content) != end - start + 1:
+        raise HomeAssistantError(
+            f"Drive returned {len(content)} bytes for the range {start}-{end} of file '{file_id}'"
+        )
+    return content
+
+def download_sequentially(drive, file_id: str, size: int, partial_path: str, offset: int) -> None:
+    """Append the bytes from `offset` to the end of a Drive file to the partial file, one range at a time.
+
+    Every range is written before the next one is requested, so the partial file always holds
+    a prefix of the Drive file and an interrupted download resumes from its size.
+    """
+    with open(partial_path, "ab") as file:
+        for start in range(offset, size, DOWNLOAD_CHUNK_SIZE):
+            file.write(download_byte_range(drive, file_id, start, min(start + DOWNLOAD_CHUNK_SIZE, size) - 1))
+            file.flush()
+
+def download_in_parallel(credentials,
+                         file_id: str,
+                         size: int,
+                         partial_path: str,
+                         offset: int,
+                         max_parallel_ranges: int,
+                         client_pool: DriveClientPool | None = None) -> None:
+    """Download the bytes from `offset` to the end of a Drive file in ranges fetched at the same time.
+
+    Each range is written at its position in the partial file. When a range fails the remaining
+    ones are cancelled and the partial file is cut after the ranges that completed without a gap,
+    so a later download resumes from its size like after a sequential download.
+    """
+    starts = list(range(offset, size, DOWNLOAD_CHUNK_SIZE))
+    completed = set()
+    lock = threading.Lock()
+
+    fd = os.open(partial_path, os.O_WRONLY | os.O_CREAT, 0o644)
+
+    def download_range(start: int) -> None:
+        # Every executor thread uses its own Drive service of the pool
+        drive = get_drive_service(credentials, client_pool)
+        content = download_byte_range(drive, file_id, start, min(start + DOWNLOAD_CHUNK_SIZE, size) - 1)
+        os.pwrite(fd, content, start)
+        with lock:
+            completed.add(start)
+
+    try:
+        with get_job_executor(max_parallel_ranges, "google_drive_download") as executor:
+            futures = [executor.submit(download_range, start) for start in starts]
+            for future in as_completed(futures):
+                if future.exception() is not None:
+                    for pending in futures:
+                        pending.cancel()
+                    raise future.exception()
+    finally:
+        # Keep only the bytes up to the first range that is missing
+        end = offset
+        for start in starts:
+            if start not in completed:
+                break
+            end = min(start + DOWNLOAD_CHUNK_SIZE, size)
+        os.ftruncate(fd, end)
+        os.close(fd)
+
+def check_allowed_local_path(hass, local_file_path: str) -> None:
+    """Raise a HomeAssistantError if a local path is not in a folder of allowlist_external_dirs."""
+    if not hass.config.is_allowed_path(local_file_path):
+        raise HomeAssistantError(
+            f"Local path '{local_file_path}' is not allowed, add its folder to allowlist_external_dirs"
+        )
+
+def download_file(hass,
+                  credentials,
+                  file_id: str | None,
+                  remote_file_path: str | None,
+                  local_file_path: str,
+                  overwrite: bool = False,
+                  resume: bool = True,
+                  max_parallel_ranges: int = 1,
+                  client_pool: DriveClientPool | None = None,
+                  folder_cache: FolderCache | None = None) -> dict:
+    """Download a Drive file to a local file, streaming it to disk in byte ranges.
+
+    The file is written to the local path with a '.part' suffix and renamed when it is complete
+    and its MD5 checksum matches the one of Drive. A partial file left by an interrupted download
+    is resumed from its size; if the resumed file turns out not to match (e.g. the Drive file
+    changed in between) it is downloaded again from the start.
+
+    Args:
+        hass: The Home Assistant instance used to store the fallback folder ID cache.
+        credentials: The credentials object to access Google Drive.
+        file_id (str | None): The ID of the file to download.
+        remote_file_path (str | None): The path of the file in Google Drive, used when no file ID is given.
+        local_file_path (str): The local file path, or an existing folder to download the file into.
+        overwrite (bool): (optional) If True, an existing local file is replaced.
+        resume (bool): (optional) If False, a partial file of an earlier download is discarded.
+        max_parallel_ranges (int): (optional) Number of byte ranges of large files downloaded at the same time.
+        client_pool (DriveClientPool | None): (optional) The Drive client pool of the config entry.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+
+    Returns:
+        dict: The Drive metadata of the file, the 'local_file_path' and the byte 'resumed_from'.
+    """
+    check_allowed_local_path(hass, local_file_path)
+    file = get_remote_file(hass, credentials, file_id, remote_file_path, client_pool, folder_cache)
+
+    # Google Docs, Sheets, ... have no binary content and can only be exported
+    if file["mimeType"].startswith("application/vnd.google-apps."):
+        raise HomeAssistantError(
+            f"Drive file '{file['name']}' is a {file['mimeType']} document and cannot be downloaded"
+        )
+
+    if os.path.isdir(local_file_path):
+        # The Drive name may contain path separators, check the joined path as well
+        local_file_path = os.path.join(local_file_path, file["name"])
+        check_allowed_local_path(hass, local_file_path)
+    if os.path.exists(local_file_path) and not overwrite:
+        raise HomeAssistantError(
+            f"Local file '{local_file_path}' already exists, set overwrite to replace it"
+        )
+    os.makedirs(os.path.dirname(local_file_path) or ".", exist_ok=True)
+
+    size = int(file.get("size", 0))
+    partial_path = local_file_path + DOWNLOAD_PARTIAL_SUFFIX
+
+    offset = os.path.getsize(partial_path) if os.path.isfile(partial_path) else 0
+    if offset > size or not resume:
+        offset = 0
+        open(partial_path, "wb").close()
+
+    resumed_from = offset
+    while True:
+        if offset:
+            _LOGGER.info("Resuming download of '%s' at byte %d of %d", file["name"], offset, size)
+
+        # Large files are fetched over several connections, which is faster on links with a high latency
+        if max_parallel_ranges > 1 and size - offset >= DOWNLOAD_PARALLEL_THRESHOLD:
+            download_in_parallel(credentials, file["id"], size, partial_path, offset, max_parallel_ranges, client_pool)
+        else:
+            download_sequentially(get_drive_service(credentials, client_pool), file["id"], size, partial_path, offset)
+
+        if "md5Checksum" not in file or compute_md5(partial_path) == file["md5Checksum"]:
+            break
+
+        if offset == 0:
+            os.remove(partial_path)
+            raise HomeAssistantError(f"Downloaded file '{file['name']}' does not match the MD5 checksum of Drive")
+
+        # The partial file did not belong to the current version of the Drive file
+        _LOGGER.warning("Resumed download of '%s' does not match, downloading it again", file["name"])
+        offset = resumed_from = 0
+        open(partial_path, "wb").close()
+
+    os.replace(partial_path, local_file_path)
+
+    return {**file, "local_file_path": local_file_path, "resumed_from": resumed_from}
+
+async def async_download_file(hass,
+                              credentials,
+                              file_id: str | None,
+                              remote_file_path: str | None,
+                              local_file_path: str,
+                              overwrite: bool,
+                              resume: bool,
+                              max_parallel_ranges: int,
+                              save_to_sensor: bool,
+                              sensor_name: str,
+                              client_pool: DriveClientPool | None = None,
+                              folder_cache: FolderCache | None = None,
+                              job_scheduler: DriveJobScheduler | None = None) -> dict:
+    """Async wrapper to download a Drive file and optionally save the result to a sensor.
+
+    See download_file for the arguments, `save_to_sensor` and `sensor_name` select the sensor.
+
+    Returns:
+        dict: The service response, the Drive metadata of the file and where it was saved.
+    """
+    try:
+        response = await async_run_drive_job(
+            hass,
+            job_scheduler,
+            JOB_CLASS_TRANSFER,
+            download_file,
+            hass,
+            credentials,
+            file_id,
+            remote_file_path,
+            local_file_path,
+            overwrite,
+            resume,
+            max_parallel_ranges,
+            client_pool=client_pool,
+            folder_cache=folder_cache,
+        )
+
+        _LOGGER.info("Downloaded Drive file '%s' to '%s'", response["name"], response["local_file_path"])
+
+        if save_to_sensor:
+            # Set the state to the name of the downloaded file
+            await async_create_or_update_sensor(
+                hass, sensor_name, response["name"], {**response, "friendly_name": sensor_name, "icon": "mdi:download"}
+            )
+
+        return response
+
+    except HomeAssistantError:
+        raise
+
+    except Exception as e:
+        _LOGGER.error("Error downloading file from Google Drive: %s", e, exc_info=True)
+        raise HomeAssistantError(f"Drive download failed: {e}") from e
+#endregion
+
+#region Native async Drive backend
+async def async_native_get_root_folder_id(drive: AsyncDriveClient, folder_cache: FolderCache) -> str:
+    """Return the ID of the root folder of My Drive like get_root_folder_id, with the async Drive client."""
+    root_id = folder_cache.get("")
+    if root_id is None:
+        root_id = (await drive.async_get_file("root", "id"))["id"]
+        folder_cache.set("", root_id)
+    return root_id
+
+async def async_native_get_cached_folder_id(drive: AsyncDriveClient, folder_cache: FolderCache, path: str) -> str | None:
+    """Return the cached folder ID of a path like get_cached_folder_id, with the async Drive client."""
+    folder_id = folder_cache.get(path)
+    if folder_id is None or not folder_cache.needs_validation(path):
+        return folder_id
+
+    try:
+        folder = await drive.async_get_file(folder_id, "id,trashed")
+    except HttpError as e:
+        if e.resp.status != 404:
+            raise
+        folder = {"trashed": True}
+
+    if not folder.get("trashed", False):
+        folder_cache.mark_validated(path)
+        return folder_id
+
+    _LOGGER.info("Cached folder %s → %s no longer exists, resolving it again", path, folder_id)
+    folder_cache.invalidate(path)
+    return None
+
+async def async_native_create_folder(drive: AsyncDriveClient, name: str, parent_id: str, path: str) -> str:
+    """Create a folder in the parent folder and return its ID, with the async Drive client."""
+    created = await drive.async_create_file({"name": name, "mimeType": FOLDER_MIME_TYPE, "parents": [parent_id]})
+    _LOGGER.info("Created folder %s → %s", path, created["id"])
+    return created["id"]
+
+async def async_native_extract_folder_id_from_path(drive: AsyncDriveClient,
+                                                   folder_remote_path: str,
+                                                   folder_cache: FolderCache) -> str:
+    """Resolve (and create) a Drive folder path like extract_folder_id_from_path, with the async Drive client.
+
+    Coroutines and threads resolving the same path wait for each other in `folder_cache.async_resolving`,
+    which shares the lock of the path with `folder_cache.resolving`.
+
+    Args:
+        drive (AsyncDriveClient): The async Drive client of the config entry.
+        folder_remote_path (str): The folder path in Google Drive, formatted with '/' as a separator.
+        folder_cache (FolderCache): The folder cache of the config entry.
+
+    Returns:
+        str: The ID of the folder.
+    """
+    folder_remote_path = folder_remote_path.strip("/")
+
+    folder_id = await async_native_get_cached_folder_id(drive, folder_cache, folder_remote_path)
+    if folder_id:
+        return folder_id
+
+    async with folder_cache.async_resolving(folder_remote_path):
+        folder_id = folder_cache.get(folder_remote_path)
+        if folder_id:
+            return folder_id
+
+        segments = folder_remote_path.split("/")
+
+        # Start from the deepest folder of the path that is cached
+        start, parent_id = 0, None
+        for i in range(len(segments) - 1, 0, -1):
+            parent_id = await async_native_get_cached_folder_id(drive, folder_cache, "/".join(segments[:i]))
+            if parent_id:
+                start = i
+                break
+        if not parent_id:
+            parent_id = await async_native_get_root_folder_id(drive, folder_cache)
+
+        # Look up all remaining folders of the path in one query
+        candidates = await drive.async_list_files(
+            build_folder_chain_query(segments[start:]), "id,name,parents", order_by="createdTime"
+        )
+        chain = follow_folder_chain(candidates, parent_id, segments[start:], "/".join(segments[:start]))
+        if chain:
+            folder_cache.set_many({
+                "/".join(segments[:start + i]): chain_id for i, chain_id in enumerate(chain, start=1)
+            })
+            parent_id = chain[-1]
+
+        # Create the folders that do not exist yet
+        for i in range(start + len(chain), len(segments)):
+            subpath = "/".join(segments[:i + 1])
+
+            # Paths sharing this folder may be resolved at the same time, only one of them creates it
+            async with folder_cache.async_resolving(subpath):
+                folder_id = folder_cache.get(subpath)
+                if folder_id is None:
+                    folder_id = await async_native_create_folder(drive, segments[i], parent_id, subpath)
+                    folder_cache.set(subpath, folder_id)
+
+            parent_id = folder_id
+
+    return parent_id
+
+async def async_native_find_identical_file(hass,
+                                           drive: AsyncDriveClient,
+                                           local_file_path: str,
+                                           remote_file_name: str,
+                                           folder_id: str | None,
+                                           fields: str,
+                                           file_hash_cache: FileHashCache | None = None,
+                                           job_scheduler: DriveJobScheduler | None = None) -> dict | None:
+    """Return a file in a Drive folder with the same name and content as a local file like find_identical_file.
+
+    Hashing the local file runs on the job scheduler, as a large file takes a while.
+    """
+    query = (
+        f"name = '{escape_query_value(remote_file_name)}' "
+        f"and '{escape_query_value(folder_id or 'root')}' in parents and trashed = false"
+    )
+    candidates = await drive.async_list_files(
+        query, generate_full_fields_filter(fields, mandatory_fields=["id", "size", "md5Checksum"])
+    )
+
+    # Files with another size can't be identical, only hash the local file when needed
+    size = str(await hass.async_add_executor_job(os.path.getsize, local_file_path))
+    candidates = [file for file in candidates if file.get("size") == size and file.get("md5Checksum")]
+    if not candidates:
+        return None
+
+    md5 = await async_run_drive_job(
+        hass, job_scheduler, JOB_CLASS_TRANSFER, (file_hash_cache or FileHashCache()).get_md5, local_file_path
+    )
+    return next((file for file in candidates if file["md5Checksum"] == md5), None)
+
+async def async_native_upload_media_file(hass,
+                                         drive: AsyncDriveClient,
+                                         local_file_path: str,
+                                         fields: str,
+                                         mime_type: str = None,
+                                         remote_file_name: str = None,
+                                         remote_folder_path: str = None,
+                                         append_ymd_path: bool = False,
+                                         upload_strategy: UploadStrategy | None = None,
+                                         progress_tracker: UploadProgressTracker | None = None,
+                                         folder_cache: FolderCache | None = None,
+                                         skip_if_identical: bool = False,
+                                         file_hash_cache: FileHashCache | None = None,
+                                         job_scheduler: DriveJobScheduler | None = None) -> dict:
+    """Upload a local file like upload_media_file, with the async Drive client instead of an executor thread.
+
+    When the upload fails because the cached folder no longer exists, the cached path is invalidated
+    and the upload is retried once in a newly resolved folder, like upload_to_folder_path does.
+
+    Args:
+        hass: The Home Assistant instance.
+        drive (AsyncDriveClient): The async Drive client of the config entry.
+        local_file_path (str): The local path to the media file.
+        fields (str): The fields to include in the response from the Google Drive API.
+        mime_type (str): (optional) The MIME type of the file, guessed from the extension if empty.
+        remote_file_name (str): (optional) The desired name for the file in Google Drive.
+        remote_folder_path (str): (optional) A filepath in Google Drive to upload the file to.
+        append_ymd_path (bool): If True, the file will be uploaded in a subfolder structure for year/month/day.
+        upload_strategy (UploadStrategy | None): (optional) The upload strategy of the config entry.
+        progress_tracker (UploadProgressTracker | None): (optional) Receives the progress of resumable uploads.
+        folder_cache (FolderCache | None): (optional) The folder cache of the config entry.
+        skip_if_identical (bool): (optional) If True, an identical file in the folder is returned instead of uploading.
+        file_hash_cache (FileHashCache | None): (optional) Caches the checksums of local files.
+        job_scheduler (DriveJobScheduler | None): (optional) Hashes the local file for `skip_if_identical`.
+
+    Returns:
+        dict: The response from the Google Drive API after the upload, with the 'upload_strategy' that was used.
+    """
+    await hass.async_add_executor_job(verify_file_path_exists, local_file_path)
+
+    upload_strategy = upload_strategy or UploadStrategy()
+    if folder_cache is None:
+        folder_cache = get_fallback_folder_cache(hass)
+
+    # Remember the path, so the folders of the next day can be created ahead of time
+    if append_ymd_path:
+        folder_cache.remember_daily_root((remote_folder_path or "").strip("/"))
+
+    mime_type = mime_type or get_mime_type_from_path(local_file_path)
+    fields = generate_full_fields_filter(fields)
+
+    async def upload(folder_id: str | None) -> dict:
+        metadata = {}
+        if remote_file_name:
+            metadata["name"] = remote_file_name
+        if folder_id:
+            metadata["parents"] = [folder_id]
+
+        # Return the existing file instead of transferring the same content again
+        if skip_if_identical:
+            existing_file = await async_native_find_identical_file(
+                hass,
+                drive,
+                local_file_path,
+                remote_file_name or os.path.basename(local_file_path),
+                folder_id,
+                fields,
+                file_hash_cache,
+                job_scheduler,
+            )
+            if existing_file is not None:
+                _LOGGER.info("Skipped uploading %s, an identical file exists in Drive", local_file_path)
+                return {**existing_file, "upload_strategy": "skipped"}
+
+        return await drive.async_upload_file(
+            local_file_path, metadata, mime_type, fields, upload_strategy, progress_tracker
+        )
+
+    folder_path = build_upload_folder_path(remote_folder_path, append_ymd_path)
+    if not folder_path:
+        return await upload(None)
+
+    folder_id = await async_native_extract_folder_id_from_path(drive, folder_path, folder_cache)
+
+    try:
+        return await upload(folder_id)
+
+    except HttpError as e:
+        # Drive answers 404 when the parent folder of the new file does not exist (anymore)
+        if e.resp.status != 404:
+            raise
+
+        _LOGGER.warning("Drive folder %s (%s) no longer exists, resolving it again", folder_path, folder_id)
+        folder_cache.invalidate(folder_path.strip("/").split("/")[0])
+
+        folder_id = await async_native_extract_folder_id_from_path(drive, folder_path, folder_cache)
+        return await upload(folder_id)
+
+async def async_native_get_list_files_by_pattern(drive: AsyncDriveClient,
+                                                 query: str,
+                                                 fields: str,
+                                                 sort_by_recent: bool,
+                                                 maximum_files: int) -> dict:
+    """List the files matching a Drive query like get_list_files_by_pattern, with the async Drive client.
+
+    Returns:
+        dict: The matching 'files' with the requested fields.
+    """
+    files = await drive.async_list_files(
+        query,
+        generate_full_fields_filter(fields),
+        "modifiedTime desc" if sort_by_recent else "name",
+        maximum_files,
+    )
+    return {"files": files}
+
+async def async_native_delete_files_batch(drive: AsyncDriveClient, files: list[dict]) -> list[dict]:
+    """Delete a group of files with a single Drive batch request like delete_files_batch, with the async Drive client.
+
+    Returns:
+        List of the given files, each extended with a 'status' ('deleted' or 'failed'), and on failure
+        an 'error' and the 'http_status' of the failed request (None if it failed without a response).
+    """
+    try:
+        responses = await drive.async_batch([("DELETE", f"drive/v3/files/{file['id']}", None) for file in files])
+    except Exception as e:
+        # The batch request itself failed, so none of the files were deleted
+        _LOGGER.warning("Batch deleting %d Drive file(s) failed: %s", len(files), e)
+        return [{**file, "status": "failed", "error": str(e), "http_status": get_http_status(e)} for file in files]
+
+    results = []
+    for file, (_, exception) in zip(files, responses):
+        if exception is not None:
+            results.append({**file, "status": "failed", "error": str(exception), "http_status": get_http_status(exception)})
+        else:
+            results.append({**file, "status": "deleted"})
+
+    return results
+
+async def async_native_iter_cleanup_older_files_by_pattern(
+    drive: AsyncDriveClient,
+    pattern: str,
+    days_ago: int,
+    preview: bool,
+    fields: str,
+    progress_callback: Callable[[dict], None] | None = None) -> AsyncIterator[list[dict]]:
+    """Delete old files matching `pattern` like iter_cleanup_older_files_by_pattern, with the async Drive client.
+
+    The batches of a page are deleted as tasks while the next page is listed, with at most
+    DELETE_MAX_CONCURRENT_BATCHES batches in flight, so memory stays bounded like in the threaded version.
+
+    Yields:
+        The results of a page (preview) or a batch: the matched files with the requested fields and a
+        'status' of 'deleted', 'failed' or 'preview', failed files also contain the 'error'.
+    """
+    query = build_cleanup_query(pattern, days_ago)
+
+    # Generate the full fields filter, ensuring 'id' is always included
+    fields = generate_full_fields_filter(fields, mandatory_fields=["id", "name"])
+
+    started = time.monotonic()
+    last_report = started
+    progress = {"pages_scanned": 0, "files_deleted": 0, "files_failed": 0, "files_preview": 0}
+
+    def report(finished: bool) -> None:
+        if progress_callback:
+            progress_callback({
+                **progress,
+                "elapsed_seconds": round(time.monotonic() - started, 1),
+                "finished": finished,
+            })
+
+    def count(results: list[dict]) -> list[dict]:
+        for result in results:
+            progress[f"files_{result['status']}"] += 1
+        return results
+
+    in_flight: set[asyncio.Task] = set()
+
+    try:
+        async for files in drive.async_iter_file_pages(query, fields):
+            progress["pages_scanned"] += 1
+
+            # Check if the preview parameter is set, in that case only report the files
+            if preview:
+                yield count([{**file, "status": "preview"} for file in files])
+
+            # Otherwise delete the files in batches, waiting for a free slot when too many are in flight
+            else:
+                for start in range(0, len(files), DELETE_BATCH_SIZE):
+                    if len(in_flight) >= DELETE_MAX_CONCURRENT_BATCHES:
+                        done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            yield count(task.result())
+
+                    in_flight.add(asyncio.create_task(
+                        async_native_delete_files_batch(drive, files[start:start + DELETE_BATCH_SIZE])
+                    ))
+
+            # Report the progress during long runs
+            if time.monotonic() - last_report >= CLEANUP_PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                report(finished=False)
+
+        # Wait for the remaining batches to finish
+        while in_flight:
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield count(task.result())
+
+        report(finished=True)
+
+    finally:
+        # Stop the batches still running when failed or when the consumer stopped iterating
+        for task in in_flight:
+            task.cancel()
+
+async def async_native_summarize_cleanup(hass,
+                                         drive: AsyncDriveClient,
+                                         pattern: str,
+                                         days_ago: int,
+                                         preview: bool,
+                                         fields: str,
+                                         collector: SensorResultCollector | None = None,
+                                         previous_digest: str | None = None,
+                                         keep_files: bool = False,
+                                         progress_callback: Callable[[dict], None] | None = None) -> dict:
+    """Run a cleanup with the async Drive client and summarize it like summarize_cleanup_results.
+
+    Only writing the collected results for the sensor runs in the executor, one job per batch.
+    """
+    summary = CleanupSummary(collector, keep_files)
+
+    try:
+        async for results in async_native_iter_cleanup_older_files_by_pattern(
+            drive, pattern, days_ago, preview, fields, progress_callback
+        ):
+            if collector is not None:
+                await hass.async_add_executor_job(summary.add_all, results)
+            else:
+                summary.add_all(results)
+    except Exception:
+        if collector is not None:
+            await hass.async_add_executor_job(summary.discard)
+        raise
+
+    if collector is not None:
+        return await hass.async_add_executor_job(summary.close, previous_digest)
+    return summary.close(previous_digest)
+#endregion
@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .create_sensor import async_create_or_update_sensor
+
+import asyncio
+import threading
+import time
+import logging
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_futures
+from functools import partial
+from typing import Any, NamedTuple
+
+from ..const import (
+    JOB_CLASSES,
+    JOB_CLASS_LIMITS,
+    JOB_CLASS_SUBTASK_LIMITS,
+    JOB_SCHEDULER_WORKERS,
+    JOB_WAIT_SAMPLES,
+    JOB_QUEUE_SENSOR_NAME,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# The job of the scheduler that the current worker thread runs, if any
+_current_job = threading.local()
+
+
+class DriveJob(NamedTuple):
+    """A blocking Drive job waiting for (or running on) a worker of the scheduler."""
+
+    target: Callable[..., Any]
+    args: tuple
+    future: asyncio.Future
+    queued: float
+
+
+class DriveJobContext:
+    """The sub-task slots of a running job, shared by the sub-task executors the job creates."""
+
+    def __init__(self, scheduler: DriveJobScheduler, job_class: str, slots: int) -> None:
+        self.scheduler = scheduler
+        self.job_class = job_class
+        self._free_slots = slots
+        self._lock = threading.Lock()
+
+    def create_executor(self, max_workers: int) -> DriveSubtaskExecutor:
+        """Reserve up to `max_workers` free slots of the job for a new sub-task executor."""
+        with self._lock:
+            # A job that already reserved all its slots still gets one, so it never waits on itself
+            slots = max(1, min(max_workers, self._free_slots))
+            self._free_slots -= slots
+
+        return DriveSubtaskExecutor(self, slots)
+
+    def release(self, slots: int) -> None:
+        with self._lock:
+            self._free_slots += slots
+
+
+class DriveSubtaskExecutor:
+    """Runs the sub-tasks of a scheduler job on the sub-task threads of the scheduler, like a ThreadPoolExecutor.
+
+    At most the reserved number of sub-tasks run at the same time, the others wait in submission order.
+    The threads are shared by all jobs and stay alive between them, so the Drive services that the
+    client pool keeps per thread are reused. The slots are returned to the job once the executor is
+    shut down and its sub-tasks finished.
+    """
+
+    def __init__(self, context: DriveJobContext, slots: int) -> None:
+        self._context = context
+        self._slots = slots
+        self._pending: deque[tuple[Future, Callable[..., Any], tuple]] = deque()
+        self._futures: list[Future] = []
+        self._running = 0
+        self._shutdown = False
+        self._lock = threading.Lock()
+
+    @property
+    def max_workers(self) -> int:
+        return self._slots
+
+    def submit(self, target: Callable[..., Any], *args) -> Future:
+        """Queue a sub-task and return its future."""
+        future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("Cannot submit sub-tasks after shutdown")
+            self._pending.append((future, target, args))
+            self._futures.append(future)
+            self._dispatch()
+        return future
+
+    def _dispatch(self) -> None:
+        """Start pending sub-tasks on free slots, called with the lock held."""
+        while self._pending and self._running < self._slots:
+            future, target, args = self._pending.popleft()
+
+            # Skip the sub-tasks that were cancelled while they waited
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            self._running += 1
+            try:
+                self._context.scheduler.submit_subtask(self._context.job_class, self._run, future, target, args)
+            except RuntimeError as e:
+                # The scheduler was closed
+                self._running -= 1
+                future.set_exception(e)
+
+        if self._shutdown and not self._running and not self._pending and self._slots:
+            self._context.release(self._slots)
+            self._slots = 0
+
+    def _run(self, future: Future, target: Callable[..., Any], args: tuple) -> None:
+        try:
+            result = target(*args)
+        except BaseException as e:
+            exception = e
+        else:
+            exception = None
+
+        # Free the slot before the future is done, a caller waiting for it may submit again
+        with self._lock:
+            self._running -= 1
+            self._dispatch()
+
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        """Stop accepting sub-tasks, optionally cancel the waiting ones and wait for the others to finish."""
+        with self._lock:
+            self._shutdown = True
+            if cancel_futures:
+                while self._pending:
+                    self._pending.popleft()[0].cancel()
+            self._dispatch()
+
+        if wait:
+            wait_futures(self._futures)
+
+    def __enter__(self) -> DriveSubtaskExecutor:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown(wait=True)
+
+
+class DriveJobScheduler:
+    """Runs the blocking Drive jobs of a config entry on its own worker threads, by priority class.
+
+    Jobs are queued per class (see JOB_CLASSES, highest priority first) and started on the
+    scheduler's workers instead of Home Assistant's shared executor, so a large upload or cleanup
+    never delays other integrations. A free worker takes the oldest job of the highest priority
+    class that is below its limit in JOB_CLASS_LIMITS. As the transfer and bulk limits together
+    stay below the number of workers, a listing never waits behind bulk work.
+
+    The threads a job fans out to (see get_job_executor) run on separate sub-task threads, at most
+    JOB_CLASS_SUBTASK_LIMITS of them per running job of a class. There are as many sub-task threads
+    as the running jobs can use together, so a sub-task never waits for a thread and at most
+    `max_workers` + `max_subtask_workers` threads run Drive work at any time.
+
+    All methods must be called from the event loop.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_workers: int = JOB_SCHEDULER_WORKERS,
+        class_limits: dict[str, int] = JOB_CLASS_LIMITS,
+        subtask_limits: dict[str, int] = JOB_CLASS_SUBTASK_LIMITS,
+    ) -> None:
+        self._hass = hass
+        self._max_workers = max_workers
+        self._class_limits = class_limits
+        self._subtask_limits = subtask_limits
+        self._max_subtask_workers = get_max_subtask_workers(max_workers, class_limits, subtask_limits)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="google_drive_job")
+        self._subtask_executor = ThreadPoolExecutor(
+            max_workers=self._max_subtask_workers, thread_name_prefix="google_drive_subtask"
+        )
+        self._subtasks_running: dict[str, int] = dict.fromkeys(JOB_CLASSES, 0)
+        self._subtasks_lock = threading.Lock()
+        self._queues: dict[str, deque[DriveJob]] = {job_class: deque() for job_class in JOB_CLASSES}
+        self._running: dict[str, int] = dict.fromkeys(JOB_CLASSES, 0)
+        self._waits: dict[str, deque[float]] = {
+            job_class: deque(maxlen=JOB_WAIT_SAMPLES) for job_class in JOB_CLASSES
+        }
+        self._completed: dict[str, int] = dict.fromkeys(JOB_CLASSES, 0)
+        self._failed: dict[str, int] = dict.fromkeys(JOB_CLASSES, 0)
+        self._closed = False
+
+    async def async_run(self, job_class: str, target: Callable[..., Any], *args) -> Any:
+        """Queue a blocking function in a priority class and return its result once a worker ran it.
+
+        Cancelling the caller removes a queued job; a running job finishes, its result is dropped.
+        """
+        if self._closed:
+            raise HomeAssistantError("The Google Drive integration is unloading, no new jobs are accepted")
+
+        job = DriveJob(target, args, self._hass.loop.create_future(), time.monotonic())
+        self._queues[job_class].append(job)
+        self._dispatch()
+
+        return await job.future
+
+    def _dispatch(self) -> None:
+        """Start queued jobs on the free workers, highest priority class first."""
+        for job_class in JOB_CLASSES:
+            queue = self._queues[job_class]
+
+            while (
+                queue
+                and sum(self._running.values()) < self._max_workers
+                and self._running[job_class] < self._class_limits[job_class]
+            ):
+                job = queue.popleft()
+
+                # The caller stopped waiting while the job was queued
+                if job.future.done():
+                    continue
+
+                self._start(job_class, job)
+
+    def _start(self, job_class: str, job: DriveJob) -> None:
+        waited = time.monotonic() - job.queued
+        self._waits[job_class].append(waited)
+        _LOGGER.debug(
+            "Starting %s job %s after %.2f s in the queue",
+            job_class, getattr(job.target, "__name__", job.target), waited,
+        )
+        self._running[job_class] += 1
+
+        worker_future = self._executor.submit(self._run_job, job_class, job)
+        worker_future.add_done_callback(
+            lambda future: self._hass.loop.call_soon_threadsafe(self._finish, job_class, job, future)
+        )
+
+    def _run_job(self, job_class: str, job: DriveJob) -> Any:
+        """Run a job on a worker thread, with the context its sub-task executors take their slots from."""
+        _current_job.context = DriveJobContext(self, job_class, self._subtask_limits[job_class])
+        try:
+            return job.target(*job.args)
+        finally:
+            _current_job.context = None
+
+    def submit_subtask(self, job_class: str, target: Callable[..., Any], *args) -> None:
+        """Run a sub-task of a job on a sub-task thread, counted as running for the class of the job."""
+        with self._subtasks_lock:
+            self._subtasks_running[job_class] += 1
+
+        def run() -> None:
+            try:
+                target(*args)
+            finally:
+                with self._subtasks_lock:
+                    self._subtasks_running[job_class] -= 1
+
+        self._subtask_executor.submit(run)
+
+    def _finish(self, job_class: str, job: DriveJob, worker_future: Future) -> None:
+        self._running[job_class] -= 1
+
+        exception = None if worker_future.cancelled() else worker_future.exception()
+        if worker_future.cancelled() or exception is not None:
+            self._failed[job_class] += 1
+        else:
+            self._completed[job_class] += 1
+
+        if not job.future.done():
+            if worker_future.cancelled():
+                job.future.cancel()
+            elif exception is not None:
+                job.future.set_exception(exception)
+            else:
+                job.future.set_result(worker_future.result())
+
+        self._dispatch()
+
+    def stats(self) -> dict[str, dict]:
+        """Return the queue depth, running jobs and wait times of every job class."""
+        now = time.monotonic()
+        stats = {}
+
+        for job_class in JOB_CLASSES:
+            queued = [job for job in self._queues[job_class] if not job.future.done()]
+            waits = self._waits[job_class]
+
+            stats[job_class] = {
+                "queued": len(queued),
+                "running": self._running[job_class],
+                "limit": self._class_limits[job_class],
+                "subtasks_running": self._subtasks_running[job_class],
+                "subtask_limit": self._subtask_limits[job_class],
+                "completed": self._completed[job_class],
+                "failed": self._failed[job_class],
+                "oldest_queued_seconds": round(now - queued[0].queued, 1) if queued else 0.0,
+                "average_wait_seconds": round(sum(waits) / len(waits), 2) if waits else 0.0,
+                "max_wait_seconds": round(max(waits), 2) if waits else 0.0,
+            }
+
+        return stats
+
+    async def async_publish_stats(self, now=None) -> None:
+        """Write the statistics of every job class to its queue sensor."""
+        for job_class, stats in self.stats().items():
+            await async_create_or_update_sensor(
+                self._hass,
+                JOB_QUEUE_SENSOR_NAME.format(job_class),
+                stats["queued"],
+                {
+                    **stats,
+                    "workers": self._max_workers,
+                    "subtask_workers": self._max_subtask_workers,
+                    "icon": "mdi:tray-full",
+                },
+            )
+
+    def close(self) -> None:
+        """Cancel the queued jobs and stop the workers once the running jobs finished, without waiting."""
+        self._closed = True
+
+        for queue in self._queues.values():
+            while queue:
+                queue.popleft().future.cancel()
+
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._subtask_executor.shutdown(wait=False)
+
+
+def get_max_subtask_workers(max_workers: int, class_limits: dict[str, int], subtask_limits: dict[str, int]) -> int:
+    """Return the number of sub-tasks that the jobs running at the same time can run together.
+
+    The workers are filled with the jobs of the classes with the most sub-tasks first, as far as
+    the limit of each class allows.
+    """
+    total = 0
+    free_workers = max_workers
+    for job_class in sorted(subtask_limits, key=subtask_limits.get, reverse=True):
+        jobs = min(class_limits[job_class], free_workers)
+        total += jobs * subtask_limits[job_class]
+        free_workers -= jobs
+    return max(total, 1)
+
+
+def get_job_executor(max_workers: int, thread_name_prefix: str) -> DriveSubtaskExecutor | ThreadPoolExecutor:
+    """Return an executor for the threads a blocking Drive job fans out to.
+
+    In a job of the scheduler the sub-tasks run on its sub-task threads, within the sub-task limit
+    of the class of the job, which may be below `max_workers`. Outside of the scheduler (e.g. in
+    Home Assistant's executor) a private thread pool of `max_workers` threads is used.
+    """
+    context: DriveJobContext | None = getattr(_current_job, "context", None)
+    if context is None:
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+
+    return context.create_executor(max_workers)
+
+
+async def async_run_drive_job(hass,
+                              job_scheduler: DriveJobScheduler | None,
+                              job_class: str,
+                              target: Callable[..., Any],
+                              *args,
+                              **kwargs) -> Any:
+    """Run a blocking Drive job on the scheduler of the config entry, or in Home Assistant's executor without one.
+
+    The entry-scoped objects (client pool, folder cache, ...) are passed to `target` as keyword arguments.
+    """
+    if kwargs:
+        target = partial(target, **kwargs)
+
+    if job_scheduler is None:
+        return await hass.async_add_executor_job(target, *args)
+
+    return await job_scheduler.async_run(job_class, target, *args)
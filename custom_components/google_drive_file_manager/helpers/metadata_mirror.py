@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+from .drive_query import UnsupportedQueryError, register_query_functions, translate_query
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+
+from ..const import MIRROR_QUERY_SYNC_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+# The file fields stored in the mirror, queries asking for other fields go to the Drive API
+MIRROR_FIELDS = (
+    "id",
+    "name",
+    "mimeType",
+    "parents",
+    "createdTime",
+    "modifiedTime",
+    "trashed",
+    "size",
+    "md5Checksum",
+    "webViewLink",
+    "webContentLink",
+)
+
+MIRROR_ORDER_BY = {
+    "modifiedTime desc": "files.modified_time DESC",
+    "name": "files.name COLLATE NOCASE",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    mime_type TEXT NOT NULL,
+    created_time TEXT,
+    modified_time TEXT,
+    trashed INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_name ON files (name);
+CREATE INDEX IF NOT EXISTS files_mime_type ON files (mime_type);
+CREATE INDEX IF NOT EXISTS files_created_time ON files (created_time);
+CREATE INDEX IF NOT EXISTS files_modified_time ON files (modified_time);
+CREATE TABLE IF NOT EXISTS parents (
+    file_id TEXT NOT NULL,
+    parent_id TEXT NOT NULL,
+    PRIMARY KEY (file_id, parent_id)
+);
+CREATE INDEX IF NOT EXISTS parents_parent_id ON parents (parent_id);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def upsert_files(connection: sqlite3.Connection, files: list[dict]) -> None:
+    """Insert or replace the metadata of files in a database with the mirror schema."""
+    connection.executemany(
+        "INSERT OR REPLACE INTO files (id, name, mime_type, created_time, modified_time, trashed, data) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (
+                file["id"],
+                file.get("name", ""),
+                file.get("mimeType", ""),
+                file.get("createdTime"),
+                file.get("modifiedTime"),
+                1 if file.get("trashed") else 0,
+                json.dumps(file),
+            )
+            for file in files
+        ],
+    )
+    connection.executemany("DELETE FROM parents WHERE file_id = ?", [(file["id"],) for file in files])
+    connection.executemany(
+        "INSERT OR IGNORE INTO parents (file_id, parent_id) VALUES (?, ?)",
+        [(file["id"], parent) for file in files for parent in file.get("parents", [])],
+    )
+
+
+def match_files(files: list[dict], query: str, root_id: str | None = None) -> set[str]:
+    """Return the IDs of the given files that match a Drive query, evaluated locally.
+
+    Raises:
+        UnsupportedQueryError: The query uses syntax outside the supported subset.
+    """
+    condition, params = translate_query(query, root_id)
+    if not files:
+        return set()
+
+    connection = sqlite3.connect(":memory:")
+    try:
+        register_query_functions(connection)
+        connection.executescript(SCHEMA)
+        upsert_files(connection, files)
+        return {row[0] for row in connection.execute(f"SELECT id FROM files WHERE {condition}", params)}
+    finally:
+        connection.close()
+
+
+class DriveMetadataMirror:
+    """Local SQLite copy of the metadata of all files in Drive, answering listing queries without the API.
+
+    The mirror is filled once with a full listing and then kept up to date with the Drive
+    Changes API: the page token of the changes feed is stored with the files, so after a
+    restart only the changes since the last sync are fetched. Until the first full listing
+    has completed the mirror is not ready and queries should go to the Drive API.
+
+    All methods are blocking and thread-safe, run them in the executor.
+    """
+
+    def __init__(self, database_path: str) -> None:
+        self._database_path = database_path
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._last_sync = 0.0
+        self._ready = False
+        self._root_id: str | None = None
+
+    @property
+    def ready(self) -> bool:
+        """Return True once the mirror holds a complete copy of the Drive metadata."""
+        return self._ready
+
+    def open(self) -> None:
+        """Open (and create) the database."""
+        connection = sqlite3.connect(self._database_path, check_same_thread=False)
+        register_query_functions(connection)
+        connection.executescript(SCHEMA)
+        with self._lock:
+            self._connection = connection
+            self._ready = self._get_state("page_token") is not None
+            self._root_id = self._get_state("root_id")
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    @staticmethod
+    def remove_database(database_path: str) -> None:
+        """Delete the database of a mirror that is no longer used."""
+        for path in (database_path, f"{database_path}-journal"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _get_state(self, key: str) -> str | None:
+        row = self._connection.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: str) -> None:
+        self._connection.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value))
+
+    def _upsert_files(self, files: list[dict]) -> None:
+        upsert_files(self._connection, files)
+
+    def _remove_files(self, file_ids: list[str]) -> None:
+        self._connection.executemany("DELETE FROM files WHERE id = ?", [(file_id,) for file_id in file_ids])
+        self._connection.executemany("DELETE FROM parents WHERE file_id = ?", [(file_id,) for file_id in file_ids])
+
+    def sync(self, drive) -> int:
+        """Bring the mirror up to date, with a full listing the first time and the changes feed afterwards.
+
+        Args:
+            drive: The Drive service.
+
+        Returns:
+            int: The number of files listed or changed.
+        """
+        with self._sync_lock:
+            if self._ready:
+                count = self._sync_changes(drive)
+            else:
+                count = self._full_sync(drive)
+            self._last_sync = time.monotonic()
+            return count
+
+    def sync_if_stale(self, drive) -> None:
+        """Sync the mirror unless it was synced less than MIRROR_QUERY_SYNC_INTERVAL seconds ago."""
+        if time.monotonic() - self._last_sync >= MIRROR_QUERY_SYNC_INTERVAL:
+            self.sync(drive)
+
+    def _full_sync(self, drive) -> int:
+        files_resource = drive.files()
+
+        # Take the page token before listing, so changes made during the listing are applied afterwards
+        page_token = drive.changes().getStartPageToken().execute()["startPageToken"]
+        root_id = files_resource.get(fileId="root", fields="id").execute()["id"]
+
+        with self._lock:
+            self._connection.execute("DELETE FROM files")
+            self._connection.execute("DELETE FROM parents")
+            self._connection.commit()
+
+        count = 0
+        list_page_token = None
+        while True:
+            response = files_resource.list(
+                fields=f"nextPageToken, files({','.join(MIRROR_FIELDS)})",
+                pageSize=1000,
+                pageToken=list_page_token,
+            ).execute()
+            files = response.get("files", [])
+
+            with self._lock:
+                self._upsert_files(files)
+                self._connection.commit()
+            count += len(files)
+
+            list_page_token = response.get("nextPageToken")
+            if not list_page_token:
+                break
+
+        with self._lock:
+            self._set_state("root_id", root_id)
+            self._set_state("page_token", page_token)
+            self._connection.commit()
+            self._root_id = root_id
+            self._ready = True
+
+        _LOGGER.info("Mirrored the metadata of %d Drive file(s)", count)
+
+        # Apply the changes made while listing
+        return count + self._sync_changes(drive)
+
+    def _sync_changes(self, drive) -> int:
+        changes_resource = drive.changes()
+        with self._lock:
+            page_token = self._get_state("page_token")
+
+        count = 0
+        while page_token:
+            response = changes_resource.list(
+                pageToken=page_token,
+                fields=f"nextPageToken, newStartPageToken, changes(fileId, removed, file({','.join(MIRROR_FIELDS)}))",
+                pageSize=1000,
+                includeRemoved=True,
+                spaces="drive",
+            ).execute()
+            changes = response.get("changes", [])
+
+            removed = [change["fileId"] for change in changes if change.get("removed") or "file" not in change]
+            updated = [change["file"] for change in changes if not change.get("removed") and "file" in change]
+            page_token = response.get("nextPageToken")
+            new_start_page_token = response.get("newStartPageToken")
+
+            # Store the changes together with the token, so an interrupted sync continues where it stopped
+            with self._lock:
+                self._remove_files(removed)
+                self._upsert_files(updated)
+                self._set_state("page_token", page_token or new_start_page_token)
+                self._connection.commit()
+            count += len(changes)
+
+            if not page_token:
+                break
+
+        if count:
+            _LOGGER.debug("Applied %d Drive change(s) to the metadata mirror", count)
+        return count
+
+    def list_files(self, query: str, fields: list[str], order_by: str, maximum_files: int = 0) -> list[dict]:
+        """Return the mirrored files matching a Drive query.
+
+        Args:
+            query (str): The Drive query.
+            fields (list[str]): The fields to return per file.
+            order_by (str): The sort order, 'modifiedTime desc' or 'name'.
+            maximum_files (int): (optional) The maximum number of files to return, 0 for all.
+
+        Returns:
+            list[dict]: The matching files with the requested fields.
+
+        Raises:
+            UnsupportedQueryError: The query, fields or order can't be answered from the mirror.
+        """
+        unsupported_fields = [field for field in fields if field not in MIRROR_FIELDS]
+        if unsupported_fields:
+            raise UnsupportedQueryError(f"Fields {', '.join(unsupported_fields)} are not mirrored")
+        if order_by not in MIRROR_ORDER_BY:
+            raise UnsupportedQueryError(f"Unsupported order '{order_by}'")
+
+        condition, params = translate_query(query, self._root_id)
+        sql = f"SELECT data FROM files WHERE {condition} ORDER BY {MIRROR_ORDER_BY[order_by]}"
+        if maximum_files:
+            sql += " LIMIT ?"
+            params.append(maximum_files)
+
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+
+        files = []
+        for (data,) in rows:
+            file = json.loads(data)
+            files.append({field: file[field] for field in fields if field in file})
+        return files
@@ -0,0 +1,112 @@
+from urllib3.exceptions import (
+    ConnectTimeoutError,
+    NewConnectionError,
+    ProtocolError,
+    TimeoutError as Urllib3TimeoutError,
+)
+
+import httplib2
+import urllib3
+from urllib.parse import urljoin
+
+from ..const import DRIVE_CONNECTION_POOL_SIZE, DRIVE_CONNECT_TIMEOUT, DRIVE_READ_TIMEOUT
+
+# Redirects that are followed, 308 is not: Drive answers resumable upload chunks with it
+REDIRECT_CODES = {301, 302, 303, 307}
+
+
+class ConnectionNotMadeError(ConnectionError):
+    """Raised when no connection to the server could be made, so the request was never sent."""
+
+
+class PooledHttp:
+    """Thread-safe replacement of httplib2.Http sending requests over a shared keep-alive connection pool.
+
+    Every httplib2.Http instance has its own connections, so each executor thread (and every
+    client built outside the pool) pays its own TCP and TLS handshakes to googleapis.com. This
+    class offers the request() interface googleapiclient and google-auth expect, but sends the
+    requests through a urllib3 pool whose connections are reused by all threads. Connection
+    errors are raised as the built-in ConnectionError and TimeoutError, like httplib2 does, so
+    they are retried the same way; a ConnectionNotMadeError tells that the request was never sent.
+    """
+
+    def __init__(self,
+                 max_connections: int = DRIVE_CONNECTION_POOL_SIZE,
+                 ca_certs: str | None = None) -> None:
+        """Initialize the transport.
+
+        Args:
+            max_connections (int): (optional) The maximum number of idle connections kept open per host.
+            ca_certs (str | None): (optional) The CA bundle to verify servers with, the one of httplib2 if not set.
+        """
+        self._pool = urllib3.PoolManager(
+            num_pools=4,
+            maxsize=max_connections,
+            block=False,
+            cert_reqs="CERT_REQUIRED",
+            ca_certs=ca_certs or httplib2.certs.where(),
+            timeout=urllib3.Timeout(connect=DRIVE_CONNECT_TIMEOUT, read=DRIVE_READ_TIMEOUT),
+        )
+
+    def request(self,
+                uri: str,
+                method: str = "GET",
+                body=None,
+                headers: dict | None = None,
+                redirections: int = httplib2.DEFAULT_MAX_REDIRECTS,
+                connection_type=None):
+        """Send a request and return the response like httplib2.Http.request.
+
+        Returns:
+            tuple[httplib2.Response, bytes]: The response headers and status, and the (decompressed) body.
+        """
+        while True:
+            try:
+                response = self._pool.urlopen(
+                    method,
+                    uri,
+                    body=body,
+                    headers=headers,
+                    redirect=False,
+                    retries=False,
+                    preload_content=True,
+                    decode_content=True,
+                )
+            except (NewConnectionError, ConnectTimeoutError) as e:
+                raise ConnectionNotMadeError(str(e)) from e
+            except Urllib3TimeoutError as e:
+                raise TimeoutError(str(e)) from e
+            except ProtocolError as e:
+                # E.g. the server closed a kept-alive connection while the request was sent
+                raise ConnectionError(str(e)) from e
+
+            content = response.data
+            location = response.headers.get("location")
+
+            if response.status in REDIRECT_CODES and location and redirections > 0 and method in ("GET", "HEAD"):
+                uri = urljoin(uri, location)
+                redirections -= 1
+                continue
+
+            return self._to_httplib2_response(response, content, uri), content
+
+    @staticmethod
+    def _to_httplib2_response(response, content: bytes, uri: str) -> httplib2.Response:
+        """Convert a urllib3 response to the httplib2 response googleapiclient reads."""
+        info = {key.lower(): value for key, value in response.headers.items()}
+        info["status"] = str(response.status)
+
+        # The body is already decompressed, describe it like httplib2 does
+        if "content-encoding" in info:
+            info["-content-encoding"] = info.pop("content-encoding")
+            info["content-length"] = str(len(content))
+
+        info.setdefault("content-location", uri)
+
+        result = httplib2.Response(info)
+        result.reason = response.reason
+        return result
+
+    def close(self) -> None:
+        """Close all connections of the pool, new requests open new ones."""
+        self._pool.clear()
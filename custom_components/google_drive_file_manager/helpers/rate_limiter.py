@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+from googleapiclient.errors import HttpError
+
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import asyncio
+import json
+import random
+import threading
+import time
+import logging
+
+from .pooled_http import ConnectionNotMadeError
+from ..const import (
+    API_REQUESTS_PER_SECOND,
+    API_REQUESTS_BURST,
+    API_MAX_RETRIES,
+    API_RETRY_BASE_DELAY,
+    API_RETRY_MAX_DELAY,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# HTTP statuses that are always worth retrying
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Reasons of a 403 response that mean a quota was exceeded, other 403s are permanent
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+
+# Network errors that are retried
+RETRYABLE_EXCEPTIONS = (ConnectionError, TimeoutError)
+
+# Network errors raised before the request reached Drive, the only ones non-idempotent requests are retried on
+NOT_SENT_EXCEPTIONS = (ConnectionNotMadeError, ConnectionRefusedError)
+
+# HTTP methods that can be sent twice without creating or changing anything twice
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "PATCH", "OPTIONS"}
+
+# Marker of each request in the multipart body of a batch request
+BATCH_PART_MARKER = b"Content-Type: application/http"
+
+
+def get_error_reasons(content: bytes | str) -> set[str]:
+    """Return the reasons of the errors in a Drive error response body."""
+    try:
+        error = json.loads(content).get("error", {})
+    except (ValueError, AttributeError):
+        return set()
+    if not isinstance(error, dict):
+        return set()
+    return {item.get("reason") for item in error.get("errors", []) if isinstance(item, dict)}
+
+
+def is_retryable_response(status: int, content: bytes | str) -> bool:
+    """Return True if a Drive response is a rate limit or server error that may succeed when retried."""
+    if status in RETRYABLE_STATUSES:
+        return True
+    return status == 403 and bool(get_error_reasons(content) & RATE_LIMIT_REASONS)
+
+
+def get_batch_size(body: bytes | str | None) -> int:
+    """Return the number of requests in the body of a batch request, at least 1."""
+    if not body:
+        return 1
+    if isinstance(body, str):
+        body = body.encode("utf-8", "replace")
+    return max(body.count(BATCH_PART_MARKER), 1)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Return the seconds to wait from a Retry-After header, given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max((moment - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class TokenBucket:
+    """Thread-safe token bucket, refilled with `rate` tokens per second up to `capacity`.
+
+    A caller that finds the bucket empty reserves the next token (the balance goes negative)
+    and sleeps until it is due, so waiting callers are served in order without busy waiting.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def reserve(self, tokens: int = 1) -> float:
+        """Take tokens without waiting for them.
+
+        Args:
+            tokens (int): (optional) The number of tokens to take, 1 by default.
+
+        Returns:
+            float: The number of seconds until the tokens are due, the caller has to wait that long.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            return -self._tokens / self._rate if self._tokens < 0 else 0.0
+
+    def acquire(self, tokens: int = 1) -> float:
+        """Take tokens, blocking until they are available.
+
+        Args:
+            tokens (int): (optional) The number of tokens to take, 1 by default.
+
+        Returns:
+            float: The number of seconds waited.
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """Empty the bucket so that no token is handed out for the next `seconds` seconds."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -seconds * self._rate)
+
+
+class DriveRateLimiter:
+    """Rate limit and retry policy shared by all Drive requests of a config entry (one Google account).
+
+    Every request takes a token from a token bucket (a batch request one per request it
+    contains), smoothing bursts of parallel automations to API_REQUESTS_PER_SECOND. Rate limit (429, 403 rateLimitExceeded) and server errors are
+    retried with exponential backoff and jitter, honouring the Retry-After header; a rate limit
+    error also pauses the bucket, so the other requests of the account back off as well.
+    The counters are reported by stats().
+    """
+
+    def __init__(self,
+                 requests_per_second: float = API_REQUESTS_PER_SECOND,
+                 burst: int = API_REQUESTS_BURST,
+                 max_retries: int = API_MAX_RETRIES,
+                 base_delay: float = API_RETRY_BASE_DELAY,
+                 max_delay: float = API_RETRY_MAX_DELAY) -> None:
+        self._bucket = TokenBucket(requests_per_second, burst)
+        self.max_retries = max_retries
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "throttled_requests": 0,
+            "throttled_seconds": 0.0,
+            "retries": 0,
+            "rate_limit_errors": 0,
+            "server_errors": 0,
+            "failed_after_retries": 0,
+        }
+
+    def acquire(self, requests: int = 1) -> None:
+        """Wait for the tokens of a request, or of the `requests` requests of a batch."""
+        self._record_request(self._bucket.acquire(requests), requests)
+
+    async def async_acquire(self, requests: int = 1) -> None:
+        """Wait for the tokens of a request (or batch) without blocking the event loop."""
+        waited = self._bucket.reserve(requests)
+        if waited > 0:
+            await asyncio.sleep(waited)
+        self._record_request(waited, requests)
+
+    def _record_request(self, waited: float, requests: int = 1) -> None:
+        with self._lock:
+            self._stats["requests"] += requests
+            if waited > 0:
+                self._stats["throttled_requests"] += 1
+                self._stats["throttled_seconds"] += waited
+
+    def get_retry_delay(self, attempt: int, status: int | None = None, retry_after: float | None = None) -> float | None:
+        """Record a failed attempt and return the seconds to wait before the next one.
+
+        Args:
+            attempt (int): The number of the retry that is about to be made, starting at 1.
+            status (int | None): (optional) The HTTP status of the failed attempt, None for network errors.
+            retry_after (float | None): (optional) The seconds requested by the Retry-After header.
+
+        Returns:
+            float | None: The delay in seconds, or None when the retries are exhausted.
+        """
+        with self._lock:
+            if status in (403, 429):
+                self._stats["rate_limit_errors"] += 1
+            elif status is not None:
+                self._stats["server_errors"] += 1
+
+            if attempt > self.max_retries:
+                self._stats["failed_after_retries"] += 1
+                return None
+            self._stats["retries"] += 1
+
+        if retry_after is not None:
+            delay = retry_after
+        else:
+            delay = min(self._base_delay * 2 ** (attempt - 1), self._max_delay)
+            delay += random.uniform(0, self._base_delay)
+
+        # Slow down every request of the account, not only the one that hit the quota
+        if status in (403, 429):
+            self._bucket.pause(delay)
+
+        return delay
+
+    def get_retry_delay_for_error(self, error: Exception, attempt: int) -> float | None:
+        """Return the seconds to wait before retrying after an exception, None if it should not be retried."""
+        if isinstance(error, HttpError):
+            if not is_retryable_response(error.resp.status, error.content):
+                return None
+            return self.get_retry_delay(attempt, error.resp.status, parse_retry_after(error.resp.get("retry-after")))
+
+        if isinstance(error, RETRYABLE_EXCEPTIONS):
+            return self.get_retry_delay(attempt)
+
+        return None
+
+    def stats(self) -> dict:
+        """Return a copy of the request, throttle and retry counters."""
+        with self._lock:
+            return {**self._stats, "throttled_seconds": round(self._stats["throttled_seconds"], 1)}
+
+
+class RateLimitedHttp:
+    """Wraps the (authorized) httplib2 client of a Drive service with the rate limiter of the account.
+
+    Requests are retried here, except the chunks of resumable uploads: after a failed chunk the
+    upload has to ask Drive which bytes arrived and resume from there, which the upload loop does.
+    A POST (files.create, copy, multipart uploads, batches) may have been carried out when the
+    connection broke or the server failed, so it is only retried when it never reached Drive or
+    was rejected by a rate limit. All other attributes are passed through to the wrapped client.
+    """
+
+    def __init__(self, http, rate_limiter: DriveRateLimiter) -> None:
+        self._http = http
+        self._rate_limiter = rate_limiter
+
+    def request(self, uri: str, method: str = "GET", *args, **kwargs):
+        resumable_chunk = method == "PUT" and "upload_id=" in uri
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        requests = get_batch_size(kwargs.get("body", args[0] if args else None)) if "/batch/" in uri else 1
+        attempt = 0
+
+        while True:
+            self._rate_limiter.acquire(requests)
+            attempt += 1
+
+            try:
+                response, content = self._http.request(uri, method, *args, **kwargs)
+            except RETRYABLE_EXCEPTIONS as e:
+                retry = not resumable_chunk and (idempotent or isinstance(e, NOT_SENT_EXCEPTIONS))
+                delay = self._rate_limiter.get_retry_delay(attempt) if retry else None
+                if delay is None:
+                    raise
+                _LOGGER.debug("Drive request %s %s failed (%s), retrying in %.1f s", method, uri, e, delay)
+            else:
+                if resumable_chunk or not is_retryable_response(response.status, content):
+                    return response, content
+
+                # A server error may come after a non-idempotent request was carried out
+                if not idempotent and response.status not in (403, 429):
+                    return response, content
+
+                delay = self._rate_limiter.get_retry_delay(
+                    attempt, response.status, parse_retry_after(response.get("retry-after"))
+                )
+                if delay is None:
+                    return response, content
+                _LOGGER.debug(
+                    "Drive request %s %s returned %s, retrying in %.1f s", method, uri, response.status, delay
+                )
+
+            time.sleep(delay)
+
+    def __getattr__(self, name: str):
+        return getattr(self._http, name)
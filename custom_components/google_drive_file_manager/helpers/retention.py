@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from homeassistant.util import dt as dt_util
+
+import fnmatch
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta
+from typing import Any, NamedTuple
+
+from ..const import FOLDER_MIME_TYPE
+
+# The GFS tiers of a rule and the bucket of a (local) creation time they keep one file of
+RETENTION_TIERS: dict[str, Callable[[datetime], Any]] = {
+    "keep_daily": lambda created: created.date(),
+    "keep_weekly": lambda created: created.isocalendar()[:2],
+    "keep_monthly": lambda created: (created.year, created.month),
+    "keep_yearly": lambda created: created.year,
+}
+
+
+class RetentionRule(NamedTuple):
+    """A named retention rule of apply_retention_policy."""
+
+    name: str
+    name_pattern: str | None
+    folder_id: str | None
+    keep_last: int
+    keep_within_days: int
+    tiers: dict[str, int]
+    max_total_size: int | None
+
+    @classmethod
+    def from_config(cls, config: dict, folder_id: str | None = None) -> RetentionRule:
+        """Create a rule from its service data, with the resolved ID of its 'remote_folder_path'."""
+        max_total_size_mb = config.get("max_total_size_mb")
+        return cls(
+            config["name"],
+            config.get("name_pattern") or None,
+            folder_id,
+            config.get("keep_last", 0),
+            config.get("keep_within_days", 0),
+            {tier: config.get(tier, 0) for tier in RETENTION_TIERS},
+            max_total_size_mb * 1024 * 1024 if max_total_size_mb is not None else None,
+        )
+
+    @property
+    def keeps_by_count(self) -> bool:
+        """Return whether the rule keeps files by count or age, otherwise it only limits the total size."""
+        return bool(self.keep_last or self.keep_within_days or any(self.tiers.values()))
+
+
+class RetainedFile(NamedTuple):
+    """A file of the listing, with what the retention rules need to know about it."""
+
+    created: datetime
+    size: int
+    parents: tuple[str, ...]
+    file: dict
+
+
+class RetentionPolicy:
+    """Evaluates several retention rules against a single listing of Drive files.
+
+    The listing is added page by page, files and folders alike: folders are only used to know
+    which files are in (a subfolder of) the folder of a rule. Once the listing is complete, each
+    rule sorts its files from new to old and keeps:
+
+    - the `keep_last` newest files,
+    - the files created within `keep_within_days` days,
+    - for every tier (`keep_daily`, `keep_weekly`, `keep_monthly`, `keep_yearly`) the newest file of
+      each of that many most recent days, ISO weeks, months or years that have files,
+    - or all files when none of the above is set.
+
+    When `max_total_size` is set, the kept files are then limited to the newest ones whose
+    total size stays within it. All other files of a rule are expired. A file matched by
+    several rules is expired when any of them expires it.
+    """
+
+    def __init__(self, rules: list[RetentionRule], now: datetime | None = None) -> None:
+        self._rules = rules
+        self._now = now or dt_util.utcnow()
+        self._folder_parents: dict[str, tuple[str, ...]] = {}
+        self._files: list[RetainedFile] = []
+        self._ancestors: dict[str, frozenset[str]] = {}
+
+    def add(self, items: Iterable[dict]) -> None:
+        """Add a page of the listing, each item with at least 'id', 'name', 'mimeType', 'parents' and 'createdTime'."""
+        for item in items:
+            parents = tuple(item.get("parents", ()))
+            if item.get("mimeType") == FOLDER_MIME_TYPE:
+                self._folder_parents[item["id"]] = parents
+            else:
+                self._files.append(RetainedFile(
+                    dt_util.as_local(dt_util.parse_datetime(item["createdTime"])),
+                    int(item.get("size", 0)),
+                    parents,
+                    item,
+                ))
+
+    def _get_ancestors(self, folder_id: str) -> frozenset[str]:
+        """Return the folder and all folders above it, as far as they are in the listing."""
+        ancestors = self._ancestors.get(folder_id)
+        if ancestors is not None:
+            return ancestors
+
+        # Walk up without recursion, Drive folder trees can be deep
+        chain = []
+        current = folder_id
+        while current is not None and current not in self._ancestors and current not in chain:
+            chain.append(current)
+            parents = self._folder_parents.get(current, ())
+            current = parents[0] if parents else None
+
+        above = self._ancestors.get(current, frozenset()) if current is not None else frozenset()
+        for folder in reversed(chain):
+            above = above | {folder}
+            self._ancestors[folder] = above
+
+        return self._ancestors[folder_id]
+
+    def _matches(self, rule: RetentionRule, retained: RetainedFile) -> bool:
+        if rule.name_pattern and not fnmatch.fnmatchcase(retained.file["name"], rule.name_pattern):
+            return False
+        if rule.folder_id and not any(rule.folder_id in self._get_ancestors(parent) for parent in retained.parents):
+            return False
+        return True
+
+    def _keep(self, rule: RetentionRule, files: list[RetainedFile]) -> set[str]:
+        """Return the IDs of the files (sorted from new to old) that a rule keeps."""
+        if not rule.keeps_by_count:
+            kept = {retained.file["id"] for retained in files}
+        else:
+            kept = {retained.file["id"] for retained in files[:rule.keep_last]}
+
+            if rule.keep_within_days:
+                cutoff = self._now - timedelta(days=rule.keep_within_days)
+                kept.update(retained.file["id"] for retained in files if retained.created >= cutoff)
+
+            for tier, count in rule.tiers.items():
+                bucket_of = RETENTION_TIERS[tier]
+                buckets = set()
+                for retained in files:
+                    if len(buckets) >= count:
+                        break
+                    bucket = bucket_of(retained.created)
+                    if bucket not in buckets:
+                        buckets.add(bucket)
+                        kept.add(retained.file["id"])
+
+        if rule.max_total_size is not None:
+            total_size = 0
+            for retained in files:
+                if retained.file["id"] not in kept:
+                    continue
+                total_size += retained.size
+                if total_size > rule.max_total_size:
+                    kept.discard(retained.file["id"])
+
+        return kept
+
+    def evaluate(self) -> tuple[dict[str, dict], list[dict]]:
+        """Apply the rules to the listed files.
+
+        Returns:
+            tuple[dict[str, dict], list[dict]]: Per rule name the number of 'matched' and 'kept' files,
+            the 'expired' files and their total 'expired_size', and the union of all expired files.
+        """
+        results = {}
+        expired_ids: dict[str, dict] = {}
+
+        for rule in self._rules:
+            files = sorted(
+                (retained for retained in self._files if self._matches(rule, retained)),
+                key=lambda retained: retained.created,
+                reverse=True,
+            )
+            kept = self._keep(rule, files)
+            expired = [retained for retained in files if retained.file["id"] not in kept]
+
+            results[rule.name] = {
+                "matched": len(files),
+                "kept": len(kept),
+                "expired": [retained.file for retained in expired],
+                "expired_size": sum(retained.size for retained in expired),
+            }
+            for retained in expired:
+                expired_ids.setdefault(retained.file["id"], retained.file)
+
+        return results, list(expired_ids.values())
@@ -1,18 +1,112 @@
 import voluptuous as vol
 from homeassistant.helpers import config_validation as cv
 
-# Define schemas for each service
-SCHEMAS = {
-    "upload_media_file": vol.Schema({
-        vol.Required("local_file_path"): cv.string,
-        vol.Optional("mime_type", default =""): cv.string,
-        vol.Optional("remote_file_name", default =""): cv.string,
+from ..const import ARCHIVE_FORMATS, UPLOAD_DEFAULT_PARALLEL_UPLOADS
+
+
+def unique_rule_names(rules: list[dict]) -> list[dict]:
+    """Validate that the retention rules have different names, as the results are reported per name."""
+    names = [rule["name"] for rule in rules]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise vol.Invalid(f"Duplicate retention rule names: {', '.join(duplicates)}")
+    return rules
+
+
+def rule_selects_files(rule: dict) -> dict:
+    """Validate that a retention rule selects its files, a rule without a pattern or folder would apply to the whole Drive."""
+    if not rule["name_pattern"] and not rule["remote_folder_path"].strip("/"):
+        raise vol.Invalid(f"Retention rule '{rule['name']}' needs a name_pattern or a remote_folder_path")
+    return rule
+
+
+def folder_below_root(path: str) -> str:
+    """Validate that a folder path is not the root, for services that remove everything matching below it."""
+    if not path.strip("/"):
+        raise vol.Invalid("The remote_folder_path cannot be the root of the Drive")
+    return path
+
+
+def skip_if_identical_for_local_file(config: dict) -> dict:
+    """Validate that skip_if_identical is only set for a local file, other sources have no checksum before they are uploaded."""
+    if config["skip_if_identical"] and not config.get("local_file_path"):
+        raise vol.Invalid("skip_if_identical is only supported when uploading a local_file_path")
+    return config
+
+
+# A rule of apply_retention_policy, keeping files by count, age or GFS tier and/or within a total size
+RETENTION_RULE_SCHEMA = vol.All(
+    cv.has_at_least_one_key(
+        "keep_last", "keep_within_days", "keep_daily", "keep_weekly", "keep_monthly", "keep_yearly",
+        "max_total_size_mb",
+    ),
+    vol.Schema({
+        vol.Required("name"): cv.string,
+        vol.Optional("name_pattern", default=""): cv.string,
         vol.Optional("remote_folder_path", default=""): cv.string,
-        vol.Optional("append_ymd_path", default=False): cv.boolean,
-        vol.Optional("save_to_sensor", default=False): cv.boolean,
-        vol.Optional("sensor_name", default="Latest uploaded file"): cv.string,
-        vol.Optional("fields", default="id,name,webViewLink,webContentLink"): cv.string,
+        vol.Optional("keep_last"): cv.positive_int,
+        vol.Optional("keep_within_days"): cv.positive_int,
+        vol.Optional("keep_daily"): cv.positive_int,
+        vol.Optional("keep_weekly"): cv.positive_int,
+        vol.Optional("keep_monthly"): cv.positive_int,
+        vol.Optional("keep_yearly"): cv.positive_int,
+        vol.Optional("max_total_size_mb"): cv.positive_int,
     }),
+    rule_selects_files,
+)
+
+# Define schemas for each service
+SCHEMAS = {
+    "upload_media_file": vol.All(
+        cv.has_at_least_one_key("local_file_path", "camera_entity_id", "url", "media_content_id"),
+        vol.Schema({
+            vol.Exclusive("local_file_path", "source"): cv.string,
+            vol.Exclusive("camera_entity_id", "source"): cv.entity_domain("camera"),
+            vol.Exclusive("url", "source"): cv.url,
+            vol.Exclusive("media_content_id", "source"): cv.string,
+            vol.Optional("mime_type", default =""): cv.string,
+            vol.Optional("remote_file_name", default =""): cv.string,
+            vol.Optional("remote_folder_path", default=""): cv.string,
+            vol.Optional("append_ymd_path", default=False): cv.boolean,
+            vol.Optional("skip_if_identical", default=False): cv.boolean,
+            vol.Optional("save_to_sensor", default=False): cv.boolean,
+            vol.Optional("sensor_name", default="Latest uploaded file"): cv.string,
+            vol.Optional("fields", default="id,name,webViewLink,webContentLink"): cv.string,
+            vol.Optional("queued", default=False): cv.boolean,
+            vol.Optional("queue_priority", default=0): vol.Coerce(int),
+        }),
+        skip_if_identical_for_local_file,
+    ),
+    "upload_media_files": vol.All(
+        cv.has_at_least_one_key("local_file_paths", "local_file_pattern"),
+        vol.Schema({
+            vol.Optional("local_file_paths", default=[]): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional("local_file_pattern", default=""): cv.string,
+            vol.Optional("remote_folder_path", default=""): cv.string,
+            vol.Optional("append_ymd_path", default=False): cv.boolean,
+            vol.Optional("skip_if_identical", default=False): cv.boolean,
+            vol.Optional("max_parallel_uploads", default=UPLOAD_DEFAULT_PARALLEL_UPLOADS): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=16)
+            ),
+            vol.Optional("save_to_sensor", default=False): cv.boolean,
+            vol.Optional("sensor_name", default="Latest uploaded files"): cv.string,
+            vol.Optional("fields", default="id,name,webViewLink,webContentLink"): cv.string,
+        }),
+    ),
+    "upload_archive": vol.All(
+        cv.has_at_least_one_key("local_file_paths", "local_file_pattern"),
+        vol.Schema({
+            vol.Optional("local_file_paths", default=[]): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional("local_file_pattern", default=""): cv.string,
+            vol.Optional("remote_file_name", default=""): cv.string,
+            vol.Optional("remote_folder_path", default=""): cv.string,
+            vol.Optional("append_ymd_path", default=False): cv.boolean,
+            vol.Optional("compression", default="none"): vol.In(list(ARCHIVE_FORMATS)),
+            vol.Optional("save_to_sensor", default=False): cv.boolean,
+            vol.Optional("sensor_name", default="Latest uploaded archive"): cv.string,
+            vol.Optional("fields", default="id,name,webViewLink,webContentLink"): cv.string,
+        }),
+    ),
     "cleanup_older_files_by_pattern": vol.Schema({
         vol.Required("pattern"): cv.string,
         vol.Required("days_ago"): cv.positive_int,
@@ -21,11 +115,70 @@ SCHEMAS = {
         vol.Optional("sensor_name", default="Latest deleted files"): cv.string,
         vol.Optional("fields", default="id,name,createdTime"): cv.string,
     }),
+    "cleanup_older_date_folders": vol.Schema({
+        vol.Required("remote_folder_path"): vol.All(cv.string, folder_below_root),
+        vol.Required("days_ago"): cv.positive_int,
+        vol.Optional("trash", default=True): cv.boolean,
+        vol.Optional("preview", default=False): cv.boolean,
+        vol.Optional("save_to_sensor", default=False): cv.boolean,
+        vol.Optional("sensor_name", default="Latest deleted folders"): cv.string,
+    }),
+    "apply_retention_policy": vol.Schema({
+        vol.Required("rules"): vol.All(cv.ensure_list, vol.Length(min=1), [RETENTION_RULE_SCHEMA], unique_rule_names),
+        vol.Optional("query", default=""): cv.string,
+        vol.Optional("trash", default=True): cv.boolean,
+        vol.Optional("preview", default=False): cv.boolean,
+        vol.Optional("save_to_sensor", default=False): cv.boolean,
+        vol.Optional("sensor_name", default="Latest retention policy"): cv.string,
+        vol.Optional("fields", default="id,name,createdTime,size"): cv.string,
+    }),
     "list_files_by_pattern": vol.Schema({
         vol.Required("query"): cv.string,
+        vol.Optional("save_to_sensor", default=True): cv.boolean,
         vol.Optional("sensor_name", default="List files"): cv.string,
         vol.Optional("fields", default="id,name,createdTime"): cv.string,
         vol.Optional("sort_by_recent", default=True): cv.boolean,
         vol.Optional("maximum_files", default=0): cv.positive_int,
     }),
+    "merge_duplicate_folders": vol.Schema({
+        vol.Optional("remote_folder_path", default=""): cv.string,
+        vol.Optional("preview", default=False): cv.boolean,
+        vol.Optional("save_to_sensor", default=False): cv.boolean,
+        vol.Optional("sensor_name", default="Merged duplicate folders"): cv.string,
+    }),
+    "sync_folder": vol.Schema({
+        vol.Required("local_folder_path"): cv.string,
+        vol.Optional("remote_folder_path", default=""): cv.string,
+        vol.Optional("delete_orphans", default=False): cv.boolean,
+        vol.Optional("full_scan", default=False): cv.boolean,
+        vol.Optional("max_parallel_uploads", default=UPLOAD_DEFAULT_PARALLEL_UPLOADS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=16)
+        ),
+        vol.Optional("save_to_sensor", default=False): cv.boolean,
+        vol.Optional("sensor_name", default="Synced folder"): cv.string,
+    }),
+    "download_file": vol.All(
+        cv.has_at_least_one_key("file_id", "remote_file_path"),
+        vol.Schema({
+            vol.Exclusive("file_id", "downloaded_file"): cv.string,
+            vol.Exclusive("remote_file_path", "downloaded_file"): cv.string,
+            vol.Required("local_file_path"): cv.string,
+            vol.Optional("overwrite", default=False): cv.boolean,
+            vol.Optional("resume", default=True): cv.boolean,
+            vol.Optional("max_parallel_ranges", default=1): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
+            vol.Optional("save_to_sensor", default=False): cv.boolean,
+            vol.Optional("sensor_name", default="Latest downloaded file"): cv.string,
+        }),
+    ),
+    "add_change_watch": vol.All(
+        cv.has_at_least_one_key("remote_folder_path", "query"),
+        vol.Schema({
+            vol.Required("watch_id"): cv.string,
+            vol.Exclusive("remote_folder_path", "watched_files"): cv.string,
+            vol.Exclusive("query", "watched_files"): cv.string,
+        }),
+    ),
+    "remove_change_watch": vol.Schema({
+        vol.Required("watch_id"): cv.string,
+    }),
 }
\ No newline at end of file
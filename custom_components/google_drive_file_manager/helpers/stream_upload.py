@@ -0,0 +1,183 @@
+from googleapiclient.http import MediaUpload
+
+import asyncio
+import threading
+
+from ..const import STREAM_PIPE_BUFFER_SIZE
+
+
+class StreamClosedError(Exception):
+    """Raised when writing to a pipe of which the reader stopped reading."""
+
+
+class StreamSourceError(Exception):
+    """Raised when reading from a pipe of which the producer failed."""
+
+
+class BoundedPipe:
+    """Thread-safe byte pipe between a producer thread and the upload reading from it.
+
+    At most `max_buffered_bytes` are held; the producer blocks until the upload has sent
+    earlier bytes, so the memory used does not depend on the size of the produced data.
+    A producer in the event loop uses async_write, which waits for free space without holding
+    a thread. A producer error is raised in the reader as a StreamSourceError, and the producer
+    gets a StreamClosedError when the reader gives up (e.g. the upload failed).
+    """
+
+    def __init__(self, max_buffered_bytes: int = STREAM_PIPE_BUFFER_SIZE) -> None:
+        self._max_buffered_bytes = max_buffered_bytes
+        self._buffer = bytearray()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._cancelled = False
+        self._error: BaseException | None = None
+        self._async_writers: list[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+    def _notify(self) -> None:
+        """Wake up the waiting readers and writers, called with the condition held."""
+        self._condition.notify_all()
+        for loop, event in self._async_writers:
+            loop.call_soon_threadsafe(event.set)
+        self._async_writers.clear()
+
+    def write(self, data: bytes) -> int:
+        """Append data to the pipe, blocking while it is full (producer side)."""
+        view = memoryview(data)
+        with self._condition:
+            while view:
+                self._condition.wait_for(
+                    lambda: self._cancelled or len(self._buffer) < self._max_buffered_bytes
+                )
+                if self._cancelled:
+                    raise StreamClosedError("The reader of the pipe stopped reading")
+
+                free = self._max_buffered_bytes - len(self._buffer)
+                self._buffer += view[:free]
+                view = view[free:]
+                self._notify()
+        return len(data)
+
+    async def async_write(self, data: bytes) -> int:
+        """Append data to the pipe from the event loop, waiting while it is full (producer side)."""
+        loop = asyncio.get_running_loop()
+        view = memoryview(data)
+        while view:
+            space = asyncio.Event()
+            with self._condition:
+                if self._cancelled:
+                    raise StreamClosedError("The reader of the pipe stopped reading")
+
+                free = self._max_buffered_bytes - len(self._buffer)
+                if free > 0:
+                    self._buffer += view[:free]
+                    view = view[free:]
+                    self._notify()
+                    continue
+
+                # Woken up by the next read or cancel
+                self._async_writers.append((loop, space))
+            await space.wait()
+        return len(data)
+
+    def flush(self) -> None:
+        """Nothing to flush, written data is available to the reader right away."""
+
+    def close(self) -> None:
+        """Mark the end of the data (producer side)."""
+        with self._condition:
+            self._closed = True
+            self._notify()
+
+    def fail(self, error: BaseException) -> None:
+        """End the data with an error that is raised in the reader (producer side)."""
+        with self._condition:
+            self._error = error
+            self._closed = True
+            self._notify()
+
+    def cancel(self) -> None:
+        """Stop reading, making the producer's next write fail (reader side)."""
+        with self._condition:
+            self._cancelled = True
+            self._buffer.clear()
+            self._notify()
+
+    def read(self, size: int = -1) -> bytes:
+        """Return up to `size` bytes, blocking until data is available; b'' at the end (reader side)."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._buffer or self._closed)
+            if self._error is not None:
+                # A distinct type, so the upload doesn't mistake e.g. a failed download for a retryable error of its own
+                raise StreamSourceError(f"Producing the uploaded data failed: {self._error}") from self._error
+
+            size = len(self._buffer) if size < 0 else min(size, len(self._buffer))
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            self._notify()
+            return data
+
+
+class StreamMediaUpload(MediaUpload):
+    """Resumable media upload reading from a non-seekable stream of unknown size.
+
+    Only the bytes from the last acknowledged byte to the end of the current chunk are held
+    in memory: Drive may ask to resend from the last acknowledged byte after a failed chunk,
+    bytes before it are never asked for again. The size is reported once the stream ended.
+    """
+
+    def __init__(self, stream, mimetype: str, chunk_size: int, initial_bytes: bytes = b"") -> None:
+        """Initialize the upload.
+
+        Args:
+            stream: Object with a read(size) method returning b'' at the end of the data.
+            mimetype (str): The MIME type of the uploaded file.
+            chunk_size (int): The size of the chunks, a multiple of 256 KiB (can be changed between chunks).
+            initial_bytes (bytes): (optional) Bytes already read from the stream, uploaded first.
+        """
+        super().__init__()
+        self._stream = stream
+        self._mimetype = mimetype
+        self.chunk_size = chunk_size
+        self._buffer = bytearray(initial_bytes)
+        self._buffer_start = 0
+        self._ended = False
+        self._last_chunk = False
+
+    def chunksize(self) -> int:
+        # next_chunk only sends the total size with a chunk shorter than the chunk size. When the stream
+        # ends exactly at the end of a chunk, report a larger chunk size so that chunk is the last one.
+        return self.chunk_size + 1 if self._last_chunk else self.chunk_size
+
+    def mimetype(self) -> str:
+        return self._mimetype
+
+    def size(self) -> int | None:
+        return self._buffer_start + len(self._buffer) if self._ended else None
+
+    def resumable(self) -> bool:
+        return True
+
+    def has_stream(self) -> bool:
+        return False
+
+    def getbytes(self, begin: int, length: int) -> bytes:
+        """Return `length` bytes from offset `begin`, reading ahead one byte to detect the end of the stream."""
+        if begin < self._buffer_start:
+            raise ValueError(f"Cannot go back to byte {begin} of the stream, it is at {self._buffer_start}")
+
+        # Drive acknowledged everything before `begin`, it is never needed again
+        del self._buffer[:begin - self._buffer_start]
+        self._buffer_start = begin
+
+        while not self._ended and len(self._buffer) <= length:
+            data = self._stream.read(length + 1 - len(self._buffer))
+            if data:
+                self._buffer += data
+            else:
+                self._ended = True
+
+        self._last_chunk = self._ended and len(self._buffer) <= length
+        return bytes(self._buffer[:length])
+
+    def to_json(self) -> str:
+        raise NotImplementedError("A stream upload cannot be serialized")
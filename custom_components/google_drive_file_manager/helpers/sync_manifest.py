@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.storage import Store
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import NamedTuple
+import threading
+import logging
+
+from ..const import DOMAIN, SYNC_MANIFEST_SAVE_DELAY, SYNC_MANIFEST_STORAGE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_sync_manifest_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """Return the storage of the sync_folder manifests of a config entry."""
+    return Store(hass, SYNC_MANIFEST_STORAGE_VERSION, f"{DOMAIN}.sync_manifest.{entry_id}")
+
+
+class SyncedFile(NamedTuple):
+    """A local file as it was last uploaded by sync_folder."""
+
+    size: int
+    mtime_ns: int
+    file_id: str
+    md5: str | None
+
+
+class SyncManifest:
+    """Persisted record of the files sync_folder uploaded, per local folder and Drive folder pair.
+
+    For every synced file the manifest holds the size and modification time the local file had
+    when it was uploaded, with the ID and MD5 checksum of the Drive file. A later sync only has
+    to stat the local files: files with an unchanged size and modification time are skipped
+    without looking at Drive or reading them.
+
+    Manifests are loaded on first use, because large trees make them too big to load at startup.
+    """
+
+    def __init__(self, hass: HomeAssistant | None = None, store: Store | None = None) -> None:
+        self._hass = hass
+        self._store = store
+        self._syncs: dict[str, dict[str, SyncedFile]] = {}
+        self._running: set[str] = set()
+        self._loaded = store is None
+        self._lock = threading.Lock()
+
+    async def async_load(self) -> None:
+        """Load the manifests from storage, once."""
+        if self._loaded:
+            return
+
+        data = await self._store.async_load() or {}
+        with self._lock:
+            self._syncs = {
+                sync_key: {path: SyncedFile(*values) for path, values in files.items()}
+                for sync_key, files in data.get("syncs", {}).items()
+            }
+            self._loaded = True
+
+        _LOGGER.debug("Loaded %d sync_folder manifest(s)", len(self._syncs))
+
+    @staticmethod
+    def get_sync_key(local_folder_path: str, remote_folder_path: str) -> str:
+        """Return the key of the manifest of a local folder synced to a Drive folder."""
+        return f"{local_folder_path.rstrip('/')}|{remote_folder_path.strip('/')}"
+
+    @contextmanager
+    def running(self, sync_key: str) -> Iterator[None]:
+        """Hold a sync of a folder pair, raising when the same pair is already being synced."""
+        with self._lock:
+            if sync_key in self._running:
+                raise HomeAssistantError(f"A sync of '{sync_key.replace('|', ' to ')}' is already running")
+            self._running.add(sync_key)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._running.discard(sync_key)
+
+    def get_files(self, sync_key: str) -> dict[str, SyncedFile]:
+        """Return a copy of the synced files of a folder pair by relative path."""
+        with self._lock:
+            return dict(self._syncs.get(sync_key, {}))
+
+    def set_files(self, sync_key: str, files: dict[str, SyncedFile]) -> None:
+        """Replace the synced files of a folder pair."""
+        with self._lock:
+            self._syncs[sync_key] = dict(files)
+        self._schedule_save()
+
+    def _data_to_save(self) -> dict:
+        with self._lock:
+            return {
+                "syncs": {
+                    sync_key: {path: list(synced_file) for path, synced_file in files.items()}
+                    for sync_key, files in self._syncs.items()
+                }
+            }
+
+    def _schedule_save(self) -> None:
+        """Schedule a delayed write of the manifests, callable from any thread."""
+        if self._store is None:
+            return
+        self._hass.loop.call_soon_threadsafe(
+            self._store.async_delay_save, self._data_to_save, SYNC_MANIFEST_SAVE_DELAY
+        )
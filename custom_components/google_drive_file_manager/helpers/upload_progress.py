@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+
+from .create_sensor import async_create_or_update_sensor
+
+import threading
+import time
+import uuid
+import logging
+
+from ..const import UPLOAD_PROGRESS_INTERVAL, UPLOAD_PROGRESS_SENSOR_NAME
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class UploadProgressTracker:
+    """Publishes the progress of the running resumable uploads of a config entry to a sensor.
+
+    Uploads report their progress from executor threads after every chunk. The tracker keeps
+    the state of every active upload and writes the sensor through the event loop, at most
+    once every UPLOAD_PROGRESS_INTERVAL seconds so large uploads don't flood the state machine.
+    The sensor state is the overall percentage of the active uploads, or 'idle'. Streamed uploads
+    have no total size until they end, they only count towards the bytes sent.
+    """
+
+    def __init__(self, hass: HomeAssistant, sensor_name: str = UPLOAD_PROGRESS_SENSOR_NAME) -> None:
+        self._hass = hass
+        self._sensor_name = sensor_name
+        self._uploads: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._last_published = 0.0
+
+    def start(self, file_name: str, total_bytes: int | None) -> str:
+        """Register a new upload and return its ID, `total_bytes` is None if the size is not known."""
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self._uploads[upload_id] = {
+                "file_name": file_name,
+                "total_bytes": total_bytes,
+                "bytes_sent": 0,
+                "current_bytes_per_second": None,
+                "started": time.monotonic(),
+            }
+        self._publish()
+        return upload_id
+
+    def update(self, upload_id: str, bytes_sent: int, chunk_bytes: int, chunk_seconds: float) -> None:
+        """Record that `bytes_sent` bytes of the upload are acknowledged, after a chunk of `chunk_bytes`."""
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+            if upload is None:
+                return
+            upload["bytes_sent"] = bytes_sent
+            if chunk_seconds > 0:
+                upload["current_bytes_per_second"] = round(chunk_bytes / chunk_seconds)
+        self._publish()
+
+    def finish(self, upload_id: str) -> None:
+        """Remove a finished (or failed) upload, publishing immediately when it was the last one."""
+        with self._lock:
+            self._uploads.pop(upload_id, None)
+            idle = not self._uploads
+        self._publish(force=idle)
+
+    @staticmethod
+    def _describe(upload: dict, now: float) -> dict:
+        elapsed = now - upload["started"]
+        average = upload["bytes_sent"] / elapsed if elapsed > 0 else 0
+        total_bytes = upload["total_bytes"]
+        remaining = total_bytes - upload["bytes_sent"] if total_bytes is not None else None
+
+        if total_bytes is None:
+            percentage = None
+        else:
+            percentage = round(100 * upload["bytes_sent"] / total_bytes, 1) if total_bytes else 100.0
+
+        return {
+            "file_name": upload["file_name"],
+            "percentage": percentage,
+            "bytes_sent": upload["bytes_sent"],
+            "total_bytes": upload["total_bytes"],
+            "current_bytes_per_second": upload["current_bytes_per_second"],
+            "average_bytes_per_second": round(average),
+            "eta_seconds": round(remaining / average) if average and remaining is not None else None,
+        }
+
+    def _publish(self, force: bool = False) -> None:
+        """Write the sensor through the event loop, unless it was written less than an interval ago."""
+        now = time.monotonic()
+
+        # Hold the lock until the update is queued, so updates reach the loop in order
+        with self._lock:
+            if not force and now - self._last_published < UPLOAD_PROGRESS_INTERVAL:
+                return
+            self._last_published = now
+
+            uploads = [self._describe(upload, now) for upload in self._uploads.values()]
+            bytes_sent = sum(upload["bytes_sent"] for upload in uploads)
+            sized_uploads = [upload for upload in uploads if upload["total_bytes"] is not None]
+            total_bytes = sum(upload["total_bytes"] for upload in sized_uploads)
+            etas = [upload["eta_seconds"] for upload in uploads]
+
+            if total_bytes:
+                state = round(100 * sum(upload["bytes_sent"] for upload in sized_uploads) / total_bytes, 1)
+            else:
+                state = "uploading" if uploads else "idle"
+            attributes = {
+                "active_uploads": len(uploads),
+                "bytes_sent": bytes_sent,
+                "total_bytes": total_bytes,
+                "current_bytes_per_second": sum(upload["current_bytes_per_second"] or 0 for upload in uploads),
+                "average_bytes_per_second": sum(upload["average_bytes_per_second"] for upload in uploads),
+                # Unknown until every active upload has sent its first chunk
+                "eta_seconds": max(etas) if etas and None not in etas else None,
+                "uploads": uploads,
+                "friendly_name": self._sensor_name,
+                "icon": "mdi:cloud-upload",
+            }
+
+            # Called from executor threads, add_job hands the update to the event loop
+            self._hass.add_job(async_create_or_update_sensor, self._hass, self._sensor_name, state, attributes)
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+from google.auth.exceptions import TransportError
+from googleapiclient.errors import HttpError
+from homeassistant.core import HomeAssistant
+
+from .create_sensor import async_create_or_update_sensor
+from .rate_limiter import is_retryable_response
+
+import aiohttp
+import asyncio
+import httplib2
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import logging
+from collections.abc import Awaitable, Callable, Collection
+from datetime import datetime, timezone
+
+from ..const import (
+    EVENT_QUEUED_UPLOAD,
+    UPLOAD_QUEUE_PARALLEL_UPLOADS,
+    UPLOAD_QUEUE_MIN_RETRY_DELAY,
+    UPLOAD_QUEUE_MAX_RETRY_DELAY,
+    UPLOAD_QUEUE_SENSOR_NAME,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    priority INTEGER NOT NULL,
+    queued_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    request TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS uploads_order ON uploads (priority DESC, queued_at, id);
+"""
+
+# Errors meaning Drive (or Google's token endpoint) could not be reached, the upload may succeed later
+OFFLINE_EXCEPTIONS = (
+    ConnectionError,
+    TimeoutError,
+    socket.gaierror,
+    aiohttp.ClientError,
+    TransportError,
+    httplib2.ServerNotFoundError,
+)
+
+
+def is_offline_error(exception: BaseException | None) -> bool:
+    """Return True if an upload failed because Drive was unreachable or unavailable, following the chained causes."""
+    seen = set()
+    while exception is not None and id(exception) not in seen:
+        seen.add(id(exception))
+        if isinstance(exception, OFFLINE_EXCEPTIONS):
+            return True
+        if isinstance(exception, HttpError) and is_retryable_response(exception.resp.status, exception.content):
+            return True
+        exception = exception.__cause__ or exception.__context__
+    return False
+
+
+class UploadQueueDatabase:
+    """SQLite journal of the queued uploads of a config entry, surviving restarts.
+
+    Every upload is committed when it is added, before the service call returns. Uploads are
+    taken by descending priority, then in the order they were queued.
+
+    All methods are blocking and thread-safe, run them in the executor.
+    """
+
+    def __init__(self, database_path: str) -> None:
+        self._database_path = database_path
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        """Open (and create) the database."""
+        connection = sqlite3.connect(self._database_path, check_same_thread=False)
+        connection.executescript(SCHEMA)
+        with self._lock:
+            self._connection = connection
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    @staticmethod
+    def remove_database(database_path: str) -> None:
+        """Delete the database of a config entry that was removed."""
+        for path in (database_path, f"{database_path}-journal"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def add(self, request: dict, priority: int = 0) -> int:
+        """Queue an upload request and return its queue ID."""
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO uploads (priority, queued_at, request) VALUES (?, ?, ?)",
+                (priority, time.time(), json.dumps(request)),
+            )
+            self._connection.commit()
+            return cursor.lastrowid
+
+    def next_upload(self, exclude: Collection[int] = ()) -> tuple[int, dict] | None:
+        """Return the queue ID and request of the next upload that is not in `exclude`, or None."""
+        placeholders = ",".join("?" * len(exclude))
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT id, request FROM uploads WHERE id NOT IN ({placeholders}) "
+                "ORDER BY priority DESC, queued_at, id LIMIT 1",
+                tuple(exclude),
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def remove(self, queue_id: int) -> None:
+        """Remove an upload that was uploaded or dropped."""
+        with self._lock:
+            self._connection.execute("DELETE FROM uploads WHERE id = ?", (queue_id,))
+            self._connection.commit()
+
+    def record_failure(self, queue_id: int, error: str) -> None:
+        """Count a failed attempt of an upload that stays queued."""
+        with self._lock:
+            self._connection.execute(
+                "UPDATE uploads SET attempts = attempts + 1, last_error = ? WHERE id = ?", (error, queue_id)
+            )
+            self._connection.commit()
+
+    def stats(self) -> dict:
+        """Return the number of queued uploads and when the oldest one was queued (a Unix time, or None)."""
+        with self._lock:
+            count, oldest = self._connection.execute("SELECT COUNT(*), MIN(queued_at) FROM uploads").fetchone()
+        return {"backlog": count, "oldest_queued_at": oldest}
+
+
+class OfflineUploadQueue:
+    """Uploads the queued requests of the journal in the background, retrying while Drive is unreachable.
+
+    At most `max_parallel` queued uploads run at the same time. When an upload fails because
+    Drive can't be reached, it stays queued and no new uploads start until a retry delay has
+    passed, which doubles from UPLOAD_QUEUE_MIN_RETRY_DELAY up to UPLOAD_QUEUE_MAX_RETRY_DELAY
+    while Drive stays unreachable. Uploads failing for another reason (the file was removed,
+    Drive refused it) are dropped. Every attempt fires an EVENT_QUEUED_UPLOAD event, with a
+    status of 'uploaded', 'retrying' (it stays queued) or 'failed' (it was dropped).
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        database: UploadQueueDatabase,
+        upload: Callable[[dict], Awaitable[dict]],
+        max_parallel: int = UPLOAD_QUEUE_PARALLEL_UPLOADS,
+    ) -> None:
+        """Initialize the queue.
+
+        Args:
+            hass (HomeAssistant): The Home Assistant instance.
+            database (UploadQueueDatabase): The opened journal of the queued uploads.
+            upload (Callable[[dict], Awaitable[dict]]): Uploads a queued request, returning the Drive file.
+            max_parallel (int): The maximum number of queued uploads running at the same time.
+        """
+        self._hass = hass
+        self._database = database
+        self._upload = upload
+        self._max_parallel = max_parallel
+        self._wake = asyncio.Event()
+        self._uploading = 0
+        self._retry_at: float | None = None
+        self._last_error: str | None = None
+        self._task: asyncio.Task | None = None
+
+    def async_start(self, entry) -> None:
+        """Start uploading the queued requests in a background task of the config entry."""
+        self._task = entry.async_create_background_task(
+            self._hass, self.async_run(), "google_drive_file_manager_upload_queue"
+        )
+
+    async def async_stop(self) -> None:
+        """Stop uploading, the running uploads stay queued and are uploaded again after the next start."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def async_enqueue(self, request: dict, priority: int = 0) -> dict:
+        """Journal an upload request and wake up the queue.
+
+        Returns:
+            dict: The 'queue_id' of the upload and the 'backlog' of queued uploads.
+        """
+        queue_id = await self._hass.async_add_executor_job(self._database.add, request, priority)
+        self._wake.set()
+
+        stats = await self.async_publish_stats()
+        _LOGGER.info("Queued the upload of %s (%d queued)", request.get("local_file_path"), stats["backlog"])
+        return {"queued": True, "queue_id": queue_id, "backlog": stats["backlog"]}
+
+    async def async_run(self) -> None:
+        """Upload the queued requests until cancelled, waiting for new ones when the queue is empty."""
+        in_flight: dict[asyncio.Task, int] = {}
+        retry_delay = UPLOAD_QUEUE_MIN_RETRY_DELAY
+
+        await self.async_publish_stats()
+
+        try:
+            while True:
+                self._wake.clear()
+
+                # Start the next uploads, skipping the ones that are running
+                while len(in_flight) < self._max_parallel:
+                    item = await self._hass.async_add_executor_job(
+                        self._database.next_upload, list(in_flight.values())
+                    )
+                    if item is None:
+                        break
+                    queue_id, request = item
+                    in_flight[asyncio.create_task(self._async_upload(queue_id, request))] = queue_id
+
+                # Wait for an upload to finish, or for a new upload to be queued
+                wake = asyncio.ensure_future(self._wake.wait())
+                try:
+                    done, _ = await asyncio.wait([*in_flight, wake], return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    wake.cancel()
+
+                outcomes = []
+                for task in done:
+                    if task is not wake:
+                        del in_flight[task]
+                        outcomes.append(task.result())
+
+                if "offline" not in outcomes:
+                    if "uploaded" in outcomes:
+                        retry_delay = UPLOAD_QUEUE_MIN_RETRY_DELAY
+                    continue
+
+                # Drive is unreachable: let the running uploads end and wait before trying again
+                if in_flight:
+                    await asyncio.wait(in_flight)
+                    in_flight.clear()
+
+                self._retry_at = time.time() + retry_delay
+                await self.async_publish_stats()
+                _LOGGER.warning("Google Drive is unreachable, trying the queued uploads again in %d s", retry_delay)
+
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, UPLOAD_QUEUE_MAX_RETRY_DELAY)
+                self._retry_at = None
+
+        finally:
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+    async def _async_upload(self, queue_id: int, request: dict) -> str:
+        """Upload a queued request, returning 'uploaded', 'dropped' or 'offline' (it stays queued)."""
+        self._uploading += 1
+        try:
+            file = await self._upload(request)
+
+        except Exception as e:
+            self._last_error = str(e)
+
+            if is_offline_error(e):
+                await self._hass.async_add_executor_job(self._database.record_failure, queue_id, str(e))
+                self._hass.bus.async_fire(
+                    EVENT_QUEUED_UPLOAD,
+                    {"queue_id": queue_id, "status": "retrying", "error": str(e), **request},
+                )
+                return "offline"
+
+            _LOGGER.error("Dropped the queued upload of %s: %s", request.get("local_file_path"), e)
+            await self._hass.async_add_executor_job(self._database.remove, queue_id)
+            self._hass.bus.async_fire(
+                EVENT_QUEUED_UPLOAD,
+                {"queue_id": queue_id, "status": "failed", "error": str(e), **request},
+            )
+            await self.async_publish_stats()
+            return "dropped"
+
+        finally:
+            self._uploading -= 1
+
+        await self._hass.async_add_executor_job(self._database.remove, queue_id)
+        self._hass.bus.async_fire(
+            EVENT_QUEUED_UPLOAD,
+            {"queue_id": queue_id, "status": "uploaded", "file": file, **request},
+        )
+        await self.async_publish_stats()
+        return "uploaded"
+
+    async def async_publish_stats(self, now=None) -> dict:
+        """Write the backlog and the age of the oldest queued upload to the queue sensor."""
+        stats = await self._hass.async_add_executor_job(self._database.stats)
+        oldest = stats["oldest_queued_at"]
+
+        def to_iso(timestamp: float | None) -> str | None:
+            return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp is not None else None
+
+        await async_create_or_update_sensor(
+            self._hass,
+            UPLOAD_QUEUE_SENSOR_NAME,
+            stats["backlog"],
+            {
+                "oldest_queued": to_iso(oldest),
+                "oldest_age_seconds": round(time.time() - oldest) if oldest is not None else 0,
+                "uploading": self._uploading,
+                "retry_at": to_iso(self._retry_at),
+                "last_error": self._last_error,
+                "icon": "mdi:cloud-upload-outline",
+            },
+        )
+        return stats
@@ -0,0 +1,115 @@
+from googleapiclient.http import MediaFileUpload
+
+from collections.abc import Mapping
+import threading
+import logging
+
+from ..const import (
+    CONF_MULTIPART_THRESHOLD_MB,
+    CONF_MIN_CHUNK_SIZE_MB,
+    CONF_MAX_CHUNK_SIZE_MB,
+    DEFAULT_MULTIPART_THRESHOLD_MB,
+    DEFAULT_MIN_CHUNK_SIZE_MB,
+    DEFAULT_MAX_CHUNK_SIZE_MB,
+    UPLOAD_INITIAL_CHUNK_SIZE,
+    UPLOAD_TARGET_CHUNK_SECONDS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+MEGABYTE = 1024 * 1024
+
+# Drive requires the chunks of a resumable upload to be a multiple of 256 KiB
+CHUNK_SIZE_MULTIPLE = 256 * 1024
+
+# Weight of the most recent chunk in the moving average of the throughput
+THROUGHPUT_SMOOTHING = 0.3
+
+
+class AdaptiveMediaFileUpload(MediaFileUpload):
+    """MediaFileUpload of which the chunk size can be changed between chunks."""
+
+    def __init__(self, filename: str, mimetype: str, chunk_size: int) -> None:
+        super().__init__(filename, mimetype=mimetype, chunksize=chunk_size, resumable=True)
+        self.chunk_size = chunk_size
+
+    def chunksize(self) -> int:
+        return self.chunk_size
+
+
+class UploadStrategy:
+    """Chooses how a file is uploaded to Drive and tunes the chunk size of resumable uploads.
+
+    Files up to the multipart threshold are sent in a single multipart request, which saves
+    the round trip that initiates a resumable session. Larger files use a resumable upload
+    of which the chunk size follows the throughput measured for previous chunks, aiming for
+    chunks of UPLOAD_TARGET_CHUNK_SECONDS within the configured bounds. The measured
+    throughput is shared by all uploads of the config entry, so a new upload starts with a
+    chunk size that suits the link.
+    """
+
+    def __init__(
+        self,
+        multipart_threshold: int = DEFAULT_MULTIPART_THRESHOLD_MB * MEGABYTE,
+        min_chunk_size: int = DEFAULT_MIN_CHUNK_SIZE_MB * MEGABYTE,
+        max_chunk_size: int = DEFAULT_MAX_CHUNK_SIZE_MB * MEGABYTE,
+    ) -> None:
+        """Initialize the strategy, all sizes are in bytes."""
+        self.multipart_threshold = multipart_threshold
+        self.min_chunk_size = self._round_chunk_size(min_chunk_size)
+        self.max_chunk_size = max(self._round_chunk_size(max_chunk_size), self.min_chunk_size)
+        self._throughput: float | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_options(cls, options: Mapping) -> "UploadStrategy":
+        """Create the strategy from the options of a config entry (sizes in MB)."""
+        return cls(
+            multipart_threshold=int(options.get(CONF_MULTIPART_THRESHOLD_MB, DEFAULT_MULTIPART_THRESHOLD_MB) * MEGABYTE),
+            min_chunk_size=int(options.get(CONF_MIN_CHUNK_SIZE_MB, DEFAULT_MIN_CHUNK_SIZE_MB) * MEGABYTE),
+            max_chunk_size=int(options.get(CONF_MAX_CHUNK_SIZE_MB, DEFAULT_MAX_CHUNK_SIZE_MB) * MEGABYTE),
+        )
+
+    @staticmethod
+    def _round_chunk_size(chunk_size: float) -> int:
+        """Round a chunk size down to a multiple of 256 KiB (at least one)."""
+        return max(int(chunk_size) // CHUNK_SIZE_MULTIPLE, 1) * CHUNK_SIZE_MULTIPLE
+
+    def use_multipart(self, file_size: int) -> bool:
+        """Return True if a file of `file_size` bytes should be uploaded in a single multipart request."""
+        return file_size <= self.multipart_threshold
+
+    def _chunk_size_for_throughput(self) -> int:
+        if self._throughput is None:
+            chunk_size = UPLOAD_INITIAL_CHUNK_SIZE
+        else:
+            chunk_size = self._throughput * UPLOAD_TARGET_CHUNK_SECONDS
+
+        chunk_size = min(max(chunk_size, self.min_chunk_size), self.max_chunk_size)
+        return self._round_chunk_size(chunk_size)
+
+    def initial_chunk_size(self) -> int:
+        """Return the chunk size to start a resumable upload with."""
+        with self._lock:
+            return self._chunk_size_for_throughput()
+
+    def record_chunk(self, bytes_sent: int, seconds: float) -> int:
+        """Record the throughput of an uploaded chunk and return the chunk size for the next one.
+
+        Args:
+            bytes_sent (int): The number of bytes acknowledged for the chunk.
+            seconds (float): The time it took to send the chunk.
+
+        Returns:
+            int: The chunk size in bytes for the next chunk.
+        """
+        with self._lock:
+            # Very small or instant chunks (e.g. the end of a file) say little about the link
+            if bytes_sent >= CHUNK_SIZE_MULTIPLE and seconds > 0:
+                throughput = bytes_sent / seconds
+                if self._throughput is None:
+                    self._throughput = throughput
+                else:
+                    self._throughput += THROUGHPUT_SMOOTHING * (throughput - self._throughput)
+
+            return self._chunk_size_for_throughput()
@@ -0,0 +1,91 @@
+"""Benchmark concurrent uploads through the executor and through the native async Drive client.
+
+Starts UPLOADS upload_media_file calls of a small file at the same time, like many automations
+firing at once, against a local fake Drive that adds LATENCY seconds to every request, like a
+slow upload to Google. The googleapiclient path runs every upload in an executor thread, so at
+most EXECUTOR_THREADS uploads are in flight; the async Drive client runs them all as coroutines
+on the event loop and only reads the file in the executor.
+
+Run from the repository root:
+    python -m tests.benchmark_async_drive_client
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from google.oauth2.credentials import Credentials
+from homeassistant.core import HomeAssistant
+
+from custom_components.google_drive_file_manager.helpers.async_drive_client import AsyncDriveClient
+from custom_components.google_drive_file_manager.helpers.drive_client_pool import DriveClientPool
+from custom_components.google_drive_file_manager.helpers.folder_cache import FolderCache
+from custom_components.google_drive_file_manager.helpers.google_drive_actions import async_upload_media_file
+from custom_components.google_drive_file_manager.helpers.rate_limiter import DriveRateLimiter
+from custom_components.google_drive_file_manager.helpers.upload_strategy import UploadStrategy
+from tests.fake_drive_server import FakeDriveServer
+
+UPLOADS = 200
+EXECUTOR_THREADS = 16
+LATENCY = 0.2
+
+
+async def benchmark(name: str, hass: HomeAssistant, local_file_path: str, use_async_client: bool) -> None:
+    server = FakeDriveServer(latency=LATENCY)
+    server.start()
+    rate_limiter = DriveRateLimiter(requests_per_second=10000, burst=10000)
+    client_pool = DriveClientPool(root_url=server.root_url, rate_limiter=rate_limiter)
+    await hass.async_add_executor_job(client_pool.load_discovery_document)
+
+    async def async_get_access_token() -> str:
+        return "dummy-access-token"
+
+    async_drive_client = None
+    if use_async_client:
+        async_drive_client = AsyncDriveClient(hass, async_get_access_token, rate_limiter, server.root_url)
+
+    credentials = Credentials(token="dummy-access-token")
+    folder_cache = FolderCache()
+    upload_strategy = UploadStrategy()
+
+    async def upload(index: int) -> None:
+        await async_upload_media_file(
+            hass, credentials, local_file_path, "", f"file_{index}.jpg", "benchmark", False, False, "",
+            "id", client_pool, upload_strategy, None, folder_cache, False, None, None, None, None,
+            async_drive_client,
+        )
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(upload(index) for index in range(UPLOADS)))
+        elapsed = time.perf_counter() - start
+    finally:
+        await hass.async_add_executor_job(client_pool.close)
+        server.stop()
+
+    print(
+        f"{name:<28} {UPLOADS} uploads in {elapsed:6.2f} s "
+        f"({UPLOADS / elapsed:6.1f} uploads/s)"
+    )
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        hass = HomeAssistant(directory)
+        # Like a busy Home Assistant, where other integrations share the executor
+        hass.loop.set_default_executor(ThreadPoolExecutor(max_workers=EXECUTOR_THREADS))
+
+        local_file_path = os.path.join(directory, "snapshot.jpg")
+        with open(local_file_path, "wb") as file:
+            file.write(os.urandom(64 * 1024))
+
+        print(f"{UPLOADS} concurrent uploads, {LATENCY * 1000:.0f} ms simulated latency, {EXECUTOR_THREADS} executor threads")
+        await benchmark("executor (googleapiclient)", hass, local_file_path, False)
+        await benchmark("async Drive client", hass, local_file_path, True)
+        await hass.async_stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
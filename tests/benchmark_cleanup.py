@@ -0,0 +1,70 @@
+"""Benchmark the delete throughput of cleanup_older_files_by_pattern against a local fake Drive.
+
+Compares one delete request per file (the behaviour before batching) with the batched and
+concurrent deletes of cleanup_older_files_by_pattern. The fake Drive adds a fixed latency to
+every HTTP request to simulate the round trip to Google.
+
+Run from the repository root:
+    python -m tests.benchmark_cleanup
+"""
+
+import time
+
+from google.oauth2.credentials import Credentials
+
+from custom_components.google_drive_file_manager.helpers.drive_client_pool import DriveClientPool
+from custom_components.google_drive_file_manager.helpers.google_drive_actions import (
+    cleanup_older_files_by_pattern
+)
+from tests.fake_drive_server import FakeDriveServer
+
+FILE_COUNT = 1000
+LATENCY = 0.02
+
+
+def delete_sequentially(credentials, client_pool: DriveClientPool) -> int:
+    """Delete every listed file with its own request, as cleanup did before batching."""
+    drive = client_pool.get_service(credentials)
+    deleted = 0
+    page_token = None
+    while True:
+        response = drive.files().list(q="", pageToken=page_token, pageSize=1000).execute()
+        for file in response.get("files", []):
+            drive.files().delete(fileId=file["id"]).execute()
+            deleted += 1
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return deleted
+
+
+def delete_batched(credentials, client_pool: DriveClientPool) -> int:
+    results = cleanup_older_files_by_pattern(
+        credentials, "name contains 'file'", 0, False, "id,name", client_pool
+    )
+    return sum(1 for file in results if file["status"] == "deleted")
+
+
+def benchmark(name: str, delete_files) -> None:
+    server = FakeDriveServer(latency=LATENCY)
+    server.add_files(FILE_COUNT)
+    server.start()
+    client_pool = DriveClientPool(root_url=server.root_url)
+
+    try:
+        start = time.perf_counter()
+        deleted = delete_files(Credentials(token="dummy-access-token"), client_pool)
+        elapsed = time.perf_counter() - start
+    finally:
+        client_pool.close()
+        server.stop()
+
+    print(
+        f"{name:<12} {deleted:5d} deleted in {elapsed:6.2f} s "
+        f"({deleted / elapsed:7.1f} deletes/s, {server.request_count} HTTP requests)"
+    )
+
+
+if __name__ == "__main__":
+    print(f"{FILE_COUNT} files, {LATENCY * 1000:.0f} ms simulated latency per request")
+    benchmark("sequential", delete_sequentially)
+    benchmark("batched", delete_batched)
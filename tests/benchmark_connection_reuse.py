@@ -0,0 +1,130 @@
+"""Benchmark the latency of back-to-back small Drive calls over new and reused HTTPS connections.
+
+Sends CALLS small list requests one after another from an executor of THREADS threads, like
+service calls of Home Assistant land on a random executor thread, to a fake Drive speaking
+HTTPS with a self-signed certificate. Every request waits LATENCY seconds and every new
+connection CONNECT_LATENCY seconds more, to simulate the round trips to googleapis.com and
+the TCP and TLS handshakes. Compared are:
+  - a new client (and httplib2 connection) per call, like without the client pool
+  - a client with its own httplib2 connection per executor thread (the pool before)
+  - the DriveClientPool, whose clients share one keep-alive connection pool
+
+Run from the repository root:
+    python -m tests.benchmark_connection_reuse
+"""
+
+import datetime
+import ipaddress
+import os
+import ssl
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httplib2
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build_from_document
+
+from custom_components.google_drive_file_manager.helpers.drive_client_pool import DriveClientPool
+from custom_components.google_drive_file_manager.helpers.pooled_http import PooledHttp
+from custom_components.google_drive_file_manager.helpers.rate_limiter import DriveRateLimiter
+from tests.fake_drive_server import FakeDriveServer
+
+CALLS = 100
+THREADS = 8
+LATENCY = 0.02
+CONNECT_LATENCY = 0.04
+
+
+def create_certificate(directory: str) -> tuple[str, str]:
+    """Create a self-signed certificate for 127.0.0.1, return the paths of the certificate and the key."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+
+    certificate_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(certificate_path, "wb") as file:
+        file.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as file:
+        file.write(key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ))
+    return certificate_path, key_path
+
+
+def benchmark(name: str, get_service, server: FakeDriveServer) -> None:
+    credentials = Credentials(token="dummy-access-token")
+    connections = server.connection_count
+
+    def call() -> float:
+        start = time.perf_counter()
+        get_service(credentials).files().list(pageSize=1, fields="files(id)").execute()
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        # Start all threads first, like the executor of a running Home Assistant
+        list(executor.map(time.sleep, [0.05] * THREADS))
+        latencies = [executor.submit(call).result() * 1000 for _ in range(CALLS)]
+
+    print(
+        f"{name:<32} {statistics.mean(latencies):6.1f} ms mean, "
+        f"{statistics.quantiles(latencies, n=20)[-1]:6.1f} ms p95, "
+        f"{server.connection_count - connections:4d} connections"
+    )
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        certificate_path, key_path = create_certificate(directory)
+        ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        ssl_context.load_cert_chain(certificate_path, key_path)
+
+        server = FakeDriveServer(latency=LATENCY, connect_latency=CONNECT_LATENCY, ssl_context=ssl_context)
+        server.start()
+
+        client_pool = DriveClientPool(
+            root_url=server.root_url,
+            rate_limiter=DriveRateLimiter(requests_per_second=1000, burst=1000),
+            http=PooledHttp(ca_certs=certificate_path),
+        )
+        client_pool.load_discovery_document()
+        discovery_document = client_pool._discovery_document
+
+        def new_client(credentials):
+            http = AuthorizedHttp(credentials, http=httplib2.Http(ca_certs=certificate_path))
+            return build_from_document(discovery_document, http=http)
+
+        local = threading.local()
+
+        def client_per_thread(credentials):
+            if not hasattr(local, "service"):
+                local.service = new_client(credentials)
+            return local.service
+
+        try:
+            benchmark("new client per call", new_client, server)
+            benchmark("httplib2 client per thread", client_per_thread, server)
+            benchmark("DriveClientPool (shared pool)", client_pool.get_service, server)
+        finally:
+            client_pool.close()
+            server.stop()
@@ -0,0 +1,49 @@
+"""Benchmark the per-call overhead of getting a Drive service object.
+
+Compares building a new service on every call (the behaviour before the client pool)
+with checking out the thread-bound service from the DriveClientPool. No requests are sent
+to Google Drive, so dummy credentials are used and no .env file is required.
+
+Run from the repository root:
+    python -m tests.benchmark_drive_client_pool
+"""
+
+import time
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+
+from custom_components.google_drive_file_manager.helpers.drive_client_pool import DriveClientPool
+
+ITERATIONS = 50
+
+
+def get_dummy_credentials() -> Credentials:
+    return Credentials(token="dummy-access-token")
+
+
+def benchmark(name: str, get_service) -> float:
+    """Return the average time in milliseconds to obtain a service object."""
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        get_service(get_dummy_credentials())
+    average_ms = (time.perf_counter() - start) / ITERATIONS * 1000
+    print(f"{name:<30} {average_ms:8.3f} ms per call")
+    return average_ms
+
+
+if __name__ == "__main__":
+
+    # Before: a new service (discovery parsing + new httplib2 instance) on every call
+    build_ms = benchmark(
+        "build() per call",
+        lambda credentials: build("drive", "v3", credentials=credentials),
+    )
+
+    # After: one pooled service per thread, only the credentials are swapped
+    client_pool = DriveClientPool()
+    client_pool.load_discovery_document()
+    pool_ms = benchmark("DriveClientPool.get_service()", client_pool.get_service)
+    client_pool.close()
+
+    print(f"Speed-up: {build_ms / pool_ms:.0f}x")
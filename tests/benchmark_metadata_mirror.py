@@ -0,0 +1,71 @@
+"""Benchmark list_files_by_pattern with and without the metadata mirror against a local fake Drive.
+
+Lists the same query repeatedly, like a dashboard refreshing a sensor: once through the Drive
+API (paging through every match) and once answered from the SQLite mirror, which only asks the
+changes feed for new changes. The fake Drive adds a fixed latency to every HTTP request to
+simulate the round trip to Google.
+
+Run from the repository root:
+    python -m tests.benchmark_metadata_mirror
+"""
+
+import os
+import tempfile
+import time
+
+from google.oauth2.credentials import Credentials
+
+from custom_components.google_drive_file_manager.helpers.drive_client_pool import DriveClientPool
+from custom_components.google_drive_file_manager.helpers.google_drive_actions import (
+    get_list_files_by_pattern,
+    sync_metadata_mirror,
+)
+from custom_components.google_drive_file_manager.helpers.metadata_mirror import DriveMetadataMirror
+from tests.fake_drive_server import FakeDriveServer
+
+FILE_COUNT = 20000
+LATENCY = 0.02
+QUERY = "name contains 'file_1' and trashed = false"
+REPEATS = 5
+
+
+def benchmark(name: str, credentials, client_pool: DriveClientPool, server: FakeDriveServer, metadata_mirror=None) -> None:
+    requests = server.request_count
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        # Every refresh asks the mirror for the latest changes, like a query after MIRROR_QUERY_SYNC_INTERVAL
+        if metadata_mirror is not None:
+            metadata_mirror.sync(client_pool.get_service(credentials))
+        files = get_list_files_by_pattern(credentials, QUERY, "id,name", True, 0, client_pool, metadata_mirror)["files"]
+    elapsed = (time.perf_counter() - start) / REPEATS
+
+    print(
+        f"{name:<8} {len(files):5d} files in {elapsed * 1000:8.1f} ms per query "
+        f"({(server.request_count - requests) / REPEATS:.0f} HTTP requests per query)"
+    )
+
+
+if __name__ == "__main__":
+    server = FakeDriveServer(latency=LATENCY)
+    server.add_files(FILE_COUNT)
+    server.start()
+    client_pool = DriveClientPool(root_url=server.root_url)
+    credentials = Credentials(token="dummy-access-token")
+
+    with tempfile.TemporaryDirectory() as directory:
+        metadata_mirror = DriveMetadataMirror(os.path.join(directory, "mirror.db"))
+        metadata_mirror.open()
+
+        try:
+            print(f"{FILE_COUNT} files, {LATENCY * 1000:.0f} ms simulated latency per request")
+
+            start = time.perf_counter()
+            sync_metadata_mirror(credentials, metadata_mirror, client_pool)
+            print(f"initial mirror sync in {time.perf_counter() - start:.2f} s")
+
+            benchmark("live", credentials, client_pool, server)
+            benchmark("mirror", credentials, client_pool, server, metadata_mirror)
+        finally:
+            metadata_mirror.close()
+            client_pool.close()
+            server.stop()
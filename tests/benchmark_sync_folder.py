@@ -0,0 +1,75 @@
+"""Benchmark repeated sync_folder runs over a large local tree against a local fake Drive.
+
+The first sync uploads every file. A repeated sync of the unchanged tree only walks the local
+tree and compares it with the manifest, so it should take about as long as the walk itself and
+send no requests to Drive. A third sync after changing a few files uploads only those.
+
+Run from the repository root:
+    python -m tests.benchmark_sync_folder
+"""
+
+import os
+import tempfile
+import time
+
+from google.oauth2.credentials import Credentials
+
+from custom_components.google_drive_file_manager.helpers.drive_client_pool import DriveClientPool
+from custom_components.google_drive_file_manager.helpers.folder_cache import FolderCache
+from custom_components.google_drive_file_manager.helpers.google_drive_actions import scan_local_folder, sync_folder
+from custom_components.google_drive_file_manager.helpers.rate_limiter import DriveRateLimiter
+from custom_components.google_drive_file_manager.helpers.sync_manifest import SyncManifest
+from tests.fake_drive_server import FakeDriveServer
+
+FILE_COUNT = 50000
+FILES_PER_FOLDER = 500
+CHANGED_FILES = 10
+
+
+def run_sync(name: str, local_folder_path: str, credentials, client_pool, server, folder_cache, sync_manifest) -> None:
+    requests = server.request_count
+    start = time.perf_counter()
+    result = sync_folder(
+        None, credentials, local_folder_path, "benchmark", False, False, 16, client_pool, None, None, folder_cache, sync_manifest
+    )
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{name:<10} {elapsed:7.2f} s, {server.request_count - requests:6d} HTTP requests "
+        f"({result['uploaded']} uploaded, {result['updated']} updated, {result['unchanged']} unchanged)"
+    )
+
+
+if __name__ == "__main__":
+    server = FakeDriveServer()
+    server.start()
+    # The fake Drive has no quota, don't let the default rate limit dominate the first sync
+    client_pool = DriveClientPool(root_url=server.root_url, rate_limiter=DriveRateLimiter(requests_per_second=10000, burst=10000))
+    credentials = Credentials(token="dummy-access-token")
+    folder_cache = FolderCache()
+    sync_manifest = SyncManifest()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for i in range(FILE_COUNT):
+            folder = os.path.join(directory, f"{i // FILES_PER_FOLDER:03d}")
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, f"file_{i}.bin"), "wb") as file:
+                file.write(i.to_bytes(4, "big"))
+
+        try:
+            print(f"{FILE_COUNT} files in {FILE_COUNT // FILES_PER_FOLDER} folders")
+
+            start = time.perf_counter()
+            scan_local_folder(directory)
+            print(f"{'stat walk':<10} {time.perf_counter() - start:7.2f} s")
+
+            run_sync("first", directory, credentials, client_pool, server, folder_cache, sync_manifest)
+            run_sync("repeated", directory, credentials, client_pool, server, folder_cache, sync_manifest)
+
+            for i in range(CHANGED_FILES):
+                with open(os.path.join(directory, f"{i // FILES_PER_FOLDER:03d}", f"file_{i}.bin"), "ab") as file:
+                    file.write(b"changed")
+            run_sync("changed", directory, credentials, client_pool, server, folder_cache, sync_manifest)
+        finally:
+            client_pool.close()
+            server.stop()
@@ -0,0 +1,64 @@
+"""Benchmark uploading a burst of small snapshots one by one versus as a single archive.
+
+Uploads FILE_COUNT files of FILE_SIZE bytes with upload_media_files (every file its own
+multipart request, several in parallel) and with upload_archive (one tar streamed into a
+single upload), both with the default rate limit of an account. The fake Drive adds a fixed
+latency to every HTTP request to simulate the round trip to Google.
+
+Run from the repository root:
+    python -m tests.benchmark_upload_archive
+"""
+
+import os
+import tempfile
+import time
+
+from google.oauth2.credentials import Credentials
+
+from custom_components.google_drive_file_manager.helpers.drive_client_pool import DriveClientPool
+from custom_components.google_drive_file_manager.helpers.folder_cache import FolderCache
+from custom_components.google_drive_file_manager.helpers.google_drive_actions import upload_archive, upload_media_files
+from tests.fake_drive_server import FakeDriveServer
+
+FILE_COUNT = 300
+FILE_SIZE = 50 * 1024
+LATENCY = 0.05
+
+
+def upload_separately(credentials, client_pool: DriveClientPool, local_file_pattern: str) -> None:
+    upload_media_files(
+        None, credentials, [], "id", local_file_pattern, "snapshots", False, 4, client_pool, None, None, FolderCache()
+    )
+
+
+def upload_as_archive(credentials, client_pool: DriveClientPool, local_file_pattern: str) -> None:
+    upload_archive(
+        None, credentials, [], local_file_pattern, "", "snapshots", False, "none", "id", client_pool, None, None, FolderCache()
+    )
+
+
+def benchmark(name: str, upload, local_file_pattern: str) -> None:
+    server = FakeDriveServer(latency=LATENCY)
+    server.start()
+    client_pool = DriveClientPool(root_url=server.root_url)
+
+    try:
+        start = time.perf_counter()
+        upload(Credentials(token="dummy-access-token"), client_pool, local_file_pattern)
+        elapsed = time.perf_counter() - start
+    finally:
+        client_pool.close()
+        server.stop()
+
+    print(f"{name:<12} {elapsed:6.2f} s, {server.request_count:4d} HTTP requests, {len(server.files) - 1:4d} Drive files")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        for i in range(FILE_COUNT):
+            with open(os.path.join(directory, f"snapshot_{i:04d}.jpg"), "wb") as file:
+                file.write(os.urandom(FILE_SIZE))
+
+        print(f"{FILE_COUNT} files of {FILE_SIZE // 1024} KB, {LATENCY * 1000:.0f} ms simulated latency per request")
+        benchmark("separately", upload_separately, os.path.join(directory, "*.jpg"))
+        benchmark("archive", upload_as_archive, os.path.join(directory, "*.jpg"))
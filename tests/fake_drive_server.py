@@ -0,0 +1,543 @@
+"""A minimal local stand-in for the Google Drive v3 REST API, used by the benchmarks.
+
+It keeps the files in memory and implements just enough of the API for the integration:
+listing files (paged, with a small subset of the query syntax), getting files and (byte ranges of)
+their content, creating folders, multipart and resumable uploads (of new files and new content),
+updating (moving) and deleting files, the changes feed (with watch channels) and batch requests
+of updates and deletes.
+Every HTTP request waits `latency` seconds to simulate the round trip to Google, every new
+connection `connect_latency` seconds to simulate the TCP and TLS handshakes, and
+fail_requests() makes the next requests fail with rate limit or server errors.
+With an `ssl_context` the server speaks HTTPS, like googleapis.com.
+
+Use it with a DriveClientPool that points to the server:
+    server = FakeDriveServer(latency=0.02)
+    server.start()
+    client_pool = DriveClientPool(root_url=server.root_url)
+"""
+
+from collections.abc import Callable
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import functools
+import hashlib
+import json
+import re
+import ssl
+import threading
+import time
+import uuid
+
+
+class FakeDriveServer:
+    """In-memory fake Drive endpoint running in a background thread."""
+
+    def __init__(self, latency: float = 0.0, connect_latency: float = 0.0, ssl_context: ssl.SSLContext | None = None) -> None:
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.files: dict[str, dict] = {}
+        # Content of the files uploaded with content, by file ID
+        self.contents: dict[str, bytes] = {}
+        self.request_count = 0
+        self.connection_count = 0
+        self._sequence = 0
+        self._uploads: dict[str, dict] = {}
+        # Changes feed, a page token is an index in this list
+        self.change_log: list[dict] = []
+        # Push notification channels by ID
+        self.channels: dict[str, dict] = {}
+        # Injected failures, consumed by the next matching requests
+        self._failures: list[dict] = []
+        # Reorders or drops the response parts of a batch (e.g. `reversed`), Drive does not promise their order
+        self.batch_responses: Callable[[list[str]], list[str]] | None = None
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._create_handler(), bind_and_activate=False)
+        # Accept the many connections of concurrent async clients without dropping (and retrying) any
+        self._server.request_queue_size = 256
+        self._server.server_bind()
+        self._server.server_activate()
+        self._server.daemon_threads = True
+        self._scheme = "http"
+        if ssl_context is not None:
+            # Handshake in the connection's thread, not in the accepting one
+            self._server.socket = ssl_context.wrap_socket(
+                self._server.socket, server_side=True, do_handshake_on_connect=False
+            )
+            self._scheme = "https"
+
+    @property
+    def root_url(self) -> str:
+        host, port = self._server.server_address
+        return f"{self._scheme}://{host}:{port}/"
+
+    def add_file(self, metadata: dict, content: bytes | None = None) -> dict:
+        """Add a file (or folder) to the fake Drive and return it."""
+        with self._lock:
+            self._sequence += 1
+            file = {
+                "id": uuid.uuid4().hex,
+                "name": "Untitled",
+                "mimeType": "application/octet-stream",
+                "parents": ["root"],
+                "trashed": False,
+                "createdTime": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+                **metadata,
+                "modifiedTime": metadata.get("modifiedTime", metadata.get("createdTime"))
+                or time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+                "sequence": self._sequence,
+            }
+            if content is not None:
+                file["size"] = str(len(content))
+                file["md5Checksum"] = hashlib.md5(content).hexdigest()
+                self.contents[file["id"]] = content
+            self.files[file["id"]] = file
+            self.change_log.append({"fileId": file["id"], "removed": False})
+            return file
+
+    def add_files(self, count: int, name_prefix: str = "file") -> None:
+        """Add `count` old files to the fake Drive."""
+        for i in range(count):
+            self.add_file({"name": f"{name_prefix}_{i}", "createdTime": "2000-01-01T00:00:00.000Z"})
+
+    def start(self) -> None:
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    #region Drive API behaviour
+    @staticmethod
+    def compile_clause(clause: str):
+        """Return a predicate for a single query clause, clauses the fake does not understand match every file."""
+        clause = clause.strip()
+        if match := re.fullmatch(r"(name|mimeType)\s*=\s*'(.*)'", clause):
+            field, value = match[1], match[2].replace("\\'", "'")
+            return lambda file: file.get(field) == value
+        if match := re.fullmatch(r"(name|mimeType)\s+contains\s+'(.*)'", clause):
+            field, value = match[1], match[2]
+            return lambda file: value in file.get(field, "")
+        if match := re.fullmatch(r"'(.*)'\s+in\s+parents", clause):
+            parent = match[1]
+            return lambda file: parent in file.get("parents", [])
+        if match := re.fullmatch(r"trashed\s*=\s*(true|false)", clause):
+            trashed = match[1] == "true"
+            return lambda file: file.get("trashed", False) == trashed
+        return lambda file: True
+
+    @classmethod
+    @functools.lru_cache(maxsize=64)
+    def parse_query(cls, query: str) -> list[list]:
+        """Split a query into its 'and'-joined clauses, each a list of predicates of 'or'-joined alternatives."""
+        return [
+            [cls.compile_clause(alternative) for alternative in re.split(r"\s+or\s+", clause)]
+            for clause in re.split(r"\s+and\s+", query.replace("(", " ").replace(")", " "))
+        ]
+
+    @classmethod
+    def matches_query(cls, file: dict, query: str) -> bool:
+        """Evaluate the 'and'-joined clauses of a query, each clause may be an 'or' of alternatives."""
+        for alternatives in cls.parse_query(query):
+            if not any(predicate(file) for predicate in alternatives):
+                return False
+        return True
+
+    @staticmethod
+    def public(file: dict) -> dict:
+        return {key: value for key, value in file.items() if key != "sequence"}
+
+    def list_files(self, params: dict) -> tuple[int, dict]:
+        page_size = int(params.get("pageSize", ["100"])[0])
+        cursor = int(params.get("pageToken", ["0"])[0])
+        query = params.get("q", [""])[0]
+
+        # Like Drive, the page token is a cursor, so deleting listed files does not shift later pages
+        with self._lock:
+            files = [
+                file for file in self.files.values()
+                if file["sequence"] > cursor and self.matches_query(file, query)
+            ]
+
+        page = [self.public(file) for file in files[:page_size]]
+        body = {"files": page}
+        if len(files) > page_size:
+            body["nextPageToken"] = str(files[page_size - 1]["sequence"])
+        return 200, body
+
+    def list_changes(self, params: dict) -> tuple[int, dict]:
+        """Return the changes since a page token, a file is returned with its current metadata."""
+        page_size = int(params.get("pageSize", ["100"])[0])
+        start = int(params.get("pageToken", ["0"])[0])
+
+        with self._lock:
+            entries = self.change_log[start:start + page_size]
+            changes = []
+            for entry in entries:
+                file = self.files.get(entry["fileId"])
+                if entry["removed"] or file is None:
+                    changes.append({"fileId": entry["fileId"], "removed": True})
+                else:
+                    changes.append({"fileId": entry["fileId"], "removed": False, "file": self.public(file)})
+
+            body = {"changes": changes}
+            if start + page_size < len(self.change_log):
+                body["nextPageToken"] = str(start + page_size)
+            else:
+                body["newStartPageToken"] = str(len(self.change_log))
+        return 200, body
+
+    def get_file(self, file_id: str) -> tuple[int, dict]:
+        if file_id == "root":
+            return 200, {"id": "root"}
+        with self._lock:
+            file = self.files.get(file_id)
+        if file is None:
+            return 404, {"error": {"code": 404, "message": f"File not found: {file_id}."}}
+        return 200, self.public(file)
+
+    def get_media(self, file_id: str, range_header: str | None) -> tuple[int, bytes, dict]:
+        """Return the content of a file, or the byte range 'bytes=first-last' of it."""
+        with self._lock:
+            content = self.contents.get(file_id)
+        if content is None:
+            return 404, json.dumps({"error": {"code": 404, "message": f"File not found: {file_id}."}}).encode(), {}
+        if not range_header:
+            return 200, content, {}
+
+        first, _, last = range_header.removeprefix("bytes=").partition("-")
+        first, last = int(first), min(int(last or len(content) - 1), len(content) - 1)
+        if first > last:
+            return 416, b"", {"Content-Range": f"bytes */{len(content)}"}
+        return 206, content[first:last + 1], {"Content-Range": f"bytes {first}-{last}/{len(content)}"}
+
+    def missing_parent(self, metadata: dict) -> tuple[int, dict] | None:
+        """Return the 404 response Drive sends when a parent of a new file does not exist."""
+        with self._lock:
+            for parent in metadata.get("parents", []):
+                if parent != "root" and parent not in self.files:
+                    return 404, {"error": {"code": 404, "message": f"File not found: {parent}."}}
+        return None
+
+    def create_file(self, metadata: dict) -> tuple[int, dict]:
+        return self.missing_parent(metadata) or (200, self.public(self.add_file(metadata)))
+
+    def multipart_upload(self, content_type: str, body: bytes, file_id: str | None = None) -> tuple[int, dict]:
+        """Create (or update the content of) a file from a multipart/related body holding the metadata and the content."""
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + body
+        )
+        metadata_part, content_part = list(message.iter_parts())
+        metadata = json.loads(metadata_part.get_payload(decode=True) or b"{}")
+        if file_id:
+            return self.update_content(file_id, metadata, content_part.get_payload(decode=True))
+        return self.missing_parent(metadata) or (200, self.public(self.add_file(metadata, content_part.get_payload(decode=True))))
+
+    def update_content(self, file_id: str, metadata: dict, content: bytes) -> tuple[int, dict]:
+        """Replace the content (and update the metadata) of an existing file."""
+        with self._lock:
+            file = self.files.get(file_id)
+            if file is None:
+                return 404, {"error": {"code": 404, "message": f"File not found: {file_id}."}}
+            file.update(
+                metadata,
+                size=str(len(content)),
+                md5Checksum=hashlib.md5(content).hexdigest(),
+                modifiedTime=time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+            )
+            self.contents[file_id] = content
+            self.change_log.append({"fileId": file_id, "removed": False})
+            return 200, self.public(file)
+
+    def fail_requests(
+        self,
+        count: int = 1,
+        status: int = 503,
+        method: str | None = None,
+        retry_after: str | None = None,
+        reason: str | None = None,
+        partial: bool = False,
+        file_id: str | None = None,
+    ) -> None:
+        """Make the next `count` requests (with `method`, any if None) fail with `status`.
+
+        A failing upload chunk with `partial` keeps the first half of the chunk, like a connection
+        that broke during the transfer. With a `file_id` only the requests for that file fail,
+        including the ones inside a batch request.
+        """
+        with self._lock:
+            for _ in range(count):
+                self._failures.append({
+                    "status": status,
+                    "method": method,
+                    "retry_after": retry_after,
+                    "reason": reason,
+                    "partial": partial,
+                    "file_id": file_id,
+                })
+
+    def take_failure(self, method: str, file_id: str | None = None, batched: bool = False) -> dict | None:
+        """Return the injected failure for a request (of a file, inside a batch if `batched`), if any."""
+        with self._lock:
+            for failure in self._failures:
+                if batched and failure["file_id"] is None:
+                    continue
+                if failure["method"] in (None, method) and failure["file_id"] in (None, file_id):
+                    self._failures.remove(failure)
+                    return failure
+        return None
+
+    @staticmethod
+    def failure_response(failure: dict) -> tuple[int, dict, dict]:
+        reason = failure["reason"] or ("rateLimitExceeded" if failure["status"] in (403, 429) else "backendError")
+        headers = {"Retry-After": failure["retry_after"]} if failure["retry_after"] else {}
+        body = {"error": {"code": failure["status"], "message": reason, "errors": [{"reason": reason}]}}
+        return failure["status"], body, headers
+
+    def start_upload(self, metadata: dict, file_id: str | None = None) -> str:
+        """Start a resumable upload session (replacing the content of `file_id` if given) and return its ID."""
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self._uploads[upload_id] = {"metadata": metadata, "content": b"", "file_id": file_id}
+        return upload_id
+
+    def upload_chunk(self, upload_id: str, content_range: str | None, chunk: bytes) -> tuple[int, dict | None, dict]:
+        """Receive a chunk of a resumable upload, returning 308 until the last byte is received."""
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+        if upload is None:
+            return 404, {"error": {"code": 404, "message": "Upload session not found"}}, {}
+
+        # Content-Range is 'bytes first-last/total', or 'bytes */total' to ask for the received range
+        byte_range, _, total = (content_range or "bytes */*").removeprefix("bytes ").partition("/")
+        if byte_range != "*":
+            first = int(byte_range.split("-")[0])
+            if first > len(upload["content"]):
+                return 400, {"error": {"code": 400, "message": "Chunk does not continue the upload"}}, {}
+            upload["content"] = upload["content"][:first] + chunk
+        received = len(upload["content"])
+
+        if total == "*" or (total.isdigit() and received < int(total)):
+            return 308, None, {"Range": f"bytes=0-{received - 1}"} if received else {}
+
+        with self._lock:
+            self._uploads.pop(upload_id, None)
+        if upload["file_id"]:
+            return (*self.update_content(upload["file_id"], upload["metadata"], upload["content"]), {})
+        return 200, self.public(self.add_file(upload["metadata"], upload["content"])), {}
+
+    def receive_partial_chunk(self, upload_id: str, content_range: str, chunk: bytes) -> None:
+        """Store the part of a chunk that arrived before the connection broke."""
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+        if upload is not None:
+            first = int(content_range.removeprefix("bytes ").split("-")[0])
+            upload["content"] = upload["content"][:first] + chunk
+
+    def update_file(self, file_id: str, params: dict, metadata: dict) -> tuple[int, dict]:
+        """Update the metadata of a file, moving it when addParents/removeParents are given."""
+        with self._lock:
+            file = self.files.get(file_id)
+            if file is None:
+                return 404, {"error": {"code": 404, "message": f"File not found: {file_id}."}}
+            parents = [p for p in file["parents"] if p not in params.get("removeParents", [""])[0].split(",")]
+            parents += [p for p in params.get("addParents", [""])[0].split(",") if p]
+            file.update(metadata, parents=parents)
+            self.change_log.append({"fileId": file_id, "removed": False})
+            return 200, self.public(file)
+
+    def delete_file(self, file_id: str) -> tuple[int, dict | None]:
+        with self._lock:
+            if self.files.pop(file_id, None) is None:
+                return 404, {"error": {"code": 404, "message": f"File not found: {file_id}."}}
+            self.contents.pop(file_id, None)
+            self.change_log.append({"fileId": file_id, "removed": True})
+        return 204, None
+
+    def handle_batch(self, content_type: str, body: bytes) -> tuple[str, bytes]:
+        """Execute every request in a multipart/mixed batch and return the multipart response."""
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + body
+        )
+        boundary = uuid.uuid4().hex
+        parts = []
+
+        for part in message.iter_parts():
+            request = part.get_payload(decode=True).decode()
+            request_line = request.splitlines()[0]
+            method, url, _ = request_line.split(" ", 2)
+            # googleapiclient separates the headers of a batched request from its body with bare newlines
+            request_head_and_body = re.split(r"\r?\n\r?\n", request, maxsplit=1)
+            request_body = request_head_and_body[1] if len(request_head_and_body) > 1 else ""
+
+            status, response_body = 404, {"error": {"code": 404, "message": "Not found"}}
+            url = urlparse(url)
+            failure = self.take_failure(method, url.path.rsplit("/", 1)[1], batched=True)
+            if failure is not None:
+                status, response_body, _ = self.failure_response(failure)
+            elif method == "DELETE" and "/files/" in url.path:
+                status, response_body = self.delete_file(url.path.rsplit("/", 1)[1])
+            elif method == "PATCH" and "/files/" in url.path:
+                status, response_body = self.update_file(
+                    url.path.rsplit("/", 1)[1], parse_qs(url.query), json.loads(request_body.strip() or "{}")
+                )
+
+            content_id = part["Content-ID"].strip("<>")
+            payload = json.dumps(response_body) if response_body is not None else ""
+            parts.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} Status\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n\r\n"
+                f"{payload}\r\n"
+            )
+
+        if self.batch_responses is not None:
+            parts = list(self.batch_responses(parts))
+        return f"multipart/mixed; boundary={boundary}", ("".join(parts) + f"--{boundary}--").encode()
+    #endregion
+
+    def _create_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, don't let them wait for the client's delayed ACK
+            disable_nagle_algorithm = True
+
+            def setup(self) -> None:
+                with fake._lock:
+                    fake.connection_count += 1
+                time.sleep(fake.connect_latency)
+                if isinstance(self.request, ssl.SSLSocket):
+                    self.request.do_handshake()
+                super().setup()
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def _send(
+                self, status: int, body: bytes = b"", content_type: str = "application/json", headers: dict | None = None
+            ) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_json(self, status: int, body: dict | None, headers: dict | None = None) -> None:
+                self._send(status, json.dumps(body).encode() if body is not None else b"", headers=headers)
+
+            def _read_body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            def _before_request(self) -> bool:
+                """Count and delay the request, returns False when an injected failure was sent instead."""
+                with fake._lock:
+                    fake.request_count += 1
+                time.sleep(fake.latency)
+
+                path = urlparse(self.path).path
+                failure = fake.take_failure(self.command, path.rsplit("/", 1)[1] if "/files/" in path else None)
+                if failure is None:
+                    return True
+
+                body = self._read_body()
+                if failure["partial"] and self.command == "PUT":
+                    upload_id = parse_qs(urlparse(self.path).query).get("upload_id", [""])[0]
+                    content_range = self.headers.get("Content-Range")
+                    if content_range and not content_range.startswith("bytes */"):
+                        fake.receive_partial_chunk(upload_id, content_range, body[:len(body) // 2])
+                self._send_json(*fake.failure_response(failure))
+                return False
+
+            def do_GET(self) -> None:
+                if not self._before_request():
+                    return
+                url = urlparse(self.path)
+                if url.path == "/drive/v3/files":
+                    self._send_json(*fake.list_files(parse_qs(url.query)))
+                elif url.path == "/drive/v3/changes/startPageToken":
+                    self._send_json(200, {"startPageToken": str(len(fake.change_log))})
+                elif url.path == "/drive/v3/changes":
+                    self._send_json(*fake.list_changes(parse_qs(url.query)))
+                elif url.path.startswith("/drive/v3/files/") and parse_qs(url.query).get("alt") == ["media"]:
+                    status, body, headers = fake.get_media(url.path.rsplit("/", 1)[1], self.headers.get("Range"))
+                    self._send(status, body, "application/octet-stream", headers)
+                elif url.path.startswith("/drive/v3/files/"):
+                    self._send_json(*fake.get_file(url.path.rsplit("/", 1)[1]))
+                else:
+                    self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+
+            def do_DELETE(self) -> None:
+                if not self._before_request():
+                    return
+                self._send_json(*fake.delete_file(urlparse(self.path).path.rsplit("/", 1)[1]))
+
+            def do_POST(self) -> None:
+                if not self._before_request():
+                    return
+                body = self._read_body()
+                url = urlparse(self.path)
+                params = parse_qs(url.query)
+
+                if url.path == "/drive/v3/changes/watch":
+                    channel = json.loads(body or b"{}")
+                    channel["resourceId"] = uuid.uuid4().hex
+                    with fake._lock:
+                        fake.channels[channel["id"]] = channel
+                    self._send_json(200, channel)
+                elif url.path == "/drive/v3/channels/stop":
+                    with fake._lock:
+                        fake.channels.pop(json.loads(body or b"{}").get("id"), None)
+                    self._send_json(204, None)
+                elif url.path == "/batch/drive/v3":
+                    content_type, response = fake.handle_batch(self.headers["Content-Type"], body)
+                    self._send(200, response, content_type)
+                elif url.path == "/drive/v3/files":
+                    self._send_json(*fake.create_file(json.loads(body or b"{}")))
+                elif url.path.endswith("/upload/drive/v3/files") and params.get("uploadType") == ["multipart"]:
+                    self._send_json(*fake.multipart_upload(self.headers["Content-Type"], body))
+                elif url.path.endswith("/upload/drive/v3/files") and params.get("uploadType") == ["resumable"]:
+                    metadata = json.loads(body or b"{}")
+                    error = fake.missing_parent(metadata)
+                    if error:
+                        self._send_json(*error)
+                        return
+                    upload_id = fake.start_upload(metadata)
+                    location = f"{fake.root_url}upload/drive/v3/files?uploadType=resumable&upload_id={upload_id}"
+                    self._send_json(200, {}, {"Location": location})
+                else:
+                    self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+
+            def do_PATCH(self) -> None:
+                if not self._before_request():
+                    return
+                body = self._read_body()
+                url = urlparse(self.path)
+                params = parse_qs(url.query)
+                file_id = url.path.rsplit("/", 1)[1]
+
+                if url.path.startswith("/upload/drive/v3/files/") and params.get("uploadType") == ["multipart"]:
+                    self._send_json(*fake.multipart_upload(self.headers["Content-Type"], body, file_id))
+                elif url.path.startswith("/upload/drive/v3/files/") and params.get("uploadType") == ["resumable"]:
+                    upload_id = fake.start_upload(json.loads(body or b"{}"), file_id)
+                    location = f"{fake.root_url}upload/drive/v3/files/{file_id}?uploadType=resumable&upload_id={upload_id}"
+                    self._send_json(200, {}, {"Location": location})
+                else:
+                    self._send_json(*fake.update_file(file_id, params, json.loads(body or b"{}")))
+
+            def do_PUT(self) -> None:
+                if not self._before_request():
+                    return
+                body = self._read_body()
+                upload_id = parse_qs(urlparse(self.path).query).get("upload_id", [""])[0]
+                self._send_json(*fake.upload_chunk(upload_id, self.headers.get("Content-Range"), body))
+
+        return Handler
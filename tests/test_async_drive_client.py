@@ -0,0 +1,362 @@
+import asyncio
+import hashlib
+from types import SimpleNamespace
+
+from google.oauth2.credentials import Credentials
+
+import pytest
+from googleapiclient.errors import HttpError
+from homeassistant.core import HomeAssistant
+
+from custom_components.google_drive_file_manager.const import DRIVE_BATCH_MAX_REQUESTS, FOLDER_MIME_TYPE
+from custom_components.google_drive_file_manager.helpers import google_drive_actions
+from custom_components.google_drive_file_manager.helpers.async_drive_client import AsyncDriveClient
+from custom_components.google_drive_file_manager.helpers.drive_client_pool import DriveClientPool
+from custom_components.google_drive_file_manager.helpers.folder_cache import FolderCache
+from custom_components.google_drive_file_manager.helpers.google_drive_actions import (
+    async_native_delete_files_batch,
+    async_native_extract_folder_id_from_path,
+    async_native_get_list_files_by_pattern,
+    async_native_iter_cleanup_older_files_by_pattern,
+    async_native_upload_media_file,
+    delete_files_batch,
+    extract_folder_id_from_path,
+    get_list_files_by_pattern,
+    iter_cleanup_older_files_by_pattern,
+    upload_media_file,
+)
+from custom_components.google_drive_file_manager.helpers.rate_limiter import DriveRateLimiter
+from custom_components.google_drive_file_manager.helpers.upload_strategy import UploadStrategy
+from tests.fake_drive_server import FakeDriveServer
+
+CREDENTIALS = Credentials(token="test-token")
+# The smallest chunk of a resumable upload
+CHUNK_SIZE = 256 * 1024
+# 3 chunks, the last one shorter
+CONTENT = bytes(range(256)) * (3 * 1024 - 10)
+BACKENDS = ["native", "googleapiclient"]
+
+
+class DriveFixture:
+    def __init__(self, tmp_path) -> None:
+        self.config_dir = str(tmp_path)
+        self.server = FakeDriveServer()
+        self.server.start()
+        # Failed chunks are resumed after a few milliseconds
+        self.rate_limiter = DriveRateLimiter(10000, 10000, base_delay=0.01, max_delay=0.04)
+        self.client_pool = DriveClientPool(root_url=self.server.root_url, rate_limiter=self.rate_limiter)
+        self.client_pool.load_discovery_document()
+
+    def native(self, call):
+        """Return the result of `call(hass, client)`, with an AsyncDriveClient on a running Home Assistant."""
+
+        async def main():
+            hass = HomeAssistant(self.config_dir)
+
+            async def get_access_token() -> str:
+                return "test-token"
+
+            try:
+                return await call(hass, AsyncDriveClient(hass, get_access_token, self.rate_limiter, self.server.root_url))
+            finally:
+                await hass.async_stop(force=True)
+
+        return asyncio.run(main())
+
+    def close(self) -> None:
+        self.client_pool.close()
+        self.server.stop()
+
+
+@pytest.fixture
+def drive(tmp_path):
+    drive = DriveFixture(tmp_path)
+    yield drive
+    drive.close()
+
+
+def add_files(server: FakeDriveServer, count: int) -> list[dict]:
+    return [{"id": server.add_file({"name": f"file_{i}"})["id"], "name": f"file_{i}"} for i in range(count)]
+
+
+#region Batch requests
+@pytest.mark.parametrize("order", [None, lambda parts: parts[::-1]], ids=["in_order", "reversed"])
+def test_batch_responses_map_to_their_request(drive, order):
+    drive.server.batch_responses = order
+    files = add_files(drive.server, 2)
+
+    responses = drive.native(lambda hass, client: client.async_batch([
+        ("DELETE", f"drive/v3/files/{files[0]['id']}", None),
+        ("DELETE", "drive/v3/files/missing-id", None),
+        ("PATCH", f"drive/v3/files/{files[1]['id']}", {"trashed": True}),
+    ]))
+
+    assert responses[0] == ({}, None)
+    assert responses[1][0] is None and responses[1][1].resp.status == 404
+    assert responses[2][0]["id"] == files[1]["id"] and responses[2][0]["trashed"] is True
+    assert list(drive.server.files) == [files[1]["id"]]
+
+
+def test_missing_batch_response_fails_only_its_request(drive):
+    drive.server.batch_responses = lambda parts: [parts[0], parts[2]]
+    files = add_files(drive.server, 3)
+
+    results = drive.native(lambda hass, client: async_native_delete_files_batch(client, files))
+
+    assert [(result["name"], result["status"], result.get("http_status")) for result in results] == [
+        ("file_0", "deleted", None),
+        ("file_1", "failed", 500),
+        ("file_2", "deleted", None),
+    ]
+    assert "No response received" in results[1]["error"]
+
+
+def test_batch_of_too_many_requests_is_refused(drive):
+    requests = [("DELETE", f"drive/v3/files/{index}", None) for index in range(DRIVE_BATCH_MAX_REQUESTS + 1)]
+
+    with pytest.raises(ValueError):
+        drive.native(lambda hass, client: client.async_batch(requests))
+
+    assert drive.server.request_count == 0
+
+
+@pytest.mark.parametrize("order", [None, lambda parts: parts[::-1]], ids=["in_order", "reversed"])
+def test_native_batch_delete_matches_googleapiclient(drive, order):
+    drive.server.batch_responses = order
+
+    def delete(backend: str) -> list[tuple]:
+        files = add_files(drive.server, 3)
+        files.insert(1, {"id": "missing-id", "name": "gone"})
+        drive.server.fail_requests(1, 403, "DELETE", reason="insufficientFilePermissions", file_id=files[2]["id"])
+        if backend == "native":
+            results = drive.native(lambda hass, client: async_native_delete_files_batch(client, files))
+        else:
+            results = delete_files_batch(CREDENTIALS, files, drive.client_pool)
+        return [(result["name"], result["status"], result.get("http_status")) for result in results]
+
+    assert delete("native") == delete("googleapiclient") == [
+        ("file_0", "deleted", None),
+        ("gone", "failed", 404),
+        ("file_1", "failed", 403),
+        ("file_2", "deleted", None),
+    ]
+
+
+def test_failed_batch_request_fails_every_file_like_googleapiclient(drive):
+    files = add_files(drive.server, 2)
+
+    def delete(backend: str) -> list[tuple]:
+        drive.server.fail_requests(1, 400, "POST", reason="badRequest")
+        if backend == "native":
+            results = drive.native(lambda hass, client: async_native_delete_files_batch(client, files))
+        else:
+            results = delete_files_batch(CREDENTIALS, files, drive.client_pool)
+        return [(result["status"], result["http_status"]) for result in results]
+
+    assert delete("native") == delete("googleapiclient") == [("failed", 400), ("failed", 400)]
+    assert len(drive.server.files) == 2
+
+    drive.server.fail_requests(1, 400, "POST", reason="badRequest")
+    with pytest.raises(HttpError):
+        drive.native(lambda hass, client: client.async_batch([("DELETE", f"drive/v3/files/{files[0]['id']}", None)]))
+#endregion
+
+#region Resumable uploads
+class ChunkRecorder:
+    """Progress tracker that records the acknowledged bytes after every chunk, calling `after_first_chunk` once."""
+
+    def __init__(self, after_first_chunk=None) -> None:
+        self.offsets = []
+        self._after_first_chunk = after_first_chunk
+
+    def start(self, name: str, size: int) -> str:
+        return name
+
+    def update(self, upload_id: str, bytes_sent: int, chunk_bytes: int, chunk_seconds: float) -> None:
+        self.offsets.append(bytes_sent)
+        if len(self.offsets) == 1 and self._after_first_chunk:
+            self._after_first_chunk()
+
+    def finish(self, upload_id: str) -> None:
+        pass
+
+
+def upload(drive: DriveFixture, backend: str, local_file_path: str, progress_tracker=None, resumable: bool = True) -> dict:
+    """Upload a file to 'camera/2025' with the backend, in chunks of CHUNK_SIZE when `resumable`."""
+    upload_strategy = UploadStrategy(
+        multipart_threshold=0 if resumable else len(CONTENT), min_chunk_size=CHUNK_SIZE, max_chunk_size=CHUNK_SIZE
+    )
+    fields = "id,name,mimeType,parents,md5Checksum,size"
+    if backend == "native":
+        return drive.native(lambda hass, client: async_native_upload_media_file(
+            hass,
+            client,
+            local_file_path,
+            fields,
+            "video/mp4",
+            "clip.mp4",
+            "camera/2025",
+            upload_strategy=upload_strategy,
+            progress_tracker=progress_tracker,
+            folder_cache=FolderCache(),
+        ))
+    return upload_media_file(
+        SimpleNamespace(data={}),
+        CREDENTIALS,
+        local_file_path,
+        fields,
+        "video/mp4",
+        "clip.mp4",
+        "camera/2025",
+        client_pool=drive.client_pool,
+        upload_strategy=upload_strategy,
+        progress_tracker=progress_tracker,
+        folder_cache=FolderCache(),
+    )
+
+
+@pytest.fixture
+def local_file(tmp_path) -> str:
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(CONTENT)
+    return str(path)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_resumable_upload_sends_the_file_in_chunks(drive, local_file, backend):
+    recorder = ChunkRecorder()
+
+    response = upload(drive, backend, local_file, recorder)
+
+    assert recorder.offsets == [CHUNK_SIZE, 2 * CHUNK_SIZE, len(CONTENT)]
+    assert response["upload_strategy"] == "resumable"
+    assert response["md5Checksum"] == hashlib.md5(CONTENT).hexdigest()
+    assert drive.server.contents[response["id"]] == CONTENT
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_failed_chunk_is_resumed_from_the_acknowledged_bytes(drive, local_file, backend):
+    requests = []
+
+    def fail_next_chunk():
+        requests.append(drive.server.request_count)
+        # Drive keeps the first half of the chunk before the connection breaks
+        drive.server.fail_requests(1, 503, "PUT", partial=True)
+
+    recorder = ChunkRecorder(fail_next_chunk)
+
+    response = upload(drive, backend, local_file, recorder)
+
+    assert recorder.offsets == [CHUNK_SIZE, 2 * CHUNK_SIZE + CHUNK_SIZE // 2, len(CONTENT)]
+    assert drive.server.contents[response["id"]] == CONTENT
+    # The failed chunk, the status query and the rest of the file from the acknowledged byte
+    assert drive.server.request_count - requests[0] == 4
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_chunk_answered_with_308_without_range_is_sent_again_from_zero(drive, local_file, backend):
+    # Without a Range header Drive has not kept any byte of the upload
+    recorder = ChunkRecorder(lambda: drive.server.fail_requests(1, 308, "PUT"))
+
+    response = upload(drive, backend, local_file, recorder)
+
+    assert recorder.offsets == [CHUNK_SIZE, 0, CHUNK_SIZE, 2 * CHUNK_SIZE, len(CONTENT)]
+    assert drive.server.contents[response["id"]] == CONTENT
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_failed_first_chunk_restarts_from_zero(drive, local_file, backend):
+    # The status query after the failure is answered with a 308 without Range
+    drive.server.fail_requests(1, 503, "PUT")
+    recorder = ChunkRecorder()
+
+    response = upload(drive, backend, local_file, recorder)
+
+    assert recorder.offsets == [CHUNK_SIZE, 2 * CHUNK_SIZE, len(CONTENT)]
+    assert drive.server.contents[response["id"]] == CONTENT
+
+
+@pytest.mark.parametrize("resumable", [False, True], ids=["multipart", "resumable"])
+def test_native_upload_matches_googleapiclient(drive, local_file, resumable):
+    native = upload(drive, "native", local_file, resumable=resumable)
+    threaded = upload(drive, "googleapiclient", local_file, resumable=resumable)
+
+    def without_id(response: dict) -> dict:
+        return {key: value for key, value in response.items() if key != "id"}
+
+    assert without_id(native) == without_id(threaded)
+    assert native["upload_strategy"] == ("resumable" if resumable else "multipart")
+    assert drive.server.contents[native["id"]] == drive.server.contents[threaded["id"]] == CONTENT
+    # The second upload found the folders the first one created
+    folders = [file["name"] for file in drive.server.files.values() if file["mimeType"] == FOLDER_MIME_TYPE]
+    assert sorted(folders) == ["2025", "camera"]
+#endregion
+
+#region Folders, listing and cleanup
+def test_native_and_googleapiclient_resolve_the_same_folders(drive):
+    native = drive.native(
+        lambda hass, client: async_native_extract_folder_id_from_path(client, "camera/2025/06", FolderCache())
+    )
+    threaded = extract_folder_id_from_path(None, CREDENTIALS, "camera/2025/06", drive.client_pool, FolderCache())
+    threaded_new = extract_folder_id_from_path(None, CREDENTIALS, "/camera/2025/07/", drive.client_pool, FolderCache())
+    native_new = drive.native(
+        lambda hass, client: async_native_extract_folder_id_from_path(client, "/camera/2025/07/", FolderCache())
+    )
+
+    assert native == threaded
+    assert native_new == threaded_new
+    assert sorted(file["name"] for file in drive.server.files.values()) == ["06", "07", "2025", "camera"]
+
+
+@pytest.mark.parametrize("sort_by_recent", [False, True])
+@pytest.mark.parametrize("maximum_files", [0, 3, 1500])
+def test_native_listing_matches_googleapiclient(drive, sort_by_recent, maximum_files):
+    drive.server.add_files(2500, "camera")
+    drive.server.add_files(10, "doorbell")
+    query = "name contains 'camera'"
+
+    native = drive.native(lambda hass, client: async_native_get_list_files_by_pattern(
+        client, query, "id,name", sort_by_recent, maximum_files
+    ))
+    threaded = get_list_files_by_pattern(CREDENTIALS, query, "id,name", sort_by_recent, maximum_files, drive.client_pool)
+
+    assert native == threaded
+    assert len(native["files"]) == (maximum_files or 2500)
+
+
+@pytest.mark.parametrize("preview", [False, True])
+def test_native_cleanup_matches_googleapiclient(drive, monkeypatch, preview):
+    # Several batches per page, with one of them in flight per backend at a time
+    monkeypatch.setattr(google_drive_actions, "DELETE_BATCH_SIZE", 4)
+    drive.server.add_files(30, "native")
+    drive.server.add_files(30, "threaded")
+    drive.server.add_files(5, "other")
+
+    def cleanup(backend: str) -> list[tuple]:
+        names = {file["name"]: file["id"] for file in drive.server.files.values()}
+        drive.server.fail_requests(1, 403, "DELETE", reason="insufficientFilePermissions", file_id=names[f"{backend}_7"])
+        pattern = f"name contains '{backend}'"
+        if backend == "native":
+            async def collect(hass, client) -> list[dict]:
+                return [
+                    result
+                    async for results in async_native_iter_cleanup_older_files_by_pattern(client, pattern, 30, preview, "id,name")
+                    for result in results
+                ]
+
+            results = drive.native(collect)
+        else:
+            results = list(iter_cleanup_older_files_by_pattern(CREDENTIALS, pattern, 30, preview, "id,name", drive.client_pool))
+        return sorted((result["name"].split("_", 1)[1], result["status"], result.get("http_status")) for result in results)
+
+    native, threaded = cleanup("native"), cleanup("threaded")
+
+    assert native == threaded
+    if preview:
+        assert {status for _, status, _ in native} == {"preview"}
+    else:
+        assert [item for item in native if item[1] == "failed"] == [("7", "failed", 403)]
+        assert sorted(file["name"] for file in drive.server.files.values()) == [
+            "native_7", *(f"other_{i}" for i in range(5)), "threaded_7"
+        ]
+#endregion
@@ -0,0 +1,131 @@
+import threading
+import time
+
+from google.oauth2.credentials import Credentials
+
+import pytest
+from googleapiclient.errors import HttpError
+
+from custom_components.google_drive_file_manager.const import DELETE_BATCH_SIZE, DELETE_MAX_CONCURRENT_BATCHES
+from custom_components.google_drive_file_manager.helpers import google_drive_actions
+from custom_components.google_drive_file_manager.helpers.drive_client_pool import DriveClientPool
+from custom_components.google_drive_file_manager.helpers.google_drive_actions import iter_cleanup_older_files_by_pattern
+from custom_components.google_drive_file_manager.helpers.rate_limiter import DriveRateLimiter
+from tests.fake_drive_server import FakeDriveServer
+
+CREDENTIALS = Credentials(token="test-token")
+# Drive lists pages of 1000 files
+PAGE_SIZE = 1000
+
+
+@pytest.fixture
+def drive():
+    server = FakeDriveServer()
+    server.start()
+    client_pool = DriveClientPool(root_url=server.root_url, rate_limiter=DriveRateLimiter(10000, 10000))
+    client_pool.load_discovery_document()
+    yield server, client_pool
+    client_pool.close()
+    server.stop()
+
+
+def cleanup(client_pool: DriveClientPool, preview: bool = False, progress_callback=None):
+    return iter_cleanup_older_files_by_pattern(
+        CREDENTIALS, "name contains 'camera'", 30, preview, "id,name", client_pool, progress_callback
+    )
+
+
+def wait_for_listing_threads() -> bool:
+    """Return whether the producer threads of the listings finished within a few seconds."""
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        if not any(thread.name.startswith("google_drive_list") for thread in threading.enumerate()):
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_listing_waits_while_deletes_lag_behind(drive, monkeypatch):
+    server, client_pool = drive
+    server.add_files(5 * PAGE_SIZE, "camera")
+    release = threading.Event()
+    batch_delete = google_drive_actions.delete_files_batch
+
+    def slow_delete_files_batch(*args):
+        release.wait(10)
+        return batch_delete(*args)
+
+    monkeypatch.setattr(google_drive_actions, "delete_files_batch", slow_delete_files_batch)
+    results = cleanup(client_pool)
+    first = []
+    consumer = threading.Thread(target=lambda: first.append(next(results)))
+    consumer.start()
+
+    # No batch was sent yet, so every request so far listed a page
+    time.sleep(0.5)
+    pages_listed = server.request_count
+
+    release.set()
+    consumer.join(10)
+    results = [*first, *results]
+
+    # The batches in flight and the batch waiting for a free slot come from the first page,
+    # the next page is queued and the producer waits for room in the queue with a third one
+    assert (DELETE_MAX_CONCURRENT_BATCHES + 1) * DELETE_BATCH_SIZE <= PAGE_SIZE
+    assert pages_listed <= 3
+    assert len(results) == 5 * PAGE_SIZE
+    assert {result["status"] for result in results} == {"deleted"}
+    assert server.files == {}
+
+
+def test_listing_stops_when_the_consumer_stops(drive):
+    server, client_pool = drive
+    server.add_files(5 * PAGE_SIZE, "camera")
+
+    results = cleanup(client_pool, preview=True)
+    taken = [next(results) for _ in range(10)]
+    results.close()
+
+    assert wait_for_listing_threads()
+    requests = server.request_count
+    time.sleep(0.2)
+
+    assert [result["status"] for result in taken] == ["preview"] * 10
+    assert requests == server.request_count
+    assert requests < 5
+    assert len(server.files) == 5 * PAGE_SIZE
+
+
+def test_progress_is_reported_per_page_and_when_finished(drive, monkeypatch):
+    server, client_pool = drive
+    monkeypatch.setattr(google_drive_actions, "CLEANUP_PROGRESS_INTERVAL", 0)
+    server.add_files(2 * PAGE_SIZE + 500, "camera")
+    server.add_file({"name": "other", "createdTime": "2000-01-01T00:00:00.000Z"})
+    reports = []
+
+    results = list(cleanup(client_pool, progress_callback=reports.append))
+
+    assert len(results) == 2 * PAGE_SIZE + 500
+    assert [(report["pages_scanned"], report["finished"]) for report in reports] == [
+        (1, False),
+        (2, False),
+        (3, False),
+        (3, True),
+    ]
+    assert reports[-1]["files_deleted"] == 2 * PAGE_SIZE + 500
+    assert reports[-1]["files_failed"] == 0
+    # Reported while the pages are deleted, not after
+    assert reports[1]["files_deleted"] < reports[-1]["files_deleted"]
+    assert [file["name"] for file in server.files.values()] == ["other"]
+
+
+def test_listing_failure_is_raised_to_the_consumer(drive):
+    server, client_pool = drive
+    server.add_files(10, "camera")
+    server.fail_requests(1, 400, "GET", reason="invalidQuery")
+
+    with pytest.raises(HttpError):
+        list(cleanup(client_pool))
+
+    assert wait_for_listing_threads()
+    assert len(server.files) == 10
@@ -0,0 +1,76 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from homeassistant.helpers.config_entry_oauth2_flow import OAuth2Session
+
+from custom_components.google_drive_file_manager.helpers.authentication_services import DriveCredentialsCache
+
+
+class FakeImplementation:
+    def __init__(self) -> None:
+        self.refreshes = 0
+
+    async def async_refresh_token(self, token: dict) -> dict:
+        self.refreshes += 1
+        # Give the other calls time to queue up behind the refresh
+        await asyncio.sleep(0.05)
+        return {**token, "access_token": f"token-{self.refreshes}", "expires_at": time.time() + 3600}
+
+
+def create_cache(expires_in: float) -> tuple[DriveCredentialsCache, FakeImplementation, SimpleNamespace]:
+    entry = SimpleNamespace(data={
+        "client_id": "client-id",
+        "client_secret": "client-secret",
+        "token": {"access_token": "token-0", "refresh_token": "refresh", "expires_at": time.time() + expires_in},
+    })
+
+    def async_update_entry(config_entry, data: dict) -> None:
+        config_entry.data = data
+
+    hass = SimpleNamespace(config_entries=SimpleNamespace(async_update_entry=async_update_entry))
+    implementation = FakeImplementation()
+    return DriveCredentialsCache(hass, entry, OAuth2Session(hass, entry, implementation)), implementation, entry
+
+
+def test_concurrent_calls_refresh_an_expired_token_once():
+    cache, implementation, entry = create_cache(-10)
+
+    async def main():
+        return await asyncio.gather(*(cache.async_get_credentials() for _ in range(10)))
+
+    credentials = asyncio.run(main())
+
+    assert implementation.refreshes == 1
+    assert all(item is credentials[0] for item in credentials)
+    assert credentials[0].token == entry.data["token"]["access_token"] == "token-1"
+    assert credentials[0].refresh_token == "refresh"
+    assert credentials[0].client_id == "client-id"
+
+
+def test_valid_token_is_not_refreshed_and_credentials_are_reused():
+    cache, implementation, _ = create_cache(3600)
+
+    async def main():
+        return [await cache.async_get_credentials() for _ in range(3)]
+
+    first, *others = asyncio.run(main())
+
+    assert implementation.refreshes == 0
+    assert first.token == "token-0"
+    assert all(item is first for item in others)
+
+
+def test_token_refreshed_elsewhere_replaces_the_credentials():
+    cache, implementation, entry = create_cache(3600)
+
+    async def main():
+        first = await cache.async_get_credentials()
+        # E.g. refreshed by another request of the OAuth2 session
+        entry.data = {**entry.data, "token": {**entry.data["token"], "access_token": "token-other"}}
+        return first, await cache.async_get_credentials()
+
+    first, second = asyncio.run(main())
+
+    assert implementation.refreshes == 0
+    assert (first.token, second.token) == ("token-0", "token-other")
@@ -0,0 +1,124 @@
+from datetime import date
+
+from google.oauth2.credentials import Credentials
+
+import pytest
+import voluptuous as vol
+
+from custom_components.google_drive_file_manager.const import FOLDER_MIME_TYPE
+from custom_components.google_drive_file_manager.helpers.drive_client_pool import DriveClientPool, get_drive_service
+from custom_components.google_drive_file_manager.helpers.google_drive_actions import (
+    find_expired_date_folders,
+    get_date_folder_range,
+)
+from custom_components.google_drive_file_manager.helpers.service_schemas import SCHEMAS
+from tests.fake_drive_server import FakeDriveServer
+
+
+@pytest.fixture
+def drive():
+    server = FakeDriveServer()
+    server.start()
+    client_pool = DriveClientPool(root_url=server.root_url)
+    client_pool.load_discovery_document()
+    yield server, get_drive_service(Credentials(token="test-token"), client_pool)
+    client_pool.close()
+    server.stop()
+
+
+def add_folder(server: FakeDriveServer, name: str, parent: str) -> str:
+    return server.add_file({"name": name, "mimeType": FOLDER_MIME_TYPE, "parents": [parent]})["id"]
+
+
+def add_date_tree(server: FakeDriveServer, parent: str, days: list[date]) -> None:
+    """Add the year/month/day folders append_ymd_path creates for `days`."""
+    folders = {}
+    for day in days:
+        parent_id = parent
+        for name in (f"{day.year:04d}", f"{day.month:02d}", f"{day.day:02d}"):
+            key = (parent_id, name)
+            if key not in folders:
+                folders[key] = add_folder(server, name, parent_id)
+            parent_id = folders[key]
+
+
+@pytest.mark.parametrize(("year", "month", "last_day"), [
+    (2025, 1, date(2025, 1, 31)),
+    (2025, 4, date(2025, 4, 30)),
+    (2025, 12, date(2025, 12, 31)),
+    (2024, 2, date(2024, 2, 29)),
+    (2025, 2, date(2025, 2, 28)),
+    (2000, 2, date(2000, 2, 29)),
+    (1900, 2, date(1900, 2, 28)),
+])
+def test_month_folder_ends_on_last_day_of_month(year, month, last_day):
+    assert get_date_folder_range(f"{month:02d}", (year,)) == ((year, month), date(year, month, 1), last_day)
+
+
+def test_year_and_day_folder_ranges():
+    assert get_date_folder_range("2024", ()) == ((2024,), date(2024, 1, 1), date(2024, 12, 31))
+    assert get_date_folder_range("29", (2024, 2)) == ((2024, 2, 29), date(2024, 2, 29), date(2024, 2, 29))
+
+
+@pytest.mark.parametrize(("name", "parent_parts"), [
+    ("29", (2025, 2)),  # not a leap year
+    ("31", (2025, 4)),
+    ("00", (2025, 4)),
+    ("13", (2025,)),
+    ("00", (2025,)),
+    ("3", (2025,)),  # append_ymd_path pads months and days
+    ("2025a", ()),
+    ("202", ()),
+    ("0000", ()),
+    ("backups", ()),
+    ("²⁰²⁵", ()),  # digits int() does not parse
+    ("2025", (2025,)),
+])
+def test_non_date_folder_names_are_ignored(name, parent_parts):
+    assert get_date_folder_range(name, parent_parts) is None
+
+
+def test_cutoff_in_the_middle_of_a_month(drive):
+    server, service = drive
+    root_id = add_folder(server, "camera", "root")
+    add_date_tree(server, root_id, [
+        date(2023, 12, 31),
+        date(2024, 2, 28),
+        date(2024, 2, 29),
+        date(2024, 3, 1),
+        date(2024, 3, 14),
+        date(2024, 3, 15),
+        date(2024, 3, 16),
+        date(2024, 4, 1),
+    ])
+    add_folder(server, "notes", root_id)
+    add_folder(server, "misc", add_folder(server, "2024", "root"))  # outside of the folder
+
+    expired = find_expired_date_folders(service, root_id, "camera", date(2024, 3, 15))
+
+    # Whole years and months are returned without their subfolders, only March is split by day
+    assert [(folder["path"], folder["last_day"]) for folder in expired] == [
+        ("camera/2023", "2023-12-31"),
+        ("camera/2024/02", "2024-02-29"),
+        ("camera/2024/03/01", "2024-03-01"),
+        ("camera/2024/03/14", "2024-03-14"),
+    ]
+
+
+def test_cutoff_on_the_first_day_of_a_year(drive):
+    server, service = drive
+    root_id = add_folder(server, "camera", "root")
+    add_date_tree(server, root_id, [date(2024, 12, 31), date(2025, 1, 1)])
+
+    expired = find_expired_date_folders(service, root_id, "camera", date(2025, 1, 1))
+
+    assert [folder["path"] for folder in expired] == ["camera/2024"]
+
+
+def test_cleanup_date_folders_requires_a_folder_below_root():
+    schema = SCHEMAS["cleanup_older_date_folders"]
+
+    for data in ({"days_ago": 30}, {"remote_folder_path": "", "days_ago": 30}, {"remote_folder_path": "/", "days_ago": 30}):
+        with pytest.raises(vol.Invalid):
+            schema(data)
+    assert schema({"remote_folder_path": "camera", "days_ago": 30})["remote_folder_path"] == "camera"
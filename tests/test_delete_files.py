@@ -0,0 +1,142 @@
+import threading
+
+from google.oauth2.credentials import Credentials
+
+import pytest
+
+from custom_components.google_drive_file_manager.const import DELETE_MAX_CONCURRENT_BATCHES
+from custom_components.google_drive_file_manager.helpers import google_drive_actions
+from custom_components.google_drive_file_manager.helpers.drive_client_pool import DriveClientPool
+from custom_components.google_drive_file_manager.helpers.google_drive_actions import delete_files_batch, iter_delete_files
+from custom_components.google_drive_file_manager.helpers.rate_limiter import DriveRateLimiter
+from tests.fake_drive_server import FakeDriveServer
+
+CREDENTIALS = Credentials(token="test-token")
+
+
+@pytest.fixture
+def drive():
+    server = FakeDriveServer()
+    server.start()
+    client_pool = DriveClientPool(root_url=server.root_url, rate_limiter=DriveRateLimiter(10000, 10000))
+    client_pool.load_discovery_document()
+    yield server, client_pool
+    client_pool.close()
+    server.stop()
+
+
+def add_files(server: FakeDriveServer, count: int) -> list[dict]:
+    return [{"id": server.add_file({"name": f"file_{i}"})["id"], "name": f"file_{i}"} for i in range(count)]
+
+
+#region delete_files_batch
+def test_batch_deletes_every_file(drive):
+    server, client_pool = drive
+    files = add_files(server, 3)
+
+    results = delete_files_batch(CREDENTIALS, files, client_pool)
+
+    assert results == [{**file, "status": "deleted"} for file in files]
+    assert server.files == {}
+
+
+def test_failed_batch_request_fails_every_file(drive):
+    server, client_pool = drive
+    files = add_files(server, 3)
+    server.fail_requests(1, 400, "POST", reason="badRequest")
+
+    results = delete_files_batch(CREDENTIALS, files, client_pool)
+
+    assert [(result["id"], result["status"], result["http_status"]) for result in results] == [
+        (file["id"], "failed", 400) for file in files
+    ]
+    assert all("badRequest" in result["error"] for result in results)
+    assert len(server.files) == 3
+
+
+def test_failures_of_single_files_do_not_fail_the_batch(drive):
+    server, client_pool = drive
+    files = add_files(server, 3)
+    missing = {"id": "missing-id", "name": "gone"}
+    server.fail_requests(1, 403, "DELETE", reason="insufficientFilePermissions", file_id=files[1]["id"])
+
+    results = delete_files_batch(CREDENTIALS, [files[0], missing, files[1], files[2]], client_pool)
+
+    assert [(result["name"], result["status"], result.get("http_status")) for result in results] == [
+        ("file_0", "deleted", None),
+        ("gone", "failed", 404),
+        ("file_1", "failed", 403),
+        ("file_2", "deleted", None),
+    ]
+    assert list(server.files) == [files[1]["id"]]
+
+
+def test_batch_trashes_files(drive):
+    server, client_pool = drive
+    files = add_files(server, 2)
+    server.fail_requests(1, 403, "PATCH", reason="insufficientFilePermissions", file_id=files[0]["id"])
+
+    results = delete_files_batch(CREDENTIALS, files, client_pool, trash=True)
+
+    assert [(result["status"], result.get("http_status")) for result in results] == [("failed", 403), ("trashed", None)]
+    assert [file["trashed"] for file in server.files.values()] == [False, True]
+#endregion
+
+#region iter_delete_files
+def test_batches_in_flight_are_bounded(drive, monkeypatch):
+    server, client_pool = drive
+    # Slow batches, so the batches pile up when the bound does not hold
+    server.latency = 0.05
+    monkeypatch.setattr(google_drive_actions, "DELETE_BATCH_SIZE", 2)
+    files = add_files(server, 30)
+    running = []
+    max_running = 0
+    lock = threading.Lock()
+    batch_delete = google_drive_actions.delete_files_batch
+
+    def counting_delete_files_batch(*args):
+        nonlocal max_running
+        with lock:
+            running.append(1)
+            max_running = max(max_running, len(running))
+        try:
+            return batch_delete(*args)
+        finally:
+            with lock:
+                running.pop()
+
+    monkeypatch.setattr(google_drive_actions, "delete_files_batch", counting_delete_files_batch)
+    taken = []
+
+    def listed_files():
+        for file in files:
+            taken.append(file)
+            yield file
+
+    results = iter_delete_files(CREDENTIALS, listed_files(), client_pool)
+    first = next(results)
+    # The files are taken a batch at a time, not all at once
+    taken_before_first_result = len(taken)
+    results = [first, *results]
+
+    assert max_running == DELETE_MAX_CONCURRENT_BATCHES
+    assert taken_before_first_result <= (DELETE_MAX_CONCURRENT_BATCHES + 1) * 2
+    assert sorted(result["id"] for result in results) == sorted(file["id"] for file in files)
+    assert {result["status"] for result in results} == {"deleted"}
+    assert server.files == {}
+
+
+def test_iter_delete_files_reports_failed_files(drive, monkeypatch):
+    server, client_pool = drive
+    monkeypatch.setattr(google_drive_actions, "DELETE_BATCH_SIZE", 2)
+    files = add_files(server, 5)
+    server.fail_requests(1, 403, "DELETE", reason="insufficientFilePermissions", file_id=files[3]["id"])
+
+    results = {result["id"]: result for result in iter_delete_files(CREDENTIALS, files, client_pool)}
+
+    assert {file_id: result["status"] for file_id, result in results.items()} == {
+        file["id"]: "failed" if file is files[3] else "deleted" for file in files
+    }
+    assert results[files[3]["id"]]["http_status"] == 403
+    assert list(server.files) == [files[3]["id"]]
+#endregion
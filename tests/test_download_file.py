@@ -0,0 +1,192 @@
+import os
+import time
+from types import SimpleNamespace
+
+from google.oauth2.credentials import Credentials
+
+import pytest
+from homeassistant.core import Config
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.google_drive_file_manager.helpers import google_drive_actions
+from custom_components.google_drive_file_manager.helpers.drive_client_pool import DriveClientPool
+from custom_components.google_drive_file_manager.helpers.folder_cache import FolderCache
+from custom_components.google_drive_file_manager.helpers.google_drive_actions import download_file
+from custom_components.google_drive_file_manager.helpers.rate_limiter import DriveRateLimiter
+from tests.fake_drive_server import FakeDriveServer
+
+CREDENTIALS = Credentials(token="test-token")
+CHUNK_SIZE = 16
+# 10 chunks, the last one shorter
+CONTENT = bytes(range(150))
+
+
+class DownloadFixture:
+    def __init__(self, server: FakeDriveServer, client_pool: DriveClientPool, tmp_path) -> None:
+        self.server = server
+        self.client_pool = client_pool
+        self.folder = str(tmp_path / "downloads")
+        os.makedirs(self.folder)
+        config = Config(None, str(tmp_path))
+        config.allowlist_external_dirs = {self.folder}
+        self.hass = SimpleNamespace(config=config, data={})
+
+    def download(self, file_id: str, local_file_path: str, max_parallel_ranges: int = 1, **kwargs) -> dict:
+        return download_file(
+            self.hass,
+            CREDENTIALS,
+            file_id,
+            None,
+            local_file_path,
+            max_parallel_ranges=max_parallel_ranges,
+            client_pool=self.client_pool,
+            folder_cache=FolderCache(),
+            **kwargs,
+        )
+
+
+@pytest.fixture
+def drive(tmp_path, monkeypatch):
+    # Small ranges, so a file of a few bytes is downloaded in several (parallel) requests
+    monkeypatch.setattr(google_drive_actions, "DOWNLOAD_CHUNK_SIZE", CHUNK_SIZE)
+    monkeypatch.setattr(google_drive_actions, "DOWNLOAD_PARALLEL_THRESHOLD", 2 * CHUNK_SIZE)
+    server = FakeDriveServer()
+    server.start()
+    client_pool = DriveClientPool(root_url=server.root_url, rate_limiter=DriveRateLimiter(10000, 10000))
+    client_pool.load_discovery_document()
+    yield DownloadFixture(server, client_pool, tmp_path)
+    client_pool.close()
+    server.stop()
+
+
+def read(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def write(path: str, content: bytes) -> None:
+    with open(path, "wb") as file:
+        file.write(content)
+
+
+@pytest.mark.parametrize("max_parallel_ranges", [1, 4])
+def test_download_to_a_folder(drive, max_parallel_ranges):
+    file_id = drive.server.add_file({"name": "clip.mp4"}, CONTENT)["id"]
+
+    response = drive.download(file_id, drive.folder, max_parallel_ranges)
+
+    local_file_path = os.path.join(drive.folder, "clip.mp4")
+    assert (response["local_file_path"], response["resumed_from"]) == (local_file_path, 0)
+    assert read(local_file_path) == CONTENT
+    assert not os.path.exists(local_file_path + ".part")
+
+
+@pytest.mark.parametrize("max_parallel_ranges", [1, 4])
+def test_download_resumes_from_the_partial_file(drive, max_parallel_ranges):
+    file_id = drive.server.add_file({"name": "clip.mp4"}, CONTENT)["id"]
+    local_file_path = os.path.join(drive.folder, "clip.mp4")
+    write(local_file_path + ".part", CONTENT[:3 * CHUNK_SIZE])
+    requests = drive.server.request_count
+
+    response = drive.download(file_id, local_file_path, max_parallel_ranges)
+
+    assert response["resumed_from"] == 3 * CHUNK_SIZE
+    assert read(local_file_path) == CONTENT
+    # The metadata and the 7 remaining ranges
+    assert drive.server.request_count - requests == 1 + 7
+
+
+def test_resumed_download_that_does_not_match_restarts_from_zero(drive):
+    file_id = drive.server.add_file({"name": "clip.mp4"}, CONTENT)["id"]
+    local_file_path = os.path.join(drive.folder, "clip.mp4")
+    # Left by a download of an earlier version of the file
+    write(local_file_path + ".part", b"x" * (3 * CHUNK_SIZE))
+
+    response = drive.download(file_id, local_file_path)
+
+    assert response["resumed_from"] == 0
+    assert read(local_file_path) == CONTENT
+
+
+def test_download_that_does_not_match_is_removed(drive):
+    file = drive.server.add_file({"name": "clip.mp4"}, CONTENT)
+    file["md5Checksum"] = "0" * 32
+    local_file_path = os.path.join(drive.folder, "clip.mp4")
+
+    with pytest.raises(HomeAssistantError, match="does not match the MD5 checksum"):
+        drive.download(file["id"], local_file_path)
+
+    assert os.listdir(drive.folder) == []
+
+
+def test_failed_parallel_range_truncates_the_partial_file_after_the_first_gap(drive, monkeypatch):
+    file_id = drive.server.add_file({"name": "clip.mp4"}, CONTENT)["id"]
+    local_file_path = os.path.join(drive.folder, "clip.mp4")
+    download_byte_range = google_drive_actions.download_byte_range
+
+    def fail_fourth_range(drive_service, file_id: str, start: int, end: int) -> bytes:
+        if start == 3 * CHUNK_SIZE:
+            # Fail after the ranges behind it were written
+            time.sleep(0.2)
+            raise HomeAssistantError("Connection lost")
+        return download_byte_range(drive_service, file_id, start, end)
+
+    monkeypatch.setattr(google_drive_actions, "download_byte_range", fail_fourth_range)
+
+    with pytest.raises(HomeAssistantError, match="Connection lost"):
+        drive.download(file_id, local_file_path, 4)
+
+    assert read(local_file_path + ".part") == CONTENT[:3 * CHUNK_SIZE]
+    assert not os.path.exists(local_file_path)
+
+    monkeypatch.setattr(google_drive_actions, "download_byte_range", download_byte_range)
+    response = drive.download(file_id, local_file_path, 4)
+
+    assert response["resumed_from"] == 3 * CHUNK_SIZE
+    assert read(local_file_path) == CONTENT
+
+
+def test_local_path_outside_of_the_allowlist_is_refused(drive, tmp_path):
+    file_id = drive.server.add_file({"name": "clip.mp4"}, CONTENT)["id"]
+    requests = drive.server.request_count
+
+    for local_file_path in (str(tmp_path / "clip.mp4"), os.path.join(drive.folder, "..", "clip.mp4")):
+        with pytest.raises(HomeAssistantError, match="allowlist_external_dirs"):
+            drive.download(file_id, local_file_path)
+
+    assert drive.server.request_count == requests
+    assert not os.path.exists(tmp_path / "clip.mp4")
+
+
+@pytest.mark.parametrize("name", ["../escape.mp4", "clips/../../escape.mp4", ".."])
+def test_drive_name_escaping_the_folder_is_refused(drive, tmp_path, name):
+    file_id = drive.server.add_file({"name": name}, CONTENT)["id"]
+
+    with pytest.raises(HomeAssistantError, match="allowlist_external_dirs"):
+        drive.download(file_id, drive.folder)
+
+    assert sorted(os.listdir(tmp_path)) == ["downloads"]
+    assert os.listdir(drive.folder) == []
+
+
+@pytest.mark.parametrize("mime_type", ["application/vnd.google-apps.document", "application/vnd.google-apps.spreadsheet"])
+def test_google_docs_are_refused(drive, mime_type):
+    file_id = drive.server.add_file({"name": "notes", "mimeType": mime_type})["id"]
+
+    with pytest.raises(HomeAssistantError, match="cannot be downloaded"):
+        drive.download(file_id, drive.folder)
+
+    assert os.listdir(drive.folder) == []
+
+
+def test_existing_local_file_is_only_replaced_with_overwrite(drive):
+    file_id = drive.server.add_file({"name": "clip.mp4"}, CONTENT)["id"]
+    local_file_path = os.path.join(drive.folder, "clip.mp4")
+    write(local_file_path, b"local")
+
+    with pytest.raises(HomeAssistantError, match="already exists"):
+        drive.download(file_id, local_file_path)
+    assert read(local_file_path) == b"local"
+
+    drive.download(file_id, local_file_path, overwrite=True)
+    assert read(local_file_path) == CONTENT
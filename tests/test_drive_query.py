@@ -0,0 +1,97 @@
+import sqlite3
+
+import pytest
+
+from custom_components.google_drive_file_manager.helpers.drive_query import (
+    UnsupportedQueryError,
+    drive_contains,
+    register_query_functions,
+    tokenize,
+    translate_query,
+)
+from custom_components.google_drive_file_manager.helpers.metadata_mirror import SCHEMA, match_files, upsert_files
+
+FILES = [
+    {"id": "1", "name": "front door.jpg", "mimeType": "image/jpeg", "parents": ["cams"],
+     "createdTime": "2025-05-01T10:00:00.000Z", "modifiedTime": "2025-05-01T10:00:00.000Z", "trashed": False},
+    {"id": "2", "name": "front_door.mp4", "mimeType": "video/mp4", "parents": ["cams"],
+     "createdTime": "2025-05-02T10:00:00.000Z", "modifiedTime": "2025-05-02T10:00:00.000Z", "trashed": False},
+    {"id": "3", "name": "frontdoor.jpg", "mimeType": "image/jpeg", "parents": ["root-id"],
+     "createdTime": "2025-05-03T10:00:00.000Z", "modifiedTime": "2025-05-03T10:00:00.000Z", "trashed": False},
+    {"id": "4", "name": "Backup 2025.tar", "mimeType": "application/x-tar", "parents": ["root-id"],
+     "createdTime": "2025-04-01T10:00:00.000Z", "modifiedTime": "2025-04-01T10:00:00.000Z", "trashed": True},
+]
+
+
+def test_tokenize_unescapes_strings():
+    assert tokenize("name = 'it\\'s' and trashed = false") == [
+        ("word", "name"), ("operator", "="), ("string", "it's"),
+        ("word", "and"), ("word", "trashed"), ("operator", "="), ("word", "false"),
+    ]
+
+
+def test_tokenize_rejects_unknown_input():
+    with pytest.raises(UnsupportedQueryError):
+        tokenize("name = 'a' ; drop")
+
+
+@pytest.mark.parametrize("text, value, expected", [
+    ("front door.jpg", "door", True),
+    ("front_door.jpg", "door", True),
+    ("frontdoor.jpg", "door", False),
+    ("Front Door.jpg", "front d", True),
+    ("backup_backupdoor", "door", False),
+    ("image/jpeg", "image/", True),
+    ("image/jpeg", "jpeg", True),
+    ("image/jpeg", "peg", False),
+    (None, "a", False),
+])
+def test_drive_contains_matches_prefixes_of_words(text, value, expected):
+    assert drive_contains(text, value) is expected
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("", {"1", "2", "3", "4"}),
+    ("name contains 'door'", {"1", "2"}),
+    ("name contains 'FRONT'", {"1", "2", "3"}),
+    ("name = 'frontdoor.jpg'", {"3"}),
+    ("name != 'frontdoor.jpg' and trashed = false", {"1", "2"}),
+    ("mimeType contains 'image/'", {"1", "3"}),
+    ("not mimeType = 'image/jpeg'", {"2", "4"}),
+    ("'cams' in parents", {"1", "2"}),
+    ("'root' in parents", {"3", "4"}),
+    ("createdTime > '2025-05-01T12:00:00Z'", {"2", "3"}),
+    ("modifiedTime <= '2025-05-01T12:00:00+02:00'", {"1", "4"}),
+    ("(name contains 'front' or name contains 'backup') and trashed = true", {"4"}),
+])
+def test_match_files(query, expected):
+    assert match_files(FILES, query, "root-id") == expected
+
+
+@pytest.mark.parametrize("query", [
+    "fullText contains 'door'",
+    "'me' in owners",
+    "size > '10'",
+    "name < 'a'",
+    "trashed = maybe",
+    "(name = 'a'",
+    "name = 'a' name = 'b'",
+    "createdTime > 'yesterday'",
+])
+def test_unsupported_queries(query):
+    with pytest.raises(UnsupportedQueryError):
+        translate_query(query)
+
+
+def test_translate_query_uses_parameters():
+    condition, params = translate_query("name = 'a\\' OR 1=1 --' or trashed = true")
+    assert "OR 1=1" not in condition
+    assert params == ["a' OR 1=1 --", 1]
+
+    connection = sqlite3.connect(":memory:")
+    register_query_functions(connection)
+    connection.executescript(SCHEMA)
+    upsert_files(connection, FILES)
+    condition, params = translate_query("name = 'a\\' OR 1=1 --'")
+    assert connection.execute(f"SELECT id FROM files WHERE {condition}", params).fetchall() == []
+    connection.close()
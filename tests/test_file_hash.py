@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import os
+
+from google.oauth2.credentials import Credentials
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.google_drive_file_manager.helpers import file_hash
+from custom_components.google_drive_file_manager.helpers.async_drive_client import AsyncDriveClient
+from custom_components.google_drive_file_manager.helpers.drive_client_pool import DriveClientPool
+from custom_components.google_drive_file_manager.helpers.file_hash import FileHashCache, compute_md5
+from custom_components.google_drive_file_manager.helpers.folder_cache import FolderCache
+from custom_components.google_drive_file_manager.helpers.google_drive_actions import (
+    async_native_upload_media_file,
+    upload_file_to_folder,
+)
+from custom_components.google_drive_file_manager.helpers.rate_limiter import DriveRateLimiter
+from tests.fake_drive_server import FakeDriveServer
+
+CREDENTIALS = Credentials(token="test-token")
+CONTENT = b"camera footage" * 100
+
+
+@pytest.fixture
+def hashed(monkeypatch) -> list[str]:
+    """Record the paths of which the checksum is computed."""
+    hashed = []
+
+    def recording_compute_md5(local_file_path: str) -> str:
+        hashed.append(os.path.basename(local_file_path))
+        return compute_md5(local_file_path)
+
+    monkeypatch.setattr(file_hash, "compute_md5", recording_compute_md5)
+    return hashed
+
+
+def write(path, content: bytes, mtime_ns: int | None = None) -> str:
+    """Write a file, with the given modification time if set."""
+    path.write_bytes(content)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+
+#region FileHashCache
+def test_compute_md5_reads_the_file_in_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_hash, "FILE_HASH_BLOCK_SIZE", 7)
+    path = write(tmp_path / "clip.mp4", CONTENT)
+
+    assert compute_md5(path) == hashlib.md5(CONTENT).hexdigest()
+
+
+def test_unchanged_file_is_hashed_once(tmp_path, hashed):
+    cache = FileHashCache()
+    path = write(tmp_path / "clip.mp4", CONTENT)
+
+    checksums = [cache.get_md5(path) for _ in range(3)]
+
+    assert checksums == [hashlib.md5(CONTENT).hexdigest()] * 3
+    assert hashed == ["clip.mp4"]
+
+
+def test_file_with_another_size_is_hashed_again(tmp_path, hashed):
+    cache = FileHashCache()
+    path = write(tmp_path / "clip.mp4", CONTENT, mtime_ns=1_700_000_000_000_000_000)
+    cache.get_md5(path)
+
+    # Same modification time, so only the size tells the files apart
+    write(tmp_path / "clip.mp4", CONTENT + b"!", mtime_ns=1_700_000_000_000_000_000)
+
+    assert cache.get_md5(path) == hashlib.md5(CONTENT + b"!").hexdigest()
+    assert hashed == ["clip.mp4", "clip.mp4"]
+
+
+def test_file_with_another_modification_time_is_hashed_again(tmp_path, hashed):
+    cache = FileHashCache()
+    path = write(tmp_path / "clip.mp4", CONTENT, mtime_ns=1_700_000_000_000_000_000)
+    cache.get_md5(path)
+
+    # Same size, so only the modification time tells the files apart
+    changed = CONTENT.replace(b"camera", b"CAMERA")
+    write(tmp_path / "clip.mp4", changed, mtime_ns=1_700_000_000_000_000_001)
+
+    assert cache.get_md5(path) == hashlib.md5(changed).hexdigest()
+    assert hashed == ["clip.mp4", "clip.mp4"]
+
+
+def test_least_recently_used_checksums_are_evicted(tmp_path, hashed):
+    cache = FileHashCache(max_entries=2)
+    paths = [write(tmp_path / name, name.encode()) for name in ("a", "b", "c")]
+
+    cache.get_md5(paths[0])
+    cache.get_md5(paths[1])
+    # 'a' is used again, so 'b' is the least recently used one when 'c' is added
+    cache.get_md5(paths[0])
+    cache.get_md5(paths[2])
+    cache.get_md5(paths[0])
+    cache.get_md5(paths[1])
+
+    assert hashed == ["a", "b", "c", "b"]
+#endregion
+
+#region skip_if_identical
+@pytest.fixture
+def drive(tmp_path):
+    server = FakeDriveServer()
+    server.start()
+    client_pool = DriveClientPool(root_url=server.root_url, rate_limiter=DriveRateLimiter(10000, 10000))
+    client_pool.load_discovery_document()
+    yield server, client_pool
+    client_pool.close()
+    server.stop()
+
+
+def upload(drive, backend: str, local_file_path: str, file_hash_cache: FileHashCache, tmp_path) -> dict:
+    """Upload a file as 'clip.mp4' to the root folder with skip_if_identical."""
+    server, client_pool = drive
+    if backend == "googleapiclient":
+        return upload_file_to_folder(
+            CREDENTIALS,
+            local_file_path,
+            "id,name,size,md5Checksum",
+            "video/mp4",
+            "clip.mp4",
+            client_pool=client_pool,
+            skip_if_identical=True,
+            file_hash_cache=file_hash_cache,
+        )
+
+    async def main() -> dict:
+        hass = HomeAssistant(str(tmp_path))
+
+        async def get_access_token() -> str:
+            return "test-token"
+
+        try:
+            return await async_native_upload_media_file(
+                hass,
+                AsyncDriveClient(hass, get_access_token, client_pool.rate_limiter, server.root_url),
+                local_file_path,
+                "id,name,size,md5Checksum",
+                "video/mp4",
+                "clip.mp4",
+                folder_cache=FolderCache(),
+                skip_if_identical=True,
+                file_hash_cache=file_hash_cache,
+            )
+        finally:
+            await hass.async_stop(force=True)
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("backend", ["googleapiclient", "native"])
+def test_identical_file_is_skipped(drive, tmp_path, hashed, backend):
+    server, _ = drive
+    existing = server.add_file({"name": "clip.mp4"}, CONTENT)
+    path = write(tmp_path / "local.mp4", CONTENT)
+    requests = server.request_count
+
+    response = upload(drive, backend, path, FileHashCache(), tmp_path)
+
+    assert (response["id"], response["upload_strategy"]) == (existing["id"], "skipped")
+    assert len(server.files) == 1
+    # Only the lookup of the candidates
+    assert server.request_count - requests == 1
+    assert hashed == ["local.mp4"]
+
+
+@pytest.mark.parametrize("backend", ["googleapiclient", "native"])
+def test_same_size_with_another_checksum_is_uploaded(drive, tmp_path, hashed, backend):
+    server, _ = drive
+    server.add_file({"name": "clip.mp4"}, CONTENT.replace(b"camera", b"CAMERA"))
+    path = write(tmp_path / "local.mp4", CONTENT)
+
+    response = upload(drive, backend, path, FileHashCache(), tmp_path)
+
+    assert response["upload_strategy"] == "multipart"
+    assert server.contents[response["id"]] == CONTENT
+    assert hashed == ["local.mp4"]
+
+
+@pytest.mark.parametrize("backend", ["googleapiclient", "native"])
+def test_another_size_is_uploaded_without_hashing(drive, tmp_path, hashed, backend):
+    server, _ = drive
+    # Even with the same checksum, e.g. a file of which Drive reports another size
+    existing = server.add_file({"name": "clip.mp4"}, CONTENT)
+    existing["size"] = str(len(CONTENT) + 1)
+    path = write(tmp_path / "local.mp4", CONTENT)
+
+    response = upload(drive, backend, path, FileHashCache(), tmp_path)
+
+    assert response["upload_strategy"] == "multipart"
+    assert len(server.files) == 2
+    assert hashed == []
+
+
+@pytest.mark.parametrize("backend", ["googleapiclient", "native"])
+def test_identical_content_under_another_name_is_uploaded(drive, tmp_path, hashed, backend):
+    server, _ = drive
+    server.add_file({"name": "other.mp4"}, CONTENT)
+    path = write(tmp_path / "local.mp4", CONTENT)
+
+    response = upload(drive, backend, path, FileHashCache(), tmp_path)
+
+    assert (response["name"], response["upload_strategy"]) == ("clip.mp4", "multipart")
+    assert len(server.files) == 2
+    assert hashed == []
+
+
+def test_rewritten_local_file_is_not_skipped_with_a_stale_checksum(drive, tmp_path, hashed):
+    server, _ = drive
+    existing = server.add_file({"name": "clip.mp4"}, CONTENT)
+    cache = FileHashCache()
+    path = write(tmp_path / "local.mp4", CONTENT, mtime_ns=1_700_000_000_000_000_000)
+    assert upload(drive, "googleapiclient", path, cache, tmp_path)["id"] == existing["id"]
+
+    # Same size, rewritten later with other content
+    changed = CONTENT.replace(b"camera", b"CAMERA")
+    write(tmp_path / "local.mp4", changed, mtime_ns=1_700_000_000_000_000_001)
+    response = upload(drive, "googleapiclient", path, cache, tmp_path)
+
+    assert response["upload_strategy"] == "multipart"
+    assert server.contents[response["id"]] == changed
+    assert hashed == ["local.mp4", "local.mp4"]
+#endregion
@@ -0,0 +1,199 @@
+import asyncio
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from google.oauth2.credentials import Credentials
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.google_drive_file_manager.const import FOLDER_MIME_TYPE
+from custom_components.google_drive_file_manager.helpers.async_drive_client import AsyncDriveClient
+from custom_components.google_drive_file_manager.helpers.drive_client_pool import DriveClientPool
+from custom_components.google_drive_file_manager.helpers.folder_cache import FolderCache
+from custom_components.google_drive_file_manager.helpers.google_drive_actions import (
+    async_native_extract_folder_id_from_path,
+    extract_folder_id_from_path,
+    merge_duplicate_folders,
+)
+from custom_components.google_drive_file_manager.helpers.rate_limiter import DriveRateLimiter
+from tests.fake_drive_server import FakeDriveServer
+
+CREDENTIALS = Credentials(token="test-token")
+
+
+@pytest.fixture
+def drive():
+    # The latency widens the window in which concurrent resolutions could race
+    server = FakeDriveServer(latency=0.01)
+    server.start()
+    client_pool = DriveClientPool(root_url=server.root_url, rate_limiter=DriveRateLimiter(10000, 10000))
+    client_pool.load_discovery_document()
+    yield server, client_pool
+    client_pool.close()
+    server.stop()
+
+
+def folders_by_path(server: FakeDriveServer) -> dict[str, list[str]]:
+    """Return the IDs of the folders that are not trashed per path."""
+    folders = {
+        file["id"]: file for file in server.files.values()
+        if file["mimeType"] == FOLDER_MIME_TYPE and not file.get("trashed")
+    }
+
+    def path_of(folder: dict) -> str:
+        parent = folders.get(folder["parents"][0])
+        return f"{path_of(parent)}/{folder['name']}" if parent else folder["name"]
+
+    paths: dict[str, list[str]] = {}
+    for folder in folders.values():
+        paths.setdefault(path_of(folder), []).append(folder["id"])
+    return paths
+
+
+def add_folder(server: FakeDriveServer, name: str, parent: str, created: str) -> str:
+    return server.add_file({"name": name, "mimeType": FOLDER_MIME_TYPE, "parents": [parent], "createdTime": created})["id"]
+
+
+def add_file(server: FakeDriveServer, name: str, parent: str) -> str:
+    return server.add_file({"name": name, "parents": [parent]}, b"content")["id"]
+
+
+#region Single-flight resolution
+def test_concurrent_threads_create_a_new_path_once(drive):
+    server, client_pool = drive
+    folder_cache = FolderCache()
+    start = threading.Barrier(8)
+
+    def resolve(path: str) -> str:
+        start.wait()
+        return extract_folder_id_from_path(None, CREDENTIALS, path, client_pool, folder_cache)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        # Half of them resolve a sibling path sharing the first two folders
+        paths = ["camera/2025/01", "camera/2025/02"] * 4
+        ids = list(executor.map(resolve, paths))
+
+    assert folders_by_path(server) == {
+        "camera": [folder_cache.get("camera")],
+        "camera/2025": [folder_cache.get("camera/2025")],
+        "camera/2025/01": [ids[0]],
+        "camera/2025/02": [ids[1]],
+    }
+    assert set(ids[::2]) == {ids[0]}
+    assert set(ids[1::2]) == {ids[1]}
+
+
+def test_threads_and_coroutines_create_a_new_path_once(drive, tmp_path):
+    server, client_pool = drive
+    folder_cache = FolderCache()
+
+    async def main() -> list[str]:
+        hass = HomeAssistant(str(tmp_path))
+
+        async def get_access_token() -> str:
+            return "test-token"
+
+        client = AsyncDriveClient(hass, get_access_token, DriveRateLimiter(10000, 10000), server.root_url)
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=4)
+        try:
+            threaded = [
+                loop.run_in_executor(
+                    executor, extract_folder_id_from_path, None, CREDENTIALS, "doorbell/2025/06", client_pool, folder_cache
+                )
+                for _ in range(4)
+            ]
+            native = [
+                async_native_extract_folder_id_from_path(client, "doorbell/2025/06", folder_cache) for _ in range(4)
+            ]
+            return await asyncio.wait_for(asyncio.gather(*threaded, *native), 10)
+        finally:
+            executor.shutdown()
+            await hass.async_stop(force=True)
+
+    ids = asyncio.run(main())
+
+    assert len(set(ids)) == 1
+    assert {path: len(folder_ids) for path, folder_ids in folders_by_path(server).items()} == {
+        "doorbell": 1,
+        "doorbell/2025": 1,
+        "doorbell/2025/06": 1,
+    }
+    # The path locks are forgotten once nobody uses them
+    assert folder_cache._resolving == {}
+
+
+def test_existing_path_is_found_and_not_created(drive):
+    server, client_pool = drive
+    camera = add_folder(server, "camera", "root", "2025-01-01T00:00:00.000Z")
+    year = add_folder(server, "2025", camera, "2025-01-01T00:00:00.000Z")
+
+    folder_id = extract_folder_id_from_path(None, CREDENTIALS, "camera/2025/", client_pool, FolderCache())
+
+    assert folder_id == year
+    assert len(folders_by_path(server)) == 2
+#endregion
+
+#region Merge duplicate folders
+def add_duplicate_tree(server: FakeDriveServer) -> dict[str, str]:
+    """Add two 'camera' folders, each with a '2025' subfolder holding a file, and return their IDs."""
+    ids = {
+        "camera": add_folder(server, "camera", "root", "2025-01-01T00:00:00.000Z"),
+        "camera-duplicate": add_folder(server, "camera", "root", "2025-02-01T00:00:00.000Z"),
+    }
+    ids["2025"] = add_folder(server, "2025", ids["camera"], "2025-01-01T00:00:00.000Z")
+    ids["2025-duplicate"] = add_folder(server, "2025", ids["camera-duplicate"], "2025-02-01T00:00:00.000Z")
+    ids["old.jpg"] = add_file(server, "old.jpg", ids["2025"])
+    ids["new.jpg"] = add_file(server, "new.jpg", ids["2025-duplicate"])
+    ids["loose.jpg"] = add_file(server, "loose.jpg", ids["camera-duplicate"])
+    return ids
+
+
+def test_merge_moves_children_and_trashes_duplicates(drive):
+    server, client_pool = drive
+    ids = add_duplicate_tree(server)
+    folder_cache = FolderCache()
+    folder_cache.set("camera", ids["camera-duplicate"])
+
+    results = merge_duplicate_folders(None, CREDENTIALS, "", False, client_pool, folder_cache)
+
+    assert [(result["path"], result["merged_folder_id"], result["files"], result["status"]) for result in results] == [
+        ("camera", ids["camera-duplicate"], 2, "merged"),
+        ("camera/2025", ids["2025-duplicate"], 1, "merged"),
+    ]
+    assert server.files[ids["camera-duplicate"]]["trashed"]
+    assert server.files[ids["2025-duplicate"]]["trashed"]
+    assert server.files[ids["loose.jpg"]]["parents"] == [ids["camera"]]
+    assert server.files[ids["new.jpg"]]["parents"] == [ids["2025"]]
+    assert server.files[ids["old.jpg"]]["parents"] == [ids["2025"]]
+    assert folders_by_path(server) == {"camera": [ids["camera"]], "camera/2025": [ids["2025"]]}
+    # The cached ID of the trashed folder is gone
+    assert folder_cache.get("camera") is None
+
+
+def test_merge_preview_leaves_drive_unchanged(drive):
+    server, client_pool = drive
+    ids = add_duplicate_tree(server)
+    before = copy.deepcopy(server.files)
+
+    results = merge_duplicate_folders(None, CREDENTIALS, "camera", True, client_pool, FolderCache())
+
+    # The '2025' folders only clash once the contents are moved, which a preview does not do
+    assert results == [{
+        "path": "camera",
+        "kept_folder_id": ids["camera"],
+        "merged_folder_id": ids["camera-duplicate"],
+        "files": 2,
+        "status": "preview",
+    }]
+    assert server.files == before
+
+
+def test_merge_of_a_missing_path_fails(drive):
+    _, client_pool = drive
+
+    with pytest.raises(Exception, match="does not exist"):
+        merge_duplicate_folders(None, CREDENTIALS, "missing/path", True, client_pool, FolderCache())
+#endregion
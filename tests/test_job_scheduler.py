@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from custom_components.google_drive_file_manager.const import (
+    JOB_CLASS_BULK,
+    JOB_CLASS_LIMITS,
+    JOB_CLASS_SUBTASK_LIMITS,
+    JOB_CLASS_TRANSFER,
+    JOB_SCHEDULER_WORKERS,
+)
+from custom_components.google_drive_file_manager.helpers.job_scheduler import (
+    DriveJobScheduler,
+    async_run_drive_job,
+    get_job_executor,
+    get_max_subtask_workers,
+)
+
+
+def run_jobs(*jobs: tuple[str, callable], subtask_limits: dict[str, int] = JOB_CLASS_SUBTASK_LIMITS) -> list:
+    """Run blocking jobs on a scheduler and return their results."""
+
+    async def main():
+        # The scheduler only uses the event loop of Home Assistant
+        scheduler = DriveJobScheduler(SimpleNamespace(loop=asyncio.get_running_loop()), subtask_limits=subtask_limits)
+        try:
+            return await asyncio.wait_for(
+                asyncio.gather(*(scheduler.async_run(job_class, target) for job_class, target in jobs)), 10
+            )
+        finally:
+            scheduler.close()
+
+    return asyncio.run(main())
+
+
+class ConcurrencyCounter:
+    def __init__(self) -> None:
+        self.running = 0
+        self.max_running = 0
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def task(self, duration: float = 0.02) -> None:
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            self.threads.add(threading.current_thread().name)
+        time.sleep(duration)
+        with self._lock:
+            self.running -= 1
+
+
+def test_subtask_workers_cover_the_running_jobs():
+    # 2 bulk jobs with 8 sub-tasks, 4 transfers with 4 and the 2 remaining workers with interactive jobs
+    assert get_max_subtask_workers(JOB_SCHEDULER_WORKERS, JOB_CLASS_LIMITS, JOB_CLASS_SUBTASK_LIMITS) == 34
+    assert get_max_subtask_workers(2, JOB_CLASS_LIMITS, JOB_CLASS_SUBTASK_LIMITS) == 16
+
+
+def test_fan_out_is_limited_by_the_class_of_the_job():
+    counter = ConcurrencyCounter()
+
+    def job():
+        with get_job_executor(16, "test") as executor:
+            futures = [executor.submit(counter.task) for _ in range(16)]
+        return [future.result() for future in futures]
+
+    run_jobs((JOB_CLASS_TRANSFER, job))
+
+    assert counter.max_running == JOB_CLASS_SUBTASK_LIMITS[JOB_CLASS_TRANSFER]
+    assert all(name.startswith("google_drive_subtask") for name in counter.threads)
+
+
+def test_subtask_threads_are_reused_between_jobs():
+    def job():
+        with get_job_executor(2, "test") as executor:
+            return executor.submit(lambda: threading.get_ident()).result()
+
+    async def main():
+        scheduler = DriveJobScheduler(SimpleNamespace(loop=asyncio.get_running_loop()))
+        try:
+            threads = set()
+            for _ in range(5):
+                threads.add(await scheduler.async_run(JOB_CLASS_BULK, job))
+                await asyncio.sleep(0.01)
+            return threads
+        finally:
+            scheduler.close()
+
+    # The Drive services the client pool keeps per thread are reused as well
+    assert len(asyncio.run(main())) == 1
+
+
+def test_running_subtasks_are_charged_to_the_class_of_the_job():
+    started = threading.Event()
+    release = threading.Event()
+
+    async def main():
+        scheduler = DriveJobScheduler(SimpleNamespace(loop=asyncio.get_running_loop()))
+
+        def job():
+            with get_job_executor(2, "test") as executor:
+                for _ in range(2):
+                    executor.submit(lambda: (started.set(), release.wait(5)))
+
+        try:
+            running = asyncio.ensure_future(scheduler.async_run(JOB_CLASS_BULK, job))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+            await asyncio.sleep(0.05)
+            stats = scheduler.stats()
+            release.set()
+            await running
+            return stats, scheduler.stats()
+        finally:
+            scheduler.close()
+
+    during, after = asyncio.run(main())
+
+    assert during[JOB_CLASS_BULK]["subtasks_running"] == 2
+    assert during[JOB_CLASS_BULK]["subtask_limit"] == JOB_CLASS_SUBTASK_LIMITS[JOB_CLASS_BULK]
+    assert during[JOB_CLASS_TRANSFER]["subtasks_running"] == 0
+    assert after[JOB_CLASS_BULK]["subtasks_running"] == 0
+
+
+def test_producer_and_batches_of_one_job_do_not_wait_on_each_other():
+    # Like a cleanup: a listing producer blocks until the batches it feeds have run
+    done = threading.Event()
+
+    def job():
+        producer = get_job_executor(1, "list")
+        producer.submit(done.wait, 5)
+        with get_job_executor(4, "delete") as executor:
+            results = [executor.submit(lambda i=i: i) for i in range(10)]
+        done.set()
+        producer.shutdown(wait=True)
+        return sum(future.result() for future in results)
+
+    # Even when the class only has 2 slots for the producer and the batches
+    assert run_jobs((JOB_CLASS_BULK, job), subtask_limits={**JOB_CLASS_SUBTASK_LIMITS, JOB_CLASS_BULK: 2}) == [45]
+
+
+def test_waiting_subtasks_can_be_cancelled():
+    def job():
+        release = threading.Event()
+        with get_job_executor(1, "test") as executor:
+            first = executor.submit(release.wait, 5)
+            second = executor.submit(lambda: "ran")
+            cancelled = second.cancel()
+            release.set()
+        return cancelled, first.result(), second.cancelled()
+
+    assert run_jobs((JOB_CLASS_TRANSFER, job)) == [(True, True, True)]
+
+
+def test_subtask_failure_is_raised_by_its_future():
+    def fail():
+        raise ValueError("range failed")
+
+    def job():
+        with get_job_executor(2, "test") as executor:
+            future = executor.submit(fail)
+        return type(future.exception()).__name__
+
+    assert run_jobs((JOB_CLASS_TRANSFER, job)) == ["ValueError"]
+
+
+def test_private_pool_outside_of_the_scheduler():
+    executor = get_job_executor(3, "test")
+    try:
+        assert isinstance(executor, ThreadPoolExecutor)
+        assert executor.submit(lambda: threading.current_thread().name).result().startswith("test")
+    finally:
+        executor.shutdown()
+
+
+def test_run_drive_job_passes_keyword_arguments():
+    def job(first, second=None, client_pool=None):
+        return first, second, client_pool
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        scheduler = DriveJobScheduler(SimpleNamespace(loop=loop))
+        # Without a scheduler the job runs in Home Assistant's executor
+        hass = SimpleNamespace(async_add_executor_job=lambda target, *args: loop.run_in_executor(None, target, *args))
+        try:
+            return (
+                await async_run_drive_job(hass, scheduler, JOB_CLASS_BULK, job, 1, client_pool="pool"),
+                await async_run_drive_job(hass, None, JOB_CLASS_BULK, job, 1, 2, client_pool="pool"),
+            )
+        finally:
+            scheduler.close()
+
+    scheduled, executor = asyncio.run(main())
+
+    assert scheduled == (1, None, "pool")
+    assert executor == (1, 2, "pool")
@@ -0,0 +1,91 @@
+from google.oauth2.credentials import Credentials
+
+import pytest
+
+from custom_components.google_drive_file_manager.helpers.drive_client_pool import DriveClientPool, get_drive_service
+from custom_components.google_drive_file_manager.helpers.drive_query import UnsupportedQueryError
+from custom_components.google_drive_file_manager.helpers.metadata_mirror import DriveMetadataMirror
+from tests.fake_drive_server import FakeDriveServer
+
+
+@pytest.fixture
+def drive():
+    server = FakeDriveServer()
+    server.start()
+    client_pool = DriveClientPool(root_url=server.root_url)
+    client_pool.load_discovery_document()
+    yield server, get_drive_service(Credentials(token="test-token"), client_pool)
+    client_pool.close()
+    server.stop()
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    mirror = DriveMetadataMirror(str(tmp_path / "mirror.db"))
+    mirror.open()
+    yield mirror
+    mirror.close()
+
+
+def add_files(server: FakeDriveServer) -> dict[str, dict]:
+    return {
+        name: server.add_file({"name": name, "modifiedTime": modified})
+        for name, modified in [
+            ("front door.jpg", "2025-05-01T10:00:00.000Z"),
+            ("front_door.mp4", "2025-05-03T10:00:00.000Z"),
+            ("frontdoor.jpg", "2025-05-02T10:00:00.000Z"),
+        ]
+    }
+
+
+def test_list_files_after_full_sync(drive, mirror):
+    server, service = drive
+    add_files(server)
+
+    assert not mirror.ready
+    assert mirror.sync(service) == 3
+    assert mirror.ready
+
+    files = mirror.list_files("name contains 'door'", ["name"], "modifiedTime desc")
+    assert files == [{"name": "front_door.mp4"}, {"name": "front door.jpg"}]
+
+    files = mirror.list_files("", ["name", "modifiedTime"], "name", maximum_files=2)
+    assert [file["name"] for file in files] == ["front door.jpg", "front_door.mp4"]
+
+
+def test_sync_applies_changes(drive, mirror):
+    server, service = drive
+    files = add_files(server)
+    mirror.sync(service)
+
+    server.add_file({"name": "garden door.jpg"})
+    server.delete_file(files["front door.jpg"]["id"])
+    mirror.sync(service)
+
+    files = mirror.list_files("name contains 'door'", ["name"], "name")
+    assert files == [{"name": "front_door.mp4"}, {"name": "garden door.jpg"}]
+
+
+def test_list_files_survives_reopen(drive, mirror, tmp_path):
+    server, service = drive
+    add_files(server)
+    mirror.sync(service)
+    mirror.close()
+
+    reopened = DriveMetadataMirror(str(tmp_path / "mirror.db"))
+    reopened.open()
+    try:
+        assert reopened.ready
+        assert len(reopened.list_files("trashed = false", ["id"], "name")) == 3
+    finally:
+        reopened.close()
+
+
+@pytest.mark.parametrize("query, fields, order_by", [
+    ("fullText contains 'door'", ["id"], "name"),
+    ("", ["owners"], "name"),
+    ("", ["id"], "createdTime"),
+])
+def test_list_files_unsupported(mirror, query, fields, order_by):
+    with pytest.raises(UnsupportedQueryError):
+        mirror.list_files(query, fields, order_by)
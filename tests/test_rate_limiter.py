@@ -0,0 +1,402 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import httplib2
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.google_drive_file_manager.helpers import rate_limiter
+from custom_components.google_drive_file_manager.helpers.async_drive_client import AsyncDriveClient
+from custom_components.google_drive_file_manager.helpers.pooled_http import ConnectionNotMadeError, PooledHttp
+from custom_components.google_drive_file_manager.helpers.rate_limiter import (
+    DriveRateLimiter,
+    RateLimitedHttp,
+    TokenBucket,
+    get_batch_size,
+    parse_retry_after,
+)
+from tests.fake_drive_server import FakeDriveServer
+
+
+class StubHttp:
+    """Returns the given responses (status, body, headers) or raises the given exceptions, in order."""
+
+    def __init__(self, *responses) -> None:
+        self.responses = list(responses)
+        self.calls = []
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        self.calls.append(method)
+        item = self.responses.pop(0)
+        if isinstance(item, BaseException):
+            raise item
+        status, content, response_headers = (*item, {})[:3]
+        return httplib2.Response({"status": str(status), **response_headers}), content
+
+
+def error_body(reason: str) -> bytes:
+    return json.dumps({"error": {"errors": [{"reason": reason}]}}).encode()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the retry delays of RateLimitedHttp instead of sleeping."""
+    delays = []
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(sleep=delays.append, monotonic=time.monotonic))
+    return delays
+
+
+def make_limiter(max_retries: int = 3) -> DriveRateLimiter:
+    return DriveRateLimiter(requests_per_second=1000, burst=1000, max_retries=max_retries, base_delay=0.01, max_delay=0.04)
+
+
+def make_http(*responses, max_retries: int = 3) -> tuple[RateLimitedHttp, StubHttp, DriveRateLimiter]:
+    stub = StubHttp(*responses)
+    limiter = make_limiter(max_retries)
+    return RateLimitedHttp(stub, limiter), stub, limiter
+
+
+#region Token bucket and Retry-After
+def test_token_bucket_paces_requests_after_the_burst():
+    bucket = TokenBucket(rate=100, capacity=2)
+
+    waits = [bucket.reserve() for _ in range(5)]
+
+    # The burst is free, then every request is due 10 ms after the previous one
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2:] == pytest.approx([0.01, 0.02, 0.03], abs=0.005)
+
+
+def test_token_bucket_acquire_waits_for_the_tokens():
+    bucket = TokenBucket(rate=200, capacity=1)
+    bucket.acquire()
+
+    started = time.monotonic()
+    waited = bucket.acquire(10)
+
+    assert waited == pytest.approx(0.05, abs=0.01)
+    assert time.monotonic() - started >= 0.045
+
+
+def test_token_bucket_pause_holds_back_all_tokens():
+    bucket = TokenBucket(rate=100, capacity=20)
+
+    bucket.pause(0.5)
+
+    assert bucket.reserve() == pytest.approx(0.51, abs=0.01)
+
+
+@pytest.mark.parametrize(("value", "expected"), [
+    ("3", 3.0),
+    ("1.5", 1.5),
+    ("-4", 0.0),
+    ("", None),
+    (None, None),
+    ("soon", None),
+])
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    moment = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+    assert parse_retry_after(format_datetime(moment, usegmt=True)) == pytest.approx(30, abs=1.5)
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_batch_size_counts_the_requests_of_a_batch():
+    part = b"--b\r\nContent-Type: application/http\r\n\r\nDELETE /drive/v3/files/x HTTP/1.1\r\n\r\n"
+
+    assert get_batch_size(part * 7 + b"--b--") == 7
+    assert get_batch_size(None) == 1
+    assert get_batch_size(b"{}") == 1
+#endregion
+
+#region RateLimitedHttp
+def test_rate_limit_is_retried_after_retry_after(sleeps):
+    http, stub, limiter = make_http((429, error_body("rateLimitExceeded"), {"retry-after": "2"}), (200, b"{}"))
+
+    response, _ = http.request("https://drive/drive/v3/files", "GET")
+
+    assert response.status == 200
+    assert stub.calls == ["GET", "GET"]
+    # The retry waits for Retry-After, and the paused bucket holds back the next token as long
+    assert sleeps[0] == 2.0
+    assert sleeps[1:] == [pytest.approx(2.0, abs=0.05)]
+    assert limiter.stats()["rate_limit_errors"] == 1
+    assert limiter.stats()["retries"] == 1
+
+
+@pytest.mark.parametrize("status", [500, 502, 503, 504])
+def test_server_errors_are_retried_with_backoff(sleeps, status):
+    http, stub, limiter = make_http((status, b""), (status, b""), (200, b"{}"))
+
+    response, _ = http.request("https://drive/drive/v3/files/x", "GET")
+
+    assert response.status == 200
+    assert len(stub.calls) == 3
+    # Exponential backoff with up to one base delay of jitter
+    assert 0.01 <= sleeps[0] <= 0.02
+    assert 0.02 <= sleeps[1] <= 0.03
+    assert limiter.stats()["server_errors"] == 2
+
+
+def test_quota_403_is_retried_other_403_is_not(sleeps):
+    http, stub, _ = make_http((403, error_body("userRateLimitExceeded")), (200, b"{}"))
+    assert http.request("https://drive/drive/v3/files", "GET")[0].status == 200
+    assert len(stub.calls) == 2
+
+    http, stub, _ = make_http((403, error_body("insufficientFilePermissions")))
+    assert http.request("https://drive/drive/v3/files", "GET")[0].status == 403
+    assert len(stub.calls) == 1
+
+
+def test_retries_give_up_with_the_last_response(sleeps):
+    http, stub, limiter = make_http(*[(503, b"")] * 3, max_retries=2)
+
+    response, _ = http.request("https://drive/drive/v3/files", "GET")
+
+    assert response.status == 503
+    assert len(stub.calls) == 3
+    assert limiter.stats()["failed_after_retries"] == 1
+
+
+def test_post_is_not_retried_after_server_error(sleeps):
+    http, stub, _ = make_http((503, b""), (200, b"{}"))
+
+    response, _ = http.request("https://drive/upload/drive/v3/files", "POST", body=b"{}")
+
+    assert response.status == 503
+    assert stub.calls == ["POST"]
+    assert sleeps == []
+
+
+def test_post_is_retried_on_rate_limit(sleeps):
+    http, stub, _ = make_http((429, error_body("rateLimitExceeded")), (200, b"{}"))
+
+    assert http.request("https://drive/drive/v3/files", "POST", body=b"{}")[0].status == 200
+    assert stub.calls == ["POST", "POST"]
+
+
+def test_post_is_not_retried_after_connection_drop(sleeps):
+    http, stub, _ = make_http(ConnectionResetError("reset"), (200, b"{}"))
+
+    with pytest.raises(ConnectionError):
+        http.request("https://drive/drive/v3/files", "POST", body=b"{}")
+    assert stub.calls == ["POST"]
+
+
+@pytest.mark.parametrize("error", [ConnectionNotMadeError("no route"), ConnectionRefusedError("refused")])
+def test_post_is_retried_when_never_sent(sleeps, error):
+    http, stub, _ = make_http(error, (200, b"{}"))
+
+    assert http.request("https://drive/drive/v3/files", "POST", body=b"{}")[0].status == 200
+    assert stub.calls == ["POST", "POST"]
+
+
+def test_get_is_retried_after_connection_drop(sleeps):
+    http, stub, _ = make_http(ConnectionResetError("reset"), TimeoutError("read"), (200, b"{}"))
+
+    assert http.request("https://drive/drive/v3/files", "GET")[0].status == 200
+    assert len(stub.calls) == 3
+
+
+def test_resumable_chunk_is_never_retried(sleeps):
+    http, stub, _ = make_http((503, b""), ConnectionResetError("reset"))
+    uri = "https://drive/upload/drive/v3/files?uploadType=resumable&upload_id=abc"
+
+    assert http.request(uri, "PUT", body=b"chunk")[0].status == 503
+    with pytest.raises(ConnectionError):
+        http.request(uri, "PUT", body=b"chunk")
+    assert stub.calls == ["PUT", "PUT"]
+
+
+def test_batch_is_charged_per_request(sleeps):
+    http, _, limiter = make_http((200, b""))
+    body = b"--b\r\nContent-Type: application/http\r\n\r\nDELETE /drive/v3/files/x HTTP/1.1\r\n\r\n" * 7 + b"--b--"
+
+    http.request("https://drive/batch/drive/v3", "POST", body=body)
+
+    assert limiter.stats()["requests"] == 7
+
+
+def test_requests_are_paced_by_the_bucket():
+    stub = StubHttp(*[(200, b"{}")] * 6)
+    http = RateLimitedHttp(stub, DriveRateLimiter(requests_per_second=100, burst=1))
+
+    started = time.monotonic()
+    for _ in range(6):
+        http.request("https://drive/drive/v3/files", "GET")
+
+    assert time.monotonic() - started >= 0.045
+
+
+def test_post_dropped_mid_request_over_pooled_connections(sleeps):
+    # A server that reads the request and closes the connection without answering
+    listener = socket.create_server(("127.0.0.1", 0))
+    received = []
+
+    def serve() -> None:
+        while True:
+            try:
+                connection, _ = listener.accept()
+            except OSError:
+                return
+            with connection:
+                received.append(connection.recv(65536))
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    http = RateLimitedHttp(PooledHttp(), make_limiter())
+    try:
+        with pytest.raises(ConnectionError) as error:
+            http.request(f"http://127.0.0.1:{listener.getsockname()[1]}/drive/v3/files", "POST", body=b"{}")
+    finally:
+        listener.close()
+
+    assert not isinstance(error.value, ConnectionNotMadeError)
+    assert len(received) == 1
+    assert sleeps == []
+
+
+def test_refused_connection_is_retried_for_post(sleeps):
+    listener = socket.create_server(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    listener.close()
+    limiter = make_limiter(max_retries=2)
+    http = RateLimitedHttp(PooledHttp(), limiter)
+
+    with pytest.raises(ConnectionNotMadeError):
+        http.request(f"http://127.0.0.1:{port}/drive/v3/files", "POST", body=b"{}")
+
+    assert len(sleeps) == 2
+    assert limiter.stats()["failed_after_retries"] == 1
+#endregion
+
+#region Async Drive client
+def run_async_client(test, tmp_path) -> None:
+    """Run `test(client, server, limiter)` with an AsyncDriveClient talking to a fake Drive server."""
+
+    async def main() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        server = FakeDriveServer()
+        server.start()
+        limiter = make_limiter()
+
+        async def get_access_token() -> str:
+            return "test-token"
+
+        try:
+            await test(AsyncDriveClient(hass, get_access_token, limiter, server.root_url), server, limiter)
+        finally:
+            server.stop()
+            await hass.async_stop(force=True)
+
+    asyncio.run(main())
+
+
+def test_async_send_retries_get_on_rate_limit_and_server_error(tmp_path):
+    async def test(client, server, limiter):
+        server.add_file({"name": "a"})
+        server.fail_requests(1, 429, "GET", retry_after="0")
+        server.fail_requests(1, 503, "GET")
+
+        status, _, content = await client._async_send("GET", f"{server.root_url}drive/v3/files")
+
+        assert status == 200
+        assert [file["name"] for file in json.loads(content)["files"]] == ["a"]
+        assert server.request_count == 3
+        assert limiter.stats()["rate_limit_errors"] == 1
+        assert limiter.stats()["server_errors"] == 1
+
+    run_async_client(test, tmp_path)
+
+
+def test_async_send_does_not_retry_post_after_server_error(tmp_path):
+    async def test(client, server, limiter):
+        server.fail_requests(1, 503, "POST")
+
+        status, _, _ = await client._async_send(
+            "POST", f"{server.root_url}drive/v3/files", data=b'{"name": "a"}', headers={"Content-Type": "application/json"}
+        )
+
+        assert status == 503
+        assert server.request_count == 1
+        assert server.files == {}
+
+    run_async_client(test, tmp_path)
+
+
+def test_async_send_retries_post_on_rate_limit(tmp_path):
+    async def test(client, server, limiter):
+        server.fail_requests(1, 429, "POST", retry_after="0")
+
+        status, _, _ = await client._async_send(
+            "POST", f"{server.root_url}drive/v3/files", data=b'{"name": "a"}', headers={"Content-Type": "application/json"}
+        )
+
+        assert status == 200
+        assert [file["name"] for file in server.files.values()] == ["a"]
+
+    run_async_client(test, tmp_path)
+
+
+def test_async_send_charges_a_batch_per_request(tmp_path):
+    async def test(client, server, limiter):
+        files = [server.add_file({"name": str(index)}) for index in range(5)]
+
+        await client.async_batch([("DELETE", f"drive/v3/files/{file['id']}", None) for file in files])
+
+        assert limiter.stats()["requests"] == 5
+        assert server.files == {}
+
+    run_async_client(test, tmp_path)
+
+
+def test_async_send_does_not_retry_post_after_connection_drop(tmp_path):
+    listener = socket.create_server(("127.0.0.1", 0))
+    received = []
+
+    def serve() -> None:
+        while True:
+            try:
+                connection, _ = listener.accept()
+            except OSError:
+                return
+            with connection:
+                received.append(connection.recv(65536))
+
+    threading.Thread(target=serve, daemon=True).start()
+
+    async def test(client, server, limiter):
+        with pytest.raises(ConnectionError):
+            await client._async_send("POST", f"http://127.0.0.1:{listener.getsockname()[1]}/drive/v3/files", data=b"{}")
+        assert len(received) == 1
+        assert limiter.stats()["retries"] == 0
+
+    try:
+        run_async_client(test, tmp_path)
+    finally:
+        listener.close()
+
+
+def test_async_send_retries_post_when_connection_refused(tmp_path):
+    listener = socket.create_server(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    listener.close()
+
+    async def test(client, server, limiter):
+        with pytest.raises(ConnectionError):
+            await client._async_send("POST", f"http://127.0.0.1:{port}/drive/v3/files", data=b"{}")
+        assert limiter.stats()["retries"] == 3
+        assert limiter.stats()["failed_after_retries"] == 1
+
+    run_async_client(test, tmp_path)
+#endregion
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta, timezone
+
+from custom_components.google_drive_file_manager.const import FOLDER_MIME_TYPE
+from custom_components.google_drive_file_manager.helpers.retention import RetentionPolicy, RetentionRule
+
+NOW = datetime(2025, 6, 15, 12, 0, tzinfo=timezone.utc)
+
+
+def make_file(file_id: str, created: datetime, name: str | None = None, size: int = 1, parent: str = "root-id") -> dict:
+    return {
+        "id": file_id,
+        "name": name or f"{file_id}.tar",
+        "mimeType": "application/x-tar",
+        "parents": [parent],
+        "createdTime": created.isoformat().replace("+00:00", "Z"),
+        "size": str(size),
+    }
+
+
+def make_folder(folder_id: str, parent: str) -> dict:
+    return {"id": folder_id, "name": folder_id, "mimeType": FOLDER_MIME_TYPE, "parents": [parent]}
+
+
+def make_rule(name: str = "rule", name_pattern: str | None = "*", folder_id: str | None = None, **options) -> RetentionRule:
+    return RetentionRule.from_config({"name": name, "name_pattern": name_pattern, **options}, folder_id)
+
+
+def evaluate(rules: list[RetentionRule], *pages: list[dict]) -> tuple[dict, set[str]]:
+    policy = RetentionPolicy(rules, now=NOW)
+    for page in pages:
+        policy.add(page)
+    results, expired = policy.evaluate()
+    return results, {file["id"] for file in expired}
+
+
+def test_from_config_converts_sizes_and_defaults_tiers():
+    rule = RetentionRule.from_config({"name": "a", "name_pattern": "", "keep_daily": 3, "max_total_size_mb": 2}, "folder")
+
+    assert rule.name_pattern is None
+    assert rule.folder_id == "folder"
+    assert rule.tiers == {"keep_daily": 3, "keep_weekly": 0, "keep_monthly": 0, "keep_yearly": 0}
+    assert rule.max_total_size == 2 * 1024 * 1024
+    assert rule.keeps_by_count
+
+
+def test_keep_last_keeps_newest_files():
+    files = [make_file(str(i), NOW - timedelta(hours=i)) for i in range(5)]
+
+    results, expired = evaluate([make_rule(keep_last=2)], files)
+
+    assert expired == {"2", "3", "4"}
+    assert results["rule"]["matched"] == 5
+    assert results["rule"]["kept"] == 2
+    assert results["rule"]["expired_size"] == 3
+
+
+def test_keep_within_days_uses_creation_time():
+    files = [make_file(str(days), NOW - timedelta(days=days, minutes=1)) for days in range(5)]
+
+    _, expired = evaluate([make_rule(keep_within_days=2)], files)
+
+    assert expired == {"2", "3", "4"}
+
+
+def test_keep_daily_keeps_newest_file_of_each_day():
+    files = [
+        make_file("today-late", NOW),
+        make_file("today-early", NOW - timedelta(hours=10)),
+        make_file("yesterday", NOW - timedelta(days=1)),
+        # A day without files does not count towards the tier
+        make_file("three-days-ago", NOW - timedelta(days=3)),
+        make_file("four-days-ago", NOW - timedelta(days=4)),
+    ]
+
+    _, expired = evaluate([make_rule(keep_daily=3)], files)
+
+    assert expired == {"today-early", "four-days-ago"}
+
+
+def test_gfs_tiers_are_combined():
+    # One file per day for 400 days, the newest first
+    files = [make_file(f"d{days}", NOW - timedelta(days=days)) for days in range(400)]
+
+    results, expired = evaluate([make_rule(keep_daily=7, keep_weekly=4, keep_monthly=12, keep_yearly=2)], files)
+    kept = {file["id"] for file in files} - expired
+
+    # The 7 days overlap with the newest weeks and months
+    assert {f"d{days}" for days in range(7)} <= kept
+    assert {"d7", "d14", "d21"} <= kept  # Sundays end the ISO weeks, 2025-06-15 is one
+    assert "d8" not in kept
+    assert "d15" in kept  # newest file of May 2025
+    assert "d166" in kept  # newest file of 2024 (2024-12-31)
+    assert "d399" not in kept
+    assert results["rule"]["kept"] == len(kept)
+
+
+def test_max_total_size_limits_kept_files_from_new_to_old():
+    files = [make_file(str(i), NOW - timedelta(hours=i), size=700 * 1024) for i in range(5)]
+
+    results, expired = evaluate([make_rule(keep_last=4, max_total_size_mb=2)], files)
+
+    assert expired == {"2", "3", "4"}
+    assert results["rule"]["kept"] == 2
+
+
+def test_max_total_size_alone_keeps_newest_files_that_fit():
+    files = [make_file(str(i), NOW - timedelta(hours=i), size=1024 * 1024) for i in range(4)]
+
+    _, expired = evaluate([make_rule(max_total_size_mb=2)], files)
+
+    assert expired == {"2", "3"}
+
+
+def test_name_pattern_is_a_case_sensitive_glob():
+    files = [
+        make_file("newest", NOW, name="backup_1.tar"),
+        make_file("older", NOW - timedelta(hours=1), name="backup_2.tar"),
+        make_file("other-case", NOW - timedelta(hours=2), name="Backup_3.tar"),
+        make_file("other", NOW - timedelta(hours=3), name="clip.mp4"),
+    ]
+
+    results, expired = evaluate([make_rule(name_pattern="backup_*.tar", keep_last=1)], files)
+
+    assert results["rule"]["matched"] == 2
+    assert expired == {"older"}
+
+
+def test_folder_rule_includes_subfolders_in_any_listing_order():
+    files = [
+        make_file("direct", NOW - timedelta(hours=1), parent="backups"),
+        make_file("nested", NOW - timedelta(hours=2), parent="2025"),
+        make_file("deep", NOW - timedelta(hours=3), parent="06"),
+        make_file("outside", NOW - timedelta(hours=4), parent="clips"),
+    ]
+    folders = [make_folder("06", "2025"), make_folder("2025", "backups"), make_folder("backups", "root-id")]
+
+    # Files listed before the folders they are in
+    results, expired = evaluate([make_rule(name_pattern=None, folder_id="backups", keep_last=1)], files, folders)
+
+    assert results["rule"]["matched"] == 3
+    assert expired == {"nested", "deep"}
+
+
+def test_file_expired_by_any_rule_is_expired_once():
+    files = [make_file(str(i), NOW - timedelta(days=i), size=10) for i in range(4)]
+
+    results, expired = evaluate([
+        make_rule("keep-all-recent", keep_within_days=30),
+        make_rule("keep-two", keep_last=2),
+    ], files)
+
+    assert results["keep-all-recent"]["expired"] == []
+    assert [file["id"] for file in results["keep-two"]["expired"]] == ["2", "3"]
+    assert expired == {"2", "3"}
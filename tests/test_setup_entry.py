@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, ServiceRegistry
+
+from custom_components.google_drive_file_manager import async_setup_entry, async_unload_entry
+from custom_components.google_drive_file_manager.const import (
+    CONF_METADATA_MIRROR,
+    CONF_PRECREATE_DAILY_FOLDERS,
+    CONF_PREWARM_FOLDER_CACHE,
+    DOMAIN,
+)
+from custom_components.google_drive_file_manager.helpers.change_watcher import DriveChangeWatcher
+from custom_components.google_drive_file_manager.helpers.drive_client_pool import DriveClientPool
+from custom_components.google_drive_file_manager.helpers.job_scheduler import DriveJobScheduler
+from custom_components.google_drive_file_manager.helpers.metadata_mirror import DriveMetadataMirror
+from custom_components.google_drive_file_manager.helpers.upload_queue import OfflineUploadQueue, UploadQueueDatabase
+
+
+@pytest.fixture
+def closed(monkeypatch) -> list[str]:
+    """Record which resources of the config entry are closed or stopped."""
+    closed = []
+
+    def record(cls, name: str) -> None:
+        method = getattr(cls, name)
+        if asyncio.iscoroutinefunction(method):
+            async def wrapper(self, *args):
+                closed.append(cls.__name__)
+                return await method(self, *args)
+        else:
+            def wrapper(self, *args):
+                closed.append(cls.__name__)
+                return method(self, *args)
+        monkeypatch.setattr(cls, name, wrapper)
+
+    for cls, name in [
+        (DriveClientPool, "close"),
+        (DriveJobScheduler, "close"),
+        (DriveMetadataMirror, "close"),
+        (DriveChangeWatcher, "async_stop"),
+        (UploadQueueDatabase, "close"),
+        (OfflineUploadQueue, "async_stop"),
+    ]:
+        record(cls, name)
+    return closed
+
+
+def run_setup(tmp_path, options: dict) -> tuple[bool | Exception, HomeAssistant, ConfigEntry, list]:
+    """Set up a config entry (without any Drive requests) and return the result and the registered services."""
+    (tmp_path / ".storage").mkdir()
+    entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title="Google Drive",
+        data={
+            "client_id": "client-id",
+            "client_secret": "client-secret",
+            "token": {"access_token": "token", "refresh_token": "refresh", "expires_at": 2**40},
+        },
+        source="user",
+        options={CONF_PREWARM_FOLDER_CACHE: False, CONF_PRECREATE_DAILY_FOLDERS: False, **options},
+    )
+
+    async def main():
+        hass = HomeAssistant(str(tmp_path))
+        try:
+            result = await async_setup_entry(hass, entry)
+        except Exception as e:
+            result = e
+        services = list(hass.services.async_services().get(DOMAIN, {}))
+        if result is True:
+            await async_unload_entry(hass, entry)
+        await hass.async_stop(force=True)
+        return result, hass, entry, services
+
+    return asyncio.run(main())
+
+
+def test_failing_setup_closes_what_was_opened(tmp_path, monkeypatch, closed):
+    def fail(self):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(UploadQueueDatabase, "open", fail)
+
+    result, hass, entry, services = run_setup(tmp_path, {CONF_METADATA_MIRROR: True})
+
+    assert isinstance(result, OSError)
+    assert sorted(closed) == [
+        "DriveChangeWatcher",
+        "DriveClientPool",
+        "DriveJobScheduler",
+        "DriveMetadataMirror",
+        "UploadQueueDatabase",
+    ]
+    assert entry.entry_id not in hass.data.get(DOMAIN, {})
+    assert services == []
+
+
+def test_failing_service_registration_removes_the_registered_services(tmp_path, monkeypatch, closed):
+    async_register = ServiceRegistry.async_register
+    registered = []
+
+    def fail_on_third_service(self, domain, service, *args, **kwargs):
+        if len(registered) == 2:
+            raise ValueError("invalid schema")
+        registered.append(service)
+        return async_register(self, domain, service, *args, **kwargs)
+
+    monkeypatch.setattr(ServiceRegistry, "async_register", fail_on_third_service)
+
+    result, hass, entry, services = run_setup(tmp_path, {CONF_METADATA_MIRROR: False})
+
+    assert isinstance(result, ValueError)
+    assert services == []
+    assert entry.entry_id not in hass.data.get(DOMAIN, {})
+    # The queue is stopped before its journal is closed
+    assert closed.index("OfflineUploadQueue") < closed.index("UploadQueueDatabase")
+    assert sorted(closed) == [
+        "DriveChangeWatcher",
+        "DriveClientPool",
+        "DriveJobScheduler",
+        "OfflineUploadQueue",
+        "UploadQueueDatabase",
+    ]
+
+
+def test_completed_setup_is_closed_by_unload_only(tmp_path, closed):
+    result, hass, entry, services = run_setup(tmp_path, {CONF_METADATA_MIRROR: True})
+
+    assert result is True
+    assert "sync_folder" in services
+    # Closed once, by async_unload_entry
+    assert sorted(closed) == [
+        "DriveChangeWatcher",
+        "DriveClientPool",
+        "DriveJobScheduler",
+        "DriveMetadataMirror",
+        "OfflineUploadQueue",
+        "UploadQueueDatabase",
+    ]
@@ -0,0 +1,189 @@
+import os
+
+from google.oauth2.credentials import Credentials
+
+import pytest
+
+from custom_components.google_drive_file_manager.const import FOLDER_MIME_TYPE
+from custom_components.google_drive_file_manager.helpers.drive_client_pool import DriveClientPool
+from custom_components.google_drive_file_manager.helpers.folder_cache import FolderCache
+from custom_components.google_drive_file_manager.helpers.google_drive_actions import sync_folder
+from custom_components.google_drive_file_manager.helpers.rate_limiter import DriveRateLimiter
+from custom_components.google_drive_file_manager.helpers.sync_manifest import SyncManifest
+from tests.fake_drive_server import FakeDriveServer
+
+CREDENTIALS = Credentials(token="test-token")
+
+
+class SyncFixture:
+    def __init__(self, server: FakeDriveServer, client_pool: DriveClientPool, local_folder_path: str) -> None:
+        self.server = server
+        self.client_pool = client_pool
+        self.local_folder_path = local_folder_path
+        self.folder_cache = FolderCache()
+        self.sync_manifest = SyncManifest()
+
+    def write(self, relative_path: str, content: bytes) -> None:
+        """Write a local file, with a modification time that differs from the previous one."""
+        local_file_path = os.path.join(self.local_folder_path, relative_path)
+        os.makedirs(os.path.dirname(local_file_path), exist_ok=True)
+        previous = os.stat(local_file_path).st_mtime_ns if os.path.exists(local_file_path) else 0
+        with open(local_file_path, "wb") as file:
+            file.write(content)
+        os.utime(local_file_path, ns=(previous + 10**9, previous + 10**9))
+
+    def sync(self, delete_orphans: bool = False, full_scan: bool = False) -> dict:
+        return sync_folder(
+            None,
+            CREDENTIALS,
+            self.local_folder_path,
+            "backup",
+            delete_orphans,
+            full_scan,
+            4,
+            self.client_pool,
+            folder_cache=self.folder_cache,
+            sync_manifest=self.sync_manifest,
+        )
+
+    def manifest(self) -> dict:
+        return self.sync_manifest.get_files(SyncManifest.get_sync_key(self.local_folder_path, "backup"))
+
+    def remote_files(self) -> dict[str, bytes]:
+        """Return the content of the Drive files by name."""
+        return {
+            file["name"]: self.server.contents.get(file_id)
+            for file_id, file in self.server.files.items()
+            if file["mimeType"] != FOLDER_MIME_TYPE
+        }
+
+
+@pytest.fixture
+def drive(tmp_path):
+    server = FakeDriveServer()
+    server.start()
+    client_pool = DriveClientPool(root_url=server.root_url, rate_limiter=DriveRateLimiter(10000, 10000))
+    client_pool.load_discovery_document()
+    local_folder_path = tmp_path / "local"
+    local_folder_path.mkdir()
+    yield SyncFixture(server, client_pool, str(local_folder_path))
+    client_pool.close()
+    server.stop()
+
+
+def counts(result: dict) -> dict:
+    return {status: count for status, count in result.items() if status != "files" and count}
+
+
+def test_second_sync_of_an_unchanged_tree_makes_no_requests(drive):
+    drive.write("a.jpg", b"a")
+    drive.write("2025/b.jpg", b"b")
+    drive.write("2025/06/c.jpg", b"c")
+
+    assert counts(drive.sync()) == {"uploaded": 3}
+    assert drive.remote_files() == {"a.jpg": b"a", "b.jpg": b"b", "c.jpg": b"c"}
+
+    requests = drive.server.request_count
+    assert counts(drive.sync()) == {"unchanged": 3}
+    assert drive.server.request_count == requests
+
+
+def test_changed_file_is_updated_in_place(drive):
+    drive.write("a.jpg", b"first")
+    drive.write("b.jpg", b"b")
+    file_id = {file["path"]: file["id"] for file in drive.sync()["files"]}["a.jpg"]
+
+    drive.write("a.jpg", b"second version")
+    result = drive.sync()
+
+    assert counts(result) == {"updated": 1, "unchanged": 1}
+    assert result["files"] == [{"path": "a.jpg", "status": "updated", "id": file_id}]
+    assert drive.server.contents[file_id] == b"second version"
+    assert drive.manifest()["a.jpg"].file_id == file_id
+    assert len(drive.remote_files()) == 2
+
+
+def test_identical_drive_file_is_adopted_by_md5(drive):
+    backup_id = drive.server.add_file({"name": "backup", "mimeType": FOLDER_MIME_TYPE})["id"]
+    identical_id = drive.server.add_file({"name": "same.jpg", "parents": [backup_id]}, b"same")["id"]
+    # Same size, other content
+    other_id = drive.server.add_file({"name": "other.jpg", "parents": [backup_id]}, b"old!")["id"]
+    drive.write("same.jpg", b"same")
+    drive.write("other.jpg", b"new!")
+    requests = drive.server.request_count
+
+    result = drive.sync()
+
+    assert counts(result) == {"adopted": 1, "updated": 1}
+    assert result["files"] == [{"path": "other.jpg", "status": "updated", "id": other_id}]
+    assert drive.manifest()["same.jpg"].file_id == identical_id
+    assert drive.server.contents[other_id] == b"new!"
+    assert len(drive.remote_files()) == 2
+    # Looking up the folder and listing it, then a single upload
+    assert drive.server.request_count - requests < 5
+
+
+def test_changed_file_deleted_from_drive_is_uploaded_again(drive):
+    drive.write("a.jpg", b"first")
+    file_id = drive.sync()["files"][0]["id"]
+    drive.server.delete_file(file_id)
+
+    drive.write("a.jpg", b"second")
+    result = drive.sync()
+
+    assert counts(result) == {"uploaded": 1}
+    assert result["files"][0]["id"] != file_id
+    assert drive.manifest()["a.jpg"].file_id == result["files"][0]["id"]
+    assert drive.remote_files() == {"a.jpg": b"second"}
+
+
+def test_full_scan_uploads_unchanged_file_deleted_from_drive(drive):
+    drive.write("a.jpg", b"a")
+    drive.write("b.jpg", b"b")
+    file_id = {file["path"]: file["id"] for file in drive.sync()["files"]}["a.jpg"]
+    drive.server.delete_file(file_id)
+
+    # Without a listing the manifest is trusted
+    assert counts(drive.sync()) == {"unchanged": 2}
+
+    result = drive.sync(full_scan=True)
+
+    assert counts(result) == {"uploaded": 1, "unchanged": 1}
+    assert drive.remote_files() == {"a.jpg": b"a", "b.jpg": b"b"}
+
+
+def test_orphan_already_gone_from_drive_counts_as_deleted(drive):
+    drive.write("a.jpg", b"a")
+    drive.write("b.jpg", b"b")
+    ids = {file["path"]: file["id"] for file in drive.sync()["files"]}
+    os.remove(os.path.join(drive.local_folder_path, "a.jpg"))
+    os.remove(os.path.join(drive.local_folder_path, "b.jpg"))
+    drive.server.delete_file(ids["b.jpg"])
+
+    result = drive.sync(delete_orphans=True)
+
+    assert counts(result) == {"deleted": 2}
+    assert sorted((file["path"], file["id"]) for file in result["files"]) == sorted(ids.items())
+    assert drive.manifest() == {}
+    assert drive.remote_files() == {}
+
+
+def test_failed_orphan_delete_stays_in_the_manifest(drive):
+    drive.write("a.jpg", b"a")
+    drive.write("b.jpg", b"b")
+    ids = {file["path"]: file["id"] for file in drive.sync()["files"]}
+    os.remove(os.path.join(drive.local_folder_path, "a.jpg"))
+    os.remove(os.path.join(drive.local_folder_path, "b.jpg"))
+    drive.server.fail_requests(1, 403, "DELETE", reason="insufficientFilePermissions", file_id=ids["a.jpg"])
+
+    result = drive.sync(delete_orphans=True)
+
+    assert counts(result) == {"deleted": 1, "failed": 1}
+    failed = next(file for file in result["files"] if file["status"] == "failed")
+    assert (failed["path"], failed["id"], failed["http_status"]) == ("a.jpg", ids["a.jpg"], 403)
+    assert list(drive.manifest()) == ["a.jpg"]
+
+    # The next sync deletes it again
+    assert counts(drive.sync(delete_orphans=True)) == {"deleted": 1}
+    assert drive.manifest() == {}
+    assert drive.remote_files() == {}
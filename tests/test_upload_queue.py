@@ -0,0 +1,241 @@
+import asyncio
+import time
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.google_drive_file_manager.const import EVENT_QUEUED_UPLOAD
+from custom_components.google_drive_file_manager.helpers import upload_queue
+from custom_components.google_drive_file_manager.helpers.upload_queue import (
+    OfflineUploadQueue,
+    UploadQueueDatabase,
+    is_offline_error,
+)
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = UploadQueueDatabase(str(tmp_path / "queue.db"))
+    database.open()
+    yield database
+    database.close()
+
+
+def http_error(status: int, reason: str = "backendError") -> HttpError:
+    content = f'{{"error": {{"errors": [{{"reason": "{reason}"}}]}}}}'.encode()
+    return HttpError(httplib2.Response({"status": str(status)}), content)
+
+
+def chained(error: Exception, cause: Exception) -> Exception:
+    try:
+        raise error from cause
+    except Exception as e:
+        return e
+
+
+#region Journal
+def test_journal_survives_close_and_reopen(tmp_path):
+    path = str(tmp_path / "queue.db")
+    database = UploadQueueDatabase(path)
+    database.open()
+    queue_id = database.add({"local_file_path": "/media/a.jpg"}, 1)
+    database.close()
+
+    reopened = UploadQueueDatabase(path)
+    reopened.open()
+    try:
+        assert reopened.next_upload() == (queue_id, {"local_file_path": "/media/a.jpg"})
+        assert reopened.stats()["backlog"] == 1
+    finally:
+        reopened.close()
+
+
+def test_uploads_are_taken_by_priority_then_in_order(database):
+    ids = {
+        name: database.add({"local_file_path": name}, priority)
+        for name, priority in [("low-1", 0), ("high-1", 5), ("low-2", 0), ("high-2", 5), ("negative", -1)]
+    }
+
+    order = []
+    while (item := database.next_upload()) is not None:
+        order.append(item[1]["local_file_path"])
+        database.remove(item[0])
+
+    assert order == ["high-1", "high-2", "low-1", "low-2", "negative"]
+    assert list(ids.values()) == sorted(ids.values())
+
+
+def test_next_upload_skips_excluded_uploads(database):
+    first = database.add({"local_file_path": "a"})
+    second = database.add({"local_file_path": "b"})
+
+    assert database.next_upload(exclude=[first])[0] == second
+    assert database.next_upload(exclude=[first, second]) is None
+    assert database.next_upload(exclude=())[0] == first
+
+
+def test_failures_are_counted_and_stats_report_the_oldest(database):
+    before = time.time()
+    queue_id = database.add({"local_file_path": "a"})
+    database.add({"local_file_path": "b"})
+
+    database.record_failure(queue_id, "offline")
+    database.record_failure(queue_id, "still offline")
+
+    stats = database.stats()
+    assert stats["backlog"] == 2
+    assert before <= stats["oldest_queued_at"] <= time.time()
+    with database._lock:
+        assert database._connection.execute(
+            "SELECT attempts, last_error FROM uploads WHERE id = ?", (queue_id,)
+        ).fetchone() == (2, "still offline")
+#endregion
+
+#region Offline errors
+@pytest.mark.parametrize("error", [
+    ConnectionResetError("reset"),
+    TimeoutError("read timeout"),
+    httplib2.ServerNotFoundError("no dns"),
+    http_error(503),
+    http_error(429, "rateLimitExceeded"),
+    http_error(403, "userRateLimitExceeded"),
+])
+def test_offline_errors(error):
+    assert is_offline_error(error)
+
+
+@pytest.mark.parametrize("error", [
+    FileNotFoundError("gone"),
+    http_error(404, "notFound"),
+    http_error(403, "insufficientFilePermissions"),
+    None,
+])
+def test_other_errors_are_not_offline(error):
+    assert not is_offline_error(error)
+
+
+def test_offline_error_follows_chained_causes():
+    wrapped = chained(HomeAssistantError("Upload failed"), chained(ValueError("step"), ConnectionRefusedError("refused")))
+
+    assert is_offline_error(wrapped)
+    assert not is_offline_error(chained(HomeAssistantError("Upload failed"), ValueError("bad file")))
+
+
+def test_offline_error_stops_at_a_cause_cycle():
+    first = ValueError("first")
+    second = ValueError("second")
+    first.__cause__ = second
+    second.__cause__ = first
+
+    assert not is_offline_error(first)
+#endregion
+
+#region Drain loop
+def run_queue(tmp_path, monkeypatch, upload, requests: list[dict], until) -> tuple[list[dict], UploadQueueDatabase]:
+    """Queue `requests`, drain them with `upload` until `until(events)` holds and return the fired events."""
+    monkeypatch.setattr(upload_queue, "UPLOAD_QUEUE_MIN_RETRY_DELAY", 0.05)
+    monkeypatch.setattr(upload_queue, "UPLOAD_QUEUE_MAX_RETRY_DELAY", 0.2)
+
+    async def main():
+        hass = HomeAssistant(str(tmp_path))
+        database = UploadQueueDatabase(str(tmp_path / "queue.db"))
+        database.open()
+        events = []
+        hass.bus.async_listen(EVENT_QUEUED_UPLOAD, lambda event: events.append(event.data))
+
+        queue = OfflineUploadQueue(hass, database, upload, max_parallel=2)
+        for request in requests:
+            await queue.async_enqueue(request)
+        task = asyncio.create_task(queue.async_run())
+        try:
+            async with asyncio.timeout(10):
+                while not until(events):
+                    await asyncio.sleep(0.01)
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await hass.async_stop(force=True)
+        return events, database
+
+    return asyncio.run(main())
+
+
+def test_drain_uploads_queued_requests_and_fires_events(tmp_path, monkeypatch):
+    async def upload(request):
+        return {"id": f"id-{request['local_file_path']}"}
+
+    events, database = run_queue(
+        tmp_path, monkeypatch, upload, [{"local_file_path": "a"}, {"local_file_path": "b"}], lambda events: len(events) == 2
+    )
+    try:
+        assert sorted((event["local_file_path"], event["status"], event["file"]["id"]) for event in events) == [
+            ("a", "uploaded", "id-a"),
+            ("b", "uploaded", "id-b"),
+        ]
+        assert database.stats()["backlog"] == 0
+    finally:
+        database.close()
+
+
+def test_drain_drops_uploads_failing_for_other_reasons(tmp_path, monkeypatch):
+    async def upload(request):
+        raise HomeAssistantError(f"Local file {request['local_file_path']} does not exist")
+
+    events, database = run_queue(tmp_path, monkeypatch, upload, [{"local_file_path": "gone"}], lambda events: events)
+    try:
+        assert events == [{
+            "queue_id": 1,
+            "status": "failed",
+            "error": "Local file gone does not exist",
+            "local_file_path": "gone",
+        }]
+        assert database.stats()["backlog"] == 0
+    finally:
+        database.close()
+
+
+def test_drain_keeps_offline_uploads_queued_with_exponential_backoff(tmp_path, monkeypatch):
+    attempts = []
+
+    async def upload(request):
+        attempts.append(time.monotonic())
+        if len(attempts) <= 5:
+            raise HomeAssistantError("Upload failed") from ConnectionRefusedError("refused")
+        return {"id": "uploaded-id"}
+
+    def uploaded(events: list[dict]) -> bool:
+        return bool(events) and events[-1]["status"] == "uploaded"
+
+    events, database = run_queue(tmp_path, monkeypatch, upload, [{"local_file_path": "a"}], uploaded)
+    try:
+        assert [event["status"] for event in events] == ["retrying"] * 5 + ["uploaded"]
+        assert events[0]["error"] == "Upload failed"
+        assert len({event["queue_id"] for event in events}) == 1
+        assert len(attempts) == 6
+        # The delay doubles from the minimum up to the maximum
+        gaps = [later - earlier for earlier, later in zip(attempts, attempts[1:])]
+        for gap, delay in zip(gaps, [0.05, 0.1, 0.2, 0.2, 0.2]):
+            assert delay <= gap < delay + 0.15
+        assert database.stats()["backlog"] == 0
+    finally:
+        database.close()
+
+
+def test_offline_failures_stay_queued_and_are_counted(tmp_path, monkeypatch):
+    async def upload(request):
+        raise http_error(503)
+
+    events, database = run_queue(
+        tmp_path, monkeypatch, upload, [{"local_file_path": "a"}], lambda events: len(events) >= 2
+    )
+    try:
+        assert [event["status"] for event in events[:2]] == ["retrying", "retrying"]
+        assert database.stats()["backlog"] == 1
+        with database._lock:
+            assert database._connection.execute("SELECT attempts FROM uploads").fetchone()[0] >= 2
+    finally:
+        database.close()
+#endregion